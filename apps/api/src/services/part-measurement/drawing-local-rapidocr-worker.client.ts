@@ -14,17 +14,25 @@ export type RapidOcrWorkerWord = {
   bbox: { x0: number; y0: number; x1: number; y1: number };
 };
 
+export type RapidOcrWorkerRegion = { x0: number; y0: number; x1: number; y1: number };
+
+/** worker 側で検出前に切り出す矩形（元画像 px）と長辺上限。返る bbox は常に元画像座標。 */
+export type RapidOcrRecognizeOptions = {
+  region?: RapidOcrWorkerRegion;
+  maxSide?: number;
+};
+
 export type RapidOcrWorkerRequest = {
   id: string;
   imageBase64: string;
-};
+} & RapidOcrRecognizeOptions;
 
 export type RapidOcrWorkerResponse =
   | { id: string; ok: true; words: RapidOcrWorkerWord[] }
   | { id: string; ok: false; error: string };
 
 export interface DrawingLocalRapidOcrWorkerClient {
-  recognize(imageJpeg: Buffer, timeoutMs: number): Promise<RapidOcrWorkerWord[]>;
+  recognize(imageJpeg: Buffer, timeoutMs: number, options?: RapidOcrRecognizeOptions): Promise<RapidOcrWorkerWord[]>;
   dispose(): Promise<void>;
 }
 
@@ -78,12 +86,18 @@ export class PersistentDrawingLocalRapidOcrWorkerClient implements DrawingLocalR
     private readonly workerScript = defaultWorkerScriptPath()
   ) {}
 
-  async recognize(imageJpeg: Buffer, timeoutMs: number): Promise<RapidOcrWorkerWord[]> {
+  async recognize(
+    imageJpeg: Buffer,
+    timeoutMs: number,
+    options: RapidOcrRecognizeOptions = {}
+  ): Promise<RapidOcrWorkerWord[]> {
     await this.ensureReady();
     const id = `r${Date.now()}-${++this.seq}`;
     const payload: RapidOcrWorkerRequest = {
       id,
-      imageBase64: imageJpeg.toString('base64')
+      imageBase64: imageJpeg.toString('base64'),
+      ...(options.region ? { region: options.region } : {}),
+      ...(options.maxSide && options.maxSide > 0 ? { maxSide: Math.floor(options.maxSide) } : {})
     };
     return new Promise<RapidOcrWorkerWord[]>((resolve, reject) => {
       const timer = setTimeout(() => {
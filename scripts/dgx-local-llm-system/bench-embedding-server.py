@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+embedding server のスケジューリング層をオフラインで計測するベンチマーク。
+
+torch / CLIP を使わず、「1 回の forward に固定オーバーヘッド + 1 枚あたりコスト」がかかる
+stand-in backend を MicroBatcher に載せ、同時クライアント数ごとの throughput / latency を比較する。
+
+scenario:
+  batching    unbatched / micro-batched の比較（stdlib のみ）
+  preprocess  原寸 decode + request thread 直列前処理 と、draft decode + worker pool 前処理の
+              end-to-end 比較（Pillow が必要。--images-dir 未指定なら大きい合成 JPEG を生成）
+
+例:
+  python3 ./bench-embedding-server.py --clients 16 --requests-per-client 20
+  python3 ./bench-embedding-server.py --batch-overhead-ms 12 --per-item-ms 0.8 --max-batch-size 32
+  python3 ./bench-embedding-server.py --scenario preprocess --images-dir ./photos --clients 8
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from io import BytesIO
+from pathlib import Path
+from typing import Callable, Sequence
+
+from embedding_batcher import BatcherConfig, MicroBatcher
+from embedding_cache import CachedEmbedder, EmbeddingCache, EmbeddingCacheConfig
+from embedding_preprocess import PreprocessConfig, create_preprocess_pool, decode_image_reduced
+
+
+class StandInEmbeddingBackend:
+    """GPU forward の「起動コスト大・追加 1 枚は安い」形をまねる決定的な CPU stand-in。"""
+
+    def __init__(self, batch_overhead_ms: float, per_item_ms: float, dim: int = 16) -> None:
+        self.model_id = "stand-in"
+        self.batch_overhead_ms = batch_overhead_ms
+        self.per_item_ms = per_item_ms
+        self.dim = dim
+        self.calls = 0
+
+    def prepare(self, jpeg_bytes: bytes) -> bytes:
+        if not jpeg_bytes:
+            raise ValueError("empty image")
+        return jpeg_bytes
+
+    def embed_batch(self, prepared: Sequence[bytes]) -> list[list[float]]:
+        self.calls += 1
+        time.sleep((self.batch_overhead_ms + self.per_item_ms * len(prepared)) / 1000.0)
+        vectors: list[list[float]] = []
+        for item in prepared:
+            digest = hashlib.sha256(item).digest()
+            vectors.append([digest[i % len(digest)] / 255.0 for i in range(self.dim)])
+        return vectors
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+def run_scenario(
+    *,
+    label: str,
+    config: BatcherConfig,
+    clients: int,
+    requests_per_client: int,
+    batch_overhead_ms: float,
+    per_item_ms: float,
+) -> dict[str, object]:
+    backend = StandInEmbeddingBackend(batch_overhead_ms, per_item_ms)
+    batcher = MicroBatcher(backend.embed_batch, config)
+    latencies: list[float] = []
+    lock = threading.Lock()
+
+    def client(idx: int) -> None:
+        for n in range(requests_per_client):
+            payload = f"client-{idx}-image-{n}".encode("utf-8")
+            started = time.perf_counter()
+            batcher.submit(backend.prepare(payload))
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+    stats = batcher.stats()
+    batcher.close()
+    total = clients * requests_per_client
+    return {
+        "scenario": label,
+        "maxBatchSize": config.max_batch_size,
+        "maxWaitMs": config.max_wait_ms,
+        "requests": total,
+        "wallSec": round(wall, 4),
+        "throughputPerSec": round(total / wall, 2) if wall > 0 else None,
+        "latencyP50Ms": round(_percentile(latencies, 50) * 1000, 2),
+        "latencyP95Ms": round(_percentile(latencies, 95) * 1000, 2),
+        "forwardCalls": backend.calls,
+        "avgBatchSize": stats["avgBatchSize"],
+    }
+
+
+def load_corpus(images_dir: str, count: int, width: int, height: int) -> list[bytes]:
+    if images_dir:
+        paths = sorted(p for p in Path(images_dir).iterdir() if p.suffix.lower() in (".jpg", ".jpeg"))
+        if not paths:
+            raise SystemExit(f"no jpeg files in {images_dir}")
+        return [p.read_bytes() for p in paths[:count]]
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(42)
+    corpus: list[bytes] = []
+    for n in range(count):
+        image = Image.new("RGB", (width, height), (rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+        draw = ImageDraw.Draw(image)
+        for _ in range(60):
+            x0, y0 = rng.randrange(width), rng.randrange(height)
+            draw.rectangle(
+                (x0, y0, x0 + rng.randrange(50, 800), y0 + rng.randrange(50, 800)),
+                fill=(rng.randrange(256), rng.randrange(256), rng.randrange(256)),
+            )
+        buf = BytesIO()
+        image.save(buf, format="JPEG", quality=90)
+        corpus.append(buf.getvalue())
+    return corpus
+
+
+def clip_like_prepare(side: int, use_draft: bool) -> Callable[[bytes], bytes]:
+    """CLIPProcessor 相当の resize（短辺 side）+ center crop を PIL だけで行う。"""
+    from PIL import Image
+
+    def prepare(data: bytes) -> bytes:
+        image = decode_image_reduced(data, side, use_draft)
+        w, h = image.size
+        scale = side / min(w, h)
+        image = image.resize((max(side, round(w * scale)), max(side, round(h * scale))), Image.BICUBIC)
+        w, h = image.size
+        left, top = (w - side) // 2, (h - side) // 2
+        return image.crop((left, top, left + side, top + side)).tobytes()
+
+    return prepare
+
+
+def run_preprocess_scenario(
+    *,
+    label: str,
+    corpus: list[bytes],
+    use_draft: bool,
+    workers: int,
+    clients: int,
+    requests_per_client: int,
+    batch_overhead_ms: float,
+    per_item_ms: float,
+) -> dict[str, object]:
+    backend = StandInEmbeddingBackend(batch_overhead_ms, per_item_ms)
+    batcher = MicroBatcher(backend.embed_batch, BatcherConfig(max_batch_size=16, max_wait_ms=5.0))
+    pool = create_preprocess_pool(PreprocessConfig(workers=workers, jpeg_draft=use_draft))
+    cache = EmbeddingCache(EmbeddingCacheConfig(max_entries=0), namespace="bench")
+    embedder = CachedEmbedder(cache, clip_like_prepare(224, use_draft), batcher.enqueue, pool)
+    latencies: list[float] = []
+    lock = threading.Lock()
+
+    def client(idx: int) -> None:
+        for n in range(requests_per_client):
+            data = corpus[(idx * requests_per_client + n) % len(corpus)]
+            started = time.perf_counter()
+            embedder.embed_many([data])
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+    batcher.close()
+    if pool is not None:
+        pool.shutdown()
+    total = clients * requests_per_client
+    return {
+        "scenario": label,
+        "jpegDraft": use_draft,
+        "preprocessWorkers": workers,
+        "requests": total,
+        "wallSec": round(wall, 4),
+        "throughputPerSec": round(total / wall, 2) if wall > 0 else None,
+        "latencyP50Ms": round(_percentile(latencies, 50) * 1000, 2),
+        "latencyP95Ms": round(_percentile(latencies, 95) * 1000, 2),
+        "avgBatchSize": batcher.stats()["avgBatchSize"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", choices=("batching", "preprocess"), default="batching")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests-per-client", type=int, default=20)
+    parser.add_argument("--batch-overhead-ms", type=float, default=8.0)
+    parser.add_argument("--per-item-ms", type=float, default=0.5)
+    parser.add_argument("--max-batch-size", type=int, default=16)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--images-dir", default="")
+    parser.add_argument("--corpus-size", type=int, default=16)
+    parser.add_argument("--image-width", type=int, default=4032)
+    parser.add_argument("--image-height", type=int, default=3024)
+    parser.add_argument("--preprocess-workers", type=int, default=4)
+    args = parser.parse_args()
+
+    common = {
+        "clients": args.clients,
+        "requests_per_client": args.requests_per_client,
+        "batch_overhead_ms": args.batch_overhead_ms,
+        "per_item_ms": args.per_item_ms,
+    }
+    if args.scenario == "preprocess":
+        corpus = load_corpus(args.images_dir, args.corpus_size, args.image_width, args.image_height)
+        results = [
+            run_preprocess_scenario(label="full-decode-serial", corpus=corpus, use_draft=False, workers=0, **common),
+            run_preprocess_scenario(
+                label="draft-decode-pool",
+                corpus=corpus,
+                use_draft=True,
+                workers=args.preprocess_workers,
+                **common,
+            ),
+        ]
+        print(json.dumps({"corpusImages": len(corpus), "results": results}, ensure_ascii=False, indent=2))
+        return
+    results = [
+        run_scenario(label="unbatched", config=BatcherConfig(max_batch_size=1, max_wait_ms=0.0), **common),
+        run_scenario(
+            label="micro-batched",
+            config=BatcherConfig(max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms),
+            **common,
+        ),
+    ]
+    print(json.dumps({"results": results}, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+gateway-server.py の open-loop 負荷試験（完全オフライン）。
+
+fake_openai_backend.py の stand-in upstream（green / blue / embedding）と gateway を同一プロセスで起動し、
+決められた到着スケジュール（open-loop）でリクエストを投げて throughput / tail latency / エラー率を出す。
+`--gateway-url` を指定すると既存 gateway（例: 実機の 127.0.0.1:38081）へ向けて同じ負荷を掛ける。
+
+- 到着は応答を待たずに予定時刻どおり発生させる（closed-loop の coordinated omission を避ける）。
+  latency は「予定到着時刻 → 応答完了」で測るので、client 側の詰まりも tail に現れる
+- 到着パターン: poisson（指数分布の到着間隔）/ constant / burst（--burst-size 件を一斉に）
+- リクエスト種別は --mix で配分: chat（/v1/chat/completions、--stream-ratio で SSE）/ embed（/embed）/
+  system（/system/scheduler・/system/telemetry・/healthz を順に）
+- --compare-direct で fake backend へ直接同じ負荷を掛け、gateway の上乗せ latency を比較する
+- --switch-at-sec で実行途中に active model state を blue→green へ書き換え、切替前後を分けて集計する
+
+例:
+  python3 ./bench-gateway-server.py --rate 40 --duration-sec 20 --mix chat=0.7,embed=0.2,system=0.1
+  python3 ./bench-gateway-server.py --rate 80 --pattern burst --burst-size 16 --compare-direct
+  python3 ./bench-gateway-server.py --rate 30 --switch-at-sec 10 --error-rate 0.02 --stall-rate 0.01
+"""
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable
+
+from fake_openai_backend import FakeBackendConfig, start_fake_backend
+
+BENCH_TOKEN = "bench-token"
+SYSTEM_PATHS = ("/system/scheduler", "/system/telemetry", "/healthz")
+
+
+@dataclass
+class Sample:
+    kind: str
+    phase: str
+    status: int
+    latency_sec: float
+    ttfb_sec: float | None
+
+
+@dataclass
+class Target:
+    label: str
+    chat_url: str
+    embed_url: str
+    system_urls: tuple[str, ...]
+    samples: list[Sample] = field(default_factory=list)
+    client_saturated: int = 0
+
+
+def parse_mix(raw: str) -> list[tuple[str, float]]:
+    mix: list[tuple[str, float]] = []
+    for part in raw.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ("chat", "embed", "system"):
+            raise SystemExit(f"unknown request kind in --mix: {name}")
+        mix.append((name, float(weight or "1")))
+    return mix
+
+
+def arrival_offsets(pattern: str, rate: float, duration_sec: float, burst_size: int, rng: random.Random) -> list[float]:
+    offsets: list[float] = []
+    if pattern == "constant":
+        step = 1.0 / rate
+        t = 0.0
+        while t < duration_sec:
+            offsets.append(t)
+            t += step
+    elif pattern == "burst":
+        period = burst_size / rate
+        t = 0.0
+        while t < duration_sec:
+            offsets.extend([t] * burst_size)
+            t += period
+    else:
+        t = rng.expovariate(rate)
+        while t < duration_sec:
+            offsets.append(t)
+            t += rng.expovariate(rate)
+    return offsets
+
+
+def _percentile(values: list[float], pct: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+def _ms(value: float | None) -> float | None:
+    return round(value * 1000, 2) if value is not None else None
+
+
+def send(method: str, url: str, body: bytes | None, stream: bool) -> tuple[int, float | None]:
+    """(status, TTFB 秒) を返す。body は最後まで読み切る。"""
+    headers = {"X-LLM-Token": BENCH_TOKEN, "Content-Type": "application/json"}
+    req = urllib.request.Request(url, data=body, method=method, headers=headers)
+    started = time.monotonic()
+    try:
+        with urllib.request.urlopen(req, timeout=120) as response:
+            ttfb: float | None = None
+            if stream:
+                response.readline()
+                ttfb = time.monotonic() - started
+            response.read()
+            return response.status, ttfb
+    except urllib.error.HTTPError as exc:
+        exc.read()
+        return exc.code, None
+    except (urllib.error.URLError, OSError):
+        return 0, None
+
+
+def run_load(
+    target: Target,
+    offsets: list[float],
+    kinds: list[str],
+    streams: list[bool],
+    *,
+    max_outstanding: int,
+    completion_tokens: int,
+    switch: tuple[float, Callable[[], None]] | None,
+) -> float:
+    outstanding = threading.Semaphore(max_outstanding)
+    lock = threading.Lock()
+    chat_body = {"model": "system-prod-primary", "messages": [{"role": "user", "content": "bench"}]}
+    system_cursor = [0]
+    switched = threading.Event()
+
+    def one(kind: str, stream: bool, scheduled: float, phase: str) -> None:
+        try:
+            if kind == "chat":
+                body = json.dumps({**chat_body, "stream": stream, "max_tokens": completion_tokens}).encode("utf-8")
+                status, ttfb = send("POST", target.chat_url, body, stream)
+            elif kind == "embed":
+                body = json.dumps({"jpegBase64": "YmVuY2g="}).encode("utf-8")
+                status, ttfb = send("POST", target.embed_url, body, False)
+            else:
+                with lock:
+                    url = target.system_urls[system_cursor[0] % len(target.system_urls)]
+                    system_cursor[0] += 1
+                status, ttfb = send("GET", url, None, False)
+            latency = time.monotonic() - scheduled
+            with lock:
+                target.samples.append(Sample(kind, phase, status, latency, ttfb))
+        finally:
+            outstanding.release()
+
+    with ThreadPoolExecutor(max_workers=max_outstanding, thread_name_prefix=f"bench-{target.label}") as pool:
+        started = time.monotonic()
+        for offset, kind, stream in zip(offsets, kinds, streams):
+            scheduled = started + offset
+            if switch and not switched.is_set() and offset >= switch[0]:
+                switch[1]()
+                switched.set()
+            delay = scheduled - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            if not outstanding.acquire(blocking=False):
+                # client 側の上限。open-loop を崩さないため待たずに数えて捨てる
+                target.client_saturated += 1
+                continue
+            phase = "after-switch" if switched.is_set() else "before-switch" if switch else "all"
+            pool.submit(one, kind, stream, scheduled, phase)
+    return time.monotonic() - started
+
+
+def summarize(target: Target, wall_sec: float) -> dict[str, object]:
+    groups: dict[tuple[str, str], list[Sample]] = {}
+    for sample in target.samples:
+        groups.setdefault((sample.kind, sample.phase), []).append(sample)
+    rows = []
+    for (kind, phase), samples in sorted(groups.items()):
+        latencies = [s.latency_sec for s in samples]
+        ttfbs = [s.ttfb_sec for s in samples if s.ttfb_sec is not None]
+        errors = sum(1 for s in samples if s.status == 0 or s.status >= 500)
+        rejected = sum(1 for s in samples if s.status == 429)
+        rows.append(
+            {
+                "kind": kind,
+                "phase": phase,
+                "requests": len(samples),
+                "errors": errors,
+                "rejected429": rejected,
+                "errorRate": round(errors / len(samples), 4),
+                "throughputPerSec": round(len(samples) / wall_sec, 2) if wall_sec > 0 else None,
+                "latencyP50Ms": _ms(_percentile(latencies, 50)),
+                "latencyP95Ms": _ms(_percentile(latencies, 95)),
+                "latencyP99Ms": _ms(_percentile(latencies, 99)),
+                "latencyMaxMs": _ms(max(latencies)),
+                "ttfbP50Ms": _ms(_percentile(ttfbs, 50)),
+                "ttfbP95Ms": _ms(_percentile(ttfbs, 95)),
+            }
+        )
+    return {"target": target.label, "wallSec": round(wall_sec, 3), "clientSaturated": target.client_saturated, "results": rows}
+
+
+def load_gateway_module():
+    path = Path(__file__).resolve().parent / "gateway-server.py"
+    spec = importlib.util.spec_from_file_location("dgx_gateway_server_bench", path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def write_active_state(path: Path, backend: str) -> None:
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(
+        json.dumps(
+            {
+                "modelProfileId": f"bench-{backend}",
+                "displayNameJa": f"bench {backend}",
+                "backend": backend,
+                "servedAlias": "system-prod-primary",
+                "stateUpdatedAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            }
+        ),
+        encoding="utf-8",
+    )
+    tmp.replace(path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--gateway-url", default="", help="既存 gateway を叩く（未指定なら fake upstream と gateway を起動）")
+    parser.add_argument("--rate", type=float, default=40.0, help="平均到着レート（req/s）")
+    parser.add_argument("--duration-sec", type=float, default=15.0)
+    parser.add_argument("--pattern", choices=("poisson", "constant", "burst"), default="poisson")
+    parser.add_argument("--burst-size", type=int, default=16)
+    parser.add_argument("--mix", default="chat=0.7,embed=0.2,system=0.1")
+    parser.add_argument("--stream-ratio", type=float, default=0.5)
+    parser.add_argument("--max-outstanding", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--compare-direct", action="store_true", help="fake backend へ直接も同じ負荷を掛けて比較")
+    parser.add_argument("--switch-at-sec", type=float, default=0.0, help="この時刻に active backend を blue→green へ切替")
+    parser.add_argument("--ttft-ms", type=float, default=80.0)
+    parser.add_argument("--tokens-per-sec", type=float, default=200.0)
+    parser.add_argument("--completion-tokens", type=int, default=32)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--stall-rate", type=float, default=0.0)
+    parser.add_argument("--stall-ms", type=float, default=1500.0)
+    parser.add_argument("--max-inflight", type=int, default=8, help="起動する gateway の GATEWAY_DEFAULT_MAX_INFLIGHT")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    mix = parse_mix(args.mix)
+    offsets = arrival_offsets(args.pattern, args.rate, args.duration_sec, args.burst_size, rng)
+    kinds = rng.choices([name for name, _ in mix], weights=[weight for _, weight in mix], k=len(offsets))
+    streams = [rng.random() < args.stream_ratio for _ in offsets]
+
+    servers: list[ThreadingHTTPServer] = []
+    states = []
+    switch = None
+    tmpdir = tempfile.TemporaryDirectory(prefix="bench-gateway-")
+    try:
+        if args.gateway_url:
+            base = args.gateway_url.rstrip("/")
+            targets = [Target("gateway", f"{base}/v1/chat/completions", f"{base}/embed", tuple(base + p for p in SYSTEM_PATHS))]
+        else:
+            backend_kwargs = dict(
+                ttft_ms=args.ttft_ms,
+                tokens_per_sec=args.tokens_per_sec,
+                completion_tokens=args.completion_tokens,
+                jitter_ms=args.jitter_ms,
+                error_rate=args.error_rate,
+                stall_rate=args.stall_rate,
+                stall_ms=args.stall_ms,
+                seed=args.seed,
+            )
+            urls: dict[str, str] = {}
+            for name in ("green", "blue", "embedding"):
+                server, state = start_fake_backend(FakeBackendConfig(name=name, **backend_kwargs))
+                servers.append(server)
+                states.append(state)
+                urls[name] = f"http://127.0.0.1:{server.server_port}"
+            state_path = Path(tmpdir.name) / "active-model-profile.json"
+            write_active_state(state_path, "blue")
+            os.environ.update(
+                {
+                    "LLM_SHARED_TOKEN": BENCH_TOKEN,
+                    "LLM_RUNTIME_CONTROL_TOKEN": BENCH_TOKEN,
+                    "GREEN_LLM_BASE_URL": urls["green"],
+                    "BLUE_LLM_BASE_URL": urls["blue"],
+                    "EMBEDDING_BASE_URL": urls["embedding"],
+                    "DGX_ACTIVE_MODEL_STATE_PATH": str(state_path),
+                    "DGX_RESOURCE_STATE_PATH": str(Path(tmpdir.name) / "resource-state.json"),
+                    "DGX_MODEL_REGISTRY_ROOT": str(Path(tmpdir.name) / "registry"),
+                    "GATEWAY_DEFAULT_MAX_INFLIGHT": str(args.max_inflight),
+                    "GATEWAY_MAX_QUEUE_DEPTH": str(args.max_outstanding),
+                }
+            )
+            gateway = load_gateway_module()
+            gateway_server = ThreadingHTTPServer(("127.0.0.1", 0), gateway.make_handler(gateway.load_config_from_env()))
+            gateway_server.daemon_threads = True
+            threading.Thread(target=gateway_server.serve_forever, daemon=True).start()
+            servers.append(gateway_server)
+            base = f"http://127.0.0.1:{gateway_server.server_port}"
+            targets = [Target("gateway", f"{base}/v1/chat/completions", f"{base}/embed", tuple(base + p for p in SYSTEM_PATHS))]
+            if args.compare_direct:
+                targets.append(
+                    Target(
+                        "direct",
+                        f"{urls['blue']}/v1/chat/completions",
+                        f"{urls['embedding']}/embed",
+                        (f"{urls['blue']}/healthz",),
+                    )
+                )
+            if args.switch_at_sec > 0:
+                switch = (args.switch_at_sec, lambda: write_active_state(state_path, "green"))
+
+        reports = []
+        for target in targets:
+            wall = run_load(
+                target,
+                offsets,
+                kinds,
+                streams,
+                max_outstanding=args.max_outstanding,
+                completion_tokens=args.completion_tokens,
+                switch=switch if target.label == "gateway" else None,
+            )
+            reports.append(summarize(target, wall))
+        print(
+            json.dumps(
+                {
+                    "pattern": args.pattern,
+                    "rate": args.rate,
+                    "durationSec": args.duration_sec,
+                    "arrivals": len(offsets),
+                    "reports": reports,
+                    "backends": [state.stats() for state in states],
+                },
+                ensure_ascii=False,
+                indent=2,
+            )
+        )
+    finally:
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -18,11 +18,25 @@ DGX system-prod 用: active backend を start/stop する最小 HTTP 制御サ
   DGX_RESOURCE_STATE_PATH     任意: DGX 共有リソース owner/state JSON の保存先
   LLM_RUNTIME_LISTEN_HOST    既定: 127.0.0.1
   LLM_RUNTIME_LISTEN_PORT    既定: 39090
+  LLM_RUNTIME_COMMAND_TIMEOUT_SEC  既定: 120（start/stop command 1 本あたり）
+  LLM_RUNTIME_JOB_WAIT_SEC   既定: 600（同期応答で job 完了を待つ上限。超過時は 202 + job）
+  DGX_RUNTIME_JOB_HISTORY / DGX_RUNTIME_JOB_LOG_LINES / DGX_RUNTIME_JOB_CANCEL_GRACE_SEC  runtime_jobs.py 参照
 
 HTTP:
   POST /start       active backend を起動（modelProfileId 指定時は profile backend を優先）
   POST /stop        通常停止（blue + keep_warm / always_on では no-op）
   POST /stop-force  強制停止（keep_warm を上書きして active backend を実 stop）
+  GET  /jobs                 直近の job 一覧
+  GET  /jobs/<id>            job の状態・進捗（完了後は result も返す）
+  GET  /jobs/<id>/log?tail=N job 出力の末尾
+  POST /jobs/<id>/cancel     queued / 実行中 start の cancel（stop は実行中 cancel 不可）
+
+start / stop / stop-force は runtime_jobs.JobManager の job として 1 本ずつ直列に実行する。
+同じ内容の要求が実行中なら新しい job は作らず合流する（single-flight）。
+既定は従来どおり完了まで待って 200 を返す。`Prefer: respond-async` ヘッダか `?async=1` なら
+即座に 202 + job を返す（Location: /jobs/<id>）。
+実行中 start を cancel した場合は start command の process group を止めたうえで、その backend に
+stop-force を掛けて途中まで起動したランタイムを残さない（active model state は書かない）。
 """
 
 from __future__ import annotations
@@ -35,6 +49,7 @@ from dataclasses import dataclass
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from typing import Protocol
+from urllib.parse import parse_qs, urlsplit
 
 # 同一ディレクトリの policy を import 可能にする（python3 /path/to/control-server.py 実行時）
 _SCRIPT_DIR = Path(__file__).resolve().parent
@@ -51,6 +66,13 @@ from active_model_state import active_model_state_to_api, read_active_model_stat
 from model_profiles import ModelProfileError, validate_startable_profile  # noqa: E402
 from profile_launcher import launcher_env_for_profile  # noqa: E402
 from resource_state import infer_owner_from_profile, state_to_api, write_resource_state  # noqa: E402
+from runtime_jobs import (  # noqa: E402
+    JobCancelledError,
+    JobManager,
+    RuntimeJob,
+    load_job_manager_config_from_env,
+    run_logged_command,
+)
 from vision_readiness import assess_runtime_readiness  # noqa: E402
 from runtime_stop_policy import (  # noqa: E402
     BlueStopMode,
@@ -76,6 +98,8 @@ class ControlConfig:
     model_registry_root: str = "/srv/dgx/shared-models/registry"
     active_model_state_path: str = "/srv/dgx/system-prod/state/active-model-profile.json"
     resource_state_path: str = "/srv/dgx/system-prod/state/dgx-resource-state.json"
+    command_timeout_sec: int = 120
+    job_wait_sec: float = 600.0
 
 
 def load_config_from_env() -> ControlConfig:
@@ -100,6 +124,8 @@ def load_config_from_env() -> ControlConfig:
         ).strip(),
         host=(os.environ.get("LLM_RUNTIME_LISTEN_HOST") or "127.0.0.1").strip(),
         port=int((os.environ.get("LLM_RUNTIME_LISTEN_PORT") or "39090").strip()),
+        command_timeout_sec=int((os.environ.get("LLM_RUNTIME_COMMAND_TIMEOUT_SEC") or "120").strip()),
+        job_wait_sec=float((os.environ.get("LLM_RUNTIME_JOB_WAIT_SEC") or "600").strip()),
     )
 
 
@@ -124,18 +150,20 @@ class CommandRunner(Protocol):
     def __call__(self, command: str, extra_env: dict[str, str] | None = None) -> None: ...
 
 
-def run_shell(command: str, extra_env: dict[str, str] | None = None) -> None:
-    env = os.environ.copy()
-    if extra_env:
-        env.update(extra_env)
-    subprocess.run(
-        ["bash", "-lc", command],
-        check=True,
-        timeout=120,
-        capture_output=True,
-        text=True,
-        env=env,
-    )
+def make_shell_runner(timeout_sec: int = 120) -> CommandRunner:
+    def run_shell(command: str, extra_env: dict[str, str] | None = None) -> None:
+        """job 実行中なら出力を job log へ流し、cancel で process group ごと止める。"""
+        env = os.environ.copy()
+        if extra_env:
+            env.update(extra_env)
+        returncode, output = run_logged_command(command, env=env, timeout_sec=timeout_sec)
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode, ["bash", "-lc", command], output=output, stderr=output)
+
+    return run_shell
+
+
+run_shell = make_shell_runner()
 
 
 def resolve_effective_backend(config: ControlConfig) -> tuple[str, str]:
@@ -227,7 +255,131 @@ def write_resource_state_best_effort(
     return state_to_api(state)
 
 
-def make_handler(config: ControlConfig, command_runner: CommandRunner = run_shell) -> type[BaseHTTPRequestHandler]:
+def wants_async(handler: BaseHTTPRequestHandler) -> bool:
+    if "respond-async" in handler.headers.get("Prefer", "").lower():
+        return True
+    values = parse_qs(urlsplit(handler.path).query).get("async", [])
+    return any(v.strip().lower() in ("1", "true", "yes") for v in values)
+
+
+START_STEPS = ("hard-stop-inactive", "start-runtime", "write-state")
+STOP_STEPS = ("stop-runtime", "write-state")
+
+
+def run_start_job(
+    job: RuntimeJob,
+    config: ControlConfig,
+    command_runner: CommandRunner,
+    *,
+    profile,
+    start_backend: str,
+    reason: str | None,
+) -> dict[str, object]:
+    if single_active_guard_enabled():
+        job.progress("hard-stop-inactive")
+        hard_stop = resolve_hard_stop_for_backend(
+            inactive_backend(start_backend),
+            green_stop_cmd=config.green_stop_cmd,
+            blue_stop_cmd=config.blue_stop_cmd,
+            legacy_stop_cmd=config.stop_cmd,
+        )
+        command_runner(hard_stop)
+    job.progress("start-runtime")
+    start_env = launcher_env_for_profile(profile) if profile is not None else None
+    if start_env:
+        command_runner(resolve_command(config, "start", start_backend), start_env)
+    else:
+        command_runner(resolve_command(config, "start", start_backend))
+    # ここから先は state 書き込みのみ。cancel はこの直前まで受け付ける
+    job.progress("write-state")
+    payload: dict[str, object] = {"ok": True, "action": "start", "backend": start_backend}
+    resource_state = write_resource_state_best_effort(
+        config,
+        owner=infer_owner_from_profile(profile, reason),
+        status="preparing",
+        action="start",
+        reason=reason,
+        profile=profile,
+        backend=start_backend,
+        guarantee_level="post_only",
+    )
+    if resource_state is not None:
+        payload["resourceState"] = resource_state
+    if profile is not None:
+        ready_caps, vision_reason = assess_runtime_readiness(profile, start_env=start_env)
+        state = write_active_model_state(
+            config.active_model_state_path,
+            profile,
+            runtime_ready_capabilities=ready_caps,
+            vision_ready_reason=vision_reason,
+        )
+        payload["modelProfile"] = active_model_state_to_api(state)
+    return payload
+
+
+def cleanup_cancelled_start(
+    job: RuntimeJob,
+    config: ControlConfig,
+    command_runner: CommandRunner,
+    *,
+    start_backend: str,
+    reason: str | None,
+) -> None:
+    """途中まで起動した start の後始末。profile launcher の env 付き起動も含め、backend を実 stop する。"""
+    command_runner(resolve_command(config, "stop-force", start_backend))
+    write_resource_state_best_effort(
+        config,
+        owner=infer_owner_from_profile(None, reason),
+        status="released",
+        action="start-cancelled",
+        reason=reason,
+        profile=None,
+        backend=start_backend,
+        guarantee_level="post_only",
+    )
+
+
+def run_stop_job(
+    job: RuntimeJob,
+    config: ControlConfig,
+    command_runner: CommandRunner,
+    *,
+    action: str,
+    stop_backend: str,
+    stop_source: str,
+    reason: str | None,
+) -> dict[str, object]:
+    job.progress("stop-runtime")
+    command_runner(resolve_command(config, action, stop_backend))
+    job.progress("write-state")
+    resource_state = write_resource_state_best_effort(
+        config,
+        owner="private" if action == "stop-force" else infer_owner_from_profile(None, reason),
+        status="released",
+        action=action,
+        reason=reason,
+        profile=None,
+        backend=stop_backend,
+        guarantee_level="post_only",
+    )
+    payload: dict[str, object] = {
+        "ok": True,
+        "action": action,
+        "backend": stop_backend,
+        "backendSource": stop_source,
+    }
+    if resource_state is not None:
+        payload["resourceState"] = resource_state
+    return payload
+
+
+def make_handler(
+    config: ControlConfig,
+    command_runner: CommandRunner = run_shell,
+    jobs: JobManager | None = None,
+) -> type[BaseHTTPRequestHandler]:
+    job_manager = jobs if jobs is not None else JobManager("ctl", load_job_manager_config_from_env())
+
     class Handler(BaseHTTPRequestHandler):
         server_version = "dgx-llm-runtime-control/1.0"
 
@@ -242,29 +394,94 @@ def make_handler(config: ControlConfig, command_runner: CommandRunner = run_shel
             self.end_headers()
             self.wfile.write(encoded)
 
-        def _send_json(self, status: int, payload: dict[str, object]) -> None:
+        def _send_json(self, status: int, payload: dict[str, object], extra_headers: dict[str, str] | None = None) -> None:
             encoded = json.dumps(payload).encode("utf-8")
             self.send_response(status)
             self.send_header("Content-Type", "application/json; charset=utf-8")
             self.send_header("Content-Length", str(len(encoded)))
+            for key, value in (extra_headers or {}).items():
+                self.send_header(key, value)
             self.end_headers()
             self.wfile.write(encoded)
 
+        def _send_accepted(self, job: RuntimeJob, created: bool) -> None:
+            self._send_json(
+                202,
+                {"ok": True, "jobId": job.id, "coalesced": not created, "job": job.to_api()},
+                {"Location": f"/jobs/{job.id}"},
+            )
+
+        def _respond_with_job(self, job: RuntimeJob, created: bool) -> None:
+            """同期応答: job 完了まで待ち、従来の /start /stop と同じ形で返す。"""
+            if wants_async(self) or not job.wait(config.job_wait_sec):
+                self._send_accepted(job, created)
+                return
+            if job.status == "succeeded" and job.result is not None:
+                self._send_json(200, {**job.result, "jobId": job.id, "coalesced": not created})
+                return
+            error = job.error
+            if isinstance(error, subprocess.CalledProcessError):
+                detail = error.stderr or error.stdout or str(error)
+                self._send_text(500, detail[:2000])
+                return
+            if isinstance(error, JobCancelledError):
+                self._send_json(409, {"ok": False, "code": "JOB_CANCELLED", "message": str(error), "jobId": job.id})
+                return
+            if isinstance(error, ModelProfileError):
+                self._send_json(error.status_code, {"ok": False, "code": error.code, "message": str(error)})
+                return
+            self._send_text(500, str(error))
+
+        def _handle_jobs_get(self, route: str) -> None:
+            parts = [p for p in route.split("/") if p]
+            if len(parts) == 1:
+                self._send_json(200, {"ok": True, **job_manager.snapshot()})
+                return
+            job = job_manager.get(parts[1])
+            if job is None:
+                self._send_json(404, {"ok": False, "code": "JOB_NOT_FOUND", "message": f"unknown job: {parts[1]}"})
+                return
+            if len(parts) == 2:
+                payload: dict[str, object] = {"ok": True, "job": job.to_api()}
+                if job.result is not None:
+                    payload["result"] = job.result
+                self._send_json(200, payload)
+                return
+            if len(parts) == 3 and parts[2] == "log":
+                raw_tail = (parse_qs(urlsplit(self.path).query).get("tail") or [""])[0]
+                tail = int(raw_tail) if raw_tail.isdigit() else None
+                self._send_json(200, {"ok": True, "jobId": job.id, "status": job.status, "lines": job.log_tail(tail)})
+                return
+            self._send_text(404, "not found")
+
+        def _handle_job_cancel(self, job_id: str) -> None:
+            job, outcome = job_manager.cancel(job_id)
+            if job is None:
+                self._send_json(404, {"ok": False, "code": "JOB_NOT_FOUND", "message": f"unknown job: {job_id}"})
+                return
+            status = {"cancelled": 200, "cancelling": 202}.get(outcome, 409)
+            self._send_json(status, {"ok": status < 400, "outcome": outcome, "job": job.to_api()})
+
         def do_GET(self) -> None:
             if not self._auth_ok():
                 self._send_text(401, "unauthorized")
                 return
-            if self.path == "/healthz":
+            route = urlsplit(self.path).path
+            if route == "/healthz":
                 self._send_text(200, "ok\n")
                 return
+            if route == "/jobs" or route.startswith("/jobs/"):
+                self._handle_jobs_get(route)
+                return
             self._send_text(404, "not found")
 
         def do_POST(self) -> None:
             if not self._auth_ok():
                 self._send_text(401, "unauthorized")
                 return
+            route = urlsplit(self.path).path
             try:
-                if self.path == "/start":
+                if route == "/start":
                     body = read_json_body(self)
                     model_profile_id = body.get("modelProfileId")
                     reason = _string_body_value(body, "reason")
@@ -273,97 +490,52 @@ def make_handler(config: ControlConfig, command_runner: CommandRunner = run_shel
                     if isinstance(model_profile_id, str) and model_profile_id.strip():
                         profile = validate_startable_profile(config.model_registry_root, model_profile_id.strip())
                         start_backend = profile.backend
-                    if single_active_guard_enabled():
-                        hard_stop = resolve_hard_stop_for_backend(
-                            inactive_backend(start_backend),
-                            green_stop_cmd=config.green_stop_cmd,
-                            blue_stop_cmd=config.blue_stop_cmd,
-                            legacy_stop_cmd=config.stop_cmd,
-                        )
-                        command_runner(hard_stop)
-                    start_env = launcher_env_for_profile(profile) if profile is not None else None
-                    if start_env:
-                        command_runner(resolve_command(config, "start", start_backend), start_env)
-                    else:
-                        command_runner(resolve_command(config, "start", start_backend))
-                    payload: dict[str, object] = {"ok": True, "action": "start", "backend": start_backend}
-                    resource_state = write_resource_state_best_effort(
-                        config,
-                        owner=infer_owner_from_profile(profile, reason),
-                        status="preparing",
-                        action="start",
-                        reason=reason,
-                        profile=profile,
-                        backend=start_backend,
-                        guarantee_level="post_only",
+                    job, created = job_manager.submit(
+                        f"start:{start_backend}:{profile.id if profile is not None else ''}",
+                        "start",
+                        lambda job: run_start_job(
+                            job,
+                            config,
+                            command_runner,
+                            profile=profile,
+                            start_backend=start_backend,
+                            reason=reason,
+                        ),
+                        steps=START_STEPS,
+                        on_cancel=lambda job: cleanup_cancelled_start(
+                            job, config, command_runner, start_backend=start_backend, reason=reason
+                        ),
                     )
-                    if resource_state is not None:
-                        payload["resourceState"] = resource_state
-                    if profile is not None:
-                        ready_caps, vision_reason = assess_runtime_readiness(profile, start_env=start_env)
-                        state = write_active_model_state(
-                            config.active_model_state_path,
-                            profile,
-                            runtime_ready_capabilities=ready_caps,
-                            vision_ready_reason=vision_reason,
-                        )
-                        payload["modelProfile"] = active_model_state_to_api(state)
-                    self._send_json(200, payload)
+                    self._respond_with_job(job, created)
                     return
-                if self.path == "/stop":
+                if route in ("/stop", "/stop-force"):
+                    action = route.lstrip("/")
                     body = read_json_body(self)
                     reason = _string_body_value(body, "reason")
                     stop_backend, stop_source = resolve_effective_backend(config)
-                    command_runner(resolve_command(config, "stop", stop_backend))
-                    resource_state = write_resource_state_best_effort(
-                        config,
-                        owner=infer_owner_from_profile(None, reason),
-                        status="released",
-                        action="stop",
-                        reason=reason,
-                        profile=None,
-                        backend=stop_backend,
-                        guarantee_level="post_only",
+                    job, created = job_manager.submit(
+                        f"{action}:{stop_backend}",
+                        action,
+                        lambda job: run_stop_job(
+                            job,
+                            config,
+                            command_runner,
+                            action=action,
+                            stop_backend=stop_backend,
+                            stop_source=stop_source,
+                            reason=reason,
+                        ),
+                        steps=STOP_STEPS,
+                        # 実行中の stop を止めると中途半端な状態が残るため、queued の間だけ cancel 可
+                        cancellable_while_running=False,
                     )
-                    payload: dict[str, object] = {
-                        "ok": True,
-                        "action": "stop",
-                        "backend": stop_backend,
-                        "backendSource": stop_source,
-                    }
-                    if resource_state is not None:
-                        payload["resourceState"] = resource_state
-                    self._send_json(200, payload)
+                    self._respond_with_job(job, created)
                     return
-                if self.path == "/stop-force":
-                    body = read_json_body(self)
-                    reason = _string_body_value(body, "reason")
-                    stop_backend, stop_source = resolve_effective_backend(config)
-                    command_runner(resolve_command(config, "stop-force", stop_backend))
-                    resource_state = write_resource_state_best_effort(
-                        config,
-                        owner="private",
-                        status="released",
-                        action="stop-force",
-                        reason=reason,
-                        profile=None,
-                        backend=stop_backend,
-                        guarantee_level="post_only",
-                    )
-                    payload = {
-                        "ok": True,
-                        "action": "stop-force",
-                        "backend": stop_backend,
-                        "backendSource": stop_source,
-                    }
-                    if resource_state is not None:
-                        payload["resourceState"] = resource_state
-                    self._send_json(200, payload)
+                parts = [p for p in route.split("/") if p]
+                if len(parts) == 3 and parts[0] == "jobs" and parts[2] == "cancel":
+                    self._handle_job_cancel(parts[1])
                     return
                 self._send_text(404, "not found")
-            except subprocess.CalledProcessError as exc:
-                detail = exc.stderr or exc.stdout or str(exc)
-                self._send_text(500, detail[:2000])
             except ModelProfileError as exc:
                 self._send_json(exc.status_code, {"ok": False, "code": exc.code, "message": str(exc)})
             except Exception as exc:  # pragma: no cover
@@ -378,7 +550,10 @@ def make_handler(config: ControlConfig, command_runner: CommandRunner = run_shel
 def main() -> None:
     config = load_config_from_env()
     require_env(config)
-    httpd = ThreadingHTTPServer((config.host, config.port), make_handler(config))
+    httpd = ThreadingHTTPServer(
+        (config.host, config.port),
+        make_handler(config, command_runner=make_shell_runner(config.command_timeout_sec)),
+    )
     print(f"[dgx-llm-runtime-control] listening on http://{config.host}:{config.port}", file=sys.stderr)
     httpd.serve_forever()
 
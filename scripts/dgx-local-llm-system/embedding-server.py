@@ -4,7 +4,13 @@ DGX system-prod 用の軽量 image embedding server。
 
 - /healthz は 200 ok
 - /embed は POST { jpegBase64, modelId? } -> { embedding, modelId }
+- /embed/batch は multipart / length-prefixed binary / image/* / JSON で複数画像を受け、
+  { modelId, embeddings: [{ index, name, embedding, cached } | { index, name, error }] } を返す
+- /stats は micro-batching の batch 数・平均 batch サイズ、cache の hit 率等
 - 既定では Hugging Face の CLIP ViT-B/32 を読み、512 次元ベクトルを返す
+- 同時に届いた /embed は embedding_batcher.MicroBatcher で束ねて 1 回の forward にする
+- 同一画像（sha256）は embedding_cache.EmbeddingCache から返し、decode / 推論を省く
+- JPEG は draft mode で縮小 decode し、前処理は worker pool で推論と並行させる（embedding_preprocess.py）
 
 想定:
   このスクリプト自体は host Python ではなく、torch / transformers を含む
@@ -17,6 +23,13 @@ DGX system-prod 用の軽量 image embedding server。
   EMBEDDING_HF_MODEL         既定: openai/clip-vit-base-patch32
   EMBEDDING_DEVICE           既定: auto (cuda -> cpu)
   EMBEDDING_NORMALIZE        既定: true
+  EMBEDDING_MAX_BATCH_SIZE   既定: 16（1 回の forward に束ねる最大枚数）
+  EMBEDDING_MAX_BATCH_WAIT_MS 既定: 5（先頭リクエスト到着から束ねる時間窓）
+  EMBEDDING_CACHE_MAX_ENTRIES 既定: 4096（0 で cache 無効）
+  EMBEDDING_CACHE_PATH        任意: cache の JSONL 永続化先（空ならメモリのみ）
+  EMBEDDING_BATCH_MAX_IMAGES  既定: 64（/embed/batch 1 リクエストの上限）
+  EMBEDDING_PREPROCESS_WORKERS 既定: min(8, CPU 数)（0 で request thread 上の直列前処理）
+  EMBEDDING_JPEG_DRAFT        既定: true（false で原寸 decode）
 """
 
 from __future__ import annotations
@@ -25,13 +38,18 @@ import base64
 import json
 import os
 import sys
+import threading
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
-from io import BytesIO
+from typing import Sequence
 
 import torch
-from PIL import Image
 from transformers import CLIPModel, CLIPProcessor
 
+from embedding_batch_io import BatchRequestError, base64_overhead_bytes, parse_batch_images
+from embedding_batcher import MicroBatcher, load_batcher_config_from_env
+from embedding_cache import CachedEmbedder, EmbeddingCache, load_cache_config_from_env
+from embedding_preprocess import create_preprocess_pool, decode_image_reduced, load_preprocess_config_from_env
+
 
 HOST = (os.environ.get("EMBEDDING_LISTEN_HOST") or "0.0.0.0").strip()
 PORT = int((os.environ.get("EMBEDDING_LISTEN_PORT") or "38100").strip())
@@ -39,6 +57,7 @@ MODEL_ID = (os.environ.get("EMBEDDING_MODEL_ID") or "clip-ViT-B-32").strip()
 HF_MODEL = (os.environ.get("EMBEDDING_HF_MODEL") or "openai/clip-vit-base-patch32").strip()
 DEVICE_RAW = (os.environ.get("EMBEDDING_DEVICE") or "auto").strip().lower()
 NORMALIZE = (os.environ.get("EMBEDDING_NORMALIZE") or "true").strip().lower() not in ("0", "false", "no")
+BATCH_MAX_IMAGES = max(1, int((os.environ.get("EMBEDDING_BATCH_MAX_IMAGES") or "64").strip()))
 
 
 def resolve_device() -> str:
@@ -47,30 +66,87 @@ def resolve_device() -> str:
     return DEVICE_RAW
 
 
+def processor_input_side(processor: CLIPProcessor, default: int = 224) -> int:
+    image_processor = getattr(processor, "image_processor", processor)
+    size = getattr(image_processor, "size", None)
+    if isinstance(size, dict) and isinstance(size.get("shortest_edge"), int):
+        return size["shortest_edge"]
+    crop = getattr(image_processor, "crop_size", None)
+    if isinstance(crop, dict) and isinstance(crop.get("height"), int):
+        return crop["height"]
+    return default
+
+
+class ClipEmbeddingBackend:
+    def __init__(self, hf_model: str, model_id: str, device: str, normalize: bool, jpeg_draft: bool) -> None:
+        self.model_id = model_id
+        self.device = device
+        self.normalize = normalize
+        self.jpeg_draft = jpeg_draft
+        self.processor = CLIPProcessor.from_pretrained(hf_model)
+        self.input_side = processor_input_side(self.processor)
+        self.model = CLIPModel.from_pretrained(hf_model).eval().to(device)
+
+    def prepare(self, jpeg_bytes: bytes) -> torch.Tensor:
+        image = decode_image_reduced(jpeg_bytes, self.input_side, self.jpeg_draft)
+        inputs = self.processor(images=image, return_tensors="pt")
+        if "pixel_values" not in inputs:
+            raise ValueError("processor did not produce pixel_values")
+        return inputs["pixel_values"][0]
+
+    def embed_batch(self, prepared: Sequence[torch.Tensor]) -> list[list[float]]:
+        pixel_values = torch.stack(list(prepared)).to(self.device)
+        with torch.inference_mode():
+            vision_outputs = self.model.vision_model(pixel_values=pixel_values)
+            pooled_output = vision_outputs[1]
+            features = self.model.visual_projection(pooled_output)
+            if self.normalize:
+                features = torch.nn.functional.normalize(features, p=2, dim=-1)
+            rows = features.detach().float().cpu().tolist()
+        return [[float(v) for v in row] for row in rows]
+
+
 DEVICE = resolve_device()
-PROCESSOR = CLIPProcessor.from_pretrained(HF_MODEL)
-MODEL = CLIPModel.from_pretrained(HF_MODEL).eval().to(DEVICE)
+PREPROCESS = load_preprocess_config_from_env()
+BACKEND = ClipEmbeddingBackend(HF_MODEL, MODEL_ID, DEVICE, NORMALIZE, PREPROCESS.jpeg_draft)
+BATCHER = MicroBatcher(BACKEND.embed_batch, load_batcher_config_from_env())
+# 画素を変える前処理設定（draft 縮小の有無）も含める。永続 cache が設定変更後の vector を返さないように
+CACHE = EmbeddingCache(
+    load_cache_config_from_env(),
+    namespace=f"{MODEL_ID}|{HF_MODEL}|normalize={NORMALIZE}|jpegDraft={PREPROCESS.jpeg_draft}",
+)
+EMBEDDER = CachedEmbedder(CACHE, BACKEND.prepare, BATCHER.enqueue, create_preprocess_pool(PREPROCESS))
+
+_TRANSFER_LOCK = threading.Lock()
+_TRANSFER_STATS = {"binaryBatchRequests": 0, "binaryImages": 0, "base64BytesAvoided": 0}
 
 
 def image_embedding_from_jpeg(jpeg_bytes: bytes) -> list[float]:
-    image = Image.open(BytesIO(jpeg_bytes)).convert("RGB")
-    inputs = PROCESSOR(images=image, return_tensors="pt")
-    if "pixel_values" not in inputs:
-        raise ValueError("processor did not produce pixel_values")
-    pixel_values = inputs["pixel_values"].to(DEVICE)
-    with torch.inference_mode():
-        vision_outputs = MODEL.vision_model(pixel_values=pixel_values)
-        pooled_output = vision_outputs[1]
-        features = MODEL.visual_projection(pooled_output)
-        if NORMALIZE:
-            features = torch.nn.functional.normalize(features, p=2, dim=-1)
-        vector = features[0].detach().float().cpu().tolist()
-    return [float(v) for v in vector]
+    result = EMBEDDER.embed_many([jpeg_bytes])[0]
+    if result.error is not None or result.embedding is None:
+        raise ValueError(result.error or "embedding failed")
+    return result.embedding
 
 
-def read_json(handler: BaseHTTPRequestHandler) -> dict[str, object]:
+def record_binary_transfer(images: list[bytes]) -> None:
+    with _TRANSFER_LOCK:
+        _TRANSFER_STATS["binaryBatchRequests"] += 1
+        _TRANSFER_STATS["binaryImages"] += len(images)
+        _TRANSFER_STATS["base64BytesAvoided"] += sum(base64_overhead_bytes(len(data)) for data in images)
+
+
+def transfer_stats() -> dict[str, int]:
+    with _TRANSFER_LOCK:
+        return dict(_TRANSFER_STATS)
+
+
+def read_body(handler: BaseHTTPRequestHandler) -> bytes:
     length = int(handler.headers.get("Content-Length", "0"))
-    body = handler.rfile.read(length) if length > 0 else b"{}"
+    return handler.rfile.read(length) if length > 0 else b""
+
+
+def read_json(handler: BaseHTTPRequestHandler) -> dict[str, object]:
+    body = read_body(handler) or b"{}"
     return json.loads(body.decode("utf-8"))
 
 
@@ -97,9 +173,53 @@ class Handler(BaseHTTPRequestHandler):
         if self.path == "/healthz":
             self._send_text(200, "ok\n")
             return
+        if self.path == "/stats":
+            self._send_json(
+                200,
+                {
+                    "modelId": MODEL_ID,
+                    "device": DEVICE,
+                    "batcher": BATCHER.stats(),
+                    "cache": CACHE.stats(),
+                    "transfer": transfer_stats(),
+                    "preprocess": {"workers": PREPROCESS.workers, "jpegDraft": PREPROCESS.jpeg_draft},
+                },
+            )
+            return
         self._send_text(404, "not found")
 
+    def _embed_batch(self) -> None:
+        try:
+            images, binary = parse_batch_images(
+                self.headers.get("Content-Type", ""),
+                read_body(self),
+                BATCH_MAX_IMAGES,
+            )
+        except BatchRequestError as exc:
+            self._send_json(400, {"error": str(exc)})
+            return
+        if binary:
+            record_binary_transfer([image.data for image in images])
+        try:
+            results = EMBEDDER.embed_many([image.data for image in images])
+        except Exception as exc:  # pragma: no cover
+            self._send_json(500, {"error": str(exc)})
+            return
+        embeddings: list[dict[str, object]] = []
+        for index, (image, result) in enumerate(zip(images, results)):
+            item: dict[str, object] = {"index": index, "name": image.name}
+            if result.error is not None:
+                item["error"] = result.error
+            else:
+                item["embedding"] = result.embedding
+                item["cached"] = result.cached
+            embeddings.append(item)
+        self._send_json(200, {"modelId": MODEL_ID, "embeddings": embeddings})
+
     def do_POST(self) -> None:
+        if self.path == "/embed/batch":
+            self._embed_batch()
+            return
         if self.path != "/embed":
             self._send_text(404, "not found")
             return
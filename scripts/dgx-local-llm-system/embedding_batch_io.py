@@ -0,0 +1,114 @@
+"""
+embedding server `/embed/batch` のリクエスト body 解析。
+
+受け付ける Content-Type:
+  multipart/form-data                  各 part の body を 1 画像とする（name は filename > field name）
+  application/x-length-prefixed-images 4 byte big-endian 長 + 画像 bytes の繰り返し
+  image/* / application/octet-stream   body 全体を 1 画像とする
+  application/json                     { "images": [{ "jpegBase64": "...", "name"?: "..." }] }（互換用）
+
+binary 形式では base64 を経由しないため、その分の転送 bytes（`base64_overhead_bytes`）を統計に載せる。
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+import struct
+from dataclasses import dataclass
+from email.parser import BytesParser
+from email.policy import HTTP
+
+LENGTH_PREFIXED_CONTENT_TYPE = "application/x-length-prefixed-images"
+
+
+class BatchRequestError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class BatchImage:
+    name: str
+    data: bytes
+
+
+def base64_overhead_bytes(size: int) -> int:
+    return 4 * ((size + 2) // 3) - size
+
+
+def _media_type(content_type: str) -> str:
+    return content_type.split(";", 1)[0].strip().lower()
+
+
+def _parse_multipart(content_type: str, body: bytes) -> list[BatchImage]:
+    message = BytesParser(policy=HTTP).parsebytes(
+        b"Content-Type: " + content_type.encode("latin-1") + b"\r\n\r\n" + body
+    )
+    if not message.is_multipart():
+        raise BatchRequestError("multipart body could not be parsed")
+    images: list[BatchImage] = []
+    for index, part in enumerate(message.iter_parts()):
+        data = part.get_payload(decode=True) or b""
+        if not data:
+            continue
+        name = part.get_filename() or part.get_param("name", header="content-disposition") or str(index)
+        images.append(BatchImage(name=str(name), data=data))
+    return images
+
+
+def _parse_length_prefixed(body: bytes) -> list[BatchImage]:
+    images: list[BatchImage] = []
+    offset = 0
+    while offset < len(body):
+        if offset + 4 > len(body):
+            raise BatchRequestError("truncated length prefix")
+        (size,) = struct.unpack_from(">I", body, offset)
+        offset += 4
+        if size == 0 or offset + size > len(body):
+            raise BatchRequestError(f"invalid frame length at image {len(images)}")
+        images.append(BatchImage(name=str(len(images)), data=body[offset : offset + size]))
+        offset += size
+    return images
+
+
+def _parse_json(body: bytes) -> list[BatchImage]:
+    try:
+        payload = json.loads(body.decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise BatchRequestError("invalid json") from exc
+    raw_images = payload.get("images") if isinstance(payload, dict) else None
+    if not isinstance(raw_images, list):
+        raise BatchRequestError("images[] is required")
+    images: list[BatchImage] = []
+    for index, item in enumerate(raw_images):
+        encoded = str((item or {}).get("jpegBase64") or "").strip() if isinstance(item, dict) else ""
+        if not encoded:
+            raise BatchRequestError(f"images[{index}].jpegBase64 is required")
+        try:
+            data = base64.b64decode(encoded, validate=True)
+        except (binascii.Error, ValueError) as exc:
+            raise BatchRequestError(f"images[{index}].jpegBase64 is invalid") from exc
+        images.append(BatchImage(name=str(item.get("name") or index), data=data))
+    return images
+
+
+def parse_batch_images(content_type: str, body: bytes, max_images: int) -> tuple[list[BatchImage], bool]:
+    """(画像一覧, binary 形式か) を返す。"""
+    media_type = _media_type(content_type)
+    binary = True
+    if media_type == "multipart/form-data":
+        images = _parse_multipart(content_type, body)
+    elif media_type == LENGTH_PREFIXED_CONTENT_TYPE:
+        images = _parse_length_prefixed(body)
+    elif media_type.startswith("image/") or media_type == "application/octet-stream":
+        images = [BatchImage(name="0", data=body)] if body else []
+    elif media_type == "application/json":
+        images = _parse_json(body)
+        binary = False
+    else:
+        raise BatchRequestError(f"unsupported content type: {media_type or '(none)'}")
+    if not images:
+        raise BatchRequestError("no images in request")
+    if len(images) > max_images:
+        raise BatchRequestError(f"too many images: {len(images)} > {max_images}")
+    return images, binary
@@ -0,0 +1,167 @@
+"""
+embedding server の dynamic micro-batching。
+
+同時に届いた /embed リクエストを短い時間窓（max_wait_ms）で束ね、1 回の batched forward に流す。
+モデル本体は `EmbeddingBackend`（prepare + embed_batch）として差し替え可能にし、
+torch を持たない環境でも stand-in backend でスケジューラを検証・計測できるようにする。
+
+- prepare は呼び出し側（または前処理 pool）で実行する（壊れた画像はそのリクエストだけ 400 にする）
+- `enqueue` は待たずに ticket を返すので、前処理 worker は次の画像の decode へすぐ戻れる
+- embed_batch は batch worker スレッド 1 本で直列に実行する（GPU へ同時投入しない）
+- embed_batch が例外を出した場合、その batch の全リクエストに同じ例外を返す
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Mapping, Protocol, Sequence
+
+
+class EmbeddingBackend(Protocol):
+    model_id: str
+
+    def prepare(self, jpeg_bytes: bytes) -> object:
+        """1 枚分の入力を推論可能な形へ変換する。不正入力は ValueError。"""
+        ...
+
+    def embed_batch(self, prepared: Sequence[object]) -> list[list[float]]:
+        """prepare 済み入力をまとめて推論し、入力順にベクトルを返す。"""
+        ...
+
+
+class BatcherClosedError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class BatcherConfig:
+    max_batch_size: int = 16
+    max_wait_ms: float = 5.0
+
+
+def load_batcher_config_from_env(env: Mapping[str, str] | None = None) -> BatcherConfig:
+    env = env if env is not None else os.environ
+    try:
+        max_batch_size = max(1, int((env.get("EMBEDDING_MAX_BATCH_SIZE") or "16").strip()))
+    except ValueError:
+        max_batch_size = 16
+    try:
+        max_wait_ms = max(0.0, float((env.get("EMBEDDING_MAX_BATCH_WAIT_MS") or "5").strip()))
+    except ValueError:
+        max_wait_ms = 5.0
+    return BatcherConfig(max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+
+
+class _Pending:
+    __slots__ = ("item", "event", "result", "error")
+
+    def __init__(self, item: object) -> None:
+        self.item = item
+        self.event = threading.Event()
+        self.result: list[float] | None = None
+        self.error: BaseException | None = None
+
+    def wait(self) -> list[float]:
+        self.event.wait()
+        if self.error is not None:
+            raise self.error
+        assert self.result is not None
+        return self.result
+
+
+BatchTicket = _Pending
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        embed_batch: Callable[[Sequence[object]], list[list[float]]],
+        config: BatcherConfig = BatcherConfig(),
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._embed_batch = embed_batch
+        self._config = config
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._queue: deque[_Pending] = deque()
+        self._closed = False
+        self._batches = 0
+        self._items = 0
+        self._max_observed_batch = 0
+        self._batch_sec_total = 0.0
+        self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, item: object) -> list[float]:
+        return self.enqueue(item).wait()
+
+    def enqueue(self, item: object) -> BatchTicket:
+        """入力を batch 待ち行列へ積み、結果待ち用の ticket を返す（ブロックしない）。"""
+        pending = _Pending(item)
+        with self._cond:
+            if self._closed:
+                raise BatcherClosedError("batcher is closed")
+            self._queue.append(pending)
+            self._cond.notify()
+        return pending
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._worker.join(timeout=5)
+
+    def stats(self) -> dict[str, object]:
+        with self._cond:
+            return {
+                "maxBatchSize": self._config.max_batch_size,
+                "maxWaitMs": self._config.max_wait_ms,
+                "queued": len(self._queue),
+                "batches": self._batches,
+                "items": self._items,
+                "avgBatchSize": round(self._items / self._batches, 3) if self._batches else 0.0,
+                "maxObservedBatchSize": self._max_observed_batch,
+                "avgBatchSec": round(self._batch_sec_total / self._batches, 6) if self._batches else 0.0,
+            }
+
+    def _collect(self) -> list[_Pending] | None:
+        with self._cond:
+            while not self._queue and not self._closed:
+                self._cond.wait()
+            if not self._queue:
+                return None
+            deadline = self._clock() + self._config.max_wait_ms / 1000.0
+            while len(self._queue) < self._config.max_batch_size and not self._closed:
+                remaining = deadline - self._clock()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            size = min(len(self._queue), self._config.max_batch_size)
+            return [self._queue.popleft() for _ in range(size)]
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            started = self._clock()
+            try:
+                vectors = self._embed_batch([p.item for p in batch])
+                if len(vectors) != len(batch):
+                    raise RuntimeError(f"backend returned {len(vectors)} vectors for {len(batch)} inputs")
+                for pending, vector in zip(batch, vectors):
+                    pending.result = vector
+            except BaseException as exc:  # noqa: BLE001 - 呼び出し元スレッドへそのまま返す
+                for pending in batch:
+                    pending.error = exc
+            elapsed = self._clock() - started
+            with self._cond:
+                self._batches += 1
+                self._items += len(batch)
+                self._max_observed_batch = max(self._max_observed_batch, len(batch))
+                self._batch_sec_total += elapsed
+            for pending in batch:
+                pending.event.set()
@@ -0,0 +1,247 @@
+"""
+embedding server の content-addressed LRU キャッシュ。
+
+- key は `sha256(namespace + 画像 bytes)`。namespace にはモデル ID / HF モデル / 正規化有無を入れ、
+  モデル切替後に古いベクトルを返さない
+- 任意で JSONL へ追記永続化し、再起動時に直近 max_entries 件を読み戻す
+- 追記行が max_entries の 2 倍を超えたら、現在の LRU 内容で一時ファイルへ書き直して os.replace する
+- hit / miss 数と、hit で省略できた画像 bytes を `stats()` で返す
+- `CachedEmbedder` は cache 参照 → 同一リクエスト内の重複除去 → miss 分だけ prepare / batch 推論を行う。
+  前処理 pool がある場合、各 worker は prepare 後すぐ batcher へ enqueue し、次の画像の decode と推論を重ねる
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Mapping, Protocol, Sequence
+
+
+@dataclass(frozen=True)
+class EmbeddingCacheConfig:
+    max_entries: int = 4096
+    persist_path: str = ""
+
+
+def load_cache_config_from_env(env: Mapping[str, str] | None = None) -> EmbeddingCacheConfig:
+    env = env if env is not None else os.environ
+    try:
+        max_entries = max(0, int((env.get("EMBEDDING_CACHE_MAX_ENTRIES") or "4096").strip()))
+    except ValueError:
+        max_entries = 4096
+    return EmbeddingCacheConfig(
+        max_entries=max_entries,
+        persist_path=(env.get("EMBEDDING_CACHE_PATH") or "").strip(),
+    )
+
+
+def content_key(namespace: str, image_bytes: bytes) -> str:
+    digest = hashlib.sha256()
+    digest.update(namespace.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(image_bytes)
+    return digest.hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(self, config: EmbeddingCacheConfig, namespace: str) -> None:
+        self._config = config
+        self._namespace = namespace
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, list[float]] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._hit_bytes = 0
+        self._persisted_lines = 0
+        self._persist_errors = 0
+        if config.persist_path and config.max_entries > 0:
+            self._load()
+
+    @property
+    def enabled(self) -> bool:
+        return self._config.max_entries > 0
+
+    def key_for(self, image_bytes: bytes) -> str:
+        return content_key(self._namespace, image_bytes)
+
+    def get(self, key: str, image_size: int = 0) -> list[float] | None:
+        if not self.enabled:
+            return None
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            self._hit_bytes += image_size
+            return vector
+
+    def put(self, key: str, vector: list[float]) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            is_new = key not in self._entries
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._config.max_entries:
+                self._entries.popitem(last=False)
+            if is_new and self._config.persist_path:
+                self._append_locked(key, vector)
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "maxEntries": self._config.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hitRate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "hitImageBytes": self._hit_bytes,
+                "persistPath": self._config.persist_path or None,
+                "persistErrors": self._persist_errors,
+            }
+
+    def _load(self) -> None:
+        path = Path(self._config.persist_path)
+        if not path.exists():
+            return
+        try:
+            with path.open("r", encoding="utf-8", errors="replace") as fp:
+                for line in fp:
+                    self._persisted_lines += 1
+                    try:
+                        row = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 書き込み途中で落ちた末尾行は読み飛ばす
+                        continue
+                    if not isinstance(row, dict) or row.get("ns") != self._namespace:
+                        continue
+                    key = row.get("key")
+                    vector = row.get("embedding")
+                    if not isinstance(key, str) or not isinstance(vector, list):
+                        continue
+                    try:
+                        values = [float(v) for v in vector]
+                    except (TypeError, ValueError):
+                        # null や文字列の混じった壊れた行で起動を止めない
+                        continue
+                    self._entries[key] = values
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self._config.max_entries:
+                        self._entries.popitem(last=False)
+        except OSError:
+            self._persist_errors += 1
+
+    def _row(self, key: str, vector: list[float]) -> str:
+        return json.dumps({"ns": self._namespace, "key": key, "embedding": vector}, separators=(",", ":")) + "\n"
+
+    def _append_locked(self, key: str, vector: list[float]) -> None:
+        path = Path(self._config.persist_path)
+        try:
+            if self._persisted_lines >= self._config.max_entries * 2:
+                self._compact_locked(path)
+                return
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with path.open("a", encoding="utf-8") as fp:
+                fp.write(self._row(key, vector))
+            self._persisted_lines += 1
+        except OSError:
+            self._persist_errors += 1
+
+    def _compact_locked(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with tmp.open("w", encoding="utf-8") as fp:
+            for key, vector in self._entries.items():
+                fp.write(self._row(key, vector))
+            fp.flush()
+            os.fsync(fp.fileno())
+        os.replace(tmp, path)
+        self._persisted_lines = len(self._entries)
+
+
+@dataclass(frozen=True)
+class EmbedResult:
+    embedding: list[float] | None
+    cached: bool
+    error: str | None = None
+
+
+class _Ticket(Protocol):
+    def wait(self) -> list[float]: ...
+
+
+def _eager(fn: Callable[[bytes], _Ticket], data: bytes) -> Callable[[], _Ticket]:
+    try:
+        ticket = fn(data)
+    except (ValueError, OSError) as exc:
+        error = exc
+
+        def raise_error() -> _Ticket:
+            raise error
+
+        return raise_error
+    return lambda: ticket
+
+
+class CachedEmbedder:
+    def __init__(
+        self,
+        cache: EmbeddingCache,
+        prepare: Callable[[bytes], object],
+        enqueue: Callable[[object], _Ticket],
+        executor: Executor | None = None,
+    ) -> None:
+        self._cache = cache
+        self._prepare = prepare
+        self._enqueue = enqueue
+        self._executor = executor
+
+    def _prepare_and_enqueue(self, data: bytes) -> _Ticket:
+        return self._enqueue(self._prepare(data))
+
+    def embed_many(self, images: Sequence[bytes]) -> list[EmbedResult]:
+        results: list[EmbedResult | None] = [None] * len(images)
+        waiting: dict[str, list[int]] = {}
+        misses: list[tuple[str, bytes]] = []
+        for index, data in enumerate(images):
+            key = self._cache.key_for(data)
+            if key in waiting:
+                waiting[key].append(index)
+                continue
+            vector = self._cache.get(key, len(data))
+            if vector is not None:
+                results[index] = EmbedResult(vector, cached=True)
+                continue
+            waiting[key] = [index]
+            misses.append((key, data))
+
+        # 全 miss を先に enqueue してから待つ（同一リクエスト内の画像も 1 batch に乗る）
+        if self._executor is not None:
+            ticket_getters = [self._executor.submit(self._prepare_and_enqueue, data).result for _, data in misses]
+        else:
+            ticket_getters = [_eager(self._prepare_and_enqueue, data) for _, data in misses]
+
+        for (key, _), get_ticket in zip(misses, ticket_getters):
+            first, *duplicates = waiting[key]
+            try:
+                ticket = get_ticket()
+            except (ValueError, OSError) as exc:
+                error = str(exc) or type(exc).__name__
+                for index in (first, *duplicates):
+                    results[index] = EmbedResult(None, cached=False, error=error)
+                continue
+            vector = ticket.wait()
+            self._cache.put(key, vector)
+            results[first] = EmbedResult(vector, cached=False)
+            for index in duplicates:
+                results[index] = EmbedResult(vector, cached=True)
+        return [r if r is not None else EmbedResult(None, cached=False, error="not processed") for r in results]
@@ -0,0 +1,55 @@
+"""
+embedding server の JPEG decode / 前処理ステージ。
+
+- JPEG は PIL の draft mode で DCT 段階から 1/2・1/4・1/8 に縮小 decode する。
+  CLIP の入力は短辺 224px なので、スマホ写真（4000px 級）を原寸で展開してから縮めるより大幅に安い。
+  draft は「要求サイズ以上」の最小スケールを選ぶため、後段 processor の resize / crop の入力は不足しない
+- decode + processor は worker pool（ThreadPoolExecutor）で並列に走らせ、batch 推論と重ねる。
+  PIL の decode / resize は GIL を離すため thread で十分
+- PIL は container 内にのみある前提なので、関数内で import する（本モジュール単体は stdlib だけで読める）
+"""
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from io import BytesIO
+from typing import Any, Mapping
+
+
+def _default_workers() -> int:
+    return max(1, min(8, os.cpu_count() or 1))
+
+
+@dataclass(frozen=True)
+class PreprocessConfig:
+    workers: int = field(default_factory=_default_workers)
+    jpeg_draft: bool = True
+
+
+def load_preprocess_config_from_env(env: Mapping[str, str] | None = None) -> PreprocessConfig:
+    env = env if env is not None else os.environ
+    raw_workers = (env.get("EMBEDDING_PREPROCESS_WORKERS") or "").strip()
+    try:
+        workers = max(0, int(raw_workers)) if raw_workers else _default_workers()
+    except ValueError:
+        workers = _default_workers()
+    jpeg_draft = (env.get("EMBEDDING_JPEG_DRAFT") or "true").strip().lower() not in ("0", "false", "no")
+    return PreprocessConfig(workers=workers, jpeg_draft=jpeg_draft)
+
+
+def decode_image_reduced(image_bytes: bytes, min_side: int, use_draft: bool = True) -> Any:
+    """RGB の PIL Image を返す。JPEG かつ use_draft なら短辺 min_side 以上を保つ範囲で縮小 decode する。"""
+    from PIL import Image
+
+    image = Image.open(BytesIO(image_bytes))
+    if use_draft and min_side > 0 and image.format == "JPEG":
+        image.draft("RGB", (min_side, min_side))
+    return image.convert("RGB")
+
+
+def create_preprocess_pool(config: PreprocessConfig) -> ThreadPoolExecutor | None:
+    """workers=0 のときは None（呼び出し側スレッドで直列に前処理する）。"""
+    if config.workers <= 0:
+        return None
+    return ThreadPoolExecutor(max_workers=config.workers, thread_name_prefix="embedding-preprocess")
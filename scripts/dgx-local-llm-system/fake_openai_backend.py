@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+gateway ベンチ / 結合確認用の決定的な OpenAI 互換 stand-in upstream。
+
+GPU もモデルも使わず、vLLM / llama-server と同じ形の応答を「TTFT + 1 token あたり時間」で返す。
+乱数は seed + リクエスト連番から作るので、同じ設定・同じ順序なら遅延も失敗も再現する。
+
+- GET  /v1/models            cold start 中（起動から not_ready_sec 秒）は 503
+- POST /v1/chat/completions  stream=false は usage 付き JSON、stream=true は SSE（最後に usage chunk）
+- POST /embed /embed/batch   embedding server 互換の固定ベクトル
+- GET  /healthz              200 ok
+- GET  /stats                受信数・失敗注入数・同時実行の最大値
+
+失敗注入:
+  error_rate        その割合で 500 を返す
+  stall_rate        その割合で stall_ms 待ってから応答する（tail latency の再現）
+  not_ready_sec     起動直後の cold start 区間（/v1/models と /v1/chat/completions が 503）
+
+使い方:
+  python3 ./fake_openai_backend.py --port 38083 --ttft-ms 120 --tokens-per-sec 40 --error-rate 0.01
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+
+
+@dataclass(frozen=True)
+class FakeBackendConfig:
+    name: str = "fake"
+    ttft_ms: float = 100.0
+    tokens_per_sec: float = 50.0
+    completion_tokens: int = 64
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    stall_rate: float = 0.0
+    stall_ms: float = 2000.0
+    not_ready_sec: float = 0.0
+    embedding_ms: float = 5.0
+    embedding_dim: int = 16
+    seed: int = 0
+
+
+class FakeBackendState:
+    def __init__(self, config: FakeBackendConfig, clock: Callable[[], float] = time.monotonic) -> None:
+        self.config = config
+        self._clock = clock
+        self._started = clock()
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._inflight = 0
+        self.requests = 0
+        self.injected_errors = 0
+        self.injected_stalls = 0
+        self.max_inflight = 0
+
+    def ready(self) -> bool:
+        return self._clock() - self._started >= self.config.not_ready_sec
+
+    def begin(self) -> random.Random:
+        """リクエスト連番から決定的な乱数列を返し、同時実行数を数える。"""
+        with self._lock:
+            self._seq += 1
+            self.requests += 1
+            self._inflight += 1
+            self.max_inflight = max(self.max_inflight, self._inflight)
+            return random.Random(self.config.seed * 1_000_003 + self._seq)
+
+    def end(self) -> None:
+        with self._lock:
+            self._inflight -= 1
+
+    def note_error(self) -> None:
+        with self._lock:
+            self.injected_errors += 1
+
+    def note_stall(self) -> None:
+        with self._lock:
+            self.injected_stalls += 1
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            return {
+                "name": self.config.name,
+                "ready": self.ready(),
+                "requests": self.requests,
+                "inflight": self._inflight,
+                "maxInflight": self.max_inflight,
+                "injectedErrors": self.injected_errors,
+                "injectedStalls": self.injected_stalls,
+            }
+
+
+def fake_embedding(data: bytes, dim: int) -> list[float]:
+    digest = hashlib.sha256(data).digest()
+    return [digest[i % len(digest)] / 255.0 for i in range(dim)]
+
+
+LENGTH_PREFIXED_CONTENT_TYPE = "application/x-length-prefixed-images"
+
+
+def _length_prefixed_frames(body: bytes) -> list[bytes]:
+    """4 byte big-endian 長 + bytes の繰り返しを分割する（壊れた末尾は捨てる）。"""
+    frames: list[bytes] = []
+    offset = 0
+    while offset + 4 <= len(body):
+        size = int.from_bytes(body[offset : offset + 4], "big")
+        offset += 4
+        if size == 0 or offset + size > len(body):
+            break
+        frames.append(body[offset : offset + size])
+        offset += size
+    return frames
+
+
+def make_handler(state: FakeBackendState) -> type[BaseHTTPRequestHandler]:
+    config = state.config
+
+    class Handler(BaseHTTPRequestHandler):
+        server_version = "dgx-fake-openai-backend/1.0"
+        protocol_version = "HTTP/1.1"
+
+        def _send_json(self, status: int, payload: dict) -> None:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _read_json(self) -> dict:
+            length = int(self.headers.get("Content-Length", "0"))
+            raw = self.rfile.read(length) if length > 0 else b""
+            try:
+                payload = json.loads(raw) if raw else {}
+            except ValueError:
+                # binary body（/embed/batch の image/* や length-prefixed）。UnicodeDecodeError もここ
+                payload = None
+            return payload if isinstance(payload, dict) else {"_raw": raw}
+
+        def do_GET(self) -> None:
+            if self.path == "/healthz":
+                self._send_json(200, {"ok": True})
+                return
+            if self.path == "/stats":
+                self._send_json(200, state.stats())
+                return
+            if self.path == "/v1/models":
+                if not state.ready():
+                    self._send_json(503, {"error": {"message": "model is loading"}})
+                    return
+                self._send_json(200, {"object": "list", "data": [{"id": config.name, "object": "model"}]})
+                return
+            self._send_json(404, {"error": {"message": "not found"}})
+
+        def do_POST(self) -> None:
+            payload = self._read_json()
+            if self.path in ("/embed", "/embed/batch"):
+                rng = state.begin()
+                try:
+                    time.sleep(config.embedding_ms / 1000.0)
+                    if rng.random() < config.error_rate:
+                        state.note_error()
+                        self._send_json(500, {"ok": False, "message": "injected failure"})
+                        return
+                    if self.path == "/embed":
+                        seed_bytes = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+                        vector = fake_embedding(seed_bytes, config.embedding_dim)
+                        self._send_json(200, {"embedding": vector, "modelId": config.name})
+                    else:
+                        self._send_json(200, {"modelId": config.name, "embeddings": self._batch_embeddings(payload)})
+                finally:
+                    state.end()
+                return
+            if self.path != "/v1/chat/completions":
+                self._send_json(404, {"error": {"message": "not found"}})
+                return
+            if not state.ready():
+                self._send_json(503, {"error": {"message": "model is loading"}})
+                return
+            rng = state.begin()
+            try:
+                self._chat(payload, rng)
+            finally:
+                state.end()
+
+        def _batch_embeddings(self, payload: dict) -> list[dict]:
+            """embedding-server.py の /embed/batch と同じ形。
+
+            JSON は images[] を、`application/x-length-prefixed-images` は 4 byte big-endian 長の frame を
+            1 枚ずつ、それ以外の binary body は全体を 1 枚（name "0"）として扱う。
+            """
+            if isinstance(payload.get("images"), list):
+                images = [
+                    (str(image.get("name") or index), json.dumps(image, sort_keys=True, default=str).encode("utf-8"))
+                    if isinstance(image, dict)
+                    else (str(index), b"")
+                    for index, image in enumerate(payload["images"])
+                ]
+            else:
+                raw = payload.get("_raw") if isinstance(payload.get("_raw"), bytes) else b""
+                content_type = self.headers.get("Content-Type", "").split(";", 1)[0].strip().lower()
+                frames = _length_prefixed_frames(raw) if content_type == LENGTH_PREFIXED_CONTENT_TYPE else [raw]
+                images = [(str(index), frame) for index, frame in enumerate(frames)]
+            return [
+                {
+                    "index": index,
+                    "name": name,
+                    "embedding": fake_embedding(data, config.embedding_dim),
+                    "cached": False,
+                }
+                for index, (name, data) in enumerate(images)
+            ]
+
+        def _chat(self, payload: dict, rng: random.Random) -> None:
+            max_tokens = payload.get("max_tokens")
+            tokens = config.completion_tokens
+            if isinstance(max_tokens, int) and max_tokens > 0:
+                tokens = min(tokens, max_tokens)
+            ttft_sec = max(0.0, config.ttft_ms + rng.uniform(-config.jitter_ms, config.jitter_ms)) / 1000.0
+            if rng.random() < config.stall_rate:
+                state.note_stall()
+                ttft_sec += config.stall_ms / 1000.0
+            if rng.random() < config.error_rate:
+                state.note_error()
+                time.sleep(ttft_sec)
+                self._send_json(500, {"error": {"message": "injected failure"}})
+                return
+            per_token_sec = 1.0 / config.tokens_per_sec if config.tokens_per_sec > 0 else 0.0
+            created = int(time.time())
+            usage = {"prompt_tokens": 16, "completion_tokens": tokens, "total_tokens": 16 + tokens}
+            if not payload.get("stream"):
+                time.sleep(ttft_sec + per_token_sec * tokens)
+                self._send_json(
+                    200,
+                    {
+                        "id": f"chatcmpl-{config.name}",
+                        "object": "chat.completion",
+                        "created": created,
+                        "model": config.name,
+                        "choices": [
+                            {
+                                "index": 0,
+                                "message": {"role": "assistant", "content": "あ" * tokens},
+                                "finish_reason": "length",
+                            }
+                        ],
+                        "usage": usage,
+                    },
+                )
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            time.sleep(ttft_sec)
+            for _ in range(tokens):
+                chunk = {
+                    "id": f"chatcmpl-{config.name}",
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": config.name,
+                    "choices": [{"index": 0, "delta": {"content": "あ"}}],
+                }
+                self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                time.sleep(per_token_sec)
+            final = {"id": f"chatcmpl-{config.name}", "object": "chat.completion.chunk", "choices": [], "usage": usage}
+            self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        def log_message(self, fmt: str, *args: object) -> None:
+            return
+
+    return Handler
+
+
+def start_fake_backend(
+    config: FakeBackendConfig,
+    host: str = "127.0.0.1",
+    port: int = 0,
+) -> tuple[ThreadingHTTPServer, FakeBackendState]:
+    """バックグラウンドスレッドで起動し、(server, state) を返す。停止は server.shutdown()。"""
+    state = FakeBackendState(config)
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name=f"fake-backend-{config.name}", daemon=True).start()
+    return server, state
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=38083)
+    parser.add_argument("--name", default="fake")
+    parser.add_argument("--ttft-ms", type=float, default=100.0)
+    parser.add_argument("--tokens-per-sec", type=float, default=50.0)
+    parser.add_argument("--completion-tokens", type=int, default=64)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--stall-rate", type=float, default=0.0)
+    parser.add_argument("--stall-ms", type=float, default=2000.0)
+    parser.add_argument("--not-ready-sec", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    config = FakeBackendConfig(
+        name=args.name,
+        ttft_ms=args.ttft_ms,
+        tokens_per_sec=args.tokens_per_sec,
+        completion_tokens=args.completion_tokens,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        stall_rate=args.stall_rate,
+        stall_ms=args.stall_ms,
+        not_ready_sec=args.not_ready_sec,
+        seed=args.seed,
+    )
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(FakeBackendState(config)))
+    server.daemon_threads = True
+    print(f"[fake-openai-backend] {config.name} listening on http://{args.host}:{args.port}", file=sys.stderr)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,8 +7,21 @@ DGX system-prod 用のローカル gateway。
 - /system/model-profiles は DGX 正本の業務用モデル allowlist
 - /system/model-profile は現在ロード済みの active profile state
 - /system/resource-state は DGX 共有リソースの owner/state
-- /start /stop /stop-force は runtime control へ転送
+- state JSON と container 稼働状態はメモリ上の cache から返す（gateway_state_cache.py）。
+  container は Docker events stream で追従し、張れないときは一覧 1 回を最大 N 秒ごとに共有する
+- /system/scheduler は upstream admission control のキュー深さ・待ち時間（request_scheduler.py）
+- /system/telemetry は route / backend 別の upstream latency・TTFB・queue 待ち・completion tokens/sec の
+  histogram とエラー率（gateway_telemetry.py）
+- /system/ready?timeoutSec=N は active backend が ready になるまで待って返す long-poll（runtime_readiness.py）。
+  ready なら 200、期限切れは 503 + Retry-After。upstream probe は全 waiter で 1 本を共有する
+- /start /stop /stop-force は runtime control へ転送（query と Prefer ヘッダもそのまま渡す）
+- /jobs /jobs/<id> /jobs/<id>/log /jobs/<id>/cancel は runtime control の job API へ転送（gw- job は gateway 内）
+- /private-comfyui /experiment-lab /agent-container の start/stop は gateway 内の single-flight job で実行する
+  （同じ要求が実行中なら合流。既定は完了まで待つ。`Prefer: respond-async` / `?async=1` なら 202 + job）
+- /embed /embed/batch は embedding server へ転送（Content-Type はそのまま渡す）
 - /v1/* は active profile state の backend を優先して転送
+- /v1/chat/completions /v1/completions の `stream: true` は upstream の chunk を届いた順にそのまま流す
+  （長さは接続終了で区切る）。admission slot は stream が閉じるまで保持する
 
 環境変数:
   LLM_SHARED_TOKEN            必須（少なくとも1つ有効な LLM トークン）
@@ -33,23 +46,62 @@ DGX system-prod 用のローカル gateway。
   AGENT_CONTAINER_HEALTH_URL      http モード時の GET 先（任意）
   AGENT_CONTAINER_HEALTH_MODE     既定: container（container | http）
   AGENT_CONTAINER_CONTAINER_NAME  既定: dgx-agent-container
+  admission control（POST /v1/* と /embed /embed/batch のみ対象）:
+  GATEWAY_DEFAULT_MAX_INFLIGHT        既定: 4（backend ごとの同時実行上限）
+  GATEWAY_BACKEND_MAX_INFLIGHT        任意: green=2,blue=8,embedding=4 形式で個別上書き
+  GATEWAY_MAX_QUEUE_DEPTH             既定: 64（backend ごとの待ち行列上限。超過は 429）
+  GATEWAY_QUEUE_TIMEOUT_SEC           既定: 120（待ち時間上限。超過は 503）
+  GATEWAY_RESERVED_INTERACTIVE_SLOTS  既定: 1（batch レーンが使えないスロット数）
+  GATEWAY_BATCH_LLM_TOKENS            任意: batch レーン扱いにする LLM トークン（カンマ区切り）
+  GATEWAY_BATCH_ROUTE_PREFIXES        任意: batch レーン扱いにする path prefix（カンマ区切り）
+  wait-until-ready（GET /system/ready）:
+  GATEWAY_READY_PROBE_INTERVAL_SEC    既定: 0.5（not ready 中の upstream probe 間隔）
+  GATEWAY_READY_CACHE_SEC             既定: 2（ready 確認後、再 probe せずに即答する秒数）
+  GATEWAY_READY_MAX_WAIT_SEC          既定: 600（timeoutSec の上限）
+  telemetry:
+  GATEWAY_TELEMETRY_LOG_PATH          任意: request ごとの telemetry JSONL 追記先（未指定なら histogram のみ）
+  GATEWAY_DEBUG_LOG_PATH              任意: 補助ランタイム start/stop の debug JSONL 追記先（未指定なら出力しない）
+  GATEWAY_TELEMETRY_QUEUE_MAX         既定: 4096（書き込み待ちの上限。超過分は捨てて dropped に数える）
+  state cache:
+  GATEWAY_STATE_FILE_CHECK_SEC               既定: 1（active model / resource state JSON を stat する間隔）
+  GATEWAY_CONTAINER_STATE_MAX_STALENESS_SEC  既定: 5（events stream 不通時に container 一覧を取り直す間隔）
+  GATEWAY_DOCKER_SOCKET_PATH                 既定: /var/run/docker.sock（空なら events を使わず一覧のみ）
 """
 
 from __future__ import annotations
 
 import os
+import http.client
 import json
 import sys
 import subprocess
+import threading
 import time
 import urllib.error
 import urllib.request
 from dataclasses import dataclass
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
-from typing import Callable
+from typing import Callable, Iterator
+from urllib.parse import parse_qs, urlsplit
 
-from active_model_state import active_model_state_to_api, read_active_model_state
+from active_model_state import ActiveModelState, active_model_state_to_api, read_active_model_state
 from gateway_llm_auth import load_llm_shared_tokens_from_env, llm_shared_token_ok
+from gateway_state_cache import (
+    CachedStateFile,
+    ContainerStateCache,
+    DockerEngineClient,
+    StateCacheConfig,
+    load_state_cache_config_from_env,
+)
+from gateway_telemetry import (
+    BufferedJsonlSink,
+    GatewayTelemetry,
+    TelemetryConfig,
+    begin_upstream_timing,
+    end_upstream_timing,
+    load_telemetry_config_from_env,
+    mark_first_byte,
+)
 from model_profiles import UnknownModelProfileError, find_model_profile, load_model_profiles, model_profile_to_api
 from model_storage_delete import (
     DEFAULT_MODEL_STORAGE_DELETE_ALLOWED_ROOTS,
@@ -60,7 +112,22 @@ from model_storage_delete import (
     execute_model_storage_delete,
     parse_allowed_roots,
 )
-from resource_state import read_resource_state, state_to_api, write_resource_state
+from request_scheduler import (
+    AdmissionScheduler,
+    SchedulerConfig,
+    SchedulerRejectedError,
+    load_scheduler_config_from_env,
+    resolve_lane,
+)
+from resource_state import DgxResourceState, read_resource_state, state_to_api, write_resource_state
+from runtime_readiness import ReadinessConfig, ReadinessWatcher, load_readiness_config_from_env
+from runtime_jobs import (
+    JobCancelledError,
+    JobManager,
+    RuntimeJob,
+    load_job_manager_config_from_env,
+    run_logged_command,
+)
 
 
 @dataclass(frozen=True)
@@ -97,6 +164,10 @@ class GatewayConfig:
     active_model_state_path: str = "/srv/dgx/system-prod/state/active-model-profile.json"
     resource_state_path: str = "/srv/dgx/system-prod/state/dgx-resource-state.json"
     model_storage_delete_allowed_roots: tuple[str, ...] = DEFAULT_MODEL_STORAGE_DELETE_ALLOWED_ROOTS
+    scheduler: SchedulerConfig = SchedulerConfig()
+    readiness: ReadinessConfig = ReadinessConfig()
+    telemetry: TelemetryConfig = TelemetryConfig()
+    state_cache: StateCacheConfig = StateCacheConfig()
 
 
 def load_config_from_env() -> GatewayConfig:
@@ -158,6 +229,10 @@ def load_config_from_env() -> GatewayConfig:
             or "/srv/dgx/system-prod/state/dgx-resource-state.json"
         ).strip(),
         model_storage_delete_allowed_roots=parse_allowed_roots(os.environ.get("DGX_MODEL_STORAGE_DELETE_ALLOWED_ROOTS")),
+        scheduler=load_scheduler_config_from_env(),
+        readiness=load_readiness_config_from_env(),
+        telemetry=load_telemetry_config_from_env(),
+        state_cache=load_state_cache_config_from_env(),
     )
 
 
@@ -173,13 +248,47 @@ def require_env(config: GatewayConfig) -> None:
         sys.exit(1)
 
 
-def resolve_active_backend(config: GatewayConfig) -> str:
-    state = read_active_model_state(config.active_model_state_path)
+class GatewayStateCache:
+    """handler 間で共有する state JSON / container 稼働状態の cache。"""
+
+    def __init__(self, config: GatewayConfig, container_lister: Callable[[], set[str]] | None = None) -> None:
+        interval = config.state_cache.file_check_interval_sec
+        self.active_model: CachedStateFile[ActiveModelState] = CachedStateFile(
+            config.active_model_state_path, read_active_model_state, interval
+        )
+        self.resource: CachedStateFile[DgxResourceState] = CachedStateFile(
+            config.resource_state_path, read_resource_state, interval
+        )
+        socket_path = config.state_cache.docker_socket_path
+        self.containers = ContainerStateCache(
+            container_lister if container_lister is not None else list_running_containers,
+            config.state_cache,
+            DockerEngineClient(socket_path) if socket_path and container_lister is None else None,
+        )
+
+    def invalidate(self) -> None:
+        self.active_model.invalidate()
+        self.resource.invalidate()
+        self.containers.invalidate()
+
+    def stats(self) -> dict[str, object]:
+        return {
+            "activeModel": self.active_model.stats(),
+            "resource": self.resource.stats(),
+            "containers": self.containers.stats(),
+        }
+
+
+def resolve_active_backend(config: GatewayConfig, states: GatewayStateCache | None = None) -> str:
+    if states is not None:
+        state = states.active_model.get()
+    else:
+        state = read_active_model_state(config.active_model_state_path)
     return state.backend if state is not None else config.active_backend
 
 
-def resolve_backend_base_url(config: GatewayConfig) -> str:
-    active_backend = resolve_active_backend(config)
+def resolve_backend_base_url(config: GatewayConfig, states: GatewayStateCache | None = None) -> str:
+    active_backend = resolve_active_backend(config, states)
     if active_backend == "blue":
         return config.blue_backend_base_url or config.legacy_backend_base_url
     return config.green_backend_base_url or config.legacy_backend_base_url
@@ -218,6 +327,13 @@ def string_from_json_body(body: bytes, key: str) -> str | None:
     return value.strip() if isinstance(value, str) and value.strip() else None
 
 
+STREAMING_ROUTES = ("/v1/chat/completions", "/v1/completions")
+
+
+def wants_stream(path: str, body: bytes) -> bool:
+    return urlsplit(path).path in STREAMING_ROUTES and json_body_object(body).get("stream") is True
+
+
 def write_gateway_resource_state_best_effort(
     config: GatewayConfig,
     *,
@@ -290,16 +406,22 @@ def inject_blue_chat_completions_defaults(path: str, body: bytes, active_backend
 
 
 def run_local_command(command: str, cwd: str, timeout_sec: int) -> tuple[int, str]:
-    proc = subprocess.run(
-        ["bash", "-lc", command],
-        cwd=cwd,
-        timeout=timeout_sec,
-        capture_output=True,
-        text=True,
-        check=False,
-    )
-    out = (proc.stdout or "") + ("\n" if proc.stdout and proc.stderr else "") + (proc.stderr or "")
-    return proc.returncode, out.strip()
+    """job 実行中なら出力を job log へ流し、cancel で process group ごと止める（runtime_jobs 参照）。"""
+    return run_logged_command(command, cwd=cwd, timeout_sec=timeout_sec)
+
+
+_debug_sink: BufferedJsonlSink | None = None
+_debug_sink_lock = threading.Lock()
+
+
+def debug_log_sink() -> BufferedJsonlSink:
+    """GATEWAY_DEBUG_LOG_PATH 向けの sink を初回呼び出しで作る（未指定なら何も書かない sink）。"""
+    global _debug_sink
+    with _debug_sink_lock:
+        if _debug_sink is None:
+            config = load_telemetry_config_from_env()
+            _debug_sink = BufferedJsonlSink(config.debug_log_path, config.sink_queue_max)
+        return _debug_sink
 
 
 def emit_agent_debug_log(hypothesis_id: str, location: str, message: str, data: dict) -> None:
@@ -312,20 +434,13 @@ def emit_agent_debug_log(hypothesis_id: str, location: str, message: str, data:
         "data": data,
         "timestamp": int(time.time() * 1000),
     }
-    try:
-        # region agent log
-        with open(
-            "/Users/tsudatakashi/RaspberryPiSystem_002/.cursor/debug-504530.log",
-            "a",
-            encoding="utf-8",
-        ) as fp:
-            fp.write(json.dumps(payload, ensure_ascii=False) + "\n")
-        # endregion
-    except Exception:
-        pass
+    # region agent log
+    debug_log_sink().emit(payload)
+    # endregion
 
 
-def is_container_running(container_name: str) -> bool:
+def list_running_containers() -> set[str]:
+    """Docker events が使えないときの一覧取得（GatewayStateCache 経由で呼び、結果を共有する）。"""
     proc = subprocess.run(
         ["bash", "-lc", "docker ps --format '{{.Names}}'"],
         capture_output=True,
@@ -333,9 +448,15 @@ def is_container_running(container_name: str) -> bool:
         check=False,
     )
     if proc.returncode != 0:
+        raise OSError(f"docker ps failed: {proc.returncode}")
+    return {line.strip() for line in (proc.stdout or "").splitlines() if line.strip()}
+
+
+def is_container_running(container_name: str) -> bool:
+    try:
+        return container_name in list_running_containers()
+    except OSError:
         return False
-    names = [line.strip() for line in (proc.stdout or "").splitlines() if line.strip()]
-    return container_name in names
 
 
 def parse_nvidia_smi_number(raw: str) -> float | None:
@@ -700,13 +821,167 @@ def collect_gpu_metrics() -> tuple[bool, dict[str, object] | None]:
     return True, payload
 
 
+@dataclass(frozen=True)
+class LocalRuntimeSpec:
+    name: str
+    owner: str
+    root: str
+    start_cmd: str
+    stop_cmd: str
+
+
+def local_runtime_specs(config: GatewayConfig) -> dict[str, LocalRuntimeSpec]:
+    return {
+        "private-comfyui": LocalRuntimeSpec(
+            "private-comfyui",
+            "private",
+            config.private_comfy_root,
+            config.private_comfy_start_cmd,
+            config.private_comfy_stop_cmd,
+        ),
+        "experiment-lab": LocalRuntimeSpec(
+            "experiment-lab",
+            "experiment",
+            config.experiment_lab_root,
+            config.experiment_lab_start_cmd,
+            config.experiment_lab_stop_cmd,
+        ),
+        "agent-container": LocalRuntimeSpec(
+            "agent-container",
+            "experiment",
+            config.agent_container_root,
+            config.agent_container_start_cmd,
+            config.agent_container_stop_cmd,
+        ),
+    }
+
+
+class LocalRuntimeCommandError(RuntimeError):
+    def __init__(self, status_code: int, payload: dict[str, object]) -> None:
+        super().__init__(str(payload.get("message") or payload.get("output") or "command failed"))
+        self.status_code = status_code
+        self.payload = payload
+
+
+def run_local_runtime_action(
+    config: GatewayConfig,
+    spec: LocalRuntimeSpec,
+    path: str,
+    reason: str | None,
+) -> dict[str, object]:
+    """補助ランタイムの start/stop を実行し、成功時の payload を返す。失敗は LocalRuntimeCommandError。"""
+    is_start = path.endswith("/start")
+    location = f"gateway-server.py:{spec.name}-runtime"
+    try:
+        rc, output = run_local_command(
+            spec.start_cmd if is_start else spec.stop_cmd,
+            spec.root,
+            config.private_comfy_cmd_timeout_sec,
+        )
+    except JobCancelledError:
+        raise
+    except subprocess.TimeoutExpired:
+        # region agent log
+        emit_agent_debug_log(
+            "H9",
+            location,
+            f"{spec.name} runtime command timeout",
+            {
+                "path": path,
+                "timeoutSec": config.private_comfy_cmd_timeout_sec,
+            },
+        )
+        # endregion
+        raise LocalRuntimeCommandError(504, {"ok": False, "path": path, "message": "timeout"})
+    except Exception as exc:
+        # region agent log
+        emit_agent_debug_log(
+            "H9",
+            location,
+            f"{spec.name} runtime command exception",
+            {
+                "path": path,
+                "error": str(exc),
+            },
+        )
+        # endregion
+        raise LocalRuntimeCommandError(500, {"ok": False, "path": path, "message": str(exc)})
+    if rc != 0:
+        # region agent log
+        emit_agent_debug_log(
+            "H9",
+            location,
+            f"{spec.name} runtime command failed",
+            {
+                "path": path,
+                "exitCode": rc,
+                "outputSample": output[:300],
+            },
+        )
+        # endregion
+        raise LocalRuntimeCommandError(
+            502,
+            {
+                "ok": False,
+                "path": path,
+                "exitCode": rc,
+                "output": output[:400],
+            },
+        )
+    # region agent log
+    emit_agent_debug_log(
+        "H9",
+        location,
+        f"{spec.name} runtime command succeeded",
+        {
+            "path": path,
+            "exitCode": rc,
+            "outputSample": output[:200],
+        },
+    )
+    # endregion
+    resource_state = write_gateway_resource_state_best_effort(
+        config,
+        owner=spec.owner,
+        status="preparing" if is_start else "released",
+        action=f"{spec.name}-start" if is_start else f"{spec.name}-stop",
+        reason=reason,
+    )
+    payload_body: dict[str, object] = {"ok": True, "path": path}
+    if resource_state is not None:
+        payload_body["resourceState"] = resource_state
+    return payload_body
+
+
+def cleanup_cancelled_local_start(config: GatewayConfig, spec: LocalRuntimeSpec, reason: str | None) -> None:
+    """途中まで起動した補助ランタイムを stop し、資源を released に戻す。"""
+    run_local_command(spec.stop_cmd, spec.root, config.private_comfy_cmd_timeout_sec)
+    write_gateway_resource_state_best_effort(
+        config,
+        owner=spec.owner,
+        status="released",
+        action=f"{spec.name}-start-cancelled",
+        reason=reason,
+    )
+
+
+def wants_async(handler: BaseHTTPRequestHandler) -> bool:
+    if "respond-async" in handler.headers.get("Prefer", "").lower():
+        return True
+    values = parse_qs(urlsplit(handler.path).query).get("async", [])
+    return any(v.strip().lower() in ("1", "true", "yes") for v in values)
+
+
 def proxy_request(method: str, url: str, body: bytes, headers: dict[str, str]) -> tuple[int, bytes, str]:
     req = urllib.request.Request(url, data=body if method != "GET" else None, method=method)
     for key, value in headers.items():
         req.add_header(key, value)
     try:
         with urllib.request.urlopen(req, timeout=120) as response:
-            return response.status, response.read(), response.headers.get("Content-Type", "application/octet-stream")
+            first = response.read1(65536)
+            mark_first_byte()
+            payload = first + response.read() if first else first
+            return response.status, payload, response.headers.get("Content-Type", "application/octet-stream")
     except urllib.error.HTTPError as exc:
         return exc.code, exc.read(), exc.headers.get("Content-Type", "text/plain; charset=utf-8")
     except urllib.error.URLError as exc:
@@ -717,10 +992,62 @@ def proxy_request(method: str, url: str, body: bytes, headers: dict[str, str]) -
         return 502, body, "text/plain; charset=utf-8"
 
 
+def proxy_stream_request(method: str, url: str, body: bytes, headers: dict[str, str]) -> tuple[int, Iterator[bytes], str]:
+    """stream 応答用。(status, 届いた順の chunk iterator, Content-Type) を返す。iterator を閉じると接続も閉じる。"""
+    req = urllib.request.Request(url, data=body if method != "GET" else None, method=method)
+    for key, value in headers.items():
+        req.add_header(key, value)
+    try:
+        response = urllib.request.urlopen(req, timeout=120)
+    except urllib.error.HTTPError as exc:
+        return exc.code, iter([exc.read()]), exc.headers.get("Content-Type", "text/plain; charset=utf-8")
+    except urllib.error.URLError as exc:
+        return 502, iter([f"bad gateway: {exc.reason}".encode("utf-8")]), "text/plain; charset=utf-8"
+    except Exception as exc:  # pragma: no cover
+        return 502, iter([f"bad gateway: {exc}".encode("utf-8")]), "text/plain; charset=utf-8"
+
+    def chunks() -> Iterator[bytes]:
+        try:
+            while True:
+                chunk = response.read1(65536)
+                if not chunk:
+                    return
+                mark_first_byte()
+                yield chunk
+        finally:
+            response.close()
+
+    return response.status, chunks(), response.headers.get("Content-Type", "application/octet-stream")
+
+
 def make_handler(
     config: GatewayConfig,
     proxy_impl: Callable[[str, str, bytes, dict[str, str]], tuple[int, bytes, str]] = proxy_request,
+    stream_impl: Callable[
+        [str, str, bytes, dict[str, str]], tuple[int, Iterator[bytes], str]
+    ] = proxy_stream_request,
+    scheduler: AdmissionScheduler | None = None,
+    jobs: JobManager | None = None,
+    readiness: ReadinessWatcher | None = None,
+    telemetry: GatewayTelemetry | None = None,
+    states: GatewayStateCache | None = None,
 ) -> type[BaseHTTPRequestHandler]:
+    admission = scheduler if scheduler is not None else AdmissionScheduler(config.scheduler)
+    if states is None:
+        states = GatewayStateCache(config)
+        states.containers.start()
+    if telemetry is None:
+        telemetry = GatewayTelemetry(BufferedJsonlSink(config.telemetry.log_path, config.telemetry.sink_queue_max))
+    if readiness is None:
+
+        def probe_backend(base_url: str) -> tuple[bool, dict[str, object]]:
+            status, _, _ = proxy_impl("GET", f"{base_url}/v1/models", b"", {})
+            return status == 200, {"status": status}
+
+        readiness = ReadinessWatcher(lambda: resolve_backend_base_url(config, states), probe_backend, config.readiness)
+    job_manager = jobs if jobs is not None else JobManager("gw", load_job_manager_config_from_env())
+    runtimes = local_runtime_specs(config)
+
     class Handler(BaseHTTPRequestHandler):
         server_version = "dgx-local-llm-gateway/1.0"
 
@@ -732,10 +1059,18 @@ def make_handler(
                 return True
             return self.headers.get("Authorization", "") == f"Bearer {config.embedding_api_key}"
 
-        def _send(self, status: int, body: bytes, content_type: str) -> None:
+        def _send(
+            self,
+            status: int,
+            body: bytes,
+            content_type: str,
+            extra_headers: dict[str, str] | None = None,
+        ) -> None:
             self.send_response(status)
             self.send_header("Content-Type", content_type)
             self.send_header("Content-Length", str(len(body)))
+            for key, value in (extra_headers or {}).items():
+                self.send_header(key, value)
             self.end_headers()
             self.wfile.write(body)
 
@@ -749,7 +1084,202 @@ def make_handler(
                 "application/json; charset=utf-8",
             )
 
+        def _relay_stream(self, status: int, chunks: Iterator[bytes], content_type: str) -> bytes:
+            """upstream の chunk を届いた順に client へ書き、telemetry 用に全体を返す。"""
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Cache-Control", "no-cache")
+            # 前段 nginx（proxy_buffering on が既定）に溜めさせず chunk ごとに流させる
+            self.send_header("X-Accel-Buffering", "no")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            received: list[bytes] = []
+            try:
+                for chunk in chunks:
+                    received.append(chunk)
+                    self.wfile.write(chunk)
+                    self.wfile.flush()
+            except (OSError, http.client.HTTPException):
+                # client 切断 / upstream 途中切断。header 送信後なので接続を閉じて終える
+                pass
+            finally:
+                close = getattr(chunks, "close", None)
+                if close is not None:
+                    close()
+            return b"".join(received)
+
+        def _proxy_admitted(
+            self,
+            backend: str,
+            method: str,
+            url: str,
+            body: bytes,
+            headers: dict[str, str],
+            stream: bool = False,
+        ) -> None:
+            lane = resolve_lane(self.path, self.headers, admission.config)
+            route = urlsplit(self.path).path
+            queued_at = time.monotonic()
+            try:
+                with admission.slot(backend, lane):
+                    timing = begin_upstream_timing()
+                    try:
+                        if stream:
+                            status, chunks, content_type = stream_impl(method, url, body, headers)
+                            resp_body = self._relay_stream(status, chunks, content_type)
+                        else:
+                            status, resp_body, content_type = proxy_impl(method, url, body, headers)
+                    finally:
+                        end_upstream_timing()
+                    finished_at = time.monotonic()
+            except SchedulerRejectedError as exc:
+                telemetry.record(
+                    route=route,
+                    backend=backend,
+                    lane=lane,
+                    status=exc.status_code,
+                    queue_sec=time.monotonic() - queued_at,
+                    upstream_sec=None,
+                    ttfb_sec=None,
+                    rejected=True,
+                )
+                extra = {"Retry-After": str(exc.retry_after_sec)} if exc.retry_after_sec else None
+                payload = {"ok": False, "code": exc.code, "message": str(exc), "backend": backend, "lane": lane}
+                self._send(
+                    exc.status_code,
+                    json.dumps(payload, ensure_ascii=False).encode("utf-8"),
+                    "application/json; charset=utf-8",
+                    extra,
+                )
+                return
+            if not stream:
+                self._send(status, resp_body, content_type)
+            telemetry.record(
+                route=route,
+                backend=backend,
+                lane=lane,
+                status=status,
+                queue_sec=timing.started - queued_at,
+                upstream_sec=finished_at - timing.started,
+                ttfb_sec=timing.first_byte - timing.started if timing.first_byte is not None else None,
+                body=resp_body,
+                content_type=content_type,
+            )
+
+        def _runtime_control_ok(self) -> bool:
+            return self.headers.get("X-Runtime-Control-Token", "") == config.runtime_control_token
+
+        def _proxy_runtime_control(self, method: str, body: bytes) -> None:
+            headers = {"X-Runtime-Control-Token": config.runtime_control_token}
+            prefer = self.headers.get("Prefer")
+            if prefer:
+                headers["Prefer"] = prefer
+            status, resp_body, content_type = proxy_impl(
+                method,
+                f"{config.runtime_control_base_url}{self.path}",
+                body,
+                headers,
+            )
+            self._send(status, resp_body, content_type)
+
+        def _handle_local_job(self, route: str, method: str) -> None:
+            """gateway 内 job（gw-）の参照 / cancel。"""
+            parts = [p for p in route.split("/") if p]
+            job = job_manager.get(parts[1])
+            if job is None:
+                self._send_json(404, {"ok": False, "code": "JOB_NOT_FOUND", "message": f"unknown job: {parts[1]}"})
+                return
+            if method == "POST" and len(parts) == 3 and parts[2] == "cancel":
+                _, outcome = job_manager.cancel(job.id)
+                status = {"cancelled": 200, "cancelling": 202}.get(outcome, 409)
+                self._send_json(status, {"ok": status < 400, "outcome": outcome, "job": job.to_api()})
+                return
+            if method == "GET" and len(parts) == 2:
+                payload: dict[str, object] = {"ok": True, "job": job.to_api()}
+                if job.result is not None:
+                    payload["result"] = job.result
+                self._send_json(200, payload)
+                return
+            if method == "GET" and len(parts) == 3 and parts[2] == "log":
+                raw_tail = (parse_qs(urlsplit(self.path).query).get("tail") or [""])[0]
+                tail = int(raw_tail) if raw_tail.isdigit() else None
+                self._send_json(200, {"ok": True, "jobId": job.id, "status": job.status, "lines": job.log_tail(tail)})
+                return
+            self._send_text(404, "not found")
+
+        def _handle_jobs(self, route: str, method: str, body: bytes) -> None:
+            parts = [p for p in route.split("/") if p]
+            if len(parts) >= 2 and job_manager.owns(parts[1]):
+                self._handle_local_job(route, method)
+                return
+            if method == "GET" and len(parts) == 1:
+                # 一覧は runtime control の job に gateway 内 job を添える
+                status, resp_body, _ = proxy_impl(
+                    "GET",
+                    f"{config.runtime_control_base_url}{self.path}",
+                    b"",
+                    {"X-Runtime-Control-Token": config.runtime_control_token},
+                )
+                try:
+                    upstream = json.loads(resp_body.decode("utf-8")) if status == 200 else None
+                except (UnicodeDecodeError, json.JSONDecodeError):
+                    upstream = None
+                self._send_json(200, {"ok": True, "runtimeControl": upstream, "gateway": job_manager.snapshot()})
+                return
+            self._proxy_runtime_control(method, body)
+
+        def _run_local_runtime(self, spec: LocalRuntimeSpec, route: str, body: bytes) -> None:
+            is_start = route.endswith("/start")
+            reason = reason_from_json_body(body)
+
+            def run(job: RuntimeJob) -> dict[str, object]:
+                job.progress("run-command")
+                try:
+                    return run_local_runtime_action(config, spec, route, reason)
+                finally:
+                    states.invalidate()
+
+            job, created = job_manager.submit(
+                f"{spec.name}:{'start' if is_start else 'stop'}",
+                f"{spec.name}-{'start' if is_start else 'stop'}",
+                run,
+                steps=("run-command",),
+                cancellable_while_running=is_start,
+                on_cancel=(lambda job: cleanup_cancelled_local_start(config, spec, reason)) if is_start else None,
+            )
+            if wants_async(self) or not job.wait(config.private_comfy_cmd_timeout_sec + 30):
+                self._send(
+                    202,
+                    json.dumps({"ok": True, "jobId": job.id, "coalesced": not created, "job": job.to_api()}).encode(
+                        "utf-8"
+                    ),
+                    "application/json; charset=utf-8",
+                    {"Location": f"/jobs/{job.id}"},
+                )
+                return
+            if job.status == "succeeded" and job.result is not None:
+                self._send(200, json.dumps(job.result).encode("utf-8"), "application/json; charset=utf-8")
+                return
+            error = job.error
+            if isinstance(error, LocalRuntimeCommandError):
+                self._send(error.status_code, json.dumps(error.payload).encode("utf-8"), "application/json; charset=utf-8")
+                return
+            if isinstance(error, JobCancelledError):
+                payload = {"ok": False, "path": route, "code": "JOB_CANCELLED", "message": str(error), "jobId": job.id}
+                self._send(409, json.dumps(payload).encode("utf-8"), "application/json; charset=utf-8")
+                return
+            payload = {"ok": False, "path": route, "message": str(error)}
+            self._send(500, json.dumps(payload).encode("utf-8"), "application/json; charset=utf-8")
+
         def do_GET(self) -> None:
+            route = urlsplit(self.path).path
+            if route == "/jobs" or route.startswith("/jobs/"):
+                if not self._runtime_control_ok():
+                    self._send_text(403, "forbidden")
+                    return
+                self._handle_jobs(route, "GET", b"")
+                return
             if self.path == "/healthz":
                 self._send_text(200, "ok\n")
                 return
@@ -763,14 +1293,49 @@ def make_handler(
                 else:
                     self._send(503, b'{"ok":false,"reason":"gpu_metrics_unavailable"}', "application/json; charset=utf-8")
                 return
+            if self.path == "/system/scheduler":
+                if not self._llm_auth_ok():
+                    self._send_text(403, "forbidden")
+                    return
+                self._send_json(200, {"ok": True, **admission.snapshot(), "readiness": readiness.stats()})
+                return
+            if route == "/system/ready":
+                if not self._llm_auth_ok():
+                    self._send_text(403, "forbidden")
+                    return
+                raw_timeout = (parse_qs(urlsplit(self.path).query).get("timeoutSec") or ["0"])[0]
+                try:
+                    timeout_sec = float(raw_timeout)
+                except ValueError:
+                    self._send_json(400, {"ok": False, "code": "INVALID_TIMEOUT", "message": "timeoutSec must be a number"})
+                    return
+                result = readiness.wait(timeout_sec)
+                payload = {"ok": result.ready, "backend": resolve_active_backend(config, states), **result.to_api()}
+                if result.ready:
+                    self._send_json(200, payload)
+                    return
+                payload["code"] = "RUNTIME_NOT_READY"
+                self._send(
+                    503,
+                    json.dumps(payload, ensure_ascii=False).encode("utf-8"),
+                    "application/json; charset=utf-8",
+                    {"Retry-After": "1"},
+                )
+                return
+            if self.path == "/system/telemetry":
+                if not self._llm_auth_ok():
+                    self._send_text(403, "forbidden")
+                    return
+                self._send_json(200, {"ok": True, **telemetry.snapshot(), "stateCache": states.stats()})
+                return
             if self.path == "/system/model-profiles":
                 if not self._llm_auth_ok():
                     self._send_text(403, "forbidden")
                     return
                 try:
                     profiles = load_model_profiles(config.model_registry_root)
-                    active_state = read_active_model_state(config.active_model_state_path)
-                    resource_state = read_resource_state(config.resource_state_path)
+                    active_state = states.active_model.get()
+                    resource_state = states.resource.get()
                     self._send_json(
                         200,
                         {
@@ -792,7 +1357,7 @@ def make_handler(
                 if not self._llm_auth_ok():
                     self._send_text(403, "forbidden")
                     return
-                resource_state = read_resource_state(config.resource_state_path)
+                resource_state = states.resource.get()
                 if resource_state is None:
                     self._send_json(
                         503,
@@ -809,7 +1374,7 @@ def make_handler(
                 if not self._llm_auth_ok():
                     self._send_text(403, "forbidden")
                     return
-                active_state = read_active_model_state(config.active_model_state_path)
+                active_state = states.active_model.get()
                 if active_state is None:
                     self._send_json(
                         503,
@@ -828,7 +1393,7 @@ def make_handler(
                 return
             if self.path == "/experiment-lab/health":
                 if config.experiment_lab_health_mode == "container":
-                    if is_container_running(config.experiment_lab_container_name):
+                    if states.containers.is_running(config.experiment_lab_container_name):
                         self._send(200, b'{"ok":true,"mode":"container"}', "application/json; charset=utf-8")
                     else:
                         self._send(503, b'{"ok":false,"mode":"container"}', "application/json; charset=utf-8")
@@ -838,7 +1403,7 @@ def make_handler(
                 return
             if self.path == "/agent-container/health":
                 if config.agent_container_health_mode == "container":
-                    if is_container_running(config.agent_container_container_name):
+                    if states.containers.is_running(config.agent_container_container_name):
                         self._send(200, b'{"ok":true,"mode":"container"}', "application/json; charset=utf-8")
                     else:
                         self._send(503, b'{"ok":false,"mode":"container"}', "application/json; charset=utf-8")
@@ -864,10 +1429,10 @@ def make_handler(
                 if not self._llm_auth_ok():
                     self._send_text(403, "forbidden")
                     return
-                active_backend = resolve_active_backend(config)
+                active_backend = resolve_active_backend(config, states)
                 status, body, content_type = proxy_impl(
                     "GET",
-                    f"{resolve_backend_base_url(config)}{self.path}",
+                    f"{resolve_backend_base_url(config, states)}{self.path}",
                     b"",
                     {},
                 )
@@ -936,327 +1501,59 @@ def make_handler(
                         },
                     )
                     return
-            if self.path in ("/start", "/stop", "/stop-force"):
-                if self.headers.get("X-Runtime-Control-Token", "") != config.runtime_control_token:
+            route = urlsplit(self.path).path
+            if route in ("/start", "/stop", "/stop-force"):
+                if not self._runtime_control_ok():
                     self._send_text(403, "forbidden")
                     return
-                status, resp_body, content_type = proxy_impl(
-                    "POST",
-                    f"{config.runtime_control_base_url}{self.path}",
-                    body,
-                    {"X-Runtime-Control-Token": config.runtime_control_token},
-                )
-                self._send(status, resp_body, content_type)
+                readiness.invalidate()
+                self._proxy_runtime_control("POST", body)
+                readiness.invalidate()
+                states.invalidate()
                 return
-            if self.path in ("/private-comfyui/start", "/private-comfyui/stop"):
-                if self.headers.get("X-Runtime-Control-Token", "") != config.runtime_control_token:
+            if route.startswith("/jobs/"):
+                if not self._runtime_control_ok():
                     self._send_text(403, "forbidden")
                     return
-                command = (
-                    config.private_comfy_start_cmd
-                    if self.path.endswith("/start")
-                    else config.private_comfy_stop_cmd
-                )
-                try:
-                    rc, output = run_local_command(
-                        command,
-                        config.private_comfy_root,
-                        config.private_comfy_cmd_timeout_sec,
-                    )
-                    if rc == 0:
-                        # region agent log
-                        emit_agent_debug_log(
-                            "H9",
-                            "gateway-server.py:private-comfyui-runtime",
-                            "private-comfyui runtime command succeeded",
-                            {
-                                "path": self.path,
-                                "exitCode": rc,
-                                "outputSample": output[:200],
-                            },
-                        )
-                        # endregion
-                        is_start = self.path.endswith("/start")
-                        resource_state = write_gateway_resource_state_best_effort(
-                            config,
-                            owner="private",
-                            status="preparing" if is_start else "released",
-                            action="private-comfyui-start" if is_start else "private-comfyui-stop",
-                            reason=reason_from_json_body(body),
-                        )
-                        payload_body = {"ok": True, "path": self.path}
-                        if resource_state is not None:
-                            payload_body["resourceState"] = resource_state
-                        payload = json.dumps(payload_body).encode("utf-8")
-                        self._send(200, payload, "application/json; charset=utf-8")
-                        return
-                    # region agent log
-                    emit_agent_debug_log(
-                        "H9",
-                        "gateway-server.py:private-comfyui-runtime",
-                        "private-comfyui runtime command failed",
-                        {
-                            "path": self.path,
-                            "exitCode": rc,
-                            "outputSample": output[:300],
-                        },
-                    )
-                    # endregion
-                    payload = json.dumps(
-                        {
-                            "ok": False,
-                            "path": self.path,
-                            "exitCode": rc,
-                            "output": output[:400],
-                        }
-                    ).encode("utf-8")
-                    self._send(502, payload, "application/json; charset=utf-8")
-                    return
-                except subprocess.TimeoutExpired:
-                    # region agent log
-                    emit_agent_debug_log(
-                        "H9",
-                        "gateway-server.py:private-comfyui-runtime",
-                        "private-comfyui runtime command timeout",
-                        {
-                            "path": self.path,
-                            "timeoutSec": config.private_comfy_cmd_timeout_sec,
-                        },
-                    )
-                    # endregion
-                    payload = json.dumps({"ok": False, "path": self.path, "message": "timeout"}).encode("utf-8")
-                    self._send(504, payload, "application/json; charset=utf-8")
-                    return
-                except Exception as exc:
-                    # region agent log
-                    emit_agent_debug_log(
-                        "H9",
-                        "gateway-server.py:private-comfyui-runtime",
-                        "private-comfyui runtime command exception",
-                        {
-                            "path": self.path,
-                            "error": str(exc),
-                        },
-                    )
-                    # endregion
-                    payload = json.dumps(
-                        {"ok": False, "path": self.path, "message": str(exc)}
-                    ).encode("utf-8")
-                    self._send(500, payload, "application/json; charset=utf-8")
-                    return
-            if self.path in ("/experiment-lab/start", "/experiment-lab/stop"):
-                if self.headers.get("X-Runtime-Control-Token", "") != config.runtime_control_token:
-                    self._send_text(403, "forbidden")
-                    return
-                command = (
-                    config.experiment_lab_start_cmd
-                    if self.path.endswith("/start")
-                    else config.experiment_lab_stop_cmd
-                )
-                try:
-                    rc, output = run_local_command(
-                        command,
-                        config.experiment_lab_root,
-                        config.private_comfy_cmd_timeout_sec,
-                    )
-                    if rc == 0:
-                        # region agent log
-                        emit_agent_debug_log(
-                            "H9",
-                            "gateway-server.py:experiment-lab-runtime",
-                            "experiment-lab runtime command succeeded",
-                            {
-                                "path": self.path,
-                                "exitCode": rc,
-                                "outputSample": output[:200],
-                            },
-                        )
-                        # endregion
-                        is_start = self.path.endswith("/start")
-                        resource_state = write_gateway_resource_state_best_effort(
-                            config,
-                            owner="experiment",
-                            status="preparing" if is_start else "released",
-                            action="experiment-lab-start" if is_start else "experiment-lab-stop",
-                            reason=reason_from_json_body(body),
-                        )
-                        payload_body = {"ok": True, "path": self.path}
-                        if resource_state is not None:
-                            payload_body["resourceState"] = resource_state
-                        payload = json.dumps(payload_body).encode("utf-8")
-                        self._send(200, payload, "application/json; charset=utf-8")
-                        return
-                    # region agent log
-                    emit_agent_debug_log(
-                        "H9",
-                        "gateway-server.py:experiment-lab-runtime",
-                        "experiment-lab runtime command failed",
-                        {
-                            "path": self.path,
-                            "exitCode": rc,
-                            "outputSample": output[:300],
-                        },
-                    )
-                    # endregion
-                    payload = json.dumps(
-                        {
-                            "ok": False,
-                            "path": self.path,
-                            "exitCode": rc,
-                            "output": output[:400],
-                        }
-                    ).encode("utf-8")
-                    self._send(502, payload, "application/json; charset=utf-8")
-                    return
-                except subprocess.TimeoutExpired:
-                    # region agent log
-                    emit_agent_debug_log(
-                        "H9",
-                        "gateway-server.py:experiment-lab-runtime",
-                        "experiment-lab runtime command timeout",
-                        {
-                            "path": self.path,
-                            "timeoutSec": config.private_comfy_cmd_timeout_sec,
-                        },
-                    )
-                    # endregion
-                    payload = json.dumps({"ok": False, "path": self.path, "message": "timeout"}).encode("utf-8")
-                    self._send(504, payload, "application/json; charset=utf-8")
-                    return
-                except Exception as exc:
-                    # region agent log
-                    emit_agent_debug_log(
-                        "H9",
-                        "gateway-server.py:experiment-lab-runtime",
-                        "experiment-lab runtime command exception",
-                        {
-                            "path": self.path,
-                            "error": str(exc),
-                        },
-                    )
-                    # endregion
-                    payload = json.dumps(
-                        {"ok": False, "path": self.path, "message": str(exc)}
-                    ).encode("utf-8")
-                    self._send(500, payload, "application/json; charset=utf-8")
-                    return
-            if self.path in ("/agent-container/start", "/agent-container/stop"):
-                if self.headers.get("X-Runtime-Control-Token", "") != config.runtime_control_token:
+                self._handle_jobs(route, "POST", body)
+                return
+            runtime_name, _, runtime_action = route.strip("/").partition("/")
+            if runtime_name in runtimes and runtime_action in ("start", "stop"):
+                if not self._runtime_control_ok():
                     self._send_text(403, "forbidden")
                     return
-                command = (
-                    config.agent_container_start_cmd
-                    if self.path.endswith("/start")
-                    else config.agent_container_stop_cmd
-                )
-                try:
-                    rc, output = run_local_command(
-                        command,
-                        config.agent_container_root,
-                        config.private_comfy_cmd_timeout_sec,
-                    )
-                    if rc == 0:
-                        emit_agent_debug_log(
-                            "H9",
-                            "gateway-server.py:agent-container-runtime",
-                            "agent-container runtime command succeeded",
-                            {
-                                "path": self.path,
-                                "exitCode": rc,
-                                "outputSample": output[:200],
-                            },
-                        )
-                        is_start = self.path.endswith("/start")
-                        resource_state = write_gateway_resource_state_best_effort(
-                            config,
-                            owner="experiment",
-                            status="preparing" if is_start else "released",
-                            action="agent-container-start" if is_start else "agent-container-stop",
-                            reason=reason_from_json_body(body),
-                        )
-                        payload_body = {"ok": True, "path": self.path}
-                        if resource_state is not None:
-                            payload_body["resourceState"] = resource_state
-                        payload = json.dumps(payload_body).encode("utf-8")
-                        self._send(200, payload, "application/json; charset=utf-8")
-                        return
-                    emit_agent_debug_log(
-                        "H9",
-                        "gateway-server.py:agent-container-runtime",
-                        "agent-container runtime command failed",
-                        {
-                            "path": self.path,
-                            "exitCode": rc,
-                            "outputSample": output[:300],
-                        },
-                    )
-                    payload = json.dumps(
-                        {
-                            "ok": False,
-                            "path": self.path,
-                            "exitCode": rc,
-                            "output": output[:400],
-                        }
-                    ).encode("utf-8")
-                    self._send(502, payload, "application/json; charset=utf-8")
-                    return
-                except subprocess.TimeoutExpired:
-                    emit_agent_debug_log(
-                        "H9",
-                        "gateway-server.py:agent-container-runtime",
-                        "agent-container runtime command timeout",
-                        {
-                            "path": self.path,
-                            "timeoutSec": config.private_comfy_cmd_timeout_sec,
-                        },
-                    )
-                    payload = json.dumps({"ok": False, "path": self.path, "message": "timeout"}).encode("utf-8")
-                    self._send(504, payload, "application/json; charset=utf-8")
-                    return
-                except Exception as exc:
-                    emit_agent_debug_log(
-                        "H9",
-                        "gateway-server.py:agent-container-runtime",
-                        "agent-container runtime command exception",
-                        {
-                            "path": self.path,
-                            "error": str(exc),
-                        },
-                    )
-                    payload = json.dumps(
-                        {"ok": False, "path": self.path, "message": str(exc)}
-                    ).encode("utf-8")
-                    self._send(500, payload, "application/json; charset=utf-8")
-                    return
-            if self.path == "/embed":
+                self._run_local_runtime(runtimes[runtime_name], route, body)
+                return
+            if self.path in ("/embed", "/embed/batch"):
                 if not self._embedding_auth_ok():
                     self._send_text(403, "forbidden")
                     return
                 headers = {"Content-Type": self.headers.get("Content-Type", "application/json")}
-                status, resp_body, content_type = proxy_impl(
+                self._proxy_admitted(
+                    "embedding",
                     "POST",
                     f"{config.embedding_base_url}{self.path}",
                     body,
                     headers,
                 )
-                self._send(status, resp_body, content_type)
                 return
             if self.path.startswith("/v1/"):
                 if not self._llm_auth_ok():
                     self._send_text(403, "forbidden")
                     return
                 headers = {"Content-Type": self.headers.get("Content-Type", "application/json")}
-                active_backend = resolve_active_backend(config)
+                active_backend = resolve_active_backend(config, states)
                 upstream_body = inject_blue_chat_completions_defaults(
                     self.path, body, active_backend
                 )
-                status, resp_body, content_type = proxy_impl(
+                self._proxy_admitted(
+                    active_backend,
                     "POST",
-                    f"{resolve_backend_base_url(config)}{self.path}",
+                    f"{resolve_backend_base_url(config, states)}{self.path}",
                     upstream_body,
                     headers,
+                    stream=wants_stream(self.path, upstream_body),
                 )
-                self._send(status, resp_body, content_type)
                 return
             self._send_text(404, "not found")
 
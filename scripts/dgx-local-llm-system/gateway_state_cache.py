@@ -0,0 +1,282 @@
+"""
+gateway の health / status route 用のメモリ上 state cache。
+
+- container の稼働状態: Docker Engine API を Unix socket で直接叩き、`GET /events`（type=container）の
+  stream で start / die / destroy を反映する。stream が張れている間は常に最新なので docker を呼ばない。
+  socket が無い・切れた場合は `docker ps` 相当の一覧 1 回を最大 `container_max_staleness_sec` ごとに取り直す
+  （同時に来た health check は 1 回の一覧を共有する）。stream は backoff 付きで張り直す
+- state JSON（active model / resource state）: `file_check_interval_sec` ごとに stat し、
+  (mtime, size, inode) が変わったときだけ読み直す。読み込み失敗（書き込み途中など）は直前の値を返し続ける
+- gateway 自身が /start /stop や補助ランタイム操作をした直後は `invalidate()` で次回必ず stat させる
+"""
+from __future__ import annotations
+
+import http.client
+import json
+import os
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Generic, Iterator, Mapping, TypeVar
+from urllib.parse import quote
+
+T = TypeVar("T")
+
+# kill / stop / oom は signal を送った・OOM が起きたという通知で、process が trap して生き残ることもある。
+# 実際に止まったときは必ず die（削除なら destroy）が続くので、それだけを停止として扱う
+_STOPPED_ACTIONS = frozenset({"die", "destroy"})
+
+
+@dataclass(frozen=True)
+class StateCacheConfig:
+    file_check_interval_sec: float = 1.0
+    container_max_staleness_sec: float = 5.0
+    docker_socket_path: str = "/var/run/docker.sock"
+    events_retry_max_sec: float = 30.0
+
+
+def _float_env(env: Mapping[str, str], name: str, default: float) -> float:
+    raw = (env.get(name) or "").strip()
+    if not raw:
+        return default
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        return default
+
+
+def load_state_cache_config_from_env(env: Mapping[str, str] | None = None) -> StateCacheConfig:
+    env = env if env is not None else os.environ
+    socket_path = env.get("GATEWAY_DOCKER_SOCKET_PATH")
+    return StateCacheConfig(
+        file_check_interval_sec=_float_env(env, "GATEWAY_STATE_FILE_CHECK_SEC", 1.0),
+        container_max_staleness_sec=_float_env(env, "GATEWAY_CONTAINER_STATE_MAX_STALENESS_SEC", 5.0),
+        docker_socket_path=(socket_path if socket_path is not None else "/var/run/docker.sock").strip(),
+    )
+
+
+class CachedStateFile(Generic[T]):
+    def __init__(
+        self,
+        path: str,
+        loader: Callable[[str], T | None],
+        check_interval_sec: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._path = path
+        self._loader = loader
+        self._check_interval_sec = check_interval_sec
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._value: T | None = None
+        self._signature: tuple[int, int, int] | None = None
+        self._checked_at: float | None = None
+        self._loads = 0
+        self._load_errors = 0
+
+    def get(self) -> T | None:
+        with self._lock:
+            now = self._clock()
+            if self._checked_at is not None and now - self._checked_at < self._check_interval_sec:
+                return self._value
+            self._checked_at = now
+            try:
+                st = os.stat(self._path)
+                signature: tuple[int, int, int] | None = (st.st_mtime_ns, st.st_size, st.st_ino)
+            except OSError:
+                signature = None
+            if signature == self._signature and self._loads:
+                return self._value
+            if signature is None:
+                self._signature, self._value = None, None
+                self._loads += 1
+                return None
+            try:
+                value = self._loader(self._path)
+            except (OSError, ValueError):
+                # 書き込み途中の JSON などは直前の値のまま、次回もう一度読む
+                self._load_errors += 1
+                return self._value
+            self._signature, self._value = signature, value
+            self._loads += 1
+            return value
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._checked_at = None
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            return {"path": self._path, "loads": self._loads, "loadErrors": self._load_errors}
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str, timeout: float | None = None) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self._socket_path = socket_path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self._socket_path)
+        self.sock = sock
+
+
+class DockerEngineClient:
+    """Docker Engine API の最小 client（一覧と events stream だけ）。"""
+
+    def __init__(self, socket_path: str, timeout_sec: float = 5.0) -> None:
+        self._socket_path = socket_path
+        self._timeout_sec = timeout_sec
+
+    def running_container_names(self) -> set[str]:
+        conn = _UnixHTTPConnection(self._socket_path, timeout=self._timeout_sec)
+        try:
+            conn.request("GET", "/containers/json")
+            response = conn.getresponse()
+            body = response.read()
+            if response.status != 200:
+                raise OSError(f"docker containers/json returned {response.status}")
+            return {name.lstrip("/") for item in json.loads(body) for name in item.get("Names") or []}
+        finally:
+            conn.close()
+
+    def container_events(self, on_open: Callable[[], None]) -> Iterator[tuple[str, str]]:
+        """(action, container name) を流し続ける。on_open は stream 確立直後（初回一覧の取得用）に呼ぶ。"""
+        filters = quote(json.dumps({"type": ["container"]}))
+        conn = _UnixHTTPConnection(self._socket_path, timeout=None)
+        try:
+            conn.request("GET", f"/events?filters={filters}")
+            response = conn.getresponse()
+            if response.status != 200:
+                raise OSError(f"docker events returned {response.status}")
+            on_open()
+            while True:
+                line = response.readline()
+                if not line:
+                    return
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                action = str(event.get("Action") or event.get("status") or "")
+                name = ((event.get("Actor") or {}).get("Attributes") or {}).get("name")
+                if action and isinstance(name, str):
+                    yield action.split(":", 1)[0], name
+        finally:
+            conn.close()
+
+
+class ContainerStateCache:
+    def __init__(
+        self,
+        lister: Callable[[], set[str]],
+        config: StateCacheConfig = StateCacheConfig(),
+        engine: DockerEngineClient | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._lister = lister
+        self._config = config
+        self._engine = engine
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._names: set[str] = set()
+        self._refreshed_at: float | None = None
+        self._refreshing = False
+        self._events_live = False
+        self._listings = 0
+        self._events_applied = 0
+        self._events_reconnects = 0
+        self._watcher: threading.Thread | None = None
+
+    def start(self) -> None:
+        """events stream の監視を始める（engine が無ければ何もしない）。"""
+        if self._engine is None or self._watcher is not None:
+            return
+        self._watcher = threading.Thread(target=self._watch_events, name="gateway-docker-events", daemon=True)
+        self._watcher.start()
+
+    def is_running(self, name: str) -> bool:
+        return name in self.running_names()
+
+    def running_names(self) -> set[str]:
+        with self._cond:
+            while True:
+                if self._events_live or self._fresh_locked():
+                    return set(self._names)
+                if not self._refreshing:
+                    break
+                # 他スレッドの一覧取得を待って結果を共有する
+                self._cond.wait()
+            self._refreshing = True
+        try:
+            names = self._lister()
+            error = False
+        except Exception:  # noqa: BLE001 - 一覧失敗は空扱い（従来の docker ps 失敗と同じ）
+            names, error = set(), True
+        with self._cond:
+            self._refreshing = False
+            self._names = names
+            self._refreshed_at = self._clock() if not error else None
+            self._listings += 1
+            self._cond.notify_all()
+            return set(names)
+
+    def invalidate(self) -> None:
+        with self._cond:
+            self._refreshed_at = None
+
+    def stats(self) -> dict[str, object]:
+        with self._cond:
+            return {
+                "source": "docker-events" if self._events_live else "listing",
+                "running": sorted(self._names),
+                "listings": self._listings,
+                "eventsApplied": self._events_applied,
+                "eventsReconnects": self._events_reconnects,
+            }
+
+    def _fresh_locked(self) -> bool:
+        return (
+            self._refreshed_at is not None
+            and self._clock() - self._refreshed_at <= self._config.container_max_staleness_sec
+        )
+
+    def _apply_event(self, action: str, name: str) -> None:
+        with self._cond:
+            if action == "start":
+                self._names.add(name)
+            elif action in _STOPPED_ACTIONS:
+                self._names.discard(name)
+            else:
+                return
+            self._events_applied += 1
+
+    def _watch_events(self) -> None:
+        assert self._engine is not None
+        engine = self._engine
+        backoff = 1.0
+
+        def on_open() -> None:
+            names = engine.running_container_names()
+            with self._cond:
+                self._names = names
+                self._refreshed_at = self._clock()
+                self._events_live = True
+                self._listings += 1
+                self._cond.notify_all()
+
+        while True:
+            try:
+                for action, name in engine.container_events(on_open):
+                    self._apply_event(action, name)
+                    backoff = 1.0
+            except (OSError, http.client.HTTPException, ValueError):
+                pass
+            with self._cond:
+                self._events_live = False
+                self._refreshed_at = None
+                self._events_reconnects += 1
+            time.sleep(backoff)
+            backoff = min(backoff * 2, self._config.events_retry_max_sec)
@@ -0,0 +1,346 @@
+"""
+gateway の request telemetry（upstream latency / TTFB / completion tokens/sec / queue 待ち / route 別エラー率）。
+
+- 値は固定 bucket の in-process histogram に積む（サンプルを溜めないのでメモリは一定）。
+  p50 / p95 / p99 は bucket 上端で近似する。`GET /system/telemetry` で snapshot を返す
+- TTFB は proxy_request が upstream の最初の body byte（SSE なら最初の `data:` 行）を読んだ時刻。
+  ハンドラスレッドごとの `UpstreamTiming` に記録する（proxy_impl の signature は変えない）
+- completion tokens は `usage.completion_tokens`（JSON / SSE の usage chunk）を優先し、
+  無い stream では content を持つ chunk 数で近似する。tokens/sec の分母は stream なら TTFB 後の decode 時間
+- JSONL 出力は `BufferedJsonlSink`。リクエストスレッドは有界キューへ put_nowait するだけで、
+  書き込みは専用スレッドがまとめて追記する。キュー満杯時は捨てて `dropped` を数える（gateway を止めない）
+"""
+from __future__ import annotations
+
+import json
+import os
+import queue
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Callable, Mapping
+
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 120000)
+TOKENS_PER_SEC_BUCKETS = (1, 2, 5, 10, 20, 30, 50, 75, 100, 150, 200, 300, 500, 1000)
+
+
+@dataclass(frozen=True)
+class TelemetryConfig:
+    log_path: str = ""
+    debug_log_path: str = ""
+    sink_queue_max: int = 4096
+    flush_interval_sec: float = 1.0
+
+
+def load_telemetry_config_from_env(env: Mapping[str, str] | None = None) -> TelemetryConfig:
+    env = env if env is not None else os.environ
+    try:
+        sink_queue_max = max(1, int((env.get("GATEWAY_TELEMETRY_QUEUE_MAX") or "4096").strip()))
+    except ValueError:
+        sink_queue_max = 4096
+    return TelemetryConfig(
+        log_path=(env.get("GATEWAY_TELEMETRY_LOG_PATH") or "").strip(),
+        debug_log_path=(env.get("GATEWAY_DEBUG_LOG_PATH") or "").strip(),
+        sink_queue_max=sink_queue_max,
+    )
+
+
+class BufferedJsonlSink:
+    """path が空なら何もしない。emit はブロックせず、満杯なら捨てる。"""
+
+    def __init__(self, path: str, max_queue: int = 4096, flush_interval_sec: float = 1.0) -> None:
+        self._path = path
+        self._flush_interval_sec = flush_interval_sec
+        self._queue: queue.Queue[dict[str, object] | None] = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._written = 0
+        self._dropped = 0
+        self._write_errors = 0
+        self._worker: threading.Thread | None = None
+        if path:
+            self._worker = threading.Thread(target=self._run, name="gateway-telemetry-sink", daemon=True)
+            self._worker.start()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._path)
+
+    def emit(self, record: dict[str, object]) -> None:
+        if not self._path:
+            return
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self._dropped += 1
+
+    def close(self, timeout: float = 5.0) -> None:
+        if self._worker is None:
+            return
+        self._queue.put(None)
+        self._worker.join(timeout=timeout)
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            return {
+                "path": self._path or None,
+                "queued": self._queue.qsize(),
+                "written": self._written,
+                "dropped": self._dropped,
+                "writeErrors": self._write_errors,
+            }
+
+    def _run(self) -> None:
+        while True:
+            try:
+                first = self._queue.get(timeout=self._flush_interval_sec)
+            except queue.Empty:
+                continue
+            batch = [first]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            records = [r for r in batch if r is not None]
+            if records:
+                self._write(records)
+            if any(r is None for r in batch):
+                return
+
+    def _write(self, records: list[dict[str, object]]) -> None:
+        try:
+            with open(self._path, "a", encoding="utf-8") as fp:
+                fp.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records))
+            with self._lock:
+                self._written += len(records)
+        except OSError:
+            with self._lock:
+                self._write_errors += 1
+
+
+class Histogram:
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self._bounds = bounds
+        self._counts = [0] * (len(bounds) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._max = 0.0
+
+    def observe(self, value: float) -> None:
+        self._counts[bisect_left(self._bounds, value)] += 1
+        self._count += 1
+        self._sum += value
+        self._max = max(self._max, value)
+
+    def _quantile(self, q: float) -> float | None:
+        if not self._count:
+            return None
+        rank = q * self._count
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= rank and count:
+                return float(self._bounds[index]) if index < len(self._bounds) else self._max
+        return self._max
+
+    def snapshot(self) -> dict[str, object]:
+        return {
+            "count": self._count,
+            "avg": round(self._sum / self._count, 3) if self._count else None,
+            "max": round(self._max, 3) if self._count else None,
+            "p50": self._quantile(0.5),
+            "p95": self._quantile(0.95),
+            "p99": self._quantile(0.99),
+            "buckets": {
+                **{f"le{bound:g}": self._counts[i] for i, bound in enumerate(self._bounds)},
+                "inf": self._counts[-1],
+            },
+        }
+
+
+class UpstreamTiming:
+    __slots__ = ("started", "first_byte")
+
+    def __init__(self, started: float) -> None:
+        self.started = started
+        self.first_byte: float | None = None
+
+
+_timing = threading.local()
+
+
+def begin_upstream_timing(clock: Callable[[], float] = time.monotonic) -> UpstreamTiming:
+    timing = UpstreamTiming(clock())
+    _timing.current = timing
+    return timing
+
+
+def end_upstream_timing() -> None:
+    _timing.current = None
+
+
+def mark_first_byte(clock: Callable[[], float] = time.monotonic) -> None:
+    """proxy_request から呼ぶ。計測中のリクエストが無ければ何もしない。"""
+    timing = getattr(_timing, "current", None)
+    if timing is not None and timing.first_byte is None:
+        timing.first_byte = clock()
+
+
+def _usage_tokens(payload: object) -> int | None:
+    if not isinstance(payload, dict):
+        return None
+    usage = payload.get("usage")
+    if isinstance(usage, dict) and isinstance(usage.get("completion_tokens"), int):
+        return usage["completion_tokens"]
+    return None
+
+
+def _chunk_has_content(payload: object) -> bool:
+    if not isinstance(payload, dict):
+        return False
+    for choice in payload.get("choices") or []:
+        if not isinstance(choice, dict):
+            continue
+        delta = choice.get("delta")
+        if isinstance(delta, dict) and (delta.get("content") or delta.get("reasoning_content")):
+            return True
+        if choice.get("text"):
+            return True
+    return False
+
+
+def parse_completion_tokens(body: bytes, content_type: str) -> tuple[int | None, bool]:
+    """(completion tokens, stream か) を返す。数えられない応答は (None, stream)。"""
+    if "text/event-stream" in content_type:
+        usage_tokens: int | None = None
+        content_chunks = 0
+        for raw_line in body.splitlines():
+            line = raw_line.strip()
+            if not line.startswith(b"data:"):
+                continue
+            data = line[len(b"data:") :].strip()
+            if not data or data == b"[DONE]":
+                continue
+            try:
+                chunk = json.loads(data)
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                continue
+            tokens = _usage_tokens(chunk)
+            if tokens is not None:
+                usage_tokens = tokens
+            if _chunk_has_content(chunk):
+                content_chunks += 1
+        if usage_tokens is not None:
+            return usage_tokens, True
+        return (content_chunks or None), True
+    if "json" not in content_type:
+        return None, False
+    try:
+        return _usage_tokens(json.loads(body)), False
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        return None, False
+
+
+class _RouteStats:
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.rejected = 0
+        self.status_classes: dict[str, int] = {}
+        self.upstream_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.ttfb_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.queue_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.tokens_per_sec = Histogram(TOKENS_PER_SEC_BUCKETS)
+        self.completion_tokens = 0
+
+    def snapshot(self) -> dict[str, object]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "rejected": self.rejected,
+            "errorRate": round(self.errors / self.requests, 4) if self.requests else 0.0,
+            "statusClasses": dict(sorted(self.status_classes.items())),
+            "completionTokens": self.completion_tokens,
+            "upstreamMs": self.upstream_ms.snapshot(),
+            "ttfbMs": self.ttfb_ms.snapshot(),
+            "queueMs": self.queue_ms.snapshot(),
+            "completionTokensPerSec": self.tokens_per_sec.snapshot(),
+        }
+
+
+class GatewayTelemetry:
+    def __init__(self, sink: BufferedJsonlSink | None = None, clock: Callable[[], float] = time.time) -> None:
+        self._sink = sink if sink is not None else BufferedJsonlSink("")
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._routes: dict[tuple[str, str], _RouteStats] = {}
+        self._started_at = clock()
+
+    def record(
+        self,
+        *,
+        route: str,
+        backend: str,
+        lane: str,
+        status: int,
+        queue_sec: float,
+        upstream_sec: float | None,
+        ttfb_sec: float | None,
+        body: bytes = b"",
+        content_type: str = "",
+        rejected: bool = False,
+    ) -> dict[str, object]:
+        """1 リクエスト分を histogram へ積み、sink へ流したレコードを返す。"""
+        tokens, stream = parse_completion_tokens(body, content_type) if status < 400 else (None, False)
+        tokens_per_sec: float | None = None
+        if tokens and upstream_sec:
+            decode_sec = upstream_sec - ttfb_sec if stream and ttfb_sec is not None else upstream_sec
+            if decode_sec > 0:
+                tokens_per_sec = tokens / decode_sec
+        with self._lock:
+            stats = self._routes.setdefault((route, backend), _RouteStats())
+            stats.requests += 1
+            status_class = f"{status // 100}xx"
+            stats.status_classes[status_class] = stats.status_classes.get(status_class, 0) + 1
+            if status >= 500 or rejected:
+                stats.errors += 1
+            if rejected:
+                stats.rejected += 1
+            stats.queue_ms.observe(queue_sec * 1000)
+            if upstream_sec is not None:
+                stats.upstream_ms.observe(upstream_sec * 1000)
+            if ttfb_sec is not None:
+                stats.ttfb_ms.observe(ttfb_sec * 1000)
+            if tokens:
+                stats.completion_tokens += tokens
+            if tokens_per_sec is not None:
+                stats.tokens_per_sec.observe(tokens_per_sec)
+        record: dict[str, object] = {
+            "ts": int(self._clock() * 1000),
+            "route": route,
+            "backend": backend,
+            "lane": lane,
+            "status": status,
+            "stream": stream,
+            "queueMs": round(queue_sec * 1000, 2),
+            "upstreamMs": round(upstream_sec * 1000, 2) if upstream_sec is not None else None,
+            "ttfbMs": round(ttfb_sec * 1000, 2) if ttfb_sec is not None else None,
+            "completionTokens": tokens,
+            "completionTokensPerSec": round(tokens_per_sec, 2) if tokens_per_sec is not None else None,
+        }
+        self._sink.emit(record)
+        return record
+
+    def snapshot(self) -> dict[str, object]:
+        with self._lock:
+            routes = [
+                {"route": route, "backend": backend, **stats.snapshot()}
+                for (route, backend), stats in sorted(self._routes.items())
+            ]
+        return {
+            "sinceMs": int(self._started_at * 1000),
+            "routes": routes,
+            "sink": self._sink.stats(),
+        }
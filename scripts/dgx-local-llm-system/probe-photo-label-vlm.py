@@ -94,20 +94,42 @@ def wait_until_ready(
     timeout_sec: float,
     poll_sec: float,
 ) -> None:
+    """gateway の /system/ready long-poll で待つ。未対応の gateway（404）なら /v1/models を poll する。"""
     deadline = time.monotonic() + timeout_sec
+    ready_url = f"{base_url.rstrip('/')}/system/ready"
     models_url = f"{base_url.rstrip('/')}/v1/models"
     headers = {"X-LLM-Token": shared_token}
+    long_poll = True
     last_detail = "not ready"
     while time.monotonic() < deadline:
+        remaining = deadline - time.monotonic()
         try:
-            status, body, _ = request("GET", models_url, headers=headers, timeout_sec=min(poll_sec + 2, 10))
-            if status == 200:
-                return
-            last_detail = f"status={status} body={body.decode('utf-8', errors='replace')[:300]}"
+            if long_poll:
+                wait_sec = min(remaining, 25.0)
+                status, body, _ = request(
+                    "GET",
+                    f"{ready_url}?timeoutSec={wait_sec:.1f}",
+                    headers=headers,
+                    timeout_sec=wait_sec + 10,
+                )
+                if status == 200:
+                    return
+                last_detail = f"status={status} body={body.decode('utf-8', errors='replace')[:300]}"
+                if status == 404:
+                    long_poll = False
+                    continue
+                if status == 503:
+                    # gateway 側で timeoutSec 待った後なので sleep しない
+                    continue
+            else:
+                status, body, _ = request("GET", models_url, headers=headers, timeout_sec=min(poll_sec + 2, 10))
+                if status == 200:
+                    return
+                last_detail = f"status={status} body={body.decode('utf-8', errors='replace')[:300]}"
         except Exception as exc:  # pragma: no cover
             last_detail = str(exc)
         time.sleep(poll_sec)
-    raise RuntimeError(f"/v1/models ready timeout: {last_detail}")
+    raise RuntimeError(f"runtime ready timeout: {last_detail}")
 
 
 def extract_assistant_text(payload: object) -> str | None:
@@ -146,13 +168,13 @@ def main() -> int:
         "--ready-timeout-sec",
         type=float,
         default=90.0,
-        help="/start 後に /v1/models ready を待つ秒数",
+        help="/start 後に ready を待つ秒数（gateway の /system/ready long-poll）",
     )
     parser.add_argument(
         "--ready-poll-sec",
         type=float,
         default=2.0,
-        help="/v1/models ready poll 間隔",
+        help="/system/ready 非対応 gateway での /v1/models poll 間隔",
     )
     args = parser.parse_args()
 
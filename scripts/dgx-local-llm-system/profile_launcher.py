@@ -26,6 +26,7 @@ _VLLM_RUNTIME_ENV_MAP: dict[str, str] = {
     "attentionBackend": "VLLM_ATTENTION_BACKEND",
     "enableChunkedPrefill": "VLLM_ENABLE_CHUNKED_PREFILL",
     "enablePrefixCaching": "VLLM_ENABLE_PREFIX_CACHING",
+    "enablePromptTokensDetails": "VLLM_ENABLE_PROMPT_TOKENS_DETAILS",
 }
 
 _LLAMA_RUNTIME_ENV_MAP: dict[str, str] = {
@@ -0,0 +1,295 @@
+"""
+gateway の upstream 呼び出しに対する admission control（backend 別同時実行上限 + 有界待ち行列 + 優先レーン）。
+
+- backend（green / blue / embedding）ごとに同時実行数を制限し、超過分は有界キューで待たせる
+- レーンは interactive（stackchan / kiosk 等）と batch（Hermes digest / research 等）の2本。
+  空きスロットは常に interactive を先に割り当て、batch は `reserved_interactive_slots` 分を残してしか走らない
+- キュー満杯は即 429、待ち時間が deadline を超えたら 503 として呼び出し側へ返す
+- `snapshot()` でキュー深さ・待ち時間・拒否数を返し、gateway の /system/scheduler から参照する
+
+gateway 本体は ThreadingHTTPServer + urllib のブロッキング I/O なので、
+スケジューラも threading ベースで実装する（待機中のスレッドは GPU スロットを消費しない）。
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, Mapping
+
+LANE_INTERACTIVE = "interactive"
+LANE_BATCH = "batch"
+LANES = (LANE_INTERACTIVE, LANE_BATCH)
+
+LANE_HEADER = "X-LLM-Priority"
+
+_WAIT_SAMPLE_LIMIT = 512
+
+
+class SchedulerRejectedError(Exception):
+    def __init__(self, code: str, message: str, status_code: int, retry_after_sec: int | None = None) -> None:
+        super().__init__(message)
+        self.code = code
+        self.status_code = status_code
+        self.retry_after_sec = retry_after_sec
+
+
+@dataclass(frozen=True)
+class SchedulerConfig:
+    default_max_inflight: int = 4
+    backend_max_inflight: tuple[tuple[str, int], ...] = ()
+    max_queue_depth: int = 64
+    queue_timeout_sec: float = 120.0
+    reserved_interactive_slots: int = 1
+    batch_tokens: frozenset[str] = frozenset()
+    batch_route_prefixes: tuple[str, ...] = ()
+
+    def max_inflight_for(self, backend: str) -> int:
+        for name, limit in self.backend_max_inflight:
+            if name == backend:
+                return limit
+        return self.default_max_inflight
+
+
+def parse_backend_limits(raw: str) -> tuple[tuple[str, int], ...]:
+    """`green=2,blue=8,embedding=4` 形式。不正なトークンは無視する。"""
+    limits: list[tuple[str, int]] = []
+    for part in raw.split(","):
+        name, sep, value = part.partition("=")
+        name = name.strip().lower()
+        if not sep or not name:
+            continue
+        try:
+            limit = int(value.strip())
+        except ValueError:
+            continue
+        if limit > 0:
+            limits.append((name, limit))
+    return tuple(limits)
+
+
+def _csv_tuple(raw: str) -> tuple[str, ...]:
+    return tuple(part.strip() for part in raw.split(",") if part.strip())
+
+
+def _int_env(env: Mapping[str, str], name: str, default: int, minimum: int) -> int:
+    raw = (env.get(name) or "").strip()
+    if not raw:
+        return default
+    try:
+        return max(minimum, int(raw))
+    except ValueError:
+        return default
+
+
+def load_scheduler_config_from_env(env: Mapping[str, str] | None = None) -> SchedulerConfig:
+    env = env if env is not None else os.environ
+    timeout_raw = (env.get("GATEWAY_QUEUE_TIMEOUT_SEC") or "").strip()
+    try:
+        queue_timeout_sec = max(0.1, float(timeout_raw)) if timeout_raw else 120.0
+    except ValueError:
+        queue_timeout_sec = 120.0
+    return SchedulerConfig(
+        default_max_inflight=_int_env(env, "GATEWAY_DEFAULT_MAX_INFLIGHT", 4, 1),
+        backend_max_inflight=parse_backend_limits(env.get("GATEWAY_BACKEND_MAX_INFLIGHT") or ""),
+        max_queue_depth=_int_env(env, "GATEWAY_MAX_QUEUE_DEPTH", 64, 0),
+        queue_timeout_sec=queue_timeout_sec,
+        reserved_interactive_slots=_int_env(env, "GATEWAY_RESERVED_INTERACTIVE_SLOTS", 1, 0),
+        batch_tokens=frozenset(_csv_tuple(env.get("GATEWAY_BATCH_LLM_TOKENS") or "")),
+        batch_route_prefixes=_csv_tuple(env.get("GATEWAY_BATCH_ROUTE_PREFIXES") or ""),
+    )
+
+
+def resolve_lane(path: str, headers: Mapping[str, str], config: SchedulerConfig) -> str:
+    """明示ヘッダ > 呼び出し元トークン > route prefix の順でレーンを決める。既定は interactive。"""
+    explicit = (headers.get(LANE_HEADER) or "").strip().lower()
+    if explicit in LANES:
+        return explicit
+    if config.batch_tokens:
+        token = (headers.get("X-LLM-Token") or "").strip()
+        auth = headers.get("Authorization") or ""
+        if not token and auth.startswith("Bearer "):
+            token = auth[len("Bearer ") :].strip()
+        if token and token in config.batch_tokens:
+            return LANE_BATCH
+    if any(path.startswith(prefix) for prefix in config.batch_route_prefixes):
+        return LANE_BATCH
+    return LANE_INTERACTIVE
+
+
+class _Waiter:
+    __slots__ = ("lane", "enqueued_at", "event", "granted")
+
+    def __init__(self, lane: str, enqueued_at: float) -> None:
+        self.lane = lane
+        self.enqueued_at = enqueued_at
+        self.event = threading.Event()
+        self.granted = False
+
+
+@dataclass
+class _LaneStats:
+    admitted: int = 0
+    rejected_queue_full: int = 0
+    rejected_timeout: int = 0
+    wait_total_sec: float = 0.0
+    wait_max_sec: float = 0.0
+    wait_samples: deque = field(default_factory=lambda: deque(maxlen=_WAIT_SAMPLE_LIMIT))
+
+
+@dataclass
+class _BackendState:
+    max_inflight: int
+    inflight: int = 0
+    inflight_by_lane: dict[str, int] = field(default_factory=lambda: {lane: 0 for lane in LANES})
+    queues: dict[str, deque] = field(default_factory=lambda: {lane: deque() for lane in LANES})
+    stats: dict[str, _LaneStats] = field(default_factory=lambda: {lane: _LaneStats() for lane in LANES})
+
+    def queued(self) -> int:
+        return sum(len(q) for q in self.queues.values())
+
+
+def _percentile(samples: list[float], pct: float) -> float | None:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+class AdmissionScheduler:
+    def __init__(self, config: SchedulerConfig, clock: Callable[[], float] = time.monotonic) -> None:
+        self._config = config
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._backends: dict[str, _BackendState] = {}
+
+    @property
+    def config(self) -> SchedulerConfig:
+        return self._config
+
+    def _state(self, backend: str) -> _BackendState:
+        state = self._backends.get(backend)
+        if state is None:
+            state = _BackendState(max_inflight=self._config.max_inflight_for(backend))
+            self._backends[backend] = state
+        return state
+
+    def _batch_limit(self, state: _BackendState) -> int:
+        reserved = min(self._config.reserved_interactive_slots, state.max_inflight - 1)
+        return state.max_inflight - max(0, reserved)
+
+    def _can_run(self, state: _BackendState, lane: str) -> bool:
+        if state.inflight >= state.max_inflight:
+            return False
+        if lane == LANE_BATCH:
+            return state.inflight_by_lane[LANE_BATCH] < self._batch_limit(state)
+        return True
+
+    def _admit(self, state: _BackendState, lane: str, waited_sec: float) -> None:
+        state.inflight += 1
+        state.inflight_by_lane[lane] += 1
+        stats = state.stats[lane]
+        stats.admitted += 1
+        stats.wait_total_sec += waited_sec
+        stats.wait_max_sec = max(stats.wait_max_sec, waited_sec)
+        stats.wait_samples.append(waited_sec)
+
+    def _dispatch(self, state: _BackendState) -> None:
+        now = self._clock()
+        for lane in LANES:
+            queue = state.queues[lane]
+            while queue and self._can_run(state, lane):
+                waiter = queue.popleft()
+                waiter.granted = True
+                self._admit(state, lane, now - waiter.enqueued_at)
+                waiter.event.set()
+
+    def acquire(self, backend: str, lane: str) -> None:
+        if lane not in LANES:
+            lane = LANE_INTERACTIVE
+        with self._lock:
+            state = self._state(backend)
+            # 先着の待機者がいる間は横入りさせない（同レーン・上位レーンの待機者を優先）
+            ahead = any(state.queues[name] for name in LANES[: LANES.index(lane) + 1])
+            if not ahead and self._can_run(state, lane):
+                self._admit(state, lane, 0.0)
+                return
+            if state.queued() >= self._config.max_queue_depth:
+                state.stats[lane].rejected_queue_full += 1
+                raise SchedulerRejectedError(
+                    "GATEWAY_QUEUE_FULL",
+                    f"{backend} queue is full",
+                    429,
+                    retry_after_sec=max(1, int(self._config.queue_timeout_sec // 4)),
+                )
+            waiter = _Waiter(lane, self._clock())
+            state.queues[lane].append(waiter)
+        waiter.event.wait(self._config.queue_timeout_sec)
+        with self._lock:
+            if waiter.granted:
+                return
+            try:
+                state.queues[lane].remove(waiter)
+            except ValueError:
+                pass
+            state.stats[lane].rejected_timeout += 1
+        raise SchedulerRejectedError(
+            "GATEWAY_QUEUE_TIMEOUT",
+            f"{backend} queue wait exceeded {self._config.queue_timeout_sec:g}s",
+            503,
+        )
+
+    def release(self, backend: str, lane: str) -> None:
+        if lane not in LANES:
+            lane = LANE_INTERACTIVE
+        with self._lock:
+            state = self._state(backend)
+            state.inflight = max(0, state.inflight - 1)
+            state.inflight_by_lane[lane] = max(0, state.inflight_by_lane[lane] - 1)
+            self._dispatch(state)
+
+    @contextmanager
+    def slot(self, backend: str, lane: str) -> Iterator[None]:
+        self.acquire(backend, lane)
+        try:
+            yield
+        finally:
+            self.release(backend, lane)
+
+    def snapshot(self) -> dict[str, object]:
+        with self._lock:
+            backends: dict[str, object] = {}
+            for name, state in sorted(self._backends.items()):
+                lanes: dict[str, object] = {}
+                for lane in LANES:
+                    stats = state.stats[lane]
+                    samples = list(stats.wait_samples)
+                    p50 = _percentile(samples, 50)
+                    p95 = _percentile(samples, 95)
+                    lanes[lane] = {
+                        "inflight": state.inflight_by_lane[lane],
+                        "queued": len(state.queues[lane]),
+                        "admitted": stats.admitted,
+                        "rejectedQueueFull": stats.rejected_queue_full,
+                        "rejectedTimeout": stats.rejected_timeout,
+                        "waitAvgSec": round(stats.wait_total_sec / stats.admitted, 4) if stats.admitted else 0.0,
+                        "waitMaxSec": round(stats.wait_max_sec, 4),
+                        "waitP50Sec": round(p50, 4) if p50 is not None else None,
+                        "waitP95Sec": round(p95, 4) if p95 is not None else None,
+                    }
+                backends[name] = {
+                    "maxInflight": state.max_inflight,
+                    "batchMaxInflight": self._batch_limit(state),
+                    "inflight": state.inflight,
+                    "queueDepth": state.queued(),
+                    "lanes": lanes,
+                }
+            return {
+                "maxQueueDepth": self._config.max_queue_depth,
+                "queueTimeoutSec": self._config.queue_timeout_sec,
+                "backends": backends,
+            }
@@ -0,0 +1,404 @@
+"""
+DGX runtime start/stop を job として実行する single-flight job manager。
+
+- job は 1 本の runner スレッドで FIFO に直列実行する（GPU / コンテナ操作を同時に走らせない）
+- 同じ key（例: `start:blue:<profileId>`）の job が queued / running の間に来た要求は新規 job を作らず、
+  既存 job に合流する（single-flight）
+- job ごとに id・状態・進捗（step 名と index）・出力 log の末尾を保持し、終了済み job は直近 max_history 件だけ残す
+- cancel は queued なら即 cancelled。running は cancellable な job だけ受け付け、
+  `run_logged_command` が process group ごと SIGTERM（猶予後 SIGKILL）して `JobCancelledError` を送出する。
+  後始末（例: 途中まで起動したコンテナの stop）は job 側の on_cancel で行う
+- job 実行スレッド内では `current_job()` で実行中 job を取れるため、既存の command runner の
+  シグネチャを変えずに log 転送と cancel を差し込める
+"""
+from __future__ import annotations
+
+import itertools
+import os
+import signal
+import subprocess
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Mapping
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed", "cancelled")
+ACTIVE_STATUSES = frozenset({"queued", "running"})
+
+
+class JobCancelledError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class JobManagerConfig:
+    max_history: int = 50
+    log_tail_lines: int = 200
+    cancel_grace_sec: float = 10.0
+
+
+def load_job_manager_config_from_env(env: Mapping[str, str] | None = None) -> JobManagerConfig:
+    env = env if env is not None else os.environ
+    defaults = JobManagerConfig()
+    try:
+        max_history = max(1, int((env.get("DGX_RUNTIME_JOB_HISTORY") or str(defaults.max_history)).strip()))
+    except ValueError:
+        max_history = defaults.max_history
+    try:
+        log_tail_lines = max(1, int((env.get("DGX_RUNTIME_JOB_LOG_LINES") or str(defaults.log_tail_lines)).strip()))
+    except ValueError:
+        log_tail_lines = defaults.log_tail_lines
+    try:
+        cancel_grace_sec = max(0.0, float((env.get("DGX_RUNTIME_JOB_CANCEL_GRACE_SEC") or "10").strip()))
+    except ValueError:
+        cancel_grace_sec = defaults.cancel_grace_sec
+    return JobManagerConfig(max_history=max_history, log_tail_lines=log_tail_lines, cancel_grace_sec=cancel_grace_sec)
+
+
+class RuntimeJob:
+    def __init__(
+        self,
+        job_id: str,
+        key: str,
+        action: str,
+        fn: Callable[["RuntimeJob"], dict[str, object]],
+        *,
+        steps: tuple[str, ...],
+        cancellable_while_running: bool,
+        on_cancel: Callable[["RuntimeJob"], None] | None,
+        log_tail_lines: int,
+        cancel_grace_sec: float,
+        clock: Callable[[], float],
+    ) -> None:
+        self.id = job_id
+        self.key = key
+        self.action = action
+        self.steps = steps
+        self.cancellable_while_running = cancellable_while_running
+        self.cancel_grace_sec = cancel_grace_sec
+        self._fn = fn
+        self._on_cancel = on_cancel
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._cancel_requested = threading.Event()
+        self._in_cleanup = False
+        self._log: deque[str] = deque(maxlen=log_tail_lines)
+        self._log_lines = 0
+        self.status = "queued"
+        self.step_index = -1
+        self.created_at = clock()
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self.result: dict[str, object] | None = None
+        self.error: BaseException | None = None
+        self.waiters = 1
+
+    # --- job 実行スレッドから呼ぶ ---
+
+    def log(self, line: str) -> None:
+        with self._lock:
+            self._log.append(line.rstrip("\n"))
+            self._log_lines += 1
+
+    def progress(self, step: str) -> None:
+        """step を開始したことを記録する。cancel 要求済みならここで中断する。"""
+        self.check_cancelled()
+        with self._lock:
+            if step in self.steps:
+                self.step_index = self.steps.index(step)
+            self._log.append(f"[step] {step}")
+            self._log_lines += 1
+
+    def check_cancelled(self) -> None:
+        if self._cancel_requested.is_set():
+            raise JobCancelledError(f"job {self.id} cancelled")
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel_requested.is_set()
+
+    # --- HTTP handler から呼ぶ ---
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._done.wait(timeout)
+
+    def log_tail(self, lines: int | None = None) -> list[str]:
+        with self._lock:
+            tail = list(self._log)
+        return tail if lines is None or lines >= len(tail) else tail[len(tail) - lines :]
+
+    def to_api(self) -> dict[str, object]:
+        with self._lock:
+            now = self._clock()
+            payload: dict[str, object] = {
+                "id": self.id,
+                "key": self.key,
+                "action": self.action,
+                "status": self.status,
+                "createdAt": self.created_at,
+                "startedAt": self.started_at,
+                "finishedAt": self.finished_at,
+                "elapsedSec": round((self.finished_at or now) - (self.started_at or now), 3),
+                "progress": {
+                    "steps": list(self.steps),
+                    "stepIndex": self.step_index,
+                    "step": self.steps[self.step_index] if 0 <= self.step_index < len(self.steps) else None,
+                },
+                "cancellable": self.status == "queued"
+                or (self.status == "running" and self.cancellable_while_running),
+                "cancelRequested": self._cancel_requested.is_set(),
+                "waiters": self.waiters,
+                "logLines": self._log_lines,
+            }
+            if self.error is not None:
+                payload["error"] = str(self.error)
+            return payload
+
+    # --- JobManager 内部 ---
+
+    def _run(self) -> None:
+        with self._lock:
+            if self.status != "queued":
+                return
+            self.status = "running"
+            self.started_at = self._clock()
+        try:
+            self.check_cancelled()
+            result = self._fn(self)
+            self._finish("succeeded", result=result)
+        except JobCancelledError as exc:
+            self._cleanup_after_cancel()
+            self._finish("cancelled", error=exc)
+        except BaseException as exc:  # noqa: BLE001 - 呼び出し元（待機中の HTTP handler）へ返す
+            self._finish("failed", error=exc)
+
+    def _cleanup_after_cancel(self) -> None:
+        if self._on_cancel is None:
+            return
+        # 後始末の command は cancel 済みでも最後まで実行させる
+        with self._lock:
+            self._in_cleanup = True
+            self._cancel_requested.clear()
+        try:
+            self.log("[cancel] running cleanup")
+            self._on_cancel(self)
+        except BaseException as exc:  # noqa: BLE001
+            self.log(f"[cancel] cleanup failed: {exc}")
+        finally:
+            with self._lock:
+                self._in_cleanup = False
+                self._cancel_requested.set()
+
+    def _finish(self, status: str, *, result: dict[str, object] | None = None, error: BaseException | None = None) -> None:
+        with self._lock:
+            self.status = status
+            self.result = result
+            self.error = error
+            self.finished_at = self._clock()
+        self._done.set()
+
+    def _request_cancel(self) -> str:
+        with self._lock:
+            if self.status == "queued":
+                self.status = "cancelled"
+                self.error = JobCancelledError(f"job {self.id} cancelled before start")
+                self.finished_at = self._clock()
+                self._cancel_requested.set()
+                self._done.set()
+                return "cancelled"
+            if self.status != "running":
+                return "finished"
+            if self._in_cleanup:
+                return "cancelling"
+            if not self.cancellable_while_running:
+                return "not_cancellable"
+            self._cancel_requested.set()
+            return "cancelling"
+
+
+_current = threading.local()
+
+
+def current_job() -> RuntimeJob | None:
+    return getattr(_current, "job", None)
+
+
+class JobManager:
+    def __init__(
+        self,
+        id_prefix: str,
+        config: JobManagerConfig = JobManagerConfig(),
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._id_prefix = id_prefix
+        self._config = config
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._queue: deque[RuntimeJob] = deque()
+        self._jobs: dict[str, RuntimeJob] = {}
+        self._active_by_key: dict[str, RuntimeJob] = {}
+        self._finished_order: deque[str] = deque()
+        self._seq = itertools.count(1)
+        self._coalesced = 0
+        self._worker = threading.Thread(target=self._run, name=f"{id_prefix}-runtime-jobs", daemon=True)
+        self._worker.start()
+
+    def submit(
+        self,
+        key: str,
+        action: str,
+        fn: Callable[[RuntimeJob], dict[str, object]],
+        *,
+        steps: tuple[str, ...] = (),
+        cancellable_while_running: bool = True,
+        on_cancel: Callable[[RuntimeJob], None] | None = None,
+    ) -> tuple[RuntimeJob, bool]:
+        """(job, 新規作成か) を返す。同じ key の未完了 job があればそれに合流する。"""
+        with self._cond:
+            existing = self._active_by_key.get(key)
+            if existing is not None and existing.status in ACTIVE_STATUSES:
+                existing.waiters += 1
+                self._coalesced += 1
+                return existing, False
+            job = RuntimeJob(
+                f"{self._id_prefix}-{int(self._clock())}-{next(self._seq)}",
+                key,
+                action,
+                fn,
+                steps=steps,
+                cancellable_while_running=cancellable_while_running,
+                on_cancel=on_cancel,
+                log_tail_lines=self._config.log_tail_lines,
+                cancel_grace_sec=self._config.cancel_grace_sec,
+                clock=self._clock,
+            )
+            self._jobs[job.id] = job
+            self._active_by_key[key] = job
+            self._queue.append(job)
+            self._cond.notify()
+            return job, True
+
+    def get(self, job_id: str) -> RuntimeJob | None:
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def owns(self, job_id: str) -> bool:
+        return job_id.startswith(f"{self._id_prefix}-")
+
+    def cancel(self, job_id: str) -> tuple[RuntimeJob | None, str]:
+        """(job, outcome) を返す。outcome: cancelled | cancelling | not_cancellable | finished | not_found"""
+        job = self.get(job_id)
+        if job is None:
+            return None, "not_found"
+        outcome = job._request_cancel()
+        if outcome == "cancelled":
+            self._retire(job)
+        return job, outcome
+
+    def snapshot(self) -> dict[str, object]:
+        with self._cond:
+            jobs = sorted(self._jobs.values(), key=lambda j: j.created_at, reverse=True)
+            return {
+                "queued": sum(1 for j in jobs if j.status == "queued"),
+                "running": [j.id for j in jobs if j.status == "running"],
+                "coalesced": self._coalesced,
+                "jobs": [j.to_api() for j in jobs],
+            }
+
+    def _retire(self, job: RuntimeJob) -> None:
+        with self._cond:
+            if self._active_by_key.get(job.key) is job:
+                del self._active_by_key[job.key]
+            self._finished_order.append(job.id)
+            while len(self._finished_order) > self._config.max_history:
+                self._jobs.pop(self._finished_order.popleft(), None)
+
+    def _next(self) -> RuntimeJob:
+        with self._cond:
+            while True:
+                while not self._queue:
+                    self._cond.wait()
+                job = self._queue.popleft()
+                if job.status == "queued":
+                    return job
+
+    def _run(self) -> None:
+        while True:
+            job = self._next()
+            _current.job = job
+            try:
+                job._run()
+            finally:
+                _current.job = None
+                self._retire(job)
+
+
+def _kill_process_group(proc: subprocess.Popen, grace_sec: float) -> None:
+    try:
+        os.killpg(proc.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        return
+    try:
+        proc.wait(timeout=grace_sec)
+    except subprocess.TimeoutExpired:
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        proc.wait()
+
+
+def run_logged_command(
+    command: str,
+    *,
+    env: Mapping[str, str] | None = None,
+    cwd: str | None = None,
+    timeout_sec: float,
+) -> tuple[int, str]:
+    """
+    `bash -lc command` を別 process group で実行し、(returncode, stdout+stderr) を返す。
+
+    job 実行スレッド内なら出力行を job log に流し、cancel 要求で process group を止めて JobCancelledError を送出する。
+    timeout 時は process group を止めて subprocess.TimeoutExpired を送出する。
+    """
+    job = current_job()
+    proc = subprocess.Popen(
+        ["bash", "-lc", command],
+        cwd=cwd,
+        env=dict(env) if env is not None else None,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        start_new_session=True,
+    )
+    lines: list[str] = []
+
+    def pump() -> None:
+        assert proc.stdout is not None
+        for line in proc.stdout:
+            lines.append(line)
+            if job is not None:
+                job.log(line)
+
+    reader = threading.Thread(target=pump, name="runtime-job-output", daemon=True)
+    reader.start()
+    deadline = time.monotonic() + timeout_sec
+    grace = job.cancel_grace_sec if job is not None else JobManagerConfig().cancel_grace_sec
+    while True:
+        try:
+            returncode = proc.wait(timeout=0.2)
+            break
+        except subprocess.TimeoutExpired:
+            pass
+        if job is not None and job.cancel_requested:
+            _kill_process_group(proc, grace)
+            reader.join(timeout=1)
+            raise JobCancelledError(f"command cancelled: {command}")
+        if time.monotonic() >= deadline:
+            _kill_process_group(proc, grace)
+            reader.join(timeout=1)
+            raise subprocess.TimeoutExpired(command, timeout_sec, output="".join(lines))
+    reader.join(timeout=5)
+    return returncode, "".join(lines).strip()
@@ -0,0 +1,178 @@
+"""
+gateway の wait-until-ready long-poll（`GET /system/ready?timeoutSec=N`）。
+
+- 待機中のクライアントが何人いても、upstream（active backend の `/v1/models`）への probe は
+  gateway 全体で 1 本だけ走らせる。probe 結果は condition で全 waiter へ配る
+- 直近 `warm_ttl_sec` 以内に ready を確認済みなら probe せずに即返す（warm 時の往復を増やさない）
+- 対象 URL は probe ごとに解決し直すため、待機中に active backend が切り替わっても新しい方を見る。
+  ready のキャッシュも URL 単位で持ち、切替前の ready を流用しない
+- waiter がいなくなったら probe thread は止まる（常駐 poll はしない）
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Mapping
+
+
+@dataclass(frozen=True)
+class ReadinessConfig:
+    probe_interval_sec: float = 0.5
+    warm_ttl_sec: float = 2.0
+    max_wait_sec: float = 600.0
+
+
+def _float_env(env: Mapping[str, str], name: str, default: float, minimum: float) -> float:
+    raw = (env.get(name) or "").strip()
+    if not raw:
+        return default
+    try:
+        return max(minimum, float(raw))
+    except ValueError:
+        return default
+
+
+def load_readiness_config_from_env(env: Mapping[str, str] | None = None) -> ReadinessConfig:
+    env = env if env is not None else os.environ
+    return ReadinessConfig(
+        probe_interval_sec=_float_env(env, "GATEWAY_READY_PROBE_INTERVAL_SEC", 0.5, 0.05),
+        warm_ttl_sec=_float_env(env, "GATEWAY_READY_CACHE_SEC", 2.0, 0.0),
+        max_wait_sec=_float_env(env, "GATEWAY_READY_MAX_WAIT_SEC", 600.0, 0.0),
+    )
+
+
+@dataclass(frozen=True)
+class ReadinessResult:
+    ready: bool
+    target: str
+    waited_sec: float
+    detail: dict[str, object]
+    cached: bool = False
+
+    def to_api(self) -> dict[str, object]:
+        return {
+            "ready": self.ready,
+            "target": self.target,
+            "waitedMs": int(self.waited_sec * 1000),
+            "cached": self.cached,
+            "probe": self.detail,
+        }
+
+
+class ReadinessWatcher:
+    def __init__(
+        self,
+        target: Callable[[], str],
+        probe: Callable[[str], tuple[bool, dict[str, object]]],
+        config: ReadinessConfig = ReadinessConfig(),
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._target = target
+        self._probe = probe
+        self._config = config
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._waiters = 0
+        self._prober: threading.Thread | None = None
+        self._generation = 0
+        self._last_target = ""
+        self._last_ready = False
+        self._last_detail: dict[str, object] = {}
+        self._ready_at: float | None = None
+        self._probes = 0
+        self._long_polls = 0
+        self._cached_hits = 0
+        self._timeouts = 0
+
+    @property
+    def config(self) -> ReadinessConfig:
+        return self._config
+
+    def wait(self, timeout_sec: float) -> ReadinessResult:
+        """ready になるか timeout_sec が過ぎるまで待つ。timeout_sec=0 は probe 1 回分だけ待つ。"""
+        timeout_sec = max(0.0, min(timeout_sec, self._config.max_wait_sec))
+        started = self._clock()
+        deadline = started + timeout_sec
+        target = self._target()
+        with self._cond:
+            if self._fresh_ready_locked(target):
+                self._cached_hits += 1
+                return ReadinessResult(True, target, 0.0, dict(self._last_detail), cached=True)
+            self._long_polls += 1
+            self._waiters += 1
+            self._ensure_prober_locked()
+            try:
+                seen = self._generation
+                while True:
+                    if self._generation != seen:
+                        seen = self._generation
+                        if self._last_ready:
+                            return ReadinessResult(
+                                True, self._last_target, self._clock() - started, dict(self._last_detail)
+                            )
+                        # timeout=0 でも最初の probe 結果は返す
+                        if self._clock() >= deadline:
+                            break
+                    remaining = deadline - self._clock()
+                    if remaining <= 0 and timeout_sec > 0:
+                        break
+                    self._cond.wait(remaining if remaining > 0 else self._config.probe_interval_sec)
+                self._timeouts += 1
+                return ReadinessResult(False, self._last_target or target, self._clock() - started, dict(self._last_detail))
+            finally:
+                self._waiters -= 1
+
+    def invalidate(self) -> None:
+        """/start /stop 後など、確認済み ready を捨てて次回は必ず probe させる。"""
+        with self._cond:
+            self._ready_at = None
+
+    def stats(self) -> dict[str, object]:
+        with self._cond:
+            return {
+                "waiters": self._waiters,
+                "probes": self._probes,
+                "longPolls": self._long_polls,
+                "cachedHits": self._cached_hits,
+                "timeouts": self._timeouts,
+                "lastTarget": self._last_target or None,
+                "lastReady": self._last_ready,
+            }
+
+    def _fresh_ready_locked(self, target: str) -> bool:
+        return (
+            self._ready_at is not None
+            and self._last_target == target
+            and self._clock() - self._ready_at <= self._config.warm_ttl_sec
+        )
+
+    def _ensure_prober_locked(self) -> None:
+        if self._prober is not None and self._prober.is_alive():
+            return
+        self._prober = threading.Thread(target=self._run, name="gateway-readiness-probe", daemon=True)
+        self._prober.start()
+
+    def _run(self) -> None:
+        while True:
+            target = self._target()
+            try:
+                ready, detail = self._probe(target)
+            except Exception as exc:  # noqa: BLE001 - probe 失敗は not ready として扱う
+                ready, detail = False, {"message": str(exc)}
+            with self._cond:
+                self._probes += 1
+                self._generation += 1
+                self._last_target = target
+                self._last_ready = ready
+                self._last_detail = detail
+                self._ready_at = self._clock() if ready else None
+                self._cond.notify_all()
+                if ready or self._waiters == 0:
+                    self._prober = None
+                    return
+                self._cond.wait(self._config.probe_interval_sec)
+                if self._waiters == 0:
+                    self._prober = None
+                    return
@@ -4,6 +4,8 @@ set -euo pipefail
 CONTAINER_NAME="${EMBEDDING_CONTAINER_NAME:-system-prod-embedding}"
 IMAGE="${EMBEDDING_SERVER_IMAGE:-lmsysorg/sglang:latest}"
 SCRIPT_PATH="${EMBEDDING_SERVER_SCRIPT_PATH:-/srv/dgx/system-prod/bin/embedding-server.py}"
+SCRIPT_DIR="$(dirname "${SCRIPT_PATH}")"
+CACHE_STATE_DIR="${EMBEDDING_CACHE_STATE_DIR:-/srv/dgx/system-prod/state/embedding-cache}"
 CACHE_DIR="${EMBEDDING_SERVER_CACHE_DIR:-/srv/dgx/system-prod/data/hf-cache}"
 LOG_PATH="${EMBEDDING_SERVER_LOG_PATH:-/srv/dgx/system-prod/logs/embedding-server.log}"
 HOST_PORT="${EMBEDDING_SERVER_PORT:-38100}"
@@ -11,8 +13,14 @@ MODEL_ID="${EMBEDDING_MODEL_ID:-clip-ViT-B-32}"
 HF_MODEL="${EMBEDDING_HF_MODEL:-openai/clip-vit-base-patch32}"
 DEVICE="${EMBEDDING_DEVICE:-cpu}"
 NORMALIZE="${EMBEDDING_NORMALIZE:-true}"
+MAX_BATCH_SIZE="${EMBEDDING_MAX_BATCH_SIZE:-16}"
+MAX_BATCH_WAIT_MS="${EMBEDDING_MAX_BATCH_WAIT_MS:-5}"
+CACHE_MAX_ENTRIES="${EMBEDDING_CACHE_MAX_ENTRIES:-4096}"
+# 空なら embedding_preprocess.py 側の既定 min(8, CPU 数) を使う
+PREPROCESS_WORKERS="${EMBEDDING_PREPROCESS_WORKERS:-}"
+JPEG_DRAFT="${EMBEDDING_JPEG_DRAFT:-true}"
 
-install -d "$(dirname "${LOG_PATH}")" "${CACHE_DIR}"
+install -d "$(dirname "${LOG_PATH}")" "${CACHE_DIR}" "${CACHE_STATE_DIR}"
 
 if docker ps --format '{{.Names}}' | grep -Fxq "${CONTAINER_NAME}"; then
   echo "embedding-server already running container=${CONTAINER_NAME}"
@@ -29,6 +37,11 @@ docker run -d \
   --gpus=all \
   -p "127.0.0.1:${HOST_PORT}:38100" \
   -v "${SCRIPT_PATH}:/opt/embedding-server.py:ro" \
+  -v "${SCRIPT_DIR}/embedding_batcher.py:/opt/embedding_batcher.py:ro" \
+  -v "${SCRIPT_DIR}/embedding_cache.py:/opt/embedding_cache.py:ro" \
+  -v "${SCRIPT_DIR}/embedding_batch_io.py:/opt/embedding_batch_io.py:ro" \
+  -v "${SCRIPT_DIR}/embedding_preprocess.py:/opt/embedding_preprocess.py:ro" \
+  -v "${CACHE_STATE_DIR}:/var/lib/embedding-cache" \
   -v "${CACHE_DIR}:/root/.cache/huggingface" \
   -e EMBEDDING_LISTEN_HOST=0.0.0.0 \
   -e EMBEDDING_LISTEN_PORT=38100 \
@@ -36,6 +49,12 @@ docker run -d \
   -e EMBEDDING_HF_MODEL="${HF_MODEL}" \
   -e EMBEDDING_DEVICE="${DEVICE}" \
   -e EMBEDDING_NORMALIZE="${NORMALIZE}" \
+  -e EMBEDDING_MAX_BATCH_SIZE="${MAX_BATCH_SIZE}" \
+  -e EMBEDDING_MAX_BATCH_WAIT_MS="${MAX_BATCH_WAIT_MS}" \
+  -e EMBEDDING_CACHE_MAX_ENTRIES="${CACHE_MAX_ENTRIES}" \
+  -e EMBEDDING_CACHE_PATH=/var/lib/embedding-cache/embeddings.jsonl \
+  -e EMBEDDING_PREPROCESS_WORKERS="${PREPROCESS_WORKERS}" \
+  -e EMBEDDING_JPEG_DRAFT="${JPEG_DRAFT}" \
   "${IMAGE}" \
   bash -lc 'python /opt/embedding-server.py' >>"${LOG_PATH}" 2>&1
 
@@ -2,7 +2,9 @@ import importlib.util
 import json
 import sys
 import threading
+import time
 import unittest
+import urllib.error
 import urllib.request
 from http.server import ThreadingHTTPServer
 from pathlib import Path
@@ -548,5 +550,154 @@ class ControlServerTests(unittest.TestCase):
         self.assertEqual(calls, ["blue-start"])
 
 
+class ControlServerJobTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.module = load_module()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.state_path = Path(self.tmp.name) / "active-model-profile.json"
+        self.resource_state_path = Path(self.tmp.name) / "dgx-resource-state.json"
+        self.config = self.module.ControlConfig(
+            token="runtime-token",
+            active_backend="blue",
+            start_cmd="legacy-start",
+            stop_cmd="legacy-stop",
+            green_start_cmd="green-start",
+            green_stop_cmd="green-stop",
+            blue_start_cmd="blue-start",
+            blue_stop_cmd="blue-stop",
+            blue_stop_mode="on_demand",
+            host="127.0.0.1",
+            port=39090,
+            active_model_state_path=str(self.state_path),
+            resource_state_path=str(self.resource_state_path),
+        )
+
+    def serve(self, command_runner) -> str:
+        handler = self.module.make_handler(self.config, command_runner=command_runner)
+        httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+
+        def stop() -> None:
+            httpd.shutdown()
+            httpd.server_close()
+            thread.join(timeout=5)
+
+        self.addCleanup(stop)
+        return f"http://127.0.0.1:{httpd.server_port}"
+
+    def request(self, base_url: str, method: str, path: str, headers: dict | None = None):
+        req = urllib.request.Request(
+            f"{base_url}{path}",
+            data=b"" if method == "POST" else None,
+            method=method,
+            headers={"X-Runtime-Control-Token": "runtime-token", **(headers or {})},
+        )
+        try:
+            with urllib.request.urlopen(req, timeout=10) as response:
+                return response.status, json.loads(response.read().decode("utf-8")), response.headers
+        except urllib.error.HTTPError as exc:
+            return exc.code, json.loads(exc.read().decode("utf-8")), exc.headers
+
+    def wait_for_status(self, base_url: str, job_id: str, statuses: tuple[str, ...]) -> dict:
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            _, payload, _ = self.request(base_url, "GET", f"/jobs/{job_id}")
+            if payload["job"]["status"] in statuses:
+                return payload
+            time.sleep(0.02)
+        self.fail(f"job {job_id} did not reach {statuses}")
+
+    def test_async_start_returns_job_with_progress_and_log(self):
+        def runner(cmd, extra_env=None):
+            sys.modules["runtime_jobs"].current_job().log(f"ran {cmd}")
+
+        base_url = self.serve(runner)
+        status, payload, headers = self.request(base_url, "POST", "/start", {"Prefer": "respond-async"})
+        self.assertEqual(status, 202)
+        job_id = payload["jobId"]
+        self.assertEqual(headers["Location"], f"/jobs/{job_id}")
+
+        done = self.wait_for_status(base_url, job_id, ("succeeded",))
+        self.assertEqual(done["result"]["backend"], "blue")
+        self.assertEqual(done["job"]["progress"]["step"], "write-state")
+        _, log_payload, _ = self.request(base_url, "GET", f"/jobs/{job_id}/log?tail=2")
+        self.assertEqual(log_payload["lines"], ["ran blue-start", "[step] write-state"])
+        _, listing, _ = self.request(base_url, "GET", "/jobs")
+        self.assertEqual([job["id"] for job in listing["jobs"]], [job_id])
+
+    def test_concurrent_identical_starts_share_one_job(self):
+        release = threading.Event()
+        calls: list[str] = []
+
+        def runner(cmd, extra_env=None):
+            calls.append(cmd)
+            if cmd == "blue-start":
+                release.wait(5)
+
+        base_url = self.serve(runner)
+        results: list = []
+        clients = [
+            threading.Thread(target=lambda: results.append(self.request(base_url, "POST", "/start")))
+            for _ in range(3)
+        ]
+        for client in clients:
+            client.start()
+        deadline = time.monotonic() + 5
+        while "blue-start" not in calls and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.1)
+        release.set()
+        for client in clients:
+            client.join(timeout=10)
+
+        self.assertEqual(calls, ["green-stop", "blue-start"])
+        self.assertEqual([status for status, _, _ in results], [200, 200, 200])
+        self.assertEqual(len({payload["jobId"] for _, payload, _ in results}), 1)
+        self.assertEqual(sorted(payload["coalesced"] for _, payload, _ in results), [False, True, True])
+
+    def test_cancel_running_start_stops_backend_and_skips_state(self):
+        calls: list[str] = []
+
+        def runner(cmd, extra_env=None):
+            calls.append(cmd)
+            if cmd == "blue-start":
+                job = sys.modules["runtime_jobs"].current_job()
+                while True:
+                    job.check_cancelled()
+                    time.sleep(0.01)
+
+        base_url = self.serve(runner)
+        _, accepted, _ = self.request(base_url, "POST", "/start?async=1")
+        job_id = accepted["jobId"]
+        deadline = time.monotonic() + 5
+        while "blue-start" not in calls and time.monotonic() < deadline:
+            time.sleep(0.01)
+        status, cancel_payload, _ = self.request(base_url, "POST", f"/jobs/{job_id}/cancel")
+        self.assertEqual((status, cancel_payload["outcome"]), (202, "cancelling"))
+
+        done = self.wait_for_status(base_url, job_id, ("cancelled",))
+        self.assertNotIn("result", done)
+        self.assertEqual(calls, ["green-stop", "blue-start", "blue-stop"])
+        self.assertFalse(self.state_path.exists())
+        resource_saved = json.loads(self.resource_state_path.read_text(encoding="utf-8"))
+        self.assertEqual((resource_saved["status"], resource_saved["action"]), ("released", "start-cancelled"))
+
+    def test_running_stop_cannot_be_cancelled(self):
+        release = threading.Event()
+
+        def runner(cmd, extra_env=None):
+            release.wait(5)
+
+        base_url = self.serve(runner)
+        _, accepted, _ = self.request(base_url, "POST", "/stop", {"Prefer": "respond-async"})
+        self.wait_for_status(base_url, accepted["jobId"], ("running",))
+        status, payload, _ = self.request(base_url, "POST", f"/jobs/{accepted['jobId']}/cancel")
+        release.set()
+        self.assertEqual((status, payload["outcome"]), (409, "not_cancellable"))
+        self.assertEqual(self.request(base_url, "GET", "/jobs/ctl-unknown")[0], 404)
+
+
 if __name__ == "__main__":
     unittest.main()
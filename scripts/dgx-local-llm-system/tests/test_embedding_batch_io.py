@@ -0,0 +1,69 @@
+import base64
+import importlib.util
+import json
+import struct
+import sys
+import unittest
+from pathlib import Path
+
+
+MODULE_PATH = Path(__file__).resolve().parents[1] / "embedding_batch_io.py"
+
+
+def load_module():
+    spec = importlib.util.spec_from_file_location("dgx_embedding_batch_io", MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class EmbeddingBatchIoTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.mod = load_module()
+
+    def test_multipart_images_keep_filenames(self) -> None:
+        boundary = "xyz"
+        body = (
+            b"--xyz\r\n"
+            b'Content-Disposition: form-data; name="image"; filename="a.jpg"\r\n'
+            b"Content-Type: image/jpeg\r\n\r\n"
+            b"\xff\xd8\x00\r\n\xff\xd9\r\n"
+            b"--xyz\r\n"
+            b'Content-Disposition: form-data; name="second"\r\n\r\n'
+            b"BBBB\r\n"
+            b"--xyz--\r\n"
+        )
+        images, binary = self.mod.parse_batch_images(f"multipart/form-data; boundary={boundary}", body, 8)
+        self.assertTrue(binary)
+        self.assertEqual([i.name for i in images], ["a.jpg", "second"])
+        self.assertEqual(images[0].data, b"\xff\xd8\x00\r\n\xff\xd9")
+        self.assertEqual(images[1].data, b"BBBB")
+
+    def test_length_prefixed_frames(self) -> None:
+        body = struct.pack(">I", 3) + b"abc" + struct.pack(">I", 2) + b"de"
+        images, _ = self.mod.parse_batch_images(self.mod.LENGTH_PREFIXED_CONTENT_TYPE, body, 8)
+        self.assertEqual([i.data for i in images], [b"abc", b"de"])
+        with self.assertRaises(self.mod.BatchRequestError):
+            self.mod.parse_batch_images(self.mod.LENGTH_PREFIXED_CONTENT_TYPE, struct.pack(">I", 9) + b"ab", 8)
+
+    def test_raw_image_and_json_and_limits(self) -> None:
+        images, binary = self.mod.parse_batch_images("image/jpeg", b"raw", 8)
+        self.assertEqual((images[0].data, binary), (b"raw", True))
+        payload = json.dumps({"images": [{"jpegBase64": base64.b64encode(b"x").decode(), "name": "p1"}]}).encode()
+        images, binary = self.mod.parse_batch_images("application/json", payload, 8)
+        self.assertEqual((images[0].name, images[0].data, binary), ("p1", b"x", False))
+        with self.assertRaisesRegex(self.mod.BatchRequestError, "too many images"):
+            self.mod.parse_batch_images("application/json", json.dumps({"images": [{"jpegBase64": "eA=="}] * 3}).encode(), 2)
+        with self.assertRaisesRegex(self.mod.BatchRequestError, "unsupported"):
+            self.mod.parse_batch_images("text/plain", b"x", 8)
+
+    def test_base64_overhead(self) -> None:
+        self.assertEqual(self.mod.base64_overhead_bytes(3), 1)
+        self.assertEqual(self.mod.base64_overhead_bytes(300), 100)
+        self.assertEqual(self.mod.base64_overhead_bytes(1), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import importlib.util
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+
+MODULE_PATH = Path(__file__).resolve().parents[1] / "embedding_batcher.py"
+
+
+def load_module():
+    spec = importlib.util.spec_from_file_location("dgx_embedding_batcher", MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class EmbeddingBatcherTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.mod = load_module()
+
+    def test_load_config_from_env(self) -> None:
+        config = self.mod.load_batcher_config_from_env(
+            {"EMBEDDING_MAX_BATCH_SIZE": "32", "EMBEDDING_MAX_BATCH_WAIT_MS": "2.5"}
+        )
+        self.assertEqual(config.max_batch_size, 32)
+        self.assertEqual(config.max_wait_ms, 2.5)
+        fallback = self.mod.load_batcher_config_from_env({"EMBEDDING_MAX_BATCH_SIZE": "x"})
+        self.assertEqual(fallback.max_batch_size, 16)
+
+    def test_concurrent_submits_coalesce_into_one_batch_in_order(self) -> None:
+        batches: list[list[object]] = []
+
+        def embed_batch(items):
+            batches.append(list(items))
+            return [[float(item)] for item in items]
+
+        batcher = self.mod.MicroBatcher(
+            embed_batch, self.mod.BatcherConfig(max_batch_size=8, max_wait_ms=200)
+        )
+        results: dict[int, list[float]] = {}
+        barrier = threading.Barrier(8)
+
+        def worker(n: int) -> None:
+            barrier.wait()
+            results[n] = batcher.submit(n)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+        batcher.close()
+
+        self.assertEqual(results, {n: [float(n)] for n in range(8)})
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(sorted(batches[0]), list(range(8)))
+        self.assertEqual(batcher.stats()["maxObservedBatchSize"], 8)
+
+    def test_batch_is_capped_at_max_batch_size(self) -> None:
+        sizes: list[int] = []
+        gate = threading.Event()
+
+        def embed_batch(items):
+            gate.wait(5)
+            sizes.append(len(items))
+            return [[0.0] for _ in items]
+
+        batcher = self.mod.MicroBatcher(
+            embed_batch, self.mod.BatcherConfig(max_batch_size=3, max_wait_ms=50)
+        )
+        threads = [threading.Thread(target=batcher.submit, args=(n,)) for n in range(7)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        gate.set()
+        for thread in threads:
+            thread.join(timeout=5)
+        batcher.close()
+        self.assertEqual(sum(sizes), 7)
+        self.assertLessEqual(max(sizes), 3)
+
+    def test_single_request_is_flushed_after_max_wait(self) -> None:
+        batcher = self.mod.MicroBatcher(
+            lambda items: [[1.0] for _ in items], self.mod.BatcherConfig(max_batch_size=64, max_wait_ms=10)
+        )
+        started = time.monotonic()
+        self.assertEqual(batcher.submit("only"), [1.0])
+        self.assertLess(time.monotonic() - started, 2.0)
+        batcher.close()
+
+    def test_backend_error_is_raised_to_every_caller_in_batch(self) -> None:
+        def embed_batch(items):
+            raise RuntimeError("cuda oom")
+
+        batcher = self.mod.MicroBatcher(embed_batch, self.mod.BatcherConfig(max_batch_size=4, max_wait_ms=1))
+        with self.assertRaisesRegex(RuntimeError, "cuda oom"):
+            batcher.submit("a")
+        batcher.close()
+        with self.assertRaises(self.mod.BatcherClosedError):
+            batcher.submit("b")
+
+
+if __name__ == "__main__":
+    unittest.main()
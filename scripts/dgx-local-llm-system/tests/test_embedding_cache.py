@@ -0,0 +1,154 @@
+import importlib.util
+import json
+import sys
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+
+MODULE_PATH = Path(__file__).resolve().parents[1] / "embedding_cache.py"
+
+
+def load_module():
+    spec = importlib.util.spec_from_file_location("dgx_embedding_cache", MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_batcher_module():
+    path = MODULE_PATH.parent / "embedding_batcher.py"
+    spec = importlib.util.spec_from_file_location("dgx_embedding_batcher_for_cache", path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class EmbeddingCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.mod = load_module()
+
+    def test_lru_evicts_least_recently_used_and_counts_hits(self) -> None:
+        cache = self.mod.EmbeddingCache(self.mod.EmbeddingCacheConfig(max_entries=2), namespace="clip")
+        a, b, c = (cache.key_for(x) for x in (b"a", b"b", b"c"))
+        cache.put(a, [1.0])
+        cache.put(b, [2.0])
+        self.assertEqual(cache.get(a, 10), [1.0])
+        cache.put(c, [3.0])
+        self.assertIsNone(cache.get(b))
+        self.assertEqual(cache.get(c, 5), [3.0])
+        stats = cache.stats()
+        self.assertEqual(stats["entries"], 2)
+        self.assertEqual(stats["hits"], 2)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hitImageBytes"], 15)
+
+    def test_namespace_separates_models(self) -> None:
+        self.assertNotEqual(
+            self.mod.content_key("clip-a", b"img"),
+            self.mod.content_key("clip-b", b"img"),
+        )
+
+    def test_persistence_reloads_and_compacts(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "cache" / "embeddings.jsonl"
+            config = self.mod.EmbeddingCacheConfig(max_entries=2, persist_path=str(path))
+            cache = self.mod.EmbeddingCache(config, namespace="clip")
+            for n in range(6):
+                cache.put(cache.key_for(bytes([n])), [float(n)])
+            lines = path.read_text(encoding="utf-8").splitlines()
+            self.assertLessEqual(len(lines), 5)
+            with path.open("a", encoding="utf-8") as fp:
+                fp.write('{"ns":"clip","key":"trunc')
+
+            reloaded = self.mod.EmbeddingCache(config, namespace="clip")
+            self.assertEqual(reloaded.get(reloaded.key_for(bytes([5]))), [5.0])
+            self.assertEqual(reloaded.stats()["entries"], 2)
+            other_model = self.mod.EmbeddingCache(config, namespace="other")
+            self.assertEqual(other_model.stats()["entries"], 0)
+            self.assertTrue(all(json.loads(line)["ns"] == "clip" for line in lines))
+
+    def test_load_skips_corrupt_vector_rows(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "embeddings.jsonl"
+            rows = [
+                {"ns": "clip", "key": "good", "embedding": [1, 2.5]},
+                {"ns": "clip", "key": "null", "embedding": [1.0, None]},
+                {"ns": "clip", "key": "text", "embedding": ["x", 1.0]},
+            ]
+            with path.open("wb") as fp:
+                fp.write("".join(json.dumps(row) + "\n" for row in rows).encode("utf-8"))
+                fp.write(b'{"ns":"clip","key":"\xff\xfe","embedding":[0.0]}\n')
+            cache = self.mod.EmbeddingCache(
+                self.mod.EmbeddingCacheConfig(max_entries=8, persist_path=str(path)), namespace="clip"
+            )
+            self.assertEqual(cache.get("good"), [1.0, 2.5])
+            self.assertIsNone(cache.get("null"))
+            self.assertIsNone(cache.get("text"))
+            self.assertEqual(cache.stats()["persistErrors"], 0)
+
+    def test_cached_embedder_dedupes_and_reports_prepare_errors(self) -> None:
+        cache = self.mod.EmbeddingCache(self.mod.EmbeddingCacheConfig(max_entries=16), namespace="clip")
+        submitted: list[list[object]] = []
+
+        def prepare(data: bytes) -> object:
+            if data == b"broken":
+                raise ValueError("cannot identify image file")
+            return data.decode()
+
+        class Ticket:
+            def __init__(self, item):
+                self.item = item
+
+            def wait(self):
+                return [float(len(self.item))]
+
+        def enqueue(item):
+            submitted.append(item)
+            return Ticket(item)
+
+        embedder = self.mod.CachedEmbedder(cache, prepare, enqueue)
+        first = embedder.embed_many([b"aa", b"bbb", b"aa", b"broken"])
+        self.assertEqual(submitted, ["aa", "bbb"])
+        self.assertEqual([r.embedding for r in first[:3]], [[2.0], [3.0], [2.0]])
+        self.assertEqual([r.cached for r in first[:3]], [False, False, True])
+        self.assertEqual(first[3].error, "cannot identify image file")
+
+        second = embedder.embed_many([b"bbb"])
+        self.assertTrue(second[0].cached)
+        self.assertEqual(len(submitted), 2)
+
+    def test_cached_embedder_prepares_in_pool_and_batches_with_real_batcher(self) -> None:
+        batcher_mod = load_batcher_module()
+        batch_sizes: list[int] = []
+
+        def embed_batch(items):
+            batch_sizes.append(len(items))
+            return [[float(item)] for item in items]
+
+        batcher = batcher_mod.MicroBatcher(embed_batch, batcher_mod.BatcherConfig(max_batch_size=16, max_wait_ms=50))
+        cache = self.mod.EmbeddingCache(self.mod.EmbeddingCacheConfig(max_entries=0), namespace="clip")
+        prepare_threads: set[str] = set()
+
+        def prepare(data: bytes) -> int:
+            prepare_threads.add(threading.current_thread().name)
+            return int(data)
+
+        with ThreadPoolExecutor(max_workers=4, thread_name_prefix="prep") as pool:
+            embedder = self.mod.CachedEmbedder(cache, prepare, batcher.enqueue, pool)
+            results = embedder.embed_many([str(n).encode() for n in range(8)])
+        batcher.close()
+        self.assertEqual([r.embedding for r in results], [[float(n)] for n in range(8)])
+        self.assertTrue(all(name.startswith("prep") for name in prepare_threads))
+        self.assertEqual(sum(batch_sizes), 8)
+        self.assertLess(len(batch_sizes), 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
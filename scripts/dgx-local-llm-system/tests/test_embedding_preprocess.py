@@ -0,0 +1,57 @@
+import importlib.util
+import os
+import sys
+import unittest
+from io import BytesIO
+from pathlib import Path
+
+
+MODULE_PATH = Path(__file__).resolve().parents[1] / "embedding_preprocess.py"
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - PIL は embedding container にのみある
+    Image = None
+
+
+def load_module():
+    spec = importlib.util.spec_from_file_location("dgx_embedding_preprocess", MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class EmbeddingPreprocessTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.mod = load_module()
+
+    def test_load_config_from_env(self) -> None:
+        config = self.mod.load_preprocess_config_from_env(
+            {"EMBEDDING_PREPROCESS_WORKERS": "0", "EMBEDDING_JPEG_DRAFT": "false"}
+        )
+        self.assertEqual(config.workers, 0)
+        self.assertFalse(config.jpeg_draft)
+        self.assertIsNone(self.mod.create_preprocess_pool(config))
+        default = self.mod.load_preprocess_config_from_env({})
+        unset = self.mod.load_preprocess_config_from_env({"EMBEDDING_PREPROCESS_WORKERS": ""})
+        expected = max(1, min(8, os.cpu_count() or 1))
+        self.assertEqual((default.workers, unset.workers), (expected, expected))
+        self.assertEqual(self.mod.PreprocessConfig().workers, expected)
+        self.assertTrue(default.jpeg_draft)
+
+    @unittest.skipIf(Image is None, "Pillow is not installed")
+    def test_draft_decode_keeps_short_side_at_least_min_side(self) -> None:
+        buf = BytesIO()
+        Image.new("RGB", (4032, 3024), (120, 80, 40)).save(buf, format="JPEG", quality=90)
+        reduced = self.mod.decode_image_reduced(buf.getvalue(), 224)
+        full = self.mod.decode_image_reduced(buf.getvalue(), 224, use_draft=False)
+        self.assertEqual(reduced.mode, "RGB")
+        self.assertGreaterEqual(min(reduced.size), 224)
+        self.assertLess(reduced.size[0], full.size[0])
+        self.assertEqual(full.size, (4032, 3024))
+
+
+if __name__ == "__main__":
+    unittest.main()
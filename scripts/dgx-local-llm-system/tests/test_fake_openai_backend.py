@@ -0,0 +1,132 @@
+import importlib.util
+import json
+import sys
+import time
+import unittest
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+
+MODULE_PATH = Path(__file__).resolve().parents[1] / "fake_openai_backend.py"
+
+
+def load_module():
+    spec = importlib.util.spec_from_file_location("dgx_fake_openai_backend", MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+fake = load_module()
+
+
+def post_chat(base_url: str, payload: dict) -> tuple[int, bytes, str]:
+    req = urllib.request.Request(
+        f"{base_url}/v1/chat/completions",
+        data=json.dumps(payload).encode("utf-8"),
+        method="POST",
+        headers={"Content-Type": "application/json"},
+    )
+    try:
+        with urllib.request.urlopen(req, timeout=5) as response:
+            return response.status, response.read(), response.headers.get("Content-Type", "")
+    except urllib.error.HTTPError as exc:
+        return exc.code, exc.read(), exc.headers.get("Content-Type", "")
+
+
+class FakeOpenAiBackendTests(unittest.TestCase):
+    def start(self, **overrides):
+        server, state = fake.start_fake_backend(fake.FakeBackendConfig(ttft_ms=1, tokens_per_sec=1000, **overrides))
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return f"http://127.0.0.1:{server.server_port}", state
+
+    def test_non_stream_returns_usage_capped_by_max_tokens(self):
+        base_url, _ = self.start(completion_tokens=64)
+
+        status, body, _ = post_chat(base_url, {"messages": [], "max_tokens": 5})
+
+        payload = json.loads(body)
+        self.assertEqual(status, 200)
+        self.assertEqual(payload["usage"]["completion_tokens"], 5)
+        self.assertEqual(payload["choices"][0]["message"]["content"], "あ" * 5)
+
+    def test_stream_emits_one_chunk_per_token_then_usage(self):
+        base_url, _ = self.start(completion_tokens=3)
+
+        status, body, content_type = post_chat(base_url, {"messages": [], "stream": True})
+
+        lines = [line for line in body.decode("utf-8").splitlines() if line.startswith("data: ")]
+        self.assertEqual(status, 200)
+        self.assertEqual(content_type, "text/event-stream")
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(json.loads(lines[3][len("data: ") :])["usage"]["completion_tokens"], 3)
+        self.assertEqual(lines[-1], "data: [DONE]")
+
+    def test_embed_batch_matches_embedding_server_shape(self):
+        base_url, _ = self.start(embedding_ms=0, embedding_dim=4)
+        req = urllib.request.Request(
+            f"{base_url}/embed/batch",
+            data=json.dumps({"images": [{"jpegBase64": "AAAA", "name": "a.jpg"}, {"jpegBase64": "BBBB"}]}).encode(),
+            method="POST",
+            headers={"Content-Type": "application/json"},
+        )
+
+        with urllib.request.urlopen(req, timeout=5) as response:
+            payload = json.loads(response.read())
+
+        self.assertEqual(payload["modelId"], "fake")
+        self.assertEqual(
+            [(item["index"], item["name"], item["cached"]) for item in payload["embeddings"]],
+            [(0, "a.jpg", False), (1, "1", False)],
+        )
+        self.assertEqual([len(item["embedding"]) for item in payload["embeddings"]], [4, 4])
+        self.assertNotEqual(payload["embeddings"][0]["embedding"], payload["embeddings"][1]["embedding"])
+
+    def test_embed_batch_accepts_binary_bodies(self):
+        base_url, _ = self.start(embedding_ms=0, embedding_dim=4)
+        jpeg = b"\xff\xd8\xff\xe0" + bytes(range(256)) + b"\xff\xd9"
+        framed = b"".join(len(frame).to_bytes(4, "big") + frame for frame in (jpeg, jpeg[:40], jpeg[::-1]))
+
+        def post_batch(body: bytes, content_type: str) -> dict:
+            req = urllib.request.Request(
+                f"{base_url}/embed/batch", data=body, method="POST", headers={"Content-Type": content_type}
+            )
+            with urllib.request.urlopen(req, timeout=5) as response:
+                return json.loads(response.read())
+
+        single = post_batch(jpeg, "image/jpeg")
+        frames = post_batch(framed, "application/x-length-prefixed-images")
+
+        self.assertEqual([(item["index"], item["name"]) for item in single["embeddings"]], [(0, "0")])
+        self.assertEqual([item["name"] for item in frames["embeddings"]], ["0", "1", "2"])
+        self.assertEqual(frames["embeddings"][0]["embedding"], single["embeddings"][0]["embedding"])
+        self.assertNotEqual(frames["embeddings"][1]["embedding"], frames["embeddings"][0]["embedding"])
+
+    def test_cold_start_window_returns_503(self):
+        base_url, _ = self.start(not_ready_sec=0.3)
+
+        with self.assertRaises(urllib.error.HTTPError) as exc:
+            urllib.request.urlopen(f"{base_url}/v1/models", timeout=5)
+        self.assertEqual(exc.exception.code, 503)
+        time.sleep(0.35)
+        with urllib.request.urlopen(f"{base_url}/v1/models", timeout=5) as response:
+            self.assertEqual(response.status, 200)
+
+    def test_error_injection_is_deterministic_for_seed(self):
+        outcomes = []
+        for _ in range(2):
+            base_url, state = self.start(error_rate=0.3, seed=7)
+            outcomes.append([post_chat(base_url, {"messages": [], "max_tokens": 1})[0] for _ in range(20)])
+            self.assertEqual(state.stats()["injectedErrors"], outcomes[-1].count(500))
+
+        self.assertEqual(outcomes[0], outcomes[1])
+        self.assertIn(500, outcomes[0])
+        self.assertIn(200, outcomes[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,12 +2,13 @@ import importlib.util
 import json
 import sys
 import threading
+import time
 import unittest
 from dataclasses import replace
 import tempfile
 import urllib.error
 import urllib.request
-from http.server import ThreadingHTTPServer
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 
 
@@ -26,6 +27,41 @@ def load_module():
     return module
 
 
+def build_config(module, **overrides):
+    config = module.GatewayConfig(
+        llm_shared_tokens=frozenset({"shared-token"}),
+        runtime_control_token="runtime-token",
+        host="127.0.0.1",
+        port=38081,
+        active_backend="blue",
+        legacy_backend_base_url="http://legacy:38082",
+        green_backend_base_url="http://green:38082",
+        blue_backend_base_url="http://blue:38083",
+        runtime_control_base_url="http://control:39090",
+        embedding_api_key="",
+        embedding_base_url="http://embed:38100",
+        private_comfy_root="/tmp",
+        private_comfy_start_cmd="./start-private-comfyui.sh",
+        private_comfy_stop_cmd="./stop-private-comfyui.sh",
+        private_comfy_health_url="http://127.0.0.1:8188",
+        experiment_lab_root="/tmp",
+        experiment_lab_start_cmd="./start-trtllm-server.sh",
+        experiment_lab_stop_cmd="./stop-trtllm-server.sh",
+        experiment_lab_health_url="http://127.0.0.1:38083/v1/models",
+        experiment_lab_health_mode="http",
+        experiment_lab_container_name="system-prod-trtllm",
+        agent_container_root="/tmp",
+        agent_container_start_cmd="./start-agent-container.sh",
+        agent_container_stop_cmd="./stop-agent-container.sh",
+        agent_container_health_url="http://127.0.0.1:5555/agent-health",
+        agent_container_health_mode="http",
+        agent_container_container_name="dgx-agent-container",
+        private_comfy_cmd_timeout_sec=60,
+        active_model_state_path="/nonexistent/active-model-profile.json",
+    )
+    return replace(config, **overrides)
+
+
 class GatewayServerTests(unittest.TestCase):
     def test_collect_gpu_metrics_includes_detail_fields(self):
         module = load_module()
@@ -587,6 +623,355 @@ class GatewayServerTests(unittest.TestCase):
         start_call = next(c for c in calls if c[1] == "http://control:39090/start")
         self.assertEqual(start_call[3]["X-Runtime-Control-Token"], "runtime-token")
 
+    def test_v1_post_is_admission_controlled_and_reports_scheduler_metrics(self):
+        module = load_module()
+        config = build_config(
+            module,
+            scheduler=module.SchedulerConfig(default_max_inflight=1, max_queue_depth=0),
+        )
+        scheduler = module.AdmissionScheduler(config.scheduler)
+        calls: list[str] = []
+
+        def proxy_impl(method: str, url: str, body: bytes, headers: dict[str, str]):
+            calls.append(url)
+            return 200, b'{"choices":[]}', "application/json"
+
+        handler = module.make_handler(config, proxy_impl=proxy_impl, scheduler=scheduler)
+        httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        base_url = f"http://127.0.0.1:{httpd.server_port}"
+
+        def post_chat():
+            req = urllib.request.Request(
+                f"{base_url}/v1/chat/completions",
+                data=b'{"messages":[]}',
+                method="POST",
+                headers={"X-LLM-Token": "shared-token", "Content-Type": "application/json"},
+            )
+            return urllib.request.urlopen(req, timeout=5)
+
+        try:
+            with post_chat() as response:
+                self.assertEqual(response.status, 200)
+            scheduler.acquire("blue", "batch")
+            try:
+                with self.assertRaises(urllib.error.HTTPError) as exc:
+                    post_chat()
+                self.assertEqual(exc.exception.code, 429)
+                self.assertIsNotNone(exc.exception.headers.get("Retry-After"))
+                rejected = json.loads(exc.exception.read().decode("utf-8"))
+                self.assertEqual(rejected["code"], "GATEWAY_QUEUE_FULL")
+                self.assertEqual(rejected["lane"], "interactive")
+            finally:
+                scheduler.release("blue", "batch")
+            metrics_req = urllib.request.Request(
+                f"{base_url}/system/scheduler",
+                method="GET",
+                headers={"X-LLM-Token": "shared-token"},
+            )
+            with urllib.request.urlopen(metrics_req, timeout=5) as response:
+                metrics = json.loads(response.read().decode("utf-8"))
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+            thread.join(timeout=5)
+
+        self.assertEqual(calls, ["http://blue:38083/v1/chat/completions"])
+        blue = metrics["backends"]["blue"]
+        self.assertEqual(blue["inflight"], 0)
+        self.assertEqual(blue["lanes"]["interactive"]["admitted"], 1)
+        self.assertEqual(blue["lanes"]["interactive"]["rejectedQueueFull"], 1)
+
+    def test_stream_chat_is_relayed_chunk_by_chunk_and_holds_the_slot(self):
+        module = load_module()
+        first_seen = threading.Event()
+        last_sent = threading.Event()
+
+        class Upstream(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", "0")))
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                self.wfile.write('data: {"choices":[{"delta":{"content":"最初の文です。"}}]}\n\n'.encode("utf-8"))
+                self.wfile.flush()
+                # gateway が読み切ってから返すなら client は first を受け取れず、ここで待ちきる
+                first_seen.wait(2)
+                self.wfile.write('data: {"choices":[{"delta":{"content":"最後"}}]}\n\n'.encode("utf-8"))
+                self.wfile.write(b'data: {"choices":[],"usage":{"completion_tokens":2}}\n\ndata: [DONE]\n\n')
+                self.wfile.flush()
+                last_sent.set()
+                self.close_connection = True
+
+            def log_message(self, fmt, *args):
+                return
+
+        upstream = ThreadingHTTPServer(("127.0.0.1", 0), Upstream)
+        upstream_thread = threading.Thread(target=upstream.serve_forever, daemon=True)
+        upstream_thread.start()
+        config = build_config(module, blue_backend_base_url=f"http://127.0.0.1:{upstream.server_port}")
+        scheduler = module.AdmissionScheduler(config.scheduler)
+        httpd = ThreadingHTTPServer(("127.0.0.1", 0), module.make_handler(config, scheduler=scheduler))
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        base_url = f"http://127.0.0.1:{httpd.server_port}"
+        headers = {"X-LLM-Token": "shared-token", "Content-Type": "application/json"}
+        try:
+            chat_req = urllib.request.Request(
+                f"{base_url}/v1/chat/completions",
+                data=json.dumps({"model": "m", "stream": True, "messages": []}).encode("utf-8"),
+                method="POST",
+                headers=headers,
+            )
+            with urllib.request.urlopen(chat_req, timeout=5) as response:
+                content_type = response.headers.get("Content-Type")
+                accel_buffering = response.headers.get("X-Accel-Buffering")
+                first_line = response.readline()
+                last_sent_before_first = last_sent.is_set()
+                inflight_while_streaming = scheduler.snapshot()["backends"]["blue"]["inflight"]
+                first_seen.set()
+                rest = response.read()
+            inflight_after_close = scheduler.snapshot()["backends"]["blue"]["inflight"]
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+            upstream.shutdown()
+            upstream.server_close()
+            thread.join(timeout=5)
+            upstream_thread.join(timeout=5)
+
+        self.assertEqual(content_type, "text/event-stream")
+        self.assertEqual(accel_buffering, "no")
+        self.assertIn("最初の文です。", first_line.decode("utf-8"))
+        self.assertFalse(last_sent_before_first)
+        self.assertEqual(inflight_while_streaming, 1)
+        self.assertIn("最後".encode("utf-8"), rest)
+        self.assertTrue(rest.endswith(b"data: [DONE]\n\n"))
+        self.assertEqual(inflight_after_close, 0)
+
+    def test_runtime_requests_forward_query_prefer_and_job_routes(self):
+        module = load_module()
+        config = build_config(module)
+        calls: list[tuple[str, str, dict[str, str]]] = []
+
+        def proxy_impl(method: str, url: str, body: bytes, headers: dict[str, str]):
+            calls.append((method, url, headers))
+            if url.endswith("/jobs"):
+                return 200, json.dumps({"ok": True, "jobs": [{"id": "ctl-1-1"}]}).encode("utf-8"), "application/json"
+            return 202, json.dumps({"ok": True, "jobId": "ctl-1-1"}).encode("utf-8"), "application/json"
+
+        handler = module.make_handler(config, proxy_impl=proxy_impl)
+        httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        base_url = f"http://127.0.0.1:{httpd.server_port}"
+        auth = {"X-Runtime-Control-Token": "runtime-token"}
+        try:
+            start_req = urllib.request.Request(
+                f"{base_url}/start?async=1",
+                data=b"{}",
+                method="POST",
+                headers={**auth, "Prefer": "respond-async"},
+            )
+            with urllib.request.urlopen(start_req, timeout=5) as response:
+                self.assertEqual(response.status, 202)
+            cancel_req = urllib.request.Request(f"{base_url}/jobs/ctl-1-1/cancel", data=b"", method="POST", headers=auth)
+            with urllib.request.urlopen(cancel_req, timeout=5) as response:
+                self.assertEqual(response.status, 202)
+            with urllib.request.urlopen(urllib.request.Request(f"{base_url}/jobs", headers=auth), timeout=5) as response:
+                listing = json.loads(response.read().decode("utf-8"))
+            with self.assertRaises(urllib.error.HTTPError) as exc:
+                urllib.request.urlopen(f"{base_url}/jobs", timeout=5)
+            self.assertEqual(exc.exception.code, 403)
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+            thread.join(timeout=5)
+
+        self.assertEqual(calls[0][0:2], ("POST", "http://control:39090/start?async=1"))
+        self.assertEqual(calls[0][2]["Prefer"], "respond-async")
+        self.assertEqual(calls[1][0:2], ("POST", "http://control:39090/jobs/ctl-1-1/cancel"))
+        self.assertEqual(listing["runtimeControl"]["jobs"], [{"id": "ctl-1-1"}])
+        self.assertEqual(listing["gateway"]["jobs"], [])
+
+    def test_concurrent_local_runtime_starts_share_one_job(self):
+        module = load_module()
+        config = build_config(module)
+        release = threading.Event()
+        commands: list[str] = []
+
+        def run_local_command(command: str, cwd: str, timeout_sec: int):
+            commands.append(command)
+            release.wait(5)
+            return 0, "ok"
+
+        module.run_local_command = run_local_command
+        handler = module.make_handler(config)
+        httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        base_url = f"http://127.0.0.1:{httpd.server_port}"
+        auth = {"X-Runtime-Control-Token": "runtime-token"}
+        results: list[dict[str, object]] = []
+
+        def start() -> None:
+            req = urllib.request.Request(f"{base_url}/agent-container/start", data=b"{}", method="POST", headers=auth)
+            with urllib.request.urlopen(req, timeout=10) as response:
+                results.append(json.loads(response.read().decode("utf-8")))
+
+        try:
+            async_req = urllib.request.Request(
+                f"{base_url}/agent-container/start?async=1", data=b"{}", method="POST", headers=auth
+            )
+            with urllib.request.urlopen(async_req, timeout=5) as response:
+                self.assertEqual(response.status, 202)
+                queued = json.loads(response.read().decode("utf-8"))
+            clients = [threading.Thread(target=start) for _ in range(3)]
+            for client in clients:
+                client.start()
+            job_url = f"{base_url}/jobs/{queued['jobId']}"
+            for _ in range(100):
+                with urllib.request.urlopen(urllib.request.Request(job_url, headers=auth), timeout=5) as response:
+                    job = json.loads(response.read().decode("utf-8"))["job"]
+                if job["waiters"] >= 4:
+                    break
+                time.sleep(0.05)
+            release.set()
+            for client in clients:
+                client.join(timeout=10)
+            with urllib.request.urlopen(urllib.request.Request(job_url, headers=auth), timeout=5) as response:
+                final = json.loads(response.read().decode("utf-8"))
+        finally:
+            release.set()
+            httpd.shutdown()
+            httpd.server_close()
+            thread.join(timeout=5)
+
+        self.assertEqual(commands, ["./start-agent-container.sh"])
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(r["ok"] and r["path"] == "/agent-container/start" for r in results))
+        self.assertEqual(final["job"]["status"], "succeeded")
+        self.assertEqual(final["result"]["path"], "/agent-container/start")
+
+    def test_system_ready_long_poll_shares_upstream_probe(self):
+        module = load_module()
+        config = build_config(
+            module,
+            readiness=module.ReadinessConfig(probe_interval_sec=0.05, warm_ttl_sec=60),
+        )
+        backend_ready = threading.Event()
+        probes: list[str] = []
+
+        def proxy_impl(method: str, url: str, body: bytes, headers: dict[str, str]):
+            probes.append(url)
+            if backend_ready.is_set():
+                return 200, b'{"data":[]}', "application/json"
+            return 502, b"bad gateway: connection refused", "text/plain; charset=utf-8"
+
+        handler = module.make_handler(config, proxy_impl=proxy_impl)
+        httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        base_url = f"http://127.0.0.1:{httpd.server_port}"
+        headers = {"X-LLM-Token": "shared-token"}
+        results: list[dict[str, object]] = []
+
+        def wait_ready() -> None:
+            req = urllib.request.Request(f"{base_url}/system/ready?timeoutSec=5", headers=headers)
+            with urllib.request.urlopen(req, timeout=10) as response:
+                results.append(json.loads(response.read().decode("utf-8")))
+
+        try:
+            with self.assertRaises(urllib.error.HTTPError) as exc:
+                urllib.request.urlopen(
+                    urllib.request.Request(f"{base_url}/system/ready?timeoutSec=0.1", headers=headers), timeout=5
+                )
+            self.assertEqual(exc.exception.code, 503)
+            self.assertEqual(exc.exception.headers.get("Retry-After"), "1")
+            cold = json.loads(exc.exception.read().decode("utf-8"))
+            waiters = [threading.Thread(target=wait_ready) for _ in range(5)]
+            for waiter in waiters:
+                waiter.start()
+            time.sleep(0.3)
+            backend_ready.set()
+            for waiter in waiters:
+                waiter.join(timeout=10)
+            probes_after_cold_start = len(probes)
+            wait_ready()
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+            thread.join(timeout=5)
+
+        self.assertEqual(cold["code"], "RUNTIME_NOT_READY")
+        self.assertEqual(cold["probe"], {"status": 502})
+        self.assertEqual(len(results), 6)
+        self.assertTrue(all(r["ready"] and r["backend"] == "blue" for r in results))
+        self.assertTrue(results[-1]["cached"])
+        self.assertEqual(len(probes), probes_after_cold_start)
+        self.assertTrue(all(url == "http://blue:38083/v1/models" for url in probes))
+        # 5 waiter × 0.3 秒でも probe は共有 loop の分しか出ない
+        self.assertLess(probes_after_cold_start, 15)
+
+    def test_telemetry_records_ttfb_and_tokens_per_sec_from_real_upstream(self):
+        module = load_module()
+
+        class Upstream(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", "0")))
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                time.sleep(0.05)
+                self.wfile.write(b'data: {"choices":[{"delta":{"content":"a"}}]}\n\n')
+                self.wfile.flush()
+                time.sleep(0.2)
+                self.wfile.write(b'data: {"choices":[],"usage":{"completion_tokens":20}}\n\ndata: [DONE]\n\n')
+                self.close_connection = True
+
+            def log_message(self, fmt, *args):
+                return
+
+        upstream = ThreadingHTTPServer(("127.0.0.1", 0), Upstream)
+        upstream_thread = threading.Thread(target=upstream.serve_forever, daemon=True)
+        upstream_thread.start()
+        config = build_config(module, blue_backend_base_url=f"http://127.0.0.1:{upstream.server_port}")
+        httpd = ThreadingHTTPServer(("127.0.0.1", 0), module.make_handler(config))
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        base_url = f"http://127.0.0.1:{httpd.server_port}"
+        headers = {"X-LLM-Token": "shared-token", "Content-Type": "application/json"}
+        try:
+            chat_req = urllib.request.Request(
+                f"{base_url}/v1/chat/completions",
+                data=json.dumps({"model": "m", "stream": True, "messages": []}).encode("utf-8"),
+                method="POST",
+                headers=headers,
+            )
+            with urllib.request.urlopen(chat_req, timeout=5) as response:
+                self.assertIn(b"[DONE]", response.read())
+            with urllib.request.urlopen(
+                urllib.request.Request(f"{base_url}/system/telemetry", headers=headers), timeout=5
+            ) as response:
+                snapshot = json.loads(response.read().decode("utf-8"))
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+            upstream.shutdown()
+            upstream.server_close()
+            thread.join(timeout=5)
+            upstream_thread.join(timeout=5)
+
+        route = snapshot["routes"][0]
+        self.assertEqual((route["route"], route["backend"]), ("/v1/chat/completions", "blue"))
+        self.assertEqual(route["completionTokens"], 20)
+        self.assertGreaterEqual(route["ttfbMs"]["avg"], 40)
+        self.assertLess(route["ttfbMs"]["avg"], route["upstreamMs"]["avg"])
+        # 20 tokens / 約 0.2 秒の decode 区間（TTFB 後）
+        self.assertGreater(route["completionTokensPerSec"]["avg"], 40)
+        self.assertLess(route["completionTokensPerSec"]["avg"], 200)
+        self.assertIsNone(snapshot["sink"]["path"])
 
 if __name__ == "__main__":
     unittest.main()
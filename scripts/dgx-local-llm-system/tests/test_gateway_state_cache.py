@@ -0,0 +1,249 @@
+import importlib.util
+import json
+import os
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+
+
+MODULE_PATH = Path(__file__).resolve().parents[1] / "gateway_state_cache.py"
+
+
+def load_module():
+    spec = importlib.util.spec_from_file_location("dgx_gateway_state_cache", MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+cache_module = load_module()
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def read_json(path: str):
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+class CachedStateFileTests(unittest.TestCase):
+    def test_reloads_only_after_interval_and_on_change(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "state.json"
+            path.write_text('{"v": 1}', encoding="utf-8")
+            clock = FakeClock()
+            loads = []
+
+            def loader(p: str):
+                loads.append(p)
+                return read_json(p)
+
+            cached = cache_module.CachedStateFile(str(path), loader, check_interval_sec=1.0, clock=clock)
+
+            self.assertEqual(cached.get(), {"v": 1})
+            path.write_text('{"v": 22}', encoding="utf-8")
+            self.assertEqual(cached.get(), {"v": 1})
+            clock.now += 1.5
+            self.assertEqual(cached.get(), {"v": 22})
+            clock.now += 1.5
+            self.assertEqual(cached.get(), {"v": 22})
+            self.assertEqual(len(loads), 2)
+
+    def test_invalid_json_keeps_previous_value_and_missing_file_is_none(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "state.json"
+            path.write_text('{"v": 1}', encoding="utf-8")
+            cached = cache_module.CachedStateFile(str(path), read_json, check_interval_sec=60)
+
+            self.assertEqual(cached.get(), {"v": 1})
+            path.write_text('{"v": ', encoding="utf-8")
+            cached.invalidate()
+            self.assertEqual(cached.get(), {"v": 1})
+            self.assertEqual(cached.stats()["loadErrors"], 1)
+            path.unlink()
+            cached.invalidate()
+            self.assertIsNone(cached.get())
+
+
+class ContainerListingTests(unittest.TestCase):
+    def test_concurrent_checks_share_one_listing_within_staleness_window(self):
+        calls = []
+        release = threading.Event()
+
+        def lister() -> set[str]:
+            calls.append(1)
+            release.wait(5)
+            return {"dgx-agent-container"}
+
+        clock = FakeClock()
+        cache = cache_module.ContainerStateCache(
+            lister, cache_module.StateCacheConfig(container_max_staleness_sec=5.0), clock=clock
+        )
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.is_running("dgx-agent-container")))
+            for _ in range(6)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        self.assertEqual(results, [True] * 6)
+        self.assertEqual(len(calls), 1)
+        self.assertFalse(cache.is_running("system-prod-trtllm"))
+        self.assertEqual(len(calls), 1)
+        clock.now += 6
+        cache.is_running("dgx-agent-container")
+        self.assertEqual(len(calls), 2)
+
+    def test_listing_failure_reports_not_running_and_retries(self):
+        calls = []
+
+        def lister() -> set[str]:
+            calls.append(1)
+            raise OSError("docker ps failed")
+
+        cache = cache_module.ContainerStateCache(lister)
+
+        self.assertFalse(cache.is_running("dgx-agent-container"))
+        self.assertFalse(cache.is_running("dgx-agent-container"))
+        self.assertEqual(len(calls), 2)
+
+
+class FakeDockerEngine(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, running: list[str]) -> None:
+        self.running = running
+        self.events: list[dict] = []
+        self.events_ready = threading.Event()
+        self.push = threading.Condition()
+        super().__init__(path, self._handler())
+
+    def emit(self, action: str, name: str) -> None:
+        with self.push:
+            self.events.append({"Type": "container", "Action": action, "Actor": {"Attributes": {"name": name}}})
+            self.push.notify_all()
+
+    def _handler(self):
+        engine = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                if self.path == "/containers/json":
+                    body = json.dumps([{"Names": [f"/{name}"]} for name in engine.running]).encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                engine.events_ready.set()
+                sent = 0
+                while True:
+                    with engine.push:
+                        while sent >= len(engine.events):
+                            engine.push.wait()
+                        pending = engine.events[sent:]
+                        sent = len(engine.events)
+                    for event in pending:
+                        data = (json.dumps(event) + "\n").encode("utf-8")
+                        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                        self.wfile.flush()
+
+            def address_string(self):
+                return "unix"
+
+            def log_message(self, fmt, *args):
+                return
+
+        return Handler
+
+
+class DockerEventsTests(unittest.TestCase):
+    def start_engine(self, running: list[str]):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        socket_path = os.path.join(tmp.name, "docker.sock")
+        engine = FakeDockerEngine(socket_path, running)
+        threading.Thread(target=engine.serve_forever, daemon=True).start()
+        self.addCleanup(engine.server_close)
+        self.addCleanup(engine.shutdown)
+        listings = []
+
+        def lister() -> set[str]:
+            listings.append(1)
+            return set()
+
+        cache = cache_module.ContainerStateCache(
+            lister,
+            cache_module.StateCacheConfig(container_max_staleness_sec=0.0),
+            cache_module.DockerEngineClient(socket_path),
+        )
+        cache.start()
+        self.assertTrue(engine.events_ready.wait(5))
+        for _ in range(100):
+            if cache.stats()["source"] == "docker-events":
+                break
+            time.sleep(0.02)
+        return engine, cache, listings
+
+    def wait_applied(self, cache, count: int) -> None:
+        for _ in range(100):
+            if cache.stats()["eventsApplied"] >= count:
+                break
+            time.sleep(0.02)
+
+    def test_events_stream_keeps_state_current_without_listing(self):
+        engine, cache, listings = self.start_engine(["system-prod-trtllm"])
+
+        self.assertTrue(cache.is_running("system-prod-trtllm"))
+        engine.emit("start", "dgx-agent-container")
+        engine.emit("die", "system-prod-trtllm")
+        engine.emit("exec_start: bash", "dgx-agent-container")
+        self.wait_applied(cache, 2)
+
+        self.assertTrue(cache.is_running("dgx-agent-container"))
+        self.assertFalse(cache.is_running("system-prod-trtllm"))
+        self.assertEqual(listings, [])
+
+    def test_signal_events_do_not_mark_container_stopped_until_die(self):
+        engine, cache, _listings = self.start_engine(["system-prod-trtllm", "dgx-agent-container"])
+
+        # container が SIGTERM を trap して生き残ると kill / stop の後に die が来ない
+        engine.emit("kill", "system-prod-trtllm")
+        engine.emit("stop", "system-prod-trtllm")
+        engine.emit("oom", "system-prod-trtllm")
+        engine.emit("destroy", "dgx-agent-container")
+        self.wait_applied(cache, 1)
+        survived = cache.is_running("system-prod-trtllm")
+        engine.emit("die", "system-prod-trtllm")
+        self.wait_applied(cache, 2)
+
+        self.assertTrue(survived)
+        self.assertFalse(cache.is_running("dgx-agent-container"))
+        self.assertFalse(cache.is_running("system-prod-trtllm"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,170 @@
+import importlib.util
+import json
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+
+MODULE_PATH = Path(__file__).resolve().parents[1] / "gateway_telemetry.py"
+
+
+def load_module():
+    spec = importlib.util.spec_from_file_location("dgx_gateway_telemetry", MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+telemetry_module = load_module()
+
+
+def sse(*chunks: dict) -> bytes:
+    lines = [f"data: {json.dumps(chunk)}\n\n" for chunk in chunks]
+    return ("".join(lines) + "data: [DONE]\n\n").encode("utf-8")
+
+
+class HistogramTests(unittest.TestCase):
+    def test_quantiles_use_bucket_upper_bounds(self):
+        histogram = telemetry_module.Histogram((10, 100, 1000))
+        for value in [5] * 50 + [50] * 45 + [500] * 4 + [5000]:
+            histogram.observe(value)
+
+        snapshot = histogram.snapshot()
+
+        self.assertEqual(snapshot["count"], 100)
+        self.assertEqual(snapshot["p50"], 10.0)
+        self.assertEqual(snapshot["p95"], 100.0)
+        self.assertEqual(snapshot["p99"], 1000.0)
+        self.assertEqual(snapshot["max"], 5000)
+        self.assertEqual(snapshot["buckets"], {"le10": 50, "le100": 45, "le1000": 4, "inf": 1})
+
+    def test_empty_histogram_has_no_quantiles(self):
+        snapshot = telemetry_module.Histogram((10,)).snapshot()
+        self.assertEqual((snapshot["count"], snapshot["p50"], snapshot["avg"]), (0, None, None))
+
+
+class CompletionTokenParsingTests(unittest.TestCase):
+    def test_json_usage(self):
+        body = json.dumps({"choices": [], "usage": {"completion_tokens": 42}}).encode("utf-8")
+        self.assertEqual(telemetry_module.parse_completion_tokens(body, "application/json"), (42, False))
+
+    def test_stream_prefers_usage_chunk(self):
+        body = sse(
+            {"choices": [{"delta": {"content": "こん"}}]},
+            {"choices": [{"delta": {"content": "にちは"}}]},
+            {"choices": [], "usage": {"completion_tokens": 7}},
+        )
+        self.assertEqual(telemetry_module.parse_completion_tokens(body, "text/event-stream"), (7, True))
+
+    def test_stream_without_usage_counts_content_chunks(self):
+        body = sse(
+            {"choices": [{"delta": {"role": "assistant"}}]},
+            {"choices": [{"delta": {"content": "a"}}]},
+            {"choices": [{"delta": {"content": "b"}}]},
+        )
+        self.assertEqual(telemetry_module.parse_completion_tokens(body, "text/event-stream; charset=utf-8"), (2, True))
+
+    def test_non_json_body_is_not_counted(self):
+        self.assertEqual(telemetry_module.parse_completion_tokens(b"bad gateway", "text/plain"), (None, False))
+
+
+class BufferedJsonlSinkTests(unittest.TestCase):
+    def test_records_are_written_by_background_thread(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "telemetry.jsonl"
+            sink = telemetry_module.BufferedJsonlSink(str(path), flush_interval_sec=0.05)
+            for n in range(5):
+                sink.emit({"n": n})
+            sink.close()
+
+            rows = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+            self.assertEqual([row["n"] for row in rows], [0, 1, 2, 3, 4])
+            self.assertEqual(sink.stats()["written"], 5)
+
+    def test_emit_drops_instead_of_blocking_when_queue_is_full(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            blocked = Path(tmp) / "missing-dir" / "telemetry.jsonl"
+            sink = telemetry_module.BufferedJsonlSink(str(blocked), max_queue=2, flush_interval_sec=0.05)
+            release = threading.Event()
+            original_write = sink._write
+
+            def slow_write(records):
+                release.wait(5)
+                original_write(records)
+
+            sink._write = slow_write
+            sink.emit({"n": 0})
+            time.sleep(0.1)
+            started = time.monotonic()
+            for n in range(1, 10):
+                sink.emit({"n": n})
+            elapsed = time.monotonic() - started
+            release.set()
+            sink.close()
+
+            self.assertLess(elapsed, 0.5)
+            stats = sink.stats()
+            self.assertGreater(stats["dropped"], 0)
+            self.assertGreater(stats["writeErrors"], 0)
+
+    def test_disabled_sink_ignores_records(self):
+        sink = telemetry_module.BufferedJsonlSink("")
+        sink.emit({"n": 1})
+        self.assertFalse(sink.enabled)
+        self.assertEqual(sink.stats()["queued"], 0)
+
+
+class GatewayTelemetryTests(unittest.TestCase):
+    def test_record_computes_decode_rate_for_streams_and_error_rate(self):
+        telemetry = telemetry_module.GatewayTelemetry()
+        body = sse({"choices": [], "usage": {"completion_tokens": 50}})
+
+        record = telemetry.record(
+            route="/v1/chat/completions",
+            backend="blue",
+            lane="interactive",
+            status=200,
+            queue_sec=0.01,
+            upstream_sec=1.5,
+            ttfb_sec=0.5,
+            body=body,
+            content_type="text/event-stream",
+        )
+        telemetry.record(
+            route="/v1/chat/completions",
+            backend="blue",
+            lane="interactive",
+            status=502,
+            queue_sec=0.0,
+            upstream_sec=0.2,
+            ttfb_sec=None,
+            body=b"bad gateway",
+            content_type="text/plain",
+        )
+
+        self.assertEqual(record["completionTokensPerSec"], 50.0)
+        route = telemetry.snapshot()["routes"][0]
+        self.assertEqual((route["route"], route["backend"]), ("/v1/chat/completions", "blue"))
+        self.assertEqual(route["requests"], 2)
+        self.assertEqual(route["errorRate"], 0.5)
+        self.assertEqual(route["statusClasses"], {"2xx": 1, "5xx": 1})
+        self.assertEqual(route["completionTokens"], 50)
+        self.assertEqual(route["ttfbMs"]["count"], 1)
+        self.assertEqual(route["upstreamMs"]["count"], 2)
+
+    def test_load_config_from_env(self):
+        config = telemetry_module.load_telemetry_config_from_env(
+            {"GATEWAY_TELEMETRY_LOG_PATH": " /tmp/t.jsonl ", "GATEWAY_TELEMETRY_QUEUE_MAX": "x"}
+        )
+        self.assertEqual(config.log_path, "/tmp/t.jsonl")
+        self.assertEqual(config.debug_log_path, "")
+        self.assertEqual(config.sink_queue_max, 4096)
+
+
+if __name__ == "__main__":
+    unittest.main()
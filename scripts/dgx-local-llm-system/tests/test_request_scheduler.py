@@ -0,0 +1,127 @@
+import importlib.util
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+
+MODULE_PATH = Path(__file__).resolve().parents[1] / "request_scheduler.py"
+
+
+def load_module():
+    spec = importlib.util.spec_from_file_location("dgx_request_scheduler", MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class RequestSchedulerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.mod = load_module()
+
+    def test_load_config_from_env(self) -> None:
+        config = self.mod.load_scheduler_config_from_env(
+            {
+                "GATEWAY_DEFAULT_MAX_INFLIGHT": "3",
+                "GATEWAY_BACKEND_MAX_INFLIGHT": "blue=8, embedding=2, bogus, green=x",
+                "GATEWAY_MAX_QUEUE_DEPTH": "10",
+                "GATEWAY_QUEUE_TIMEOUT_SEC": "2.5",
+                "GATEWAY_BATCH_LLM_TOKENS": "hermes-a,hermes-b",
+                "GATEWAY_BATCH_ROUTE_PREFIXES": "/v1/embeddings",
+            }
+        )
+        self.assertEqual(config.max_inflight_for("blue"), 8)
+        self.assertEqual(config.max_inflight_for("embedding"), 2)
+        self.assertEqual(config.max_inflight_for("green"), 3)
+        self.assertEqual(config.max_queue_depth, 10)
+        self.assertEqual(config.queue_timeout_sec, 2.5)
+        self.assertEqual(config.batch_tokens, frozenset({"hermes-a", "hermes-b"}))
+
+    def test_resolve_lane_prefers_header_then_token_then_route(self) -> None:
+        config = self.mod.SchedulerConfig(
+            batch_tokens=frozenset({"hermes"}),
+            batch_route_prefixes=("/v1/embeddings",),
+        )
+        resolve = self.mod.resolve_lane
+        self.assertEqual(resolve("/v1/chat/completions", {}, config), "interactive")
+        self.assertEqual(resolve("/v1/chat/completions", {"Authorization": "Bearer hermes"}, config), "batch")
+        self.assertEqual(resolve("/v1/chat/completions", {"X-LLM-Token": "hermes"}, config), "batch")
+        self.assertEqual(
+            resolve("/v1/chat/completions", {"X-LLM-Token": "hermes", "X-LLM-Priority": "interactive"}, config),
+            "interactive",
+        )
+        self.assertEqual(resolve("/v1/embeddings", {}, config), "batch")
+
+    def test_interactive_waiter_is_granted_before_earlier_batch_waiter(self) -> None:
+        scheduler = self.mod.AdmissionScheduler(
+            self.mod.SchedulerConfig(default_max_inflight=1, reserved_interactive_slots=0, queue_timeout_sec=5)
+        )
+        scheduler.acquire("blue", "batch")
+        order: list[str] = []
+
+        def worker(lane: str) -> None:
+            scheduler.acquire("blue", lane)
+            order.append(lane)
+            scheduler.release("blue", lane)
+
+        batch_thread = threading.Thread(target=worker, args=("batch",))
+        batch_thread.start()
+        self._wait_for_queue_depth(scheduler, "blue", 1)
+        interactive_thread = threading.Thread(target=worker, args=("interactive",))
+        interactive_thread.start()
+        self._wait_for_queue_depth(scheduler, "blue", 2)
+
+        scheduler.release("blue", "batch")
+        batch_thread.join(timeout=5)
+        interactive_thread.join(timeout=5)
+        self.assertEqual(order, ["interactive", "batch"])
+
+    def test_batch_cannot_take_reserved_interactive_slot(self) -> None:
+        scheduler = self.mod.AdmissionScheduler(
+            self.mod.SchedulerConfig(default_max_inflight=2, reserved_interactive_slots=1, max_queue_depth=0)
+        )
+        scheduler.acquire("blue", "batch")
+        with self.assertRaises(self.mod.SchedulerRejectedError) as exc:
+            scheduler.acquire("blue", "batch")
+        self.assertEqual(exc.exception.status_code, 429)
+        scheduler.acquire("blue", "interactive")
+        snapshot = scheduler.snapshot()["backends"]["blue"]
+        self.assertEqual(snapshot["inflight"], 2)
+        self.assertEqual(snapshot["batchMaxInflight"], 1)
+        self.assertEqual(snapshot["lanes"]["batch"]["rejectedQueueFull"], 1)
+
+    def test_queue_timeout_is_reported_and_dequeued(self) -> None:
+        scheduler = self.mod.AdmissionScheduler(
+            self.mod.SchedulerConfig(default_max_inflight=1, queue_timeout_sec=0.05)
+        )
+        scheduler.acquire("green", "interactive")
+        with self.assertRaises(self.mod.SchedulerRejectedError) as exc:
+            scheduler.acquire("green", "interactive")
+        self.assertEqual(exc.exception.status_code, 503)
+        snapshot = scheduler.snapshot()["backends"]["green"]
+        self.assertEqual(snapshot["queueDepth"], 0)
+        self.assertEqual(snapshot["lanes"]["interactive"]["rejectedTimeout"], 1)
+
+    def test_backends_are_limited_independently(self) -> None:
+        scheduler = self.mod.AdmissionScheduler(
+            self.mod.SchedulerConfig(default_max_inflight=1, max_queue_depth=0)
+        )
+        scheduler.acquire("blue", "interactive")
+        with scheduler.slot("embedding", "interactive"):
+            self.assertEqual(scheduler.snapshot()["backends"]["embedding"]["inflight"], 1)
+        self.assertEqual(scheduler.snapshot()["backends"]["embedding"]["inflight"], 0)
+
+    def _wait_for_queue_depth(self, scheduler, backend: str, depth: int) -> None:
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            if scheduler.snapshot()["backends"][backend]["queueDepth"] >= depth:
+                return
+            time.sleep(0.005)
+        self.fail(f"queue depth {depth} not reached")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+import importlib.util
+import subprocess
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+
+MODULE_PATH = Path(__file__).resolve().parents[1] / "runtime_jobs.py"
+
+
+def load_module():
+    spec = importlib.util.spec_from_file_location("dgx_runtime_jobs", MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class RuntimeJobsTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.mod = load_module()
+        self.manager = self.mod.JobManager("t", self.mod.JobManagerConfig(max_history=3, cancel_grace_sec=1.0))
+
+    def test_load_config_from_env(self) -> None:
+        config = self.mod.load_job_manager_config_from_env(
+            {"DGX_RUNTIME_JOB_HISTORY": "5", "DGX_RUNTIME_JOB_LOG_LINES": "x", "DGX_RUNTIME_JOB_CANCEL_GRACE_SEC": "2"}
+        )
+        self.assertEqual((config.max_history, config.log_tail_lines, config.cancel_grace_sec), (5, 200, 2.0))
+
+    def test_identical_requests_coalesce_into_one_job(self) -> None:
+        release = threading.Event()
+        runs = []
+
+        def work(job):
+            runs.append(job.id)
+            release.wait(5)
+            return {"ok": True}
+
+        first, created_first = self.manager.submit("start:blue:a", "start", work)
+        second, created_second = self.manager.submit("start:blue:a", "start", work)
+        release.set()
+        self.assertTrue(first.wait(5))
+        self.assertIs(first, second)
+        self.assertEqual((created_first, created_second), (True, False))
+        self.assertEqual(runs, [first.id])
+        self.assertEqual(first.to_api()["waiters"], 2)
+        self.assertEqual(first.result, {"ok": True})
+
+        third, created_third = self.manager.submit("start:blue:a", "start", work)
+        self.assertTrue(created_third)
+        self.assertIsNot(third, first)
+        third.wait(5)
+
+    def test_jobs_run_one_at_a_time_in_order(self) -> None:
+        active = []
+        overlaps = []
+        order = []
+
+        def work(name):
+            def run(job):
+                active.append(name)
+                if len(active) > 1:
+                    overlaps.append(tuple(active))
+                time.sleep(0.05)
+                order.append(name)
+                active.remove(name)
+                return {}
+
+            return run
+
+        jobs = [self.manager.submit(f"k{n}", "start", work(n))[0] for n in range(3)]
+        for job in jobs:
+            self.assertTrue(job.wait(5))
+        self.assertEqual(order, [0, 1, 2])
+        self.assertEqual(overlaps, [])
+
+    def test_cancel_queued_job_never_runs(self) -> None:
+        release = threading.Event()
+        ran = []
+        blocker, _ = self.manager.submit("block", "stop", lambda job: release.wait(5) and {})
+        queued, _ = self.manager.submit("later", "start", lambda job: ran.append(job.id) or {})
+        job, outcome = self.manager.cancel(queued.id)
+        self.assertEqual(outcome, "cancelled")
+        self.assertEqual(job.status, "cancelled")
+        release.set()
+        blocker.wait(5)
+        time.sleep(0.05)
+        self.assertEqual(ran, [])
+        self.assertEqual(self.manager.cancel("t-missing")[1], "not_found")
+
+    def test_cancel_running_command_kills_process_group_and_runs_cleanup(self) -> None:
+        cleanup = []
+
+        def work(job):
+            job.progress("start-runtime")
+            returncode, _ = self.mod.run_logged_command("echo launching; sleep 30", timeout_sec=60)
+            return {"returncode": returncode}
+
+        def on_cancel(job):
+            returncode, output = self.mod.run_logged_command("echo cleaned", timeout_sec=10)
+            cleanup.append(output)
+
+        job, _ = self.manager.submit("start:green:", "start", work, steps=("start-runtime",), on_cancel=on_cancel)
+        deadline = time.monotonic() + 5
+        while "launching" not in job.log_tail() and time.monotonic() < deadline:
+            time.sleep(0.02)
+        started = time.monotonic()
+        _, outcome = self.manager.cancel(job.id)
+        self.assertEqual(outcome, "cancelling")
+        self.assertTrue(job.wait(5))
+        self.assertLess(time.monotonic() - started, 3)
+        self.assertEqual(job.status, "cancelled")
+        self.assertEqual(len(cleanup), 1)
+        self.assertTrue(cleanup[0].endswith("cleaned"))
+        self.assertIn("cleaned", job.log_tail())
+        self.assertEqual(job.to_api()["progress"]["step"], "start-runtime")
+
+    def test_running_job_marked_not_cancellable_is_left_alone(self) -> None:
+        release = threading.Event()
+        job, _ = self.manager.submit(
+            "stop:blue", "stop", lambda job: release.wait(5) and {"ok": True}, cancellable_while_running=False
+        )
+        while job.status != "running":
+            time.sleep(0.01)
+        self.assertEqual(self.manager.cancel(job.id)[1], "not_cancellable")
+        release.set()
+        job.wait(5)
+        self.assertEqual(job.status, "succeeded")
+        self.assertEqual(self.manager.cancel(job.id)[1], "finished")
+
+    def test_run_logged_command_outside_job_and_timeout(self) -> None:
+        returncode, output = self.mod.run_logged_command("echo out; echo err >&2; exit 3", timeout_sec=10)
+        self.assertEqual(returncode, 3)
+        # bash -l の profile 由来の出力が前に付くことがあるため末尾で比較する
+        self.assertEqual(output.splitlines()[-2:], ["out", "err"])
+        with self.assertRaises(subprocess.TimeoutExpired):
+            self.mod.run_logged_command("sleep 10", timeout_sec=0.3)
+
+    def test_failed_job_keeps_error_and_history_is_bounded(self) -> None:
+        def boom(job):
+            raise ValueError("bad")
+
+        failed, _ = self.manager.submit("fail", "start", boom)
+        failed.wait(5)
+        self.assertEqual(failed.status, "failed")
+        self.assertEqual(failed.to_api()["error"], "bad")
+        for n in range(4):
+            self.manager.submit(f"n{n}", "stop", lambda job: {})[0].wait(5)
+        time.sleep(0.05)
+        self.assertIsNone(self.manager.get(failed.id))
+        self.assertEqual(len(self.manager.snapshot()["jobs"]), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
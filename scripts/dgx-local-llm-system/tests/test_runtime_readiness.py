@@ -0,0 +1,126 @@
+import importlib.util
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+
+MODULE_PATH = Path(__file__).resolve().parents[1] / "runtime_readiness.py"
+
+
+def load_module():
+    spec = importlib.util.spec_from_file_location("dgx_runtime_readiness", MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+readiness = load_module()
+ReadinessConfig = readiness.ReadinessConfig
+ReadinessWatcher = readiness.ReadinessWatcher
+
+
+class FakeUpstream:
+    def __init__(self) -> None:
+        self.ready = False
+        self.calls: list[str] = []
+        self.lock = threading.Lock()
+
+    def probe(self, target: str) -> tuple[bool, dict[str, object]]:
+        with self.lock:
+            self.calls.append(target)
+        time.sleep(0.01)
+        return self.ready, {"status": 200 if self.ready else 503}
+
+
+class ReadinessWatcherTests(unittest.TestCase):
+    def test_load_config_from_env(self):
+        config = readiness.load_readiness_config_from_env(
+            {
+                "GATEWAY_READY_PROBE_INTERVAL_SEC": "0.2",
+                "GATEWAY_READY_CACHE_SEC": "5",
+                "GATEWAY_READY_MAX_WAIT_SEC": "bad",
+            }
+        )
+        self.assertEqual(config, ReadinessConfig(probe_interval_sec=0.2, warm_ttl_sec=5.0, max_wait_sec=600.0))
+
+    def test_waiters_share_one_probe_loop_and_wake_when_ready(self):
+        upstream = FakeUpstream()
+        watcher = ReadinessWatcher(lambda: "http://blue", upstream.probe, ReadinessConfig(probe_interval_sec=0.05))
+        results = []
+
+        def waiter() -> None:
+            results.append(watcher.wait(5))
+
+        threads = [threading.Thread(target=waiter) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.3)
+        upstream.ready = True
+        for thread in threads:
+            thread.join(timeout=5)
+
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(r.ready for r in results))
+        # 8 waiter × 0.3 秒でも probe は 1 本の loop 分（約 0.3 / 0.06 回）しか出ない
+        self.assertLess(len(upstream.calls), 15)
+        self.assertEqual(watcher.stats()["longPolls"], 8)
+
+    def test_warm_result_is_served_from_cache_until_invalidated(self):
+        upstream = FakeUpstream()
+        upstream.ready = True
+        watcher = ReadinessWatcher(lambda: "http://blue", upstream.probe, ReadinessConfig(warm_ttl_sec=60))
+
+        first = watcher.wait(1)
+        second = watcher.wait(1)
+        watcher.invalidate()
+        third = watcher.wait(1)
+
+        self.assertFalse(first.cached)
+        self.assertTrue(second.cached)
+        self.assertFalse(third.cached)
+        self.assertEqual(len(upstream.calls), 2)
+
+    def test_deadline_returns_not_ready_with_last_probe(self):
+        upstream = FakeUpstream()
+        watcher = ReadinessWatcher(lambda: "http://green", upstream.probe, ReadinessConfig(probe_interval_sec=0.05))
+
+        started = time.monotonic()
+        result = watcher.wait(0.2)
+
+        self.assertFalse(result.ready)
+        self.assertGreaterEqual(time.monotonic() - started, 0.19)
+        self.assertEqual(result.detail, {"status": 503})
+        self.assertEqual(result.target, "http://green")
+        self.assertEqual(watcher.stats()["timeouts"], 1)
+
+    def test_zero_timeout_waits_for_a_single_probe(self):
+        upstream = FakeUpstream()
+        watcher = ReadinessWatcher(lambda: "http://green", upstream.probe)
+
+        result = watcher.wait(0)
+
+        self.assertFalse(result.ready)
+        self.assertEqual(result.detail, {"status": 503})
+        self.assertEqual(len(upstream.calls), 1)
+
+    def test_cached_ready_is_not_reused_after_backend_switch(self):
+        upstream = FakeUpstream()
+        upstream.ready = True
+        target = ["http://green"]
+        watcher = ReadinessWatcher(lambda: target[0], upstream.probe, ReadinessConfig(warm_ttl_sec=60))
+
+        watcher.wait(1)
+        target[0] = "http://blue"
+        result = watcher.wait(1)
+
+        self.assertFalse(result.cached)
+        self.assertEqual(result.target, "http://blue")
+        self.assertEqual(upstream.calls, ["http://green", "http://blue"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -89,6 +89,8 @@ class VllmCommandBuilderTests(unittest.TestCase):
         self.assertIn("--disable-custom-all-reduce", argv)
         self.assertNotIn("--quantization", argv)
         self.assertNotIn("--hf-overrides", argv)
+        self.assertIn("--enable-prefix-caching", argv)
+        self.assertIn("--enable-prompt-tokens-details", argv)
 
 
 if __name__ == "__main__":
@@ -71,6 +71,8 @@ def build_vllm_argv(model_path: str) -> list[str]:
     _append_value(argv, "--attention-backend", "VLLM_ATTENTION_BACKEND")
     _append_bool(argv, "--enable-chunked-prefill", "VLLM_ENABLE_CHUNKED_PREFILL", default=True)
     _append_bool(argv, "--enable-prefix-caching", "VLLM_ENABLE_PREFIX_CACHING", default=True)
+    # usage.prompt_tokens_details.cached_tokens（bridge の prefix cache 命中率集計に使う）
+    _append_bool(argv, "--enable-prompt-tokens-details", "VLLM_ENABLE_PROMPT_TOKENS_DETAILS", default=True)
     _append_value(argv, "--load-format", "VLLM_LOAD_FORMAT", "safetensors")
     _append_bool(argv, "--trust-remote-code", "VLLM_TRUST_REMOTE_CODE", default=True)
     _append_bool(argv, "--disable-custom-all-reduce", "VLLM_DISABLE_CUSTOM_ALL_REDUCE")
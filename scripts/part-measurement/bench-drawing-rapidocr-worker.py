@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""Throughput benchmark for drawing-local-rapidocr-worker.py.
+
+Starts the worker with each requested engine count, pushes a burst of synthetic
+inspection-drawing crops (dimension text, leader lines, frames) through the
+JSONL protocol, and reports wall time, images/sec, latency percentiles and the
+per-job queueMs / computeMs the worker returns.
+
+Needs rapidocr + Pillow (both are in the API image).
+
+Examples:
+  python3 ./bench-drawing-rapidocr-worker.py --workers 1,2,4 --requests 48
+  python3 ./bench-drawing-rapidocr-worker.py --workers 1,3 --threads-per-worker 1 --images-dir ./crops
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from io import BytesIO
+from pathlib import Path
+
+WORKER_PATH = Path(__file__).resolve().parent / "drawing-local-rapidocr-worker.py"
+
+
+def synthetic_drawings(count: int, width: int, height: int, seed: int = 7) -> list[bytes]:
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(seed)
+    images: list[bytes] = []
+    for _ in range(count):
+        image = Image.new("L", (width, height), 255)
+        draw = ImageDraw.Draw(image)
+        draw.rectangle((8, 8, width - 8, height - 8), outline=0, width=2)
+        for _ in range(6):
+            x0, y0 = rng.randrange(20, width - 200), rng.randrange(20, height - 40)
+            draw.line((x0, y0 + 30, x0 + rng.randrange(80, 180), y0 + 30), fill=0, width=1)
+            label = rng.choice(("R", "φ", "C", "M", "")) + f"{rng.uniform(0.5, 120):.2f}"
+            if rng.random() < 0.4:
+                label += f" ±0.{rng.randrange(1, 9)}"
+            draw.text((x0, y0), label, fill=0)
+        buf = BytesIO()
+        image.convert("RGB").save(buf, format="JPEG", quality=90)
+        images.append(buf.getvalue())
+    return images
+
+
+def load_images(images_dir: str, count: int, width: int, height: int) -> list[bytes]:
+    if not images_dir:
+        return synthetic_drawings(count, width, height)
+    paths = sorted(p for p in Path(images_dir).iterdir() if p.suffix.lower() in (".jpg", ".jpeg", ".png"))
+    if not paths:
+        raise SystemExit(f"no images in {images_dir}")
+    return [p.read_bytes() for p in paths[:count]]
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+def run_workers(workers: int, images: list[bytes], requests: int, threads_per_worker: int) -> dict[str, object]:
+    env = dict(os.environ)
+    env["PART_MEASUREMENT_DRAWING_OCR_RAPIDOCR_WORKERS"] = str(workers)
+    env["PART_MEASUREMENT_DRAWING_OCR_RAPIDOCR_MAX_PENDING"] = str(max(1, requests))
+    if threads_per_worker > 0:
+        env["PART_MEASUREMENT_DRAWING_OCR_RAPIDOCR_THREADS_PER_WORKER"] = str(threads_per_worker)
+    startup_started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-u", str(WORKER_PATH)],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        text=True,
+        encoding="utf-8",
+        env=env,
+    )
+    assert proc.stdin is not None and proc.stdout is not None
+    ready = json.loads(proc.stdout.readline() or "{}")
+    if not ready.get("ready"):
+        proc.kill()
+        raise SystemExit(f"worker not ready: {ready}")
+    startup_sec = time.perf_counter() - startup_started
+
+    sent_at: dict[str, float] = {}
+    latencies: list[float] = []
+    queue_ms: list[float] = []
+    compute_ms: list[float] = []
+    errors = 0
+
+    def reader() -> None:
+        nonlocal errors
+        assert proc.stdout is not None
+        for _ in range(requests):
+            line = proc.stdout.readline()
+            if not line:
+                return
+            msg = json.loads(line)
+            latencies.append(time.perf_counter() - sent_at[msg["id"]])
+            timing = msg.get("timing") or {}
+            queue_ms.append(float(timing.get("queueMs") or 0.0))
+            compute_ms.append(float(timing.get("computeMs") or 0.0))
+            if not msg.get("ok"):
+                errors += 1
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    started = time.perf_counter()
+    for n in range(requests):
+        request_id = f"bench-{n}"
+        payload = base64.b64encode(images[n % len(images)]).decode("ascii")
+        sent_at[request_id] = time.perf_counter()
+        proc.stdin.write(json.dumps({"id": request_id, "imageBase64": payload}) + "\n")
+        proc.stdin.flush()
+    thread.join()
+    wall = time.perf_counter() - started
+    proc.stdin.close()
+    proc.wait(timeout=30)
+    return {
+        "workers": workers,
+        "requests": requests,
+        "errors": errors,
+        "startupSec": round(startup_sec, 3),
+        "wallSec": round(wall, 3),
+        "imagesPerSec": round(requests / wall, 2) if wall > 0 else None,
+        "latencyP50Ms": round(_percentile(latencies, 50) * 1000, 1),
+        "latencyP95Ms": round(_percentile(latencies, 95) * 1000, 1),
+        "avgQueueMs": round(sum(queue_ms) / len(queue_ms), 1),
+        "avgComputeMs": round(sum(compute_ms) / len(compute_ms), 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4", help="comma separated engine counts")
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--threads-per-worker", type=int, default=0)
+    parser.add_argument("--images-dir", default="")
+    parser.add_argument("--corpus-size", type=int, default=8)
+    parser.add_argument("--image-width", type=int, default=640)
+    parser.add_argument("--image-height", type=int, default=360)
+    args = parser.parse_args()
+
+    images = load_images(args.images_dir, args.corpus_size, args.image_width, args.image_height)
+    results = [
+        run_workers(int(raw), images, args.requests, args.threads_per_worker)
+        for raw in args.workers.split(",")
+        if raw.strip()
+    ]
+    print(json.dumps({"corpusImages": len(images), "results": results}, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,26 +2,73 @@
 """Persistent RapidOCR worker for marker-local drawing OCR.
 
 Protocol (JSON Lines over stdin/stdout):
-  request:  {"id":"...","imageBase64":"<jpeg bytes base64>"}
+  request:  {"id":"...","imageBase64":"<jpeg bytes base64>",
+             "region"?:{"x0":..,"y0":..,"x1":..,"y1":..},"maxSide"?:N}
   response: {"id":"...","ok":true,"words":[{"text":"...","confidence":0-100,"bbox":{"x0":..,"y0":..,"x1":..,"y1":..}}]}
   or        {"id":"...","ok":false,"error":"..."}
 
 Startup readiness line (before accepting work):
-  {"ready":true,"engine":"rapidocr"}
+  {"ready":true,"engine":"rapidocr","workers":N}
+
+Every response also carries {"cached":bool,"timing":{"queueMs":..,"computeMs":..}}.
+  stats:    {"id":"...","stats":true} -> {"id":"...","ok":true,"stats":{...}}
+
+Region / downscale mode:
+  "region" crops to that pixel rectangle of the original image before
+  detection, and "maxSide" downscales so the longer side of the (cropped)
+  image is at most N px. JPEGs are decoded at a reduced DCT scale when
+  downscaling. Word bboxes are always returned in original image coordinates.
+
+Result cache:
+  Words are cached by sha256(engine version + image bytes + region + maxSide)
+  in an in-memory LRU (PART_MEASUREMENT_DRAWING_OCR_RAPIDOCR_CACHE_MAX_ENTRIES,
+  0 disables). With PART_MEASUREMENT_DRAWING_OCR_RAPIDOCR_CACHE_DIR set,
+  entries are also written there as one JSON file per key; the oldest files
+  are deleted once the directory exceeds
+  PART_MEASUREMENT_DRAWING_OCR_RAPIDOCR_CACHE_MAX_MB. Hit ratios are in the
+  stats response.
+
+Engine pool (PART_MEASUREMENT_DRAWING_OCR_RAPIDOCR_WORKERS > 1):
+  The process becomes a supervisor that keeps N warm engine subprocesses
+  (this script with --engine-worker) and dispatches requests to whichever is
+  idle. Responses are written as soon as they finish, so they may be out of
+  request order; the client matches them by id. At most
+  PART_MEASUREMENT_DRAWING_OCR_RAPIDOCR_MAX_PENDING requests wait for an
+  engine; beyond that stdin is not read (backpressure through the pipe).
+  A crashed engine fails only its in-flight request and is respawned.
+  PART_MEASUREMENT_DRAWING_OCR_RAPIDOCR_THREADS_PER_WORKER caps onnxruntime
+  intra-op threads per engine so N engines do not oversubscribe the CPU.
 """
 
 from __future__ import annotations
 
 import base64
+import hashlib
 import json
+import math
+import os
+import queue
+import subprocess
 import sys
+import threading
+import time
 import traceback
-from typing import Any
+from collections import OrderedDict
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+from typing import IO, Any, Callable, Iterable, Mapping
+
+ENGINE_WORKER_FLAG = "--engine-worker"
+
+_emit_lock = threading.Lock()
 
 
 def _emit(payload: dict[str, Any]) -> None:
-    sys.stdout.write(json.dumps(payload, ensure_ascii=False) + "\n")
-    sys.stdout.flush()
+    line = json.dumps(payload, ensure_ascii=False) + "\n"
+    with _emit_lock:
+        sys.stdout.write(line)
+        sys.stdout.flush()
 
 
 def _word_from_item(item: Any) -> dict[str, Any] | None:
@@ -81,47 +128,620 @@ def _normalize_result(result: Any) -> list[dict[str, Any]]:
     return words
 
 
-def main() -> int:
+@dataclass(frozen=True)
+class PoolConfig:
+    workers: int = 1
+    max_pending: int = 1
+    threads_per_worker: int = 0
+
+
+def _env_int(env: Mapping[str, str], name: str, default: int, minimum: int) -> int:
     try:
-        from rapidocr import RapidOCR  # type: ignore
-    except Exception as exc:  # noqa: BLE001
-        _emit({"ready": False, "error": f"rapidocr import failed: {exc}"})
-        return 1
+        return max(minimum, int((env.get(name) or str(default)).strip()))
+    except ValueError:
+        return default
+
+
+def load_pool_config_from_env(env: Mapping[str, str] | None = None) -> PoolConfig:
+    env = env if env is not None else os.environ
+    workers = _env_int(env, "PART_MEASUREMENT_DRAWING_OCR_RAPIDOCR_WORKERS", 1, 1)
+    return PoolConfig(
+        workers=workers,
+        max_pending=_env_int(env, "PART_MEASUREMENT_DRAWING_OCR_RAPIDOCR_MAX_PENDING", workers, 1),
+        threads_per_worker=_env_int(env, "PART_MEASUREMENT_DRAWING_OCR_RAPIDOCR_THREADS_PER_WORKER", 0, 0),
+    )
+
+
+@dataclass(frozen=True)
+class CacheConfig:
+    max_entries: int = 512
+    directory: str = ""
+    max_disk_bytes: int = 64 * 1024 * 1024
 
+
+def load_cache_config_from_env(env: Mapping[str, str] | None = None) -> CacheConfig:
+    env = env if env is not None else os.environ
+    return CacheConfig(
+        max_entries=_env_int(env, "PART_MEASUREMENT_DRAWING_OCR_RAPIDOCR_CACHE_MAX_ENTRIES", 512, 0),
+        directory=(env.get("PART_MEASUREMENT_DRAWING_OCR_RAPIDOCR_CACHE_DIR") or "").strip(),
+        max_disk_bytes=_env_int(env, "PART_MEASUREMENT_DRAWING_OCR_RAPIDOCR_CACHE_MAX_MB", 64, 1) * 1024 * 1024,
+    )
+
+
+Region = tuple[int, int, int, int]
+
+
+@dataclass(frozen=True)
+class OcrRequest:
+    request_id: str
+    image_bytes: bytes
+    region: Region | None = None
+    max_side: int = 0
+
+
+def _parse_region(raw: Any) -> Region | None:
+    if raw is None:
+        return None
+    if not isinstance(raw, dict):
+        raise ValueError("region must be an object")
     try:
-        engine = RapidOCR()
-    except Exception as exc:  # noqa: BLE001
-        _emit({"ready": False, "error": f"rapidocr init failed: {exc}"})
-        return 1
+        x0, y0, x1, y1 = (int(math.floor(float(raw[k]))) for k in ("x0", "y0", "x1", "y1"))
+    except (KeyError, TypeError, ValueError) as exc:
+        raise ValueError("region requires numeric x0/y0/x1/y1") from exc
+    if x0 < 0 or y0 < 0 or x1 <= x0 or y1 <= y0:
+        raise ValueError("region must satisfy 0 <= x0 < x1 and 0 <= y0 < y1")
+    return (x0, y0, x1, y1)
 
-    _emit({"ready": True, "engine": "rapidocr"})
 
-    for line in sys.stdin:
+def parse_request(req: Mapping[str, Any]) -> OcrRequest:
+    image_b64 = req.get("imageBase64")
+    if not isinstance(image_b64, str) or not image_b64:
+        raise ValueError("imageBase64 is required")
+    max_side = req.get("maxSide") or 0
+    if not isinstance(max_side, int) or isinstance(max_side, bool) or max_side < 0:
+        raise ValueError("maxSide must be a non-negative integer")
+    return OcrRequest(
+        request_id=str(req.get("id") or ""),
+        image_bytes=base64.b64decode(image_b64, validate=False),
+        region=_parse_region(req.get("region")),
+        max_side=max_side,
+    )
+
+
+def _engine_namespace() -> str:
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+
+        try:
+            return f"rapidocr-{version('rapidocr')}"
+        except PackageNotFoundError:
+            return "rapidocr-unknown"
+    except ImportError:
+        return "rapidocr-unknown"
+
+
+def cache_key(namespace: str, request: OcrRequest) -> str:
+    digest = hashlib.sha256()
+    digest.update(namespace.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(request.image_bytes)
+    digest.update(b"\0")
+    digest.update(json.dumps([request.region, request.max_side]).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _map_words(
+    words: list[dict[str, Any]], offset: tuple[int, int], scale: tuple[float, float]
+) -> list[dict[str, Any]]:
+    """Map bboxes from the cropped / downscaled engine input back to original image coordinates."""
+    (ox, oy), (sx, sy) = offset, scale
+    mapped: list[dict[str, Any]] = []
+    for word in words:
+        bbox = word["bbox"]
+        mapped.append(
+            {
+                **word,
+                "bbox": {
+                    "x0": round(bbox["x0"] / sx + ox, 2),
+                    "y0": round(bbox["y0"] / sy + oy, 2),
+                    "x1": round(bbox["x1"] / sx + ox, 2),
+                    "y1": round(bbox["y1"] / sy + oy, 2),
+                },
+            }
+        )
+    return mapped
+
+
+def prepare_image(request: OcrRequest) -> tuple[bytes, Callable[[list[dict[str, Any]]], list[dict[str, Any]]]]:
+    """Return (engine input bytes, bbox mapper). Full-image requests pass through untouched."""
+    if request.region is None and request.max_side <= 0:
+        return request.image_bytes, lambda words: words
+
+    from PIL import Image
+
+    image = Image.open(BytesIO(request.image_bytes))
+    full_w, full_h = image.size
+    x0, y0, x1, y1 = request.region or (0, 0, full_w, full_h)
+    x1, y1 = min(x1, full_w), min(y1, full_h)
+    if x0 >= x1 or y0 >= y1:
+        raise ValueError(f"region is outside the image ({full_w}x{full_h})")
+    crop_w, crop_h = x1 - x0, y1 - y0
+    scale = min(1.0, request.max_side / max(crop_w, crop_h)) if request.max_side > 0 else 1.0
+    if scale < 1.0 and image.format == "JPEG":
+        # draft picks the smallest DCT scale that still covers the requested size
+        image.draft("RGB", (math.ceil(full_w * scale), math.ceil(full_h * scale)))
+    image = image.convert("RGB")
+    ratio_x, ratio_y = image.size[0] / full_w, image.size[1] / full_h
+    cropped = image.crop((round(x0 * ratio_x), round(y0 * ratio_y), round(x1 * ratio_x), round(y1 * ratio_y)))
+    target = (max(1, round(crop_w * scale)), max(1, round(crop_h * scale)))
+    if cropped.size != target:
+        cropped = cropped.resize(target, Image.BILINEAR)
+    buf = BytesIO()
+    cropped.save(buf, format="PNG", compress_level=1)
+    factors = (target[0] / crop_w, target[1] / crop_h)
+    return buf.getvalue(), lambda words: _map_words(words, (x0, y0), factors)
+
+
+def run_ocr(engine: Callable[[bytes], Any], request: OcrRequest) -> list[dict[str, Any]]:
+    engine_input, map_words = prepare_image(request)
+    return map_words(_normalize_result(engine(engine_input)))
+
+
+class ResultCache:
+    """LRU of OCR words by content hash, optionally backed by a size-bounded directory."""
+
+    def __init__(self, config: CacheConfig, namespace: str) -> None:
+        self._config = config
+        self._namespace = namespace
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, list[dict[str, Any]]] = OrderedDict()
+        # key -> file size, oldest first
+        self._disk: OrderedDict[str, int] = OrderedDict()
+        self._disk_bytes = 0
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._disk_errors = 0
+        self._directory = Path(config.directory) if config.directory and self.enabled else None
+        if self._directory is not None:
+            self._scan_disk()
+
+    @property
+    def enabled(self) -> bool:
+        return self._config.max_entries > 0
+
+    def key_for(self, request: OcrRequest) -> str:
+        return cache_key(self._namespace, request)
+
+    def get(self, key: str) -> list[dict[str, Any]] | None:
+        if not self.enabled:
+            return None
+        with self._lock:
+            words = self._memory.get(key)
+            if words is not None:
+                self._memory.move_to_end(key)
+                self._hits += 1
+                return words
+            words = self._read_disk_locked(key)
+            if words is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._disk_hits += 1
+            self._remember_locked(key, words)
+            return words
+
+    def put(self, key: str, words: list[dict[str, Any]]) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._remember_locked(key, words)
+            if self._directory is not None and key not in self._disk:
+                self._write_disk_locked(key, words)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._memory),
+                "maxEntries": self._config.max_entries,
+                "hits": self._hits,
+                "diskHits": self._disk_hits,
+                "misses": self._misses,
+                "hitRatio": round(self._hits / lookups, 4) if lookups else 0.0,
+                "diskEntries": len(self._disk),
+                "diskBytes": self._disk_bytes,
+                "maxDiskBytes": self._config.max_disk_bytes if self._directory is not None else 0,
+                "diskErrors": self._disk_errors,
+            }
+
+    def _remember_locked(self, key: str, words: list[dict[str, Any]]) -> None:
+        self._memory[key] = words
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._config.max_entries:
+            self._memory.popitem(last=False)
+
+    def _path(self, key: str) -> Path:
+        assert self._directory is not None
+        return self._directory / key[:2] / f"{key}.json"
+
+    def _scan_disk(self) -> None:
+        assert self._directory is not None
+        entries: list[tuple[float, str, int]] = []
+        try:
+            for path in self._directory.glob("*/*.json"):
+                stat = path.stat()
+                entries.append((stat.st_mtime, path.stem, stat.st_size))
+        except OSError:
+            self._disk_errors += 1
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+        self._evict_disk_locked()
+
+    def _read_disk_locked(self, key: str) -> list[dict[str, Any]] | None:
+        if self._directory is None or key not in self._disk:
+            return None
+        path = self._path(key)
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+            os.utime(path)
+        except (OSError, ValueError):
+            self._disk_errors += 1
+            self._disk_bytes -= self._disk.pop(key)
+            return None
+        if not isinstance(payload, dict) or payload.get("ns") != self._namespace:
+            return None
+        self._disk.move_to_end(key)
+        words = payload.get("words")
+        return words if isinstance(words, list) else None
+
+    def _write_disk_locked(self, key: str, words: list[dict[str, Any]]) -> None:
+        path = self._path(key)
+        data = json.dumps({"ns": self._namespace, "words": words}, ensure_ascii=False, separators=(",", ":"))
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(path.name + ".tmp")
+            tmp.write_text(data, encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError:
+            self._disk_errors += 1
+            return
+        size = len(data.encode("utf-8"))
+        self._disk[key] = size
+        self._disk_bytes += size
+        self._evict_disk_locked()
+
+    def _evict_disk_locked(self) -> None:
+        while self._disk and self._disk_bytes > self._config.max_disk_bytes:
+            key, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            try:
+                self._path(key).unlink()
+            except FileNotFoundError:
+                pass
+            except OSError:
+                self._disk_errors += 1
+
+
+def _ok_response(
+    request_id: str, words: list[dict[str, Any]], cached: bool, queue_ms: float, compute_ms: float
+) -> dict[str, Any]:
+    return {
+        "id": request_id,
+        "ok": True,
+        "words": words,
+        "cached": cached,
+        "timing": {"queueMs": queue_ms, "computeMs": compute_ms},
+    }
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000.0, 2)
+
+
+def _create_engine(threads: int) -> Any:
+    from rapidocr import RapidOCR  # type: ignore
+
+    if threads > 0:
+        return RapidOCR(params={"EngineConfig.onnxruntime.intra_op_num_threads": threads})
+    return RapidOCR()
+
+
+def serve_engine(
+    engine: Callable[[bytes], Any],
+    lines: Iterable[str],
+    emit: Callable[[dict[str, Any]], None],
+    cache: ResultCache | None = None,
+) -> None:
+    """Process requests one by one with a single warm engine."""
+    for line in lines:
         line = line.strip()
         if not line:
             continue
         request_id = ""
+        started = time.perf_counter()
         try:
             req = json.loads(line)
             request_id = str(req.get("id") or "")
-            image_b64 = req.get("imageBase64")
-            if not isinstance(image_b64, str) or not image_b64:
-                raise ValueError("imageBase64 is required")
-            image_bytes = base64.b64decode(image_b64, validate=False)
-            result = engine(image_bytes)
-            words = _normalize_result(result)
-            _emit({"id": request_id, "ok": True, "words": words})
+            if req.get("stats"):
+                emit({"id": request_id, "ok": True, "stats": {"workers": 1, "cache": cache.stats() if cache else None}})
+                continue
+            request = parse_request(req)
+            key = cache.key_for(request) if cache is not None else ""
+            words = cache.get(key) if cache is not None else None
+            if words is not None:
+                emit(_ok_response(request_id, words, True, 0.0, _elapsed_ms(started)))
+                continue
+            words = run_ocr(engine, request)
+            if cache is not None:
+                cache.put(key, words)
+            emit(_ok_response(request_id, words, False, 0.0, _elapsed_ms(started)))
         except Exception as exc:  # noqa: BLE001
-            _emit(
+            emit(
                 {
                     "id": request_id,
                     "ok": False,
                     "error": str(exc),
                     "traceback": traceback.format_exc(limit=3),
+                    "timing": {"queueMs": 0.0, "computeMs": _elapsed_ms(started)},
                 }
             )
+
+
+@dataclass
+class _Job:
+    request_id: str
+    line: str
+    enqueued_at: float
+    cache_key: str = ""
+
+
+class _EngineProcess:
+    """One warm engine subprocess speaking the same JSONL protocol."""
+
+    def __init__(self, command: list[str], env: Mapping[str, str] | None) -> None:
+        self._proc = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=None,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+            env=dict(env) if env is not None else None,
+        )
+
+    def wait_ready(self) -> dict[str, Any]:
+        msg = self._read_message()
+        if msg is None:
+            return {"ready": False, "error": f"engine exited before ready code={self._proc.poll()}"}
+        return msg
+
+    def alive(self) -> bool:
+        return self._proc.poll() is None
+
+    def request(self, line: str) -> dict[str, Any] | None:
+        """Send one request and wait for its response. None means the engine died."""
+        stdin: IO[str] | None = self._proc.stdin
+        try:
+            assert stdin is not None
+            stdin.write(line + "\n")
+            stdin.flush()
+        except (BrokenPipeError, OSError, ValueError):
+            return None
+        return self._read_message()
+
+    def _read_message(self) -> dict[str, Any] | None:
+        stdout: IO[str] | None = self._proc.stdout
+        assert stdout is not None
+        for raw in stdout:
+            try:
+                msg = json.loads(raw)
+            except json.JSONDecodeError:
+                # engine libraries occasionally print to stdout; keep the protocol stream clean
+                sys.stderr.write(raw)
+                continue
+            if isinstance(msg, dict):
+                return msg
+        return None
+
+    def close(self, timeout: float = 5.0) -> None:
+        try:
+            if self._proc.stdin is not None:
+                self._proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self._proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+            self._proc.wait()
+
+
+class EnginePool:
+    """Dispatch JSONL requests over N warm engine subprocesses, one in-flight request each."""
+
+    def __init__(
+        self,
+        command: list[str],
+        config: PoolConfig,
+        emit: Callable[[dict[str, Any]], None],
+        env: Mapping[str, str] | None = None,
+        cache: ResultCache | None = None,
+    ) -> None:
+        self._command = command
+        self._config = config
+        self._emit = emit
+        self._cache = cache
+        self._env = env
+        self._jobs: queue.Queue[_Job | None] = queue.Queue(maxsize=config.max_pending)
+        self._engines: list[_EngineProcess | None] = [None] * config.workers
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._respawns = 0
+
+    def start(self) -> dict[str, Any]:
+        """Spawn all engines (they initialise concurrently) and return the combined ready line."""
+        engines = [_EngineProcess(self._command, self._env) for _ in range(self._config.workers)]
+        for engine in engines:
+            msg = engine.wait_ready()
+            if not msg.get("ready"):
+                for other in engines:
+                    other.close(timeout=1.0)
+                return {"ready": False, "error": str(msg.get("error") or "engine not ready")}
+        self._engines = list(engines)
+        for slot in range(self._config.workers):
+            thread = threading.Thread(target=self._serve, args=(slot,), name=f"rapidocr-engine-{slot}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return {"ready": True, "engine": "rapidocr", "workers": self._config.workers}
+
+    def submit(self, line: str) -> None:
+        """Answer cache hits at once; queue the rest (blocks while max_pending requests are waiting)."""
+        enqueued_at = time.perf_counter()
+        request_id = ""
+        try:
+            req = json.loads(line)
+            if not isinstance(req, dict):
+                raise ValueError("request must be a JSON object")
+            request_id = str(req.get("id") or "")
+            if req.get("stats"):
+                self._emit({"id": request_id, "ok": True, "stats": self.stats()})
+                return
+            key = ""
+            if self._cache is not None and self._cache.enabled:
+                request = parse_request(req)
+                key = self._cache.key_for(request)
+                words = self._cache.get(key)
+                if words is not None:
+                    self._emit(_ok_response(request_id, words, True, 0.0, _elapsed_ms(enqueued_at)))
+                    return
+        except ValueError as exc:
+            self._emit({"id": request_id, "ok": False, "error": str(exc), "timing": {"queueMs": 0.0, "computeMs": 0.0}})
+            return
+        self._jobs.put(_Job(request_id=request_id, line=line, enqueued_at=enqueued_at, cache_key=key))
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "workers": self._config.workers,
+            "queued": self._jobs.qsize(),
+            "respawns": self.respawns,
+            "cache": self._cache.stats() if self._cache is not None else None,
+        }
+
+    def close(self) -> None:
+        """Finish queued requests, then stop every engine."""
+        for _ in self._threads:
+            self._jobs.put(None)
+        for thread in self._threads:
+            thread.join()
+        for engine in self._engines:
+            if engine is not None:
+                engine.close()
+
+    @property
+    def respawns(self) -> int:
+        with self._lock:
+            return self._respawns
+
+    def _engine_for(self, slot: int) -> _EngineProcess | str:
+        engine = self._engines[slot]
+        if engine is not None and engine.alive():
+            return engine
+        if engine is not None:
+            engine.close(timeout=1.0)
+        with self._lock:
+            self._respawns += 1
+        engine = _EngineProcess(self._command, self._env)
+        msg = engine.wait_ready()
+        if not msg.get("ready"):
+            engine.close(timeout=1.0)
+            self._engines[slot] = None
+            return str(msg.get("error") or "engine not ready")
+        self._engines[slot] = engine
+        return engine
+
+    def _serve(self, slot: int) -> None:
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            dispatched_at = time.perf_counter()
+            queue_ms = round((dispatched_at - job.enqueued_at) * 1000.0, 2)
+            engine = self._engine_for(slot)
+            if isinstance(engine, str):
+                self._fail(job, f"rapidocr engine unavailable: {engine}", queue_ms, dispatched_at)
+                continue
+            msg = engine.request(job.line)
+            if msg is None:
+                # stdout EOF can arrive before the process is reaped; respawn on the next job regardless
+                engine.close(timeout=1.0)
+                self._engines[slot] = None
+                self._fail(job, "rapidocr engine exited during request", queue_ms, dispatched_at)
+                continue
+            timing = msg.get("timing") if isinstance(msg.get("timing"), dict) else {}
+            msg["timing"] = {"queueMs": queue_ms, "computeMs": timing.get("computeMs", _elapsed_ms(dispatched_at))}
+            if job.cache_key and msg.get("ok") and self._cache is not None:
+                self._cache.put(job.cache_key, msg.get("words") or [])
+            self._emit(msg)
+
+    def _fail(self, job: _Job, error: str, queue_ms: float, dispatched_at: float) -> None:
+        self._emit(
+            {
+                "id": job.request_id,
+                "ok": False,
+                "error": error,
+                "timing": {"queueMs": queue_ms, "computeMs": _elapsed_ms(dispatched_at)},
+            }
+        )
+
+
+def _run_single_engine(config: PoolConfig, cache: ResultCache | None) -> int:
+    try:
+        import rapidocr  # type: ignore  # noqa: F401
+    except Exception as exc:  # noqa: BLE001
+        _emit({"ready": False, "error": f"rapidocr import failed: {exc}"})
+        return 1
+
+    try:
+        engine = _create_engine(config.threads_per_worker)
+    except Exception as exc:  # noqa: BLE001
+        _emit({"ready": False, "error": f"rapidocr init failed: {exc}"})
+        return 1
+
+    _emit({"ready": True, "engine": "rapidocr", "workers": 1})
+    serve_engine(engine, sys.stdin, _emit, cache)
+    return 0
+
+
+def _run_pool(config: PoolConfig, cache: ResultCache) -> int:
+    command = [sys.executable, "-u", os.path.abspath(__file__), ENGINE_WORKER_FLAG]
+    pool = EnginePool(command, config, _emit, cache=cache)
+    ready = pool.start()
+    _emit(ready)
+    if not ready.get("ready"):
+        return 1
+    for line in sys.stdin:
+        line = line.strip()
+        if line:
+            pool.submit(line)
+    pool.close()
     return 0
 
 
+def main(argv: list[str] | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    config = load_pool_config_from_env()
+    if ENGINE_WORKER_FLAG in argv:
+        # the supervisor owns the cache; engine subprocesses only compute
+        return _run_single_engine(config, None)
+    cache = ResultCache(load_cache_config_from_env(), _engine_namespace())
+    if config.workers <= 1:
+        return _run_single_engine(config, cache)
+    return _run_pool(config, cache)
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -0,0 +1,219 @@
+import base64
+import importlib.util
+import json
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - Pillow is only in the API image
+    Image = None
+
+
+MODULE_PATH = Path(__file__).resolve().parents[1] / "drawing-local-rapidocr-worker.py"
+
+# Engine subprocess with a fake OCR engine: the image bytes are "<sleep_ms>:<text>" (or "crash").
+FAKE_ENGINE_SOURCE = f"""
+import importlib.util, json, os, sys, time
+spec = importlib.util.spec_from_file_location("rapidocr_worker", {str(MODULE_PATH)!r})
+mod = sys.modules["rapidocr_worker"] = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(mod)
+
+def engine(image_bytes):
+    text = image_bytes.decode("utf-8")
+    if text == "crash":
+        os._exit(3)
+    sleep_ms, word = text.split(":", 1)
+    time.sleep(int(sleep_ms) / 1000.0)
+    return [[[[0, 0], [10, 0], [10, 5], [0, 5]], word, 0.9]]
+
+print("engine chatter on stdout", flush=True)
+mod._emit({{"ready": True, "engine": "fake"}})
+mod.serve_engine(engine, sys.stdin, mod._emit)
+"""
+
+
+def load_module():
+    spec = importlib.util.spec_from_file_location("part_measurement_rapidocr_worker", MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def request_line(request_id: str, payload: str, **extra) -> str:
+    image_b64 = base64.b64encode(payload.encode("utf-8")).decode("ascii")
+    return json.dumps({"id": request_id, "imageBase64": image_b64, **extra})
+
+
+class RapidOcrWorkerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.mod = load_module()
+        self.emitted: list[dict] = []
+        self.lock = threading.Lock()
+
+    def emit(self, payload: dict) -> None:
+        with self.lock:
+            self.emitted.append(payload)
+
+    def make_pool(self, workers: int, max_pending: int = 4, cache=None):
+        config = self.mod.PoolConfig(workers=workers, max_pending=max_pending)
+        return self.mod.EnginePool([sys.executable, "-u", "-c", FAKE_ENGINE_SOURCE], config, self.emit, cache=cache)
+
+    def make_cache(self, **overrides):
+        return self.mod.ResultCache(self.mod.CacheConfig(**overrides), namespace="test")
+
+    def test_load_pool_config_from_env(self) -> None:
+        config = self.mod.load_pool_config_from_env(
+            {
+                "PART_MEASUREMENT_DRAWING_OCR_RAPIDOCR_WORKERS": "3",
+                "PART_MEASUREMENT_DRAWING_OCR_RAPIDOCR_THREADS_PER_WORKER": "2",
+            }
+        )
+        self.assertEqual((config.workers, config.max_pending, config.threads_per_worker), (3, 3, 2))
+        self.assertEqual(self.mod.load_pool_config_from_env({}).workers, 1)
+        self.assertEqual(
+            self.mod.load_pool_config_from_env({"PART_MEASUREMENT_DRAWING_OCR_RAPIDOCR_WORKERS": "x"}).workers, 1
+        )
+
+    def test_serve_engine_reports_words_and_errors(self) -> None:
+        lines = [request_line("a", "0:R5"), json.dumps({"id": "b"}), ""]
+        self.mod.serve_engine(lambda data: [[[[1, 2], [3, 2], [3, 4], [1, 4]], "R5", 0.5]], lines, self.emit)
+        self.assertEqual(len(self.emitted), 2)
+        ok, failed = self.emitted
+        self.assertTrue(ok["ok"])
+        self.assertEqual(ok["words"][0]["bbox"], {"x0": 1.0, "y0": 2.0, "x1": 3.0, "y1": 4.0})
+        self.assertIn("computeMs", ok["timing"])
+        self.assertFalse(failed["ok"])
+        self.assertEqual(failed["id"], "b")
+        self.assertIn("imageBase64", failed["error"])
+
+    def test_pool_answers_out_of_order_with_timings(self) -> None:
+        pool = self.make_pool(workers=2)
+        self.assertEqual(pool.start(), {"ready": True, "engine": "rapidocr", "workers": 2})
+        pool.submit(request_line("slow", "400:slow"))
+        pool.submit(request_line("fast", "0:fast"))
+        pool.close()
+        self.assertEqual([m["id"] for m in self.emitted], ["fast", "slow"])
+        slow = self.emitted[1]
+        self.assertEqual(slow["words"][0]["text"], "slow")
+        self.assertGreaterEqual(slow["timing"]["computeMs"], 300)
+        self.assertIn("queueMs", slow["timing"])
+
+    def test_crashed_engine_fails_only_its_request_and_is_respawned(self) -> None:
+        pool = self.make_pool(workers=1)
+        self.assertTrue(pool.start()["ready"])
+        pool.submit(request_line("boom", "crash"))
+        pool.submit(request_line("after", "0:ok"))
+        pool.close()
+        by_id = {m["id"]: m for m in self.emitted}
+        self.assertFalse(by_id["boom"]["ok"])
+        self.assertIn("exited", by_id["boom"]["error"])
+        self.assertTrue(by_id["after"]["ok"])
+        self.assertEqual(pool.respawns, 1)
+
+    def test_invalid_json_line_is_answered_without_dispatch(self) -> None:
+        pool = self.make_pool(workers=1)
+        self.assertTrue(pool.start()["ready"])
+        pool.submit("{not json")
+        pool.close()
+        self.assertEqual(len(self.emitted), 1)
+        self.assertFalse(self.emitted[0]["ok"])
+
+    def test_parse_request_validates_region_and_max_side(self) -> None:
+        image_b64 = base64.b64encode(b"img").decode("ascii")
+        request = self.mod.parse_request(
+            {"id": "a", "imageBase64": image_b64, "region": {"x0": 1.7, "y0": 2, "x1": 30, "y1": 40}, "maxSide": 64}
+        )
+        self.assertEqual(request.region, (1, 2, 30, 40))
+        self.assertEqual(request.max_side, 64)
+        for bad in ({"region": {"x0": 5, "y0": 0, "x1": 5, "y1": 9}}, {"region": [0, 0, 1, 1]}, {"maxSide": -1}):
+            with self.assertRaises(ValueError):
+                self.mod.parse_request({"imageBase64": image_b64, **bad})
+
+    def test_cache_key_depends_on_region_and_max_side(self) -> None:
+        full = self.mod.OcrRequest("a", b"img")
+        keys = {
+            self.mod.cache_key("ns", full),
+            self.mod.cache_key("ns", self.mod.OcrRequest("b", b"img", region=(0, 0, 5, 5))),
+            self.mod.cache_key("ns", self.mod.OcrRequest("c", b"img", max_side=32)),
+            self.mod.cache_key("other", full),
+        }
+        self.assertEqual(len(keys), 4)
+        self.assertEqual(self.mod.cache_key("ns", full), self.mod.cache_key("ns", self.mod.OcrRequest("z", b"img")))
+
+    def test_map_words_returns_original_coordinates(self) -> None:
+        words = [{"text": "R5", "confidence": 90.0, "bbox": {"x0": 10, "y0": 5, "x1": 20, "y1": 15}}]
+        mapped = self.mod._map_words(words, (100, 200), (0.5, 0.25))
+        self.assertEqual(mapped[0]["bbox"], {"x0": 120.0, "y0": 220.0, "x1": 140.0, "y1": 260.0})
+        self.assertEqual(mapped[0]["text"], "R5")
+
+    @unittest.skipIf(Image is None, "Pillow is not installed")
+    def test_prepare_image_crops_and_downscales(self) -> None:
+        from io import BytesIO
+
+        buf = BytesIO()
+        Image.new("RGB", (800, 600), (255, 255, 255)).save(buf, format="JPEG")
+        request = self.mod.OcrRequest("a", buf.getvalue(), region=(100, 100, 500, 300), max_side=200)
+        data, map_words = self.mod.prepare_image(request)
+        self.assertEqual(Image.open(BytesIO(data)).size, (200, 100))
+        mapped = map_words([{"text": "x", "confidence": None, "bbox": {"x0": 0, "y0": 0, "x1": 200, "y1": 100}}])
+        self.assertEqual(mapped[0]["bbox"], {"x0": 100.0, "y0": 100.0, "x1": 500.0, "y1": 300.0})
+
+    def test_serve_engine_answers_repeats_from_cache(self) -> None:
+        calls = []
+
+        def engine(data):
+            calls.append(data)
+            return [[[[0, 0], [1, 0], [1, 1], [0, 1]], "A", 0.9]]
+
+        cache = self.make_cache(max_entries=8)
+        lines = [request_line("a", "same"), request_line("b", "same"), request_line("c", "other"), '{"id":"s","stats":true}']
+        self.mod.serve_engine(engine, lines, self.emit, cache)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual([m.get("cached") for m in self.emitted[:3]], [False, True, False])
+        stats = self.emitted[3]["stats"]["cache"]
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 2))
+        self.assertAlmostEqual(stats["hitRatio"], 1 / 3, places=3)
+
+    def test_disk_cache_survives_restart_and_stays_bounded(self) -> None:
+        words = [{"text": "X" * 200, "confidence": 50.0, "bbox": {"x0": 0, "y0": 0, "x1": 1, "y1": 1}}]
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = self.make_cache(max_entries=8, directory=tmp, max_disk_bytes=1000)
+            keys = [f"{n:02x}" + "0" * 62 for n in range(6)]
+            for key in keys:
+                cache.put(key, words)
+            stats = cache.stats()
+            self.assertLessEqual(stats["diskBytes"], 1000)
+            self.assertLess(stats["diskEntries"], 6)
+            self.assertEqual(len(list(Path(tmp).glob("*/*.json"))), stats["diskEntries"])
+
+            reloaded = self.make_cache(max_entries=8, directory=tmp, max_disk_bytes=1000)
+            self.assertEqual(reloaded.get(keys[-1]), words)
+            self.assertIsNone(reloaded.get(keys[0]))
+            self.assertEqual(reloaded.stats()["diskHits"], 1)
+
+    def test_pool_serves_cache_hits_without_an_engine(self) -> None:
+        cache = self.make_cache(max_entries=8)
+        pool = self.make_pool(workers=1, cache=cache)
+        self.assertTrue(pool.start()["ready"])
+        pool.submit(request_line("first", "50:R5"))
+        pool.close()
+        pool = self.make_pool(workers=1, cache=cache)
+        self.assertTrue(pool.start()["ready"])
+        pool.submit(request_line("again", "50:R5"))
+        pool.submit('{"id":"s","stats":true}')
+        pool.close()
+        by_id = {m["id"]: m for m in self.emitted}
+        self.assertFalse(by_id["first"]["cached"])
+        self.assertTrue(by_id["again"]["cached"])
+        self.assertEqual(by_id["again"]["words"], by_id["first"]["words"])
+        self.assertEqual(by_id["s"]["stats"]["cache"]["hits"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
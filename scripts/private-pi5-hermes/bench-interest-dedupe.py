@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Benchmark near-duplicate collapsing of interest digest candidates.
+
+The synthetic pool repeats each story across feeds and Brave search results with the usual
+drift (site suffix on the title, reworded summary tail). Reported per pool size:
+
+  pairwise   exact Jaccard against every earlier representative (what bucketing avoids)
+  bucketed   collapse_near_duplicates() as shipped: MinHash band buckets, exact check on candidates
+  rank       rank_interest_items() on the raw pool vs on the collapsed pool
+  editorial  distinct stories among the top items handed to the editorial prompt, and its size
+
+examples:
+  python3 ./bench-interest-dedupe.py
+  python3 ./bench-interest-dedupe.py --stories 100 --stories 400 --copies 4 --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable
+
+from lib.life_interest_digest import (
+    NEAR_DUPLICATE_EXEMPT_SOURCES,
+    NEAR_DUPLICATE_JACCARD,
+    InterestItem,
+    _jaccard,
+    _shingles,
+    collapse_near_duplicates,
+    rank_interest_items,
+    read_interest_profile,
+)
+from lib.life_interest_editorial import _editorial_prompt_payload
+
+WORDS = (
+    "dgx spark gb10 vllm nvfp4 qwen local llm gateway cold start memory cron skill discord hermes agent "
+    "pilot browser weather forecast raspberry pi whisper speech home assistant sensor kernel driver "
+    "cuda tensor model serving quant prefix cache token stream latency release update benchmark guide"
+).split()
+SITES = ("Phoronix", "The Register", "GitHub", "Hacker News", "Zenn")
+
+
+def make_pool(rng: random.Random, stories: int, copies: int, now: datetime) -> list[InterestItem]:
+    items: list[InterestItem] = []
+    for story in range(stories):
+        title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 10)))
+        summary = " ".join(rng.choice(WORDS) for _ in range(rng.randint(25, 40)))
+        for copy in range(rng.randint(1, copies)):
+            source = "brave_web_search_bench" if copy % 2 else f"feed_{copy}"
+            items.append(
+                InterestItem(
+                    item_id=f"story-{story}-{copy}",
+                    source=source,
+                    source_label=source,
+                    title=title if copy == 0 else f"{title} - {rng.choice(SITES)}",
+                    url=f"https://bench.example/{story}/{copy}",
+                    summary=summary if copy == 0 else f"{summary} {rng.choice(WORDS)}",
+                    published_at=now - timedelta(hours=rng.randint(0, 72)),
+                    tags=("bench",),
+                )
+            )
+    rng.shuffle(items)
+    return items
+
+
+def pairwise_collapse(items: list[InterestItem]) -> list[InterestItem]:
+    """Same folding rule as collapse_near_duplicates(), comparing against every representative."""
+    order = sorted(range(len(items)), key=lambda index: (items[index].source.startswith("brave_web_search"), index))
+    representatives: list[tuple[frozenset[str], frozenset[str]]] = []
+    folded: set[int] = set()
+    for index in order:
+        item = items[index]
+        if item.source in NEAR_DUPLICATE_EXEMPT_SOURCES:
+            continue
+        title, current = _shingles(item.title), _shingles(f"{item.title} {item.summary}")
+        if any(
+            _jaccard(current, other) >= NEAR_DUPLICATE_JACCARD and _jaccard(title, other_title) >= NEAR_DUPLICATE_JACCARD
+            for other_title, other in representatives
+        ):
+            folded.add(index)
+            continue
+        representatives.append((title, current))
+    return [item for index, item in enumerate(items) if index not in folded]
+
+
+def _median_ms(run: Callable[[], Any], repeat: int) -> tuple[float, Any]:
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = run()
+        timings.append(time.perf_counter() - started)
+    return round(statistics.median(timings) * 1000, 2), result
+
+
+def _story(item: InterestItem) -> str:
+    return item.item_id.rsplit("-", 1)[0]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stories", type=int, action="append", help="distinct stories (repeatable)")
+    parser.add_argument("--copies", type=int, default=4, help="max copies of one story")
+    parser.add_argument("--top", type=int, default=5, help="items handed to the editorial prompt")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    now = datetime(2026, 6, 7, 10, 0).astimezone()
+    repeat = max(1, args.repeat)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        profile = read_interest_profile(root)
+        for stories in args.stories or [50, 200, 400]:
+            pool = make_pool(rng, stories, args.copies, now)
+            pairwise_ms, pairwise_kept = _median_ms(lambda: pairwise_collapse(pool), repeat)
+            bucketed_ms, (kept, _duplicates) = _median_ms(lambda: collapse_near_duplicates(pool), repeat)
+            raw_rank_ms, raw_ranked = _median_ms(
+                lambda: rank_interest_items(pool, profile, storage_root=root, now=now, include_seen=True), repeat
+            )
+            kept_rank_ms, kept_ranked = _median_ms(
+                lambda: rank_interest_items(kept, profile, storage_root=root, now=now, include_seen=True), repeat
+            )
+            raw_top, kept_top = tuple(raw_ranked[: args.top]), tuple(kept_ranked[: args.top])
+            results.append(
+                {
+                    "stories": stories,
+                    "pool": len(pool),
+                    "kept": len(kept),
+                    "pairwiseKept": len(pairwise_kept),
+                    "pairwiseMs": pairwise_ms,
+                    "bucketedMs": bucketed_ms,
+                    "rankRawMs": raw_rank_ms,
+                    "rankCollapsedMs": kept_rank_ms,
+                    "editorialStoriesRaw": len({_story(item) for item in raw_top}),
+                    "editorialStoriesCollapsed": len({_story(item) for item in kept_top}),
+                    "editorialPayloadBytesRaw": len(json.dumps(_editorial_prompt_payload(raw_top, now=now)).encode()),
+                    "editorialPayloadBytesCollapsed": len(
+                        json.dumps(_editorial_prompt_payload(kept_top, now=now)).encode()
+                    ),
+                }
+            )
+    print(json.dumps({"copies": args.copies, "top": args.top, "results": results}, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
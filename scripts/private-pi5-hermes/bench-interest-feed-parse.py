@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark interest digest feed parsing on large synthetic RSS / Atom documents.
+
+parser:
+  legacy     the previous parse: ET.fromstring() of the whole body, then the first 30 entries
+  streaming  parse_feed_items() as shipped: XMLPullParser, stops after the entry cap and at
+             the byte / element limits
+
+Reports median wall time and tracemalloc peak per document size.
+
+examples:
+  python3 ./bench-interest-feed-parse.py
+  python3 ./bench-interest-feed-parse.py --items 1000 --items 20000 --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from typing import Any, Callable
+
+from fake_feed_server import render_feed
+from lib.life_interest_digest import (
+    DEFAULT_POSITIVE_KEYWORDS,
+    MAX_FEED_ENTRIES,
+    _child_text,
+    _clip_line,
+    _entry_link,
+    _keywords_for_text,
+    _parse_datetime,
+    parse_feed_items,
+)
+
+
+def legacy_entry_count(body: str) -> int:
+    """Previous parse_feed_items(): whole tree first, then the same per-entry extraction."""
+    try:
+        root = ET.fromstring(body)
+    except ET.ParseError:
+        return 0
+    entries = [node for node in root.iter() if node.tag.rsplit("}", 1)[-1].lower() in {"item", "entry"}]
+    count = 0
+    for node in entries[:MAX_FEED_ENTRIES]:
+        title = _clip_line(_child_text(node, ("title",)), 180)
+        url = _clip_line(_entry_link(node), 300)
+        summary = _clip_line(_child_text(node, ("summary", "description", "content")), 240)
+        _parse_datetime(_child_text(node, ("published", "updated", "pubdate", "date")), None)
+        if title and url:
+            _keywords_for_text(f"{title} {summary}", iter(DEFAULT_POSITIVE_KEYWORDS))
+            count += 1
+    return count
+
+
+def streaming_entry_count(body: str) -> int:
+    return len(parse_feed_items(body, source="bench", source_label="Bench"))
+
+
+def _measure(parse: Callable[[str], int], body: str, repeat: int) -> dict[str, Any]:
+    timings = []
+    count = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        count = parse(body)
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    parse(body)
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"medianMs": round(statistics.median(timings) * 1000, 2), "peakKiB": round(peak / 1024, 1), "entries": count}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, action="append", help="entries per document (repeatable)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    results = []
+    for kind in ("rss", "atom"):
+        for items in args.items or [100, 2000, 20000]:
+            body = render_feed("atom-bench" if kind == "atom" else "rss-bench", items)
+            results.append(
+                {
+                    "format": kind,
+                    "items": items,
+                    "bodyKiB": round(len(body.encode("utf-8")) / 1024, 1),
+                    "legacy": _measure(legacy_entry_count, body, max(1, args.repeat)),
+                    "streaming": _measure(streaming_entry_count, body, max(1, args.repeat)),
+                }
+            )
+    print(json.dumps({"results": results}, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
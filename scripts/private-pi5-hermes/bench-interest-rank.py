@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark interest ranking keyword matching at large keyword and item counts.
+
+matcher:
+  legacy    the previous loop: `keyword in text` for every profile keyword on every item
+  compiled  rank_interest_items() as shipped: KeywordMatcher, i.e. one trie-regex pass per item
+            once the profile has COMPILED_KEYWORD_THRESHOLD keywords (plain checks below that)
+
+Both rankings are compared (score, reasons, order) before timing is reported.
+
+examples:
+  python3 ./bench-interest-rank.py
+  python3 ./bench-interest-rank.py --keywords 50 --keywords 2000 --items 700 --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import time
+from dataclasses import replace
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from lib.life_interest_digest import InterestItem, _score_keywords, rank_interest_items
+
+WORDS = (
+    "dgx spark gb10 vllm nvfp4 qwen local llm gateway cold start memory cron skill discord hermes agent "
+    "pilot browser weather forecast raspberry pi whisper speech home assistant sensor kernel driver "
+    "cuda tensor model serving quant prefix cache token stream latency 天気 音声 推論 量子化 "
+    "ラズパイ 家電 自動化 発表 更新 比較"
+).split()
+
+
+def _phrase(rng: random.Random, low: int, high: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(low, high)))
+
+
+def make_profile(rng: random.Random, keywords: int) -> dict[str, Any]:
+    positive = [f"{_phrase(rng, 1, 2)}{rng.choice(['', str(rng.randint(0, 99))])}" for _ in range(keywords)]
+    negative = [_phrase(rng, 1, 2) for _ in range(max(1, keywords // 10))]
+    return {"positiveKeywords": positive, "negativeKeywords": negative, "sourceWeights": {"forum": 2}}
+
+
+def make_items(rng: random.Random, count: int, now: datetime) -> list[InterestItem]:
+    return [
+        InterestItem(
+            item_id=f"item-{index}",
+            source=rng.choice(["forum", "github", "brave"]),
+            source_label="Bench",
+            title=_phrase(rng, 6, 14),
+            url=f"https://bench.example/{index}",
+            summary=_phrase(rng, 20, 40),
+            published_at=now - timedelta(hours=rng.randint(0, 200)),
+            tags=tuple(rng.choice(WORDS) for _ in range(2)),
+        )
+        for index in range(count)
+    ]
+
+
+def legacy_rank(items: list[InterestItem], profile: dict[str, Any], now: datetime) -> list[tuple[str, float, tuple[str, ...]]]:
+    """Previous rank_interest_items() scoring, seen filtering left out."""
+    positive, negative = _score_keywords(profile)
+    source_weights = profile.get("sourceWeights", {})
+    ranked = []
+    for item in items:
+        text = f"{item.title} {item.summary} {' '.join(item.tags)}".lower()
+        score = 1.0
+        reasons: list[str] = []
+        for keyword in positive:
+            if keyword in text:
+                score += 1.5
+                if len(reasons) < 3:
+                    reasons.append(f"{keyword} に関係")
+        for keyword in negative:
+            if keyword in text:
+                score -= 2.0
+        source_weight = int(source_weights.get(item.source, 0) or 0)
+        if source_weight:
+            score += source_weight * 0.5
+            if source_weight > 0 and len(reasons) < 3:
+                reasons.append(f"{item.source_label}をよく選んでいる")
+        when = item.published_at or item.captured_at
+        if when is not None and max(0.0, (now - when).total_seconds() / 3600) < 48:
+            score += 1.0
+            if len(reasons) < 3:
+                reasons.append("新しめ")
+        if not reasons:
+            reasons.append("登録済みの関心領域に近い")
+        ranked.append(replace(item, score=score, reasons=tuple(reasons)))
+    ranked.sort(key=lambda item: (item.score, item.published_at or item.captured_at or now), reverse=True)
+    return [(item.item_id, item.score, item.reasons) for item in ranked]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keywords", type=int, action="append", help="positive keywords (repeatable)")
+    parser.add_argument("--items", type=int, default=700)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    now = datetime(2026, 6, 7, 10, 0).astimezone()
+    items = make_items(rng, args.items, now)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        for keywords in args.keywords or [20, 200, 2000]:
+            profile = make_profile(rng, keywords)
+            expected = legacy_rank(items, profile, now)
+            started = time.perf_counter()
+            compiled = rank_interest_items(items, profile, storage_root=root, now=now, include_seen=True)
+            first_sec = time.perf_counter() - started
+            actual = [(item.item_id, item.score, item.reasons) for item in compiled]
+            if actual != expected:
+                raise SystemExit(f"ranking mismatch at {keywords} keywords")
+            timings: dict[str, list[float]] = {"legacy": [], "compiled": []}
+            for _ in range(max(1, args.repeat)):
+                started = time.perf_counter()
+                legacy_rank(items, profile, now)
+                timings["legacy"].append(time.perf_counter() - started)
+                started = time.perf_counter()
+                rank_interest_items(items, profile, storage_root=root, now=now, include_seen=True)
+                timings["compiled"].append(time.perf_counter() - started)
+            results.append(
+                {
+                    "keywords": keywords,
+                    "items": len(items),
+                    "legacyMs": round(statistics.median(timings["legacy"]) * 1000, 2),
+                    "compiledMs": round(statistics.median(timings["compiled"]) * 1000, 2),
+                    "compiledFirstCallMs": round(first_sec * 1000, 2),
+                    "identical": True,
+                }
+            )
+    print(json.dumps({"results": results}, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
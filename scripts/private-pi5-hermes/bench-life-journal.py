@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Benchmark Life Pilot JSONL record updates: full read/rewrite vs the append-only journal.
+
+Each round on an inbox-shaped file of N records does what the bridge does per Discord event:
+
+  capture   dedupe by messageId, then append a new record
+  status    change one record's status (e.g. /inbox done)
+  suggest   bump one record's suggestedCount (proactive check-in)
+
+store:
+  legacy    the previous helpers: parse every line, scan, rewrite the whole file via temp + rename
+  journal   JsonlJournal as shipped: indexed lookup, one appended line, amortized compaction
+
+Both stores are compared (latest record per itemId) after the rounds before timing is reported.
+
+examples:
+  python3 ./bench-life-journal.py
+  python3 ./bench-life-journal.py --records 5000 --records 50000 --rounds 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from lib.life_journal import JsonlJournal
+
+
+def make_record(index: int) -> dict[str, Any]:
+    return {
+        "itemId": f"discord-20260607-{index}",
+        "messageId": str(10**17 + index),
+        "createdAt": "2026-06-07T10:00:00+09:00",
+        "source": "discord",
+        "text": f"shared link {index} https://example.test/{index}",
+        "urls": [f"https://example.test/{index}"],
+        "status": "new",
+    }
+
+
+def _read_jsonl(path: Path) -> list[dict[str, Any]]:
+    rows = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if line.strip():
+            rows.append(json.loads(line))
+    return rows
+
+
+def _write_jsonl(path: Path, rows: list[dict[str, Any]]) -> None:
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=path.parent, delete=False) as handle:
+        tmp_path = Path(handle.name)
+        for row in rows:
+            handle.write(json.dumps(row, ensure_ascii=False, sort_keys=True) + "\n")
+    tmp_path.replace(path)
+
+
+def legacy_round(path: Path, new: dict[str, Any], target: str) -> None:
+    rows = _read_jsonl(path)
+    if not any(row.get("messageId") == new["messageId"] for row in rows):
+        with path.open("a", encoding="utf-8") as handle:
+            handle.write(json.dumps(new, ensure_ascii=False, sort_keys=True) + "\n")
+    rows = _read_jsonl(path)
+    for row in rows:
+        if row.get("itemId") == target:
+            row["status"] = "done"
+            break
+    _write_jsonl(path, rows)
+    rows = _read_jsonl(path)
+    for row in rows:
+        if row.get("itemId") == target:
+            row["suggestedCount"] = int(row.get("suggestedCount", 0)) + 1
+            break
+    _write_jsonl(path, rows)
+
+
+def journal_round(journal: JsonlJournal, new: dict[str, Any], target: str) -> None:
+    if journal.find("messageId", new["messageId"]) is None:
+        journal.put(new)
+    journal.update(target, {"status": "done"})
+    current = journal.get(target) or {}
+    journal.update(target, {"suggestedCount": int(current.get("suggestedCount", 0)) + 1})
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, action="append", help="records already in the file (repeatable)")
+    parser.add_argument("--rounds", type=int, default=30, help="capture + status + suggest rounds")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for records in args.records or [2000, 20000, 50000]:
+            rng = random.Random(args.seed)
+            seed_rows = "".join(json.dumps(make_record(index), sort_keys=True) + "\n" for index in range(records))
+            legacy_path = Path(tmp) / f"legacy-{records}.jsonl"
+            journal_path = Path(tmp) / f"journal-{records}.jsonl"
+            legacy_path.write_text(seed_rows, encoding="utf-8")
+            journal_path.write_text(seed_rows, encoding="utf-8")
+            plan = [
+                (make_record(records + rng.randint(0, args.rounds)), f"discord-20260607-{rng.randrange(records)}")
+                for _ in range(args.rounds)
+            ]
+
+            timings: dict[str, list[float]] = {"legacy": [], "journal": []}
+            for new, target in plan:
+                started = time.perf_counter()
+                legacy_round(legacy_path, new, target)
+                timings["legacy"].append(time.perf_counter() - started)
+            started = time.perf_counter()
+            journal = JsonlJournal(journal_path, key_field="itemId", index_fields=("messageId",))
+            len(journal)
+            cold_sec = time.perf_counter() - started
+            for new, target in plan:
+                started = time.perf_counter()
+                journal_round(journal, new, target)
+                timings["journal"].append(time.perf_counter() - started)
+
+            expected = {row["itemId"]: row for row in _read_jsonl(legacy_path)}
+            actual = {
+                row["itemId"]: row
+                for row in JsonlJournal(journal_path, key_field="itemId").records()
+            }
+            if actual != expected:
+                raise SystemExit(f"journal and legacy stores differ at {records} records")
+            results.append(
+                {
+                    "records": records,
+                    "rounds": args.rounds,
+                    "legacyRoundMs": round(statistics.median(timings["legacy"]) * 1000, 3),
+                    "journalRoundMs": round(statistics.median(timings["journal"]) * 1000, 3),
+                    "journalWorstRoundMs": round(max(timings["journal"]) * 1000, 3),
+                    "journalColdLoadMs": round(cold_sec * 1000, 2),
+                    "legacyLines": len(legacy_path.read_text(encoding="utf-8").splitlines()),
+                    "journalLines": len(journal_path.read_text(encoding="utf-8").splitlines()),
+                    "identical": True,
+                }
+            )
+    print(json.dumps({"results": results}, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Local RSS / Atom stand-in for the interest digest feed collector tests and benchmark.
+
+Implements what collect_feed_items() needs from a real feed host:
+- GET /feeds/<name>.xml  RSS 2.0 (or Atom for names starting with `atom`) with ETag /
+                         Last-Modified; If-None-Match / If-Modified-Since answer 304
+- GET /stats             per-feed request counts, 304 count and peak concurrent requests
+
+Per-request latency (and per-feed overrides) make sequential vs parallel collection and
+the 304 short-circuit measurable without touching the network. A per-feed trickle sends the
+body a few bytes at a time, like a slow host that never stalls long enough for a read timeout.
+
+usage:
+  python3 ./fake_feed_server.py --port 38190 --feeds 12 --items 40 --latency-ms 300
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sys
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from xml.sax.saxutils import escape
+
+
+def render_feed(name: str, items: int, revision: int = 0) -> str:
+    """Deterministic feed body; bump `revision` to publish new entries."""
+    if name.startswith("atom"):
+        entries = "".join(
+            "  <entry>\n"
+            f"    <title>{escape(name)} vLLM note {revision}-{index}</title>\n"
+            f'    <link href="https://feeds.example.test/{escape(name)}/{revision}/{index}"/>\n'
+            f"    <summary>Local LLM serving update {index} for {escape(name)}.</summary>\n"
+            f"    <updated>2026-06-07T{index % 24:02d}:00:00+00:00</updated>\n"
+            "  </entry>\n"
+            for index in range(items)
+        )
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<feed xmlns="http://www.w3.org/2005/Atom">\n'
+            f"  <title>{escape(name)}</title>\n{entries}</feed>\n"
+        )
+    entries = "".join(
+        "    <item>\n"
+        f"      <title>{escape(name)} DGX Spark report {revision}-{index}</title>\n"
+        f"      <link>https://feeds.example.test/{escape(name)}/{revision}/{index}</link>\n"
+        f"      <description>vLLM and Raspberry Pi notes {index} from {escape(name)}.</description>\n"
+        f"      <pubDate>Sun, 07 Jun 2026 {index % 24:02d}:00:00 +0000</pubDate>\n"
+        "    </item>\n"
+        for index in range(items)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n<rss version="2.0">\n  <channel>\n'
+        f"    <title>{escape(name)}</title>\n{entries}  </channel>\n</rss>\n"
+    )
+
+
+class FakeFeedState:
+    def __init__(self, latency_ms: float = 0.0, items: int = 20) -> None:
+        self.latency_ms = latency_ms
+        self.items = items
+        self._lock = threading.Lock()
+        self._feeds: dict[str, tuple[bytes, str, str]] = {}
+        self._latency_overrides: dict[str, float] = {}
+        self._trickles: dict[str, tuple[int, float]] = {}
+        self._inflight = 0
+        self.max_inflight = 0
+        self.requests: dict[str, int] = {}
+        self.not_modified = 0
+
+    def publish(self, name: str, revision: int = 0, body: str | None = None) -> None:
+        """(Re)publish a feed; a new body gets a new ETag and Last-Modified."""
+        raw = (body if body is not None else render_feed(name, self.items, revision)).encode("utf-8")
+        etag = '"' + hashlib.sha256(raw).hexdigest()[:16] + '"'
+        with self._lock:
+            self._feeds[name] = (raw, etag, formatdate(time.time() + revision, usegmt=True))
+
+    def set_latency(self, name: str, latency_ms: float) -> None:
+        with self._lock:
+            self._latency_overrides[name] = latency_ms
+
+    def set_trickle(self, name: str, chunk_bytes: int, interval_ms: float) -> None:
+        """Send this feed's body `chunk_bytes` at a time, `interval_ms` apart."""
+        with self._lock:
+            self._trickles[name] = (chunk_bytes, interval_ms)
+
+    def trickle(self, name: str) -> tuple[int, float] | None:
+        with self._lock:
+            return self._trickles.get(name)
+
+    def request_count(self, name: str) -> int:
+        with self._lock:
+            return self.requests.get(name, 0)
+
+    def begin(self, name: str) -> tuple[tuple[bytes, str, str] | None, float]:
+        with self._lock:
+            self.requests[name] = self.requests.get(name, 0) + 1
+            self._inflight += 1
+            self.max_inflight = max(self.max_inflight, self._inflight)
+            return self._feeds.get(name), self._latency_overrides.get(name, self.latency_ms)
+
+    def end(self, not_modified: bool) -> None:
+        with self._lock:
+            self._inflight -= 1
+            if not_modified:
+                self.not_modified += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": dict(self.requests),
+                "notModified": self.not_modified,
+                "maxInflight": self.max_inflight,
+            }
+
+
+def make_handler(state: FakeFeedState) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(
+            self,
+            status: int,
+            body: bytes,
+            content_type: str,
+            headers: dict[str, str] | None = None,
+            trickle: tuple[int, float] | None = None,
+        ) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            if not body:
+                return
+            if trickle is None:
+                self.wfile.write(body)
+                return
+            chunk_bytes, interval_ms = trickle
+            try:
+                for offset in range(0, len(body), chunk_bytes):
+                    self.wfile.write(body[offset : offset + chunk_bytes])
+                    self.wfile.flush()
+                    time.sleep(interval_ms / 1000.0)
+            except OSError:
+                self.close_connection = True
+
+        def do_GET(self) -> None:  # noqa: N802
+            path = self.path.split("?", 1)[0]
+            if path == "/stats":
+                self._send(200, json.dumps(state.stats()).encode("utf-8"), "application/json")
+                return
+            if not (path.startswith("/feeds/") and path.endswith(".xml")):
+                self._send(404, b"not found", "text/plain")
+                return
+            name = path[len("/feeds/") : -len(".xml")]
+            feed, latency_ms = state.begin(name)
+            not_modified = False
+            try:
+                if latency_ms > 0:
+                    time.sleep(latency_ms / 1000.0)
+                if feed is None:
+                    self._send(404, b"unknown feed", "text/plain")
+                    return
+                body, etag, last_modified = feed
+                validators = {"ETag": etag, "Last-Modified": last_modified}
+                if self.headers.get("If-None-Match") == etag or (
+                    self.headers.get("If-None-Match") is None and self.headers.get("If-Modified-Since") == last_modified
+                ):
+                    not_modified = True
+                    self._send(304, b"", "application/xml", validators)
+                    return
+                self._send(200, body, "application/xml; charset=utf-8", validators, state.trickle(name))
+            finally:
+                state.end(not_modified)
+
+        def log_message(self, fmt: str, *args: object) -> None:
+            return
+
+    return Handler
+
+
+def start_fake_feed_server(
+    feeds: int = 4,
+    items: int = 20,
+    latency_ms: float = 0.0,
+    host: str = "127.0.0.1",
+    port: int = 0,
+) -> tuple[ThreadingHTTPServer, FakeFeedState]:
+    """Serve `feed-0` .. `feed-{n-1}` in a background thread; returns (server, state)."""
+    state = FakeFeedState(latency_ms=latency_ms, items=items)
+    for index in range(feeds):
+        state.publish(f"feed-{index}")
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fake-feed-server", daemon=True).start()
+    return server, state
+
+
+def feed_sources(server: ThreadingHTTPServer, names: list[str]) -> tuple[dict[str, str], ...]:
+    """DEFAULT_FEED_SOURCES-shaped entries pointing at the fake server."""
+    host, port = server.server_address[:2]
+    return tuple(
+        {"source": name, "label": f"Fake {name}", "url": f"http://{host}:{port}/feeds/{name}.xml"} for name in names
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=38190)
+    parser.add_argument("--feeds", type=int, default=8)
+    parser.add_argument("--items", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    state = FakeFeedState(latency_ms=args.latency_ms, items=args.items)
+    for index in range(args.feeds):
+        state.publish(f"feed-{index}")
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(state))
+    server.daemon_threads = True
+    print(f"[fake-feed-server] listening on http://{args.host}:{args.port}/feeds/feed-0.xml", file=sys.stderr)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -68,6 +68,8 @@ def dgx_config_from_env_file(
         upstream_timeout_sec=float(values.get("UPSTREAM_TIMEOUT_SEC", "45")),
         ready_timeout_sec=float(values.get("DGX_RUNTIME_READY_TIMEOUT_SEC", "600")),
         ready_poll_sec=float(values.get("DGX_RUNTIME_READY_POLL_SEC", "1")),
+        runtime_ready_wait_path=values.get("DGX_RUNTIME_READY_WAIT_PATH", "/system/ready").strip(),
+        ready_long_poll_sec=float(values.get("DGX_RUNTIME_READY_LONG_POLL_SEC", "25")),
         auto_start=auto,
         model_profile_id=model_profile_id,
     )
@@ -6,8 +6,9 @@ from __future__ import annotations
 import asyncio
 from contextlib import contextmanager
 from dataclasses import dataclass
-import json
 import re
+import socket
+import uuid
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Iterator
@@ -23,12 +24,14 @@ except ImportError:  # pragma: no cover
     yaml = None  # type: ignore[assignment]
 
 try:
+    from .life_journal import JsonlJournal, open_journal
     from .life_pilot_policy import (
         LifePilotPolicy,
         validate_life_pilot_document,
         validate_life_prompt,
     )
 except ImportError:
+    from life_journal import JsonlJournal, open_journal
     from life_pilot_policy import (
         LifePilotPolicy,
         validate_life_pilot_document,
@@ -344,6 +347,28 @@ def _reminder_file_lock(root: Path) -> Iterator[None]:
                 fcntl.flock(handle, fcntl.LOCK_UN)
 
 
+def _reminders_journal(root: Path) -> JsonlJournal:
+    return open_journal(root / "reminders" / "reminders.jsonl", key_field="id")
+
+
+def _due_scheduler_socket_path(root: Path) -> Path:
+    return root / "scheduler" / "wake.sock"
+
+
+def _notify_due_scheduler(root: Path) -> bool:
+    """Wake a running `life_due_scheduler` so it picks up a new deadline now (best effort)."""
+    path = _due_scheduler_socket_path(root)
+    if not path.exists() or not hasattr(socket, "AF_UNIX"):
+        return False
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+            sock.setblocking(False)
+            sock.sendto(b"wake", str(path))
+    except OSError:
+        return False
+    return True
+
+
 def _append_memo(root: Path, memo: str, now: datetime) -> Path:
     _ensure_storage(root)
     notes_path = root / "notes" / f"{_date_key(now)}.md"
@@ -365,6 +390,7 @@ def _append_reminder(
     parsed = parse_reminder_text(reminder, now)
     reminders_path = root / "reminders" / "reminders.jsonl"
     item = {
+        "id": f"reminder-{now.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}",
         "createdAt": now.isoformat(timespec="seconds"),
         "text": parsed.text.strip(),
         "status": "pending",
@@ -382,8 +408,9 @@ def _append_reminder(
         else:
             notification = "needs-channel"
     with _reminder_file_lock(root):
-        with reminders_path.open("a", encoding="utf-8") as handle:
-            handle.write(json.dumps(item, ensure_ascii=False, sort_keys=True) + "\n")
+        _reminders_journal(root).put(item)
+    if parsed.due_at is not None:
+        _notify_due_scheduler(root)
     return ReminderRecordResult(
         path=reminders_path,
         text=item["text"],
@@ -416,19 +443,7 @@ def _read_note_entries(root: Path, limit: int = 8) -> list[tuple[str, str]]:
 
 
 def _read_pending_reminders(root: Path, limit: int = 8) -> list[dict[str, Any]]:
-    path = root / "reminders" / "reminders.jsonl"
-    if not path.is_file():
-        return []
-    pending: list[dict[str, Any]] = []
-    for line in path.read_text(encoding="utf-8", errors="replace").splitlines():
-        if not line.strip():
-            continue
-        try:
-            item = json.loads(line)
-        except json.JSONDecodeError:
-            continue
-        if isinstance(item, dict) and item.get("status") == "pending":
-            pending.append(item)
+    pending = [item for item in _reminders_journal(root).records() if item.get("status") == "pending"]
     return pending[-limit:][::-1]
 
 
@@ -6,10 +6,8 @@ from __future__ import annotations
 from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-import json
 from pathlib import Path
 import re
-import tempfile
 from typing import Any, Iterator
 
 try:
@@ -17,6 +15,11 @@ try:
 except ImportError:  # pragma: no cover
     fcntl = None  # type: ignore[assignment]
 
+try:
+    from .life_journal import JsonlJournal, open_journal
+except ImportError:
+    from life_journal import JsonlJournal, open_journal
+
 
 _URL_RE = re.compile(r"https?://[^\s<>\]\)\"']+", re.IGNORECASE)
 _SENSITIVE_RE = re.compile(
@@ -312,40 +315,8 @@ def _inbox_file_lock(root: Path) -> Iterator[None]:
                 fcntl.flock(handle, fcntl.LOCK_UN)
 
 
-def _append_jsonl(path: Path, item: dict[str, Any]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("a", encoding="utf-8") as handle:
-        handle.write(json.dumps(item, ensure_ascii=False, sort_keys=True) + "\n")
-
-
-def _write_jsonl(path: Path, rows: list[dict[str, Any]]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with tempfile.NamedTemporaryFile(
-        "w",
-        encoding="utf-8",
-        dir=path.parent,
-        delete=False,
-    ) as handle:
-        tmp_path = Path(handle.name)
-        for item in rows:
-            handle.write(json.dumps(item, ensure_ascii=False, sort_keys=True) + "\n")
-    tmp_path.replace(path)
-
-
-def _read_jsonl(path: Path) -> list[dict[str, Any]]:
-    if not path.is_file():
-        return []
-    rows: list[dict[str, Any]] = []
-    for line in path.read_text(encoding="utf-8", errors="replace").splitlines():
-        if not line.strip():
-            continue
-        try:
-            item = json.loads(line)
-        except json.JSONDecodeError:
-            continue
-        if isinstance(item, dict):
-            rows.append(item)
-    return rows
+def _inbox_journal(root: Path) -> JsonlJournal:
+    return open_journal(_inbox_path(root), key_field="itemId", index_fields=("messageId",))
 
 
 def _normalize_url(raw: str) -> str:
@@ -507,11 +478,10 @@ def capture_discord_inbox_message(
     }
     kind = "link" if urls else "attachment" if attachments else "text"
     with _inbox_file_lock(storage_root):
-        if clean_message_id:
-            for row in _read_jsonl(_inbox_path(storage_root)):
-                if str(row.get("messageId", "") or "").strip() == clean_message_id:
-                    return DiscordInboxCaptureResult(True, "duplicate", _ack(kind))
-        _append_jsonl(_inbox_path(storage_root), record)
+        journal = _inbox_journal(storage_root)
+        if clean_message_id and journal.find("messageId", clean_message_id) is not None:
+            return DiscordInboxCaptureResult(True, "duplicate", _ack(kind))
+        journal.put(record)
     return DiscordInboxCaptureResult(True, kind, _ack(kind))
 
 
@@ -563,7 +533,7 @@ def read_discord_inbox(
         _normalize_status(status) for status in (statuses or tuple(_ACTIVE_INBOX_STATUSES))
     }
     items: list[DiscordInboxItem] = []
-    for index, row in enumerate(_read_jsonl(_inbox_path(storage_root))):
+    for index, row in enumerate(_inbox_journal(storage_root).records()):
         created_at = _parse_created_at(str(row.get("createdAt", "") or ""), current.tzinfo)
         if created_at is None or created_at < cutoff:
             continue
@@ -771,29 +741,36 @@ def update_discord_inbox_item_status(
     if clean_status not in _VALID_INBOX_STATUSES:
         raise ValueError(f"unsupported Discord inbox status: {status}")
     current = now or _now()
-    path = _inbox_path(storage_root)
+    changes: dict[str, Any] = {
+        "status": clean_status,
+        "updatedAt": current.isoformat(timespec="seconds"),
+        f"{clean_status}At": current.isoformat(timespec="seconds"),
+    }
+    if note:
+        changes["statusNote"] = _clip_line(note, 240)
+    for key, value in (extra or {}).items():
+        if isinstance(value, str):
+            changes[key] = _clip_line(value, 240)
+        elif isinstance(value, (int, float, bool)):
+            changes[key] = value
     with _inbox_file_lock(storage_root):
-        rows = _read_jsonl(path)
-        changed = False
-        for index, row in enumerate(rows):
-            if not _row_matches_item(row, index, item, current.tzinfo):
-                continue
-            row["status"] = clean_status
-            row["updatedAt"] = current.isoformat(timespec="seconds")
-            row[f"{clean_status}At"] = current.isoformat(timespec="seconds")
-            if note:
-                row["statusNote"] = _clip_line(note, 240)
-            if extra:
-                for key, value in extra.items():
-                    if isinstance(value, str):
-                        row[key] = _clip_line(value, 240)
-                    elif isinstance(value, (int, float, bool)):
-                        row[key] = value
-            changed = True
-            break
-        if changed:
-            _write_jsonl(path, rows)
-        return changed
+        journal = _inbox_journal(storage_root)
+        key = _find_inbox_key(journal, item, current.tzinfo)
+        return key is not None and journal.update(key, changes) is not None
+
+
+def _find_inbox_key(journal: JsonlJournal, item: DiscordInboxItem, fallback_tz: Any) -> str | None:
+    if item.item_id and journal.get(item.item_id) is not None:
+        return item.item_id
+    if item.message_id:
+        found = journal.find("messageId", item.message_id)
+        if found is not None:
+            return found[0]
+    # legacy rows without itemId: same matching as before, over the latest versions
+    for index, (key, row) in enumerate(journal.items()):
+        if _row_matches_item(row, index, item, fallback_tz):
+            return key
+    return None
 
 
 def mark_discord_inbox_suggested(
@@ -807,25 +784,25 @@ def mark_discord_inbox_suggested(
     if not clean_id:
         return False
     current = now or _now()
-    path = _inbox_path(storage_root)
     with _inbox_file_lock(storage_root):
-        rows = _read_jsonl(path)
-        changed = False
-        for index, row in enumerate(rows):
-            created_at = _parse_created_at(str(row.get("createdAt", "") or ""), current.tzinfo)
-            if created_at is None:
-                continue
-            if _row_item_id(row, index, created_at) != clean_id:
-                continue
-            row["lastSuggestedAt"] = current.isoformat(timespec="seconds")
-            row["suggestedCount"] = _coerce_suggested_count(row.get("suggestedCount")) + 1
-            if checkin_id:
-                row["lastSuggestedCheckinId"] = _clip_line(checkin_id, 120)
-            changed = True
-            break
-        if changed:
-            _write_jsonl(path, rows)
-        return changed
+        journal = _inbox_journal(storage_root)
+        row = journal.get(clean_id)
+        key = clean_id if row is not None else None
+        if key is None:
+            for index, (candidate_key, candidate) in enumerate(journal.items()):
+                created_at = _parse_created_at(str(candidate.get("createdAt", "") or ""), current.tzinfo)
+                if created_at is not None and _row_item_id(candidate, index, created_at) == clean_id:
+                    key, row = candidate_key, candidate
+                    break
+        if key is None or row is None:
+            return False
+        changes: dict[str, Any] = {
+            "lastSuggestedAt": current.isoformat(timespec="seconds"),
+            "suggestedCount": _coerce_suggested_count(row.get("suggestedCount")) + 1,
+        }
+        if checkin_id:
+            changes["lastSuggestedCheckinId"] = _clip_line(checkin_id, 120)
+        return journal.update(key, changes) is not None
 
 
 def should_attach_discord_inbox_reference_context(text: str) -> bool:
@@ -868,9 +845,9 @@ def prune_discord_inbox(
 ) -> int:
     current = now or _now()
     cutoff = current - timedelta(days=keep_days)
-    path = _inbox_path(storage_root)
     with _inbox_file_lock(storage_root):
-        rows = _read_jsonl(path)
+        journal = _inbox_journal(storage_root)
+        rows = journal.records()
         kept: list[dict[str, Any]] = []
         for row in rows:
             created_at = _parse_created_at(str(row.get("createdAt", "") or ""), current.tzinfo)
@@ -878,7 +855,7 @@ def prune_discord_inbox(
                 kept.append(row)
         kept = kept[-keep_latest:]
         if len(kept) != len(rows):
-            _write_jsonl(path, kept)
+            journal.rewrite(kept)
         return len(rows) - len(kept)
 
 
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""Resident scheduler that sends Life Pilot reminders and follow-ups at their due time.
+
+Instead of a timer rescanning every record each minute, deadlines sit in a min-heap
+fed incrementally from the reminders / follow-ups journals. The loop sleeps until the
+earliest deadline, or until `/remind` or a snoozed check-in wakes it through
+`scheduler/wake.sock`, and sends through `send_discord_channel_message` using the
+same per-record helpers as the timer entry points (`dispatch_due_reminders`,
+`dispatch_due_followups`). Each record is re-checked under its file lock right before
+sending, so a timer run or a second scheduler cannot double-send.
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+from datetime import datetime
+import heapq
+import json
+import os
+from pathlib import Path
+import select
+import signal
+import socket
+import threading
+from typing import Any, Callable, Protocol
+
+try:
+    from .discord_life_pilot_bridge import (
+        _due_scheduler_socket_path,
+        _reminder_file_lock,
+        _reminders_journal,
+    )
+    from .life_journal import JsonlJournal
+    from .life_proactive_loop import (
+        ProactiveSender,
+        _followups_journal,
+        _proactive_file_lock,
+        followup_due_at,
+        send_followup,
+    )
+    from .life_reminder_scheduler import (
+        ReminderSender,
+        _env_sender,
+        notify_reminder,
+        reminder_due_at,
+    )
+except ImportError:
+    from discord_life_pilot_bridge import (
+        _due_scheduler_socket_path,
+        _reminder_file_lock,
+        _reminders_journal,
+    )
+    from life_journal import JsonlJournal
+    from life_proactive_loop import (
+        ProactiveSender,
+        _followups_journal,
+        _proactive_file_lock,
+        followup_due_at,
+        send_followup,
+    )
+    from life_reminder_scheduler import (
+        ReminderSender,
+        _env_sender,
+        notify_reminder,
+        reminder_due_at,
+    )
+
+
+DEFAULT_MAX_SLEEP_SEC = 300.0
+DEFAULT_RETRY_SEC = 60.0
+
+Clock = Callable[[], datetime]
+
+
+class Waker(Protocol):
+    def wait(self, timeout: float) -> bool:
+        """Block up to `timeout` seconds; True when woken by a change notification."""
+
+
+@dataclass(frozen=True)
+class DueSchedulerTick:
+    sent: int = 0
+    failed: int = 0
+    skipped_missing_channel: int = 0
+    next_due_at: datetime | None = None
+
+
+def _now() -> datetime:
+    return datetime.now().astimezone()
+
+
+class DueScheduler:
+    """Min-heap of reminder / follow-up deadlines (see module docstring)."""
+
+    def __init__(
+        self,
+        storage_root: Path,
+        *,
+        clock: Clock = _now,
+        reminder_sender: ReminderSender | None = None,
+        followup_sender: ProactiveSender | None = None,
+        followups: bool = True,
+        channel_id: str = "",
+        user_id: str = "",
+        retry_sec: float = DEFAULT_RETRY_SEC,
+    ) -> None:
+        self.storage_root = storage_root
+        self.clock = clock
+        self.reminder_sender = reminder_sender
+        self.followup_sender = followup_sender
+        self.kinds = ("reminder", "followup") if followups else ("reminder",)
+        self.channel_id = channel_id
+        self.user_id = user_id
+        self.retry_sec = retry_sec
+        # entries are (due timestamp, kind, key); `_due` holds the live one per record,
+        # anything else popped from the heap is stale and skipped
+        self._heap: list[tuple[float, str, str]] = []
+        self._due: dict[tuple[str, str], float] = {}
+        self._not_before: dict[tuple[str, str], float] = {}
+        self._cursors = {kind: 0 for kind in self.kinds}
+
+    def _journal(self, kind: str) -> JsonlJournal:
+        if kind == "reminder":
+            return _reminders_journal(self.storage_root)
+        return _followups_journal(self.storage_root)
+
+    def _record_due(self, kind: str, record: dict[str, Any], fallback_tz: Any) -> datetime | None:
+        if kind == "reminder":
+            return reminder_due_at(record)
+        return followup_due_at(record, fallback_tz)
+
+    def _schedule(self, kind: str, key: str, due_at: datetime | None) -> None:
+        slot = (kind, key)
+        if due_at is None:
+            self._due.pop(slot, None)
+            self._not_before.pop(slot, None)
+            return
+        when = max(due_at.timestamp(), self._not_before.get(slot, 0.0))
+        if self._due.get(slot) != when:
+            self._due[slot] = when
+            heapq.heappush(self._heap, (when, kind, key))
+
+    def refresh(self) -> None:
+        """Fold records appended since the last call into the heap."""
+        tz = self.clock().tzinfo
+        for kind in self.kinds:
+            cursor, changed = self._journal(kind).changes(self._cursors[kind])
+            self._cursors[kind] = cursor
+            for key, record in changed:
+                self._schedule(kind, key, self._record_due(kind, record, tz))
+
+    def next_due_at(self) -> datetime | None:
+        while self._heap and self._due.get((self._heap[0][1], self._heap[0][2])) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return None
+        return datetime.fromtimestamp(self._heap[0][0], tz=self.clock().tzinfo)
+
+    def seconds_until_next(self, max_sleep: float = DEFAULT_MAX_SLEEP_SEC) -> float:
+        due_at = self.next_due_at()
+        if due_at is None:
+            return max_sleep
+        return min(max_sleep, max(0.0, (due_at - self.clock()).total_seconds()))
+
+    def run_due(self) -> DueSchedulerTick:
+        """Send everything whose deadline has passed, then report the next deadline."""
+        self.refresh()
+        now = self.clock()
+        counts = {"sent": 0, "failed": 0, "missing-channel": 0}
+        while self._heap and self._heap[0][0] <= now.timestamp():
+            when, kind, key = heapq.heappop(self._heap)
+            if self._due.get((kind, key)) != when:
+                continue
+            del self._due[(kind, key)]
+            outcome, due_at = self._dispatch(kind, key, now)
+            if outcome in counts:
+                counts[outcome] += 1
+            if outcome in {"failed", "missing-channel"}:
+                self._not_before[(kind, key)] = now.timestamp() + self.retry_sec
+            self._schedule(kind, key, due_at)
+        return DueSchedulerTick(
+            sent=counts["sent"],
+            failed=counts["failed"],
+            skipped_missing_channel=counts["missing-channel"],
+            next_due_at=self.next_due_at(),
+        )
+
+    def _dispatch(self, kind: str, key: str, now: datetime) -> tuple[str, datetime | None]:
+        """Send one record if it is still due; returns (outcome, due time still pending)."""
+        if kind == "reminder":
+            with _reminder_file_lock(self.storage_root):
+                journal = _reminders_journal(self.storage_root)
+                item = journal.get(key)
+                due_at = reminder_due_at(item) if item is not None else None
+                if due_at is None or due_at > now:
+                    return "not-due", due_at
+                send = self.reminder_sender or _env_sender()
+                outcome = notify_reminder(journal, key, item, now=now, send=send)
+        else:
+            with _proactive_file_lock(self.storage_root):
+                followup = _followups_journal(self.storage_root).get(key)
+                due_at = followup_due_at(followup, now.tzinfo) if followup is not None else None
+                if due_at is None or due_at > now:
+                    return "not-due", due_at
+                outcome = send_followup(
+                    self.storage_root,
+                    key,
+                    followup,
+                    now=now,
+                    sender=self.followup_sender,
+                    channel_id=self.channel_id,
+                    user_id=self.user_id,
+                )
+        return outcome, due_at if outcome in {"failed", "missing-channel"} else None
+
+    def serve(
+        self,
+        waker: Waker,
+        *,
+        stop: threading.Event,
+        max_sleep: float = DEFAULT_MAX_SLEEP_SEC,
+        log: Callable[[DueSchedulerTick], None] | None = None,
+    ) -> None:
+        """Run until `stop` is set; `max_sleep` bounds how late hand edits and clock jumps are noticed."""
+        while not stop.is_set():
+            tick = self.run_due()
+            if log is not None and (tick.sent or tick.failed or tick.skipped_missing_channel):
+                log(tick)
+            waker.wait(self.seconds_until_next(max_sleep))
+
+
+class WakeSocket:
+    """Datagram socket at `scheduler/wake.sock` that `_notify_due_scheduler` writes to."""
+
+    def __init__(self, storage_root: Path) -> None:
+        self.path = _due_scheduler_socket_path(storage_root)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.unlink(missing_ok=True)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.bind(str(self.path))
+        self._sock.setblocking(False)
+
+    def wait(self, timeout: float) -> bool:
+        readable, _writable, _errors = select.select([self._sock], [], [], max(0.0, timeout))
+        if not readable:
+            return False
+        while True:
+            try:
+                self._sock.recv(64)
+            except (BlockingIOError, InterruptedError):
+                return True
+
+    def close(self) -> None:
+        self._sock.close()
+        self.path.unlink(missing_ok=True)
+
+
+def _log_tick(tick: DueSchedulerTick) -> None:
+    print(
+        json.dumps(
+            {
+                "sent": tick.sent,
+                "failed": tick.failed,
+                "skipped_missing_channel": tick.skipped_missing_channel,
+                "next_due_at": tick.next_due_at.isoformat(timespec="seconds") if tick.next_due_at else "",
+            },
+            sort_keys=True,
+        ),
+        flush=True,
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--storage-root",
+        default=os.environ.get("LIFE_PILOT_STORAGE_ROOT", "/home/hermes/.hermes-life"),
+    )
+    parser.add_argument(
+        "--channel-id",
+        default=os.environ.get("LIFE_PILOT_PROACTIVE_CHANNEL_ID", ""),
+        help="follow-up channel override (same as life_proactive_loop.py)",
+    )
+    parser.add_argument(
+        "--user-id",
+        default=os.environ.get("LIFE_PILOT_PROACTIVE_USER_ID", ""),
+    )
+    parser.add_argument("--no-followups", action="store_true", help="only send reminders")
+    parser.add_argument("--max-sleep-sec", type=float, default=DEFAULT_MAX_SLEEP_SEC)
+    parser.add_argument("--retry-sec", type=float, default=DEFAULT_RETRY_SEC)
+    args = parser.parse_args()
+
+    root = Path(args.storage_root)
+    scheduler = DueScheduler(
+        root,
+        followups=not args.no_followups,
+        channel_id=args.channel_id,
+        user_id=args.user_id,
+        retry_sec=args.retry_sec,
+    )
+    stop = threading.Event()
+    waker = WakeSocket(root)
+
+    def _stop(_signum: int, _frame: Any) -> None:
+        stop.set()
+        # nudge the sleeping select() so shutdown does not wait for the next deadline
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+            try:
+                sock.sendto(b"stop", str(waker.path))
+            except OSError:
+                pass
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    try:
+        scheduler.serve(waker, stop=stop, max_sleep=args.max_sleep_sec, log=_log_tick)
+    finally:
+        waker.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
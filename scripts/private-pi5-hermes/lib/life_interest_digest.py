@@ -7,17 +7,24 @@ metadata, and local feedback. External posts remain untrusted input.
 
 from __future__ import annotations
 
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field, replace
 from datetime import datetime, timedelta
 from email.utils import parsedate_to_datetime
+from functools import lru_cache
 import hashlib
 import html
 import json
 import os
 from pathlib import Path
+import queue
 import re
+import socket
 import tempfile
+import threading
+import time
 from typing import Any, Callable, Iterator
+import unicodedata
 import urllib.error
 import urllib.parse
 import urllib.request
@@ -35,6 +42,7 @@ try:
         render_editorial_interest_digest,
     )
     from .life_discord_inbox import read_discord_inbox
+    from .life_interest_store import InterestStore
     from .life_reminder_scheduler import DiscordSendResult, send_discord_channel_message
 except ImportError:
     from life_interest_editorial import (
@@ -43,6 +51,7 @@ except ImportError:
         render_editorial_interest_digest,
     )
     from life_discord_inbox import read_discord_inbox
+    from life_interest_store import InterestStore
     from life_reminder_scheduler import DiscordSendResult, send_discord_channel_message
 
 
@@ -50,8 +59,23 @@ USER_AGENT = "private-pi5-hermes-interest-digest/1.0"
 MAX_STORED_ITEMS = 700
 MAX_FEEDBACK = 1000
 MAX_SEEN = 1200
+SEEN_WINDOW_DAYS = 45
+MAX_STORED_SEARCH_MATCHES = 10
+# below this many keywords, C-level `keyword in text` checks beat one regex pass (bench-interest-rank.py)
+COMPILED_KEYWORD_THRESHOLD = 160
+NEAR_DUPLICATE_JACCARD = 0.7
+NEAR_DUPLICATE_SIGNATURE_BINS = 16
+NEAR_DUPLICATE_BAND_ROWS = 2
+# user-shared links and the forecast are never folded into another item
+NEAR_DUPLICATE_EXEMPT_SOURCES = frozenset({"x_shared_inbox", "open_meteo_weather"})
 MAX_WEB_SEARCH_QUERIES = 5
 MAX_WEB_SEARCH_RESULTS_PER_QUERY = 3
+DEFAULT_FEED_CONCURRENCY = 4
+MAX_FEED_ENTRIES = 30
+MAX_FEED_BYTES = 2 * 1024 * 1024
+MAX_FEED_ELEMENTS = 20_000
+FEED_PARSE_CHUNK = 64 * 1024
+DEFAULT_FEED_DEADLINE_SEC = 20
 
 OPEN_METEO_FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
 BRAVE_WEB_SEARCH_URL = "https://api.search.brave.com/res/v1/web/search"
@@ -247,18 +271,6 @@ def _interest_dir(root: Path) -> Path:
     return root / "interest"
 
 
-def _items_path(root: Path) -> Path:
-    return _interest_dir(root) / "items.jsonl"
-
-
-def _feedback_path(root: Path) -> Path:
-    return _interest_dir(root) / "feedback.jsonl"
-
-
-def _seen_path(root: Path) -> Path:
-    return _interest_dir(root) / "seen.jsonl"
-
-
 def _profile_path(root: Path) -> Path:
     return _interest_dir(root) / "profile.json"
 
@@ -271,10 +283,28 @@ def _dispatch_path(root: Path) -> Path:
     return _interest_dir(root) / "dispatch.jsonl"
 
 
+def _feed_cache_path(root: Path) -> Path:
+    return _interest_dir(root) / "feed_cache.json"
+
+
+def _editorial_cache_path(root: Path) -> Path:
+    return _interest_dir(root) / "editorial_cache.json"
+
+
 def ensure_interest_storage(root: Path) -> None:
     _interest_dir(root).mkdir(parents=True, exist_ok=True)
 
 
+def open_interest_store(root: Path) -> InterestStore:
+    """Items, seen URLs and feedback live in interest/interest.sqlite3 (migrated from JSONL)."""
+    return InterestStore(
+        _interest_dir(root),
+        max_items=MAX_STORED_ITEMS,
+        max_seen=MAX_SEEN,
+        max_feedback=MAX_FEEDBACK,
+    )
+
+
 def _clip_line(text: str, limit: int = 180) -> str:
     one_line = " ".join(html.unescape(re.sub(r"<[^>]+>", " ", text or "")).strip().split())
     if len(one_line) <= limit:
@@ -374,12 +404,6 @@ def _write_jsonl(path: Path, rows: list[dict[str, Any]]) -> None:
     tmp_path.replace(path)
 
 
-def _append_jsonl(path: Path, row: dict[str, Any]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("a", encoding="utf-8") as handle:
-        handle.write(json.dumps(row, ensure_ascii=False, sort_keys=True) + "\n")
-
-
 class _InterestLock:
     def __init__(self, root: Path) -> None:
         self.path = _interest_dir(root) / ".interest.lock"
@@ -429,25 +453,232 @@ def _keywords_for_text(text: str, candidates: Iterator[str]) -> tuple[str, ...]:
     return tuple(found)
 
 
+def _keyword_trie_pattern(keywords: tuple[str, ...]) -> str:
+    """Regex for a character trie of `keywords`; optional tails are greedy, so it matches the longest."""
+    trie: dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def emit(node: dict[str, dict]) -> str:
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return emit(trie)
+
+
+class KeywordMatcher:
+    """All keywords contained in a text from one regex pass; same answer as `keyword in text` each.
+
+    The pattern is a lookahead over a keyword trie, so every position reports the longest keyword
+    starting there. Any other occurrence is a prefix of the hit at its position, so hits are
+    expanded with the keywords they contain (their prefixes, and recursively the hits inside
+    them), computed once per keyword and cached. Small keyword sets skip the regex entirely.
+    """
+
+    def __init__(self, keywords: tuple[str, ...], *, threshold: int = COMPILED_KEYWORD_THRESHOLD) -> None:
+        self.keywords = tuple(dict.fromkeys(keyword for keyword in keywords if keyword))
+        self._keyword_set = frozenset(self.keywords)
+        self._pattern = (
+            re.compile("(?=(" + _keyword_trie_pattern(self.keywords) + "))")
+            if self.keywords and len(self.keywords) >= threshold
+            else None
+        )
+        self._contained: dict[str, frozenset[str]] = {}
+
+    @property
+    def compiled(self) -> bool:
+        return self._pattern is not None
+
+    def _longest_hits(self, text: str) -> set[str]:
+        if self._pattern is None:
+            return set()
+        return set(self._pattern.findall(text))
+
+    def _closure(self, keyword: str) -> frozenset[str]:
+        found = self._contained.get(keyword)
+        if found is None:
+            nested = {keyword}
+            for end in range(1, len(keyword)):
+                if keyword[:end] in self._keyword_set:
+                    nested |= self._closure(keyword[:end])
+            for hit in self._longest_hits(keyword[1:]):
+                nested |= self._closure(hit)
+            found = self._contained[keyword] = frozenset(nested)
+        return found
+
+    def hits(self, text: str) -> set[str]:
+        if self._pattern is None:
+            return {keyword for keyword in self.keywords if keyword in text}
+        found: set[str] = set()
+        for hit in self._longest_hits(text):
+            found |= self._closure(hit)
+        return found
+
+
+@lru_cache(maxsize=8)
+def _compiled_keyword_matcher(keywords: tuple[str, ...]) -> KeywordMatcher:
+    return KeywordMatcher(keywords)
+
+
+_SHINGLE_TOKEN_RE = re.compile(r"[0-9a-z]+|[\u3040-\u30ff\u3400-\u9fff\uf900-\ufaff]")
+
+
+def _shingles(text: str) -> frozenset[str]:
+    """Token bigrams of the normalized text; CJK text is tokenized per character."""
+    tokens = _SHINGLE_TOKEN_RE.findall(unicodedata.normalize("NFKC", text).lower())
+    if len(tokens) < 2:
+        return frozenset(tokens)
+    return frozenset(f"{left} {right}" for left, right in zip(tokens, tokens[1:]))
+
+
+def _minhash_signature(shingles: frozenset[str], *, bins: int) -> tuple[int | None, ...]:
+    """One-permutation MinHash: each shingle hash lands in one bin, the bin keeps its minimum."""
+    signature: list[int | None] = [None] * bins
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        slot, rest = value % bins, value // bins
+        current = signature[slot]
+        if current is None or rest < current:
+            signature[slot] = rest
+    return tuple(signature)
+
+
+def _jaccard(left: frozenset[str], right: frozenset[str]) -> float:
+    if not left or not right:
+        return 0.0
+    return len(left & right) / len(left | right)
+
+
+def collapse_near_duplicates(
+    items: list[InterestItem],
+    *,
+    threshold: float = NEAR_DUPLICATE_JACCARD,
+    bins: int = NEAR_DUPLICATE_SIGNATURE_BINS,
+    band_rows: int = NEAR_DUPLICATE_BAND_ROWS,
+) -> tuple[list[InterestItem], dict[str, tuple[InterestItem, ...]]]:
+    """Fold items telling the same story into one representative, keeping the input order.
+
+    MinHash bands over the title+summary shingles only propose candidates (items sharing a band
+    bucket); a candidate is folded when the exact Jaccard similarity reaches `threshold` for
+    both the title+summary and the title shingles, so a shared boilerplate summary alone never
+    merges two stories. Feed
+    items are preferred over web search results as representatives, then earlier items win.
+    Returns the representatives and, per representative item_id, the items folded into it.
+    """
+    order = sorted(
+        range(len(items)),
+        key=lambda index: (items[index].source.startswith("brave_web_search"), index),
+    )
+    buckets: dict[tuple[int, tuple[int | None, ...]], list[int]] = {}
+    shingles: dict[int, tuple[frozenset[str], frozenset[str]]] = {}
+    folded_into: dict[int, int] = {}
+    for index in order:
+        item = items[index]
+        if item.source in NEAR_DUPLICATE_EXEMPT_SOURCES:
+            continue
+        title, current = shingles[index] = (_shingles(item.title), _shingles(f"{item.title} {item.summary}"))
+        if not title:
+            continue
+        signature = _minhash_signature(current, bins=bins)
+        keys = [
+            (start, signature[start : start + band_rows])
+            for start in range(0, bins, band_rows)
+            if any(value is not None for value in signature[start : start + band_rows])
+        ]
+        representative = next(
+            (
+                candidate
+                for key in keys
+                for candidate in buckets.get(key, ())
+                if _jaccard(current, shingles[candidate][1]) >= threshold
+                and _jaccard(title, shingles[candidate][0]) >= threshold
+            ),
+            None,
+        )
+        if representative is not None:
+            folded_into[index] = representative
+            continue
+        for key in keys:
+            buckets.setdefault(key, []).append(index)
+    duplicates: dict[str, list[InterestItem]] = {}
+    for index, representative in sorted(folded_into.items()):
+        duplicates.setdefault(items[representative].item_id, []).append(items[index])
+    kept = [item for index, item in enumerate(items) if index not in folded_into]
+    return kept, {item_id: tuple(group) for item_id, group in duplicates.items()}
+
+
+def _iter_feed_entries(
+    body: str,
+    *,
+    max_entries: int,
+    max_bytes: int,
+    max_elements: int,
+) -> Iterator[ET.Element]:
+    """Yield completed <item>/<entry> elements in document order, parsing incrementally.
+
+    Stops feeding the parser once `max_entries` entries were seen, `max_bytes` of the body
+    (characters, for the decoded str body) were consumed or `max_elements` start tags were
+    read, so an oversized feed costs no more than its first entries. Each yielded entry is
+    detached from its parent afterwards, keeping memory flat. A parse error ends the
+    iteration; entries completed before it are kept.
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    stack: list[ET.Element] = []
+    entries = 0
+    elements = 0
+    for offset in range(0, min(len(body), max_bytes), FEED_PARSE_CHUNK):
+        # a syntax error is queued by feed() and raised by read_events() after the good events
+        parser.feed(body[offset : min(offset + FEED_PARSE_CHUNK, max_bytes)])
+        events = parser.read_events()
+        while True:
+            try:
+                event, node = next(events)
+            except StopIteration:
+                break
+            except ET.ParseError:
+                return
+            if event == "start":
+                elements += 1
+                if elements > max_elements:
+                    return
+                stack.append(node)
+                continue
+            stack.pop()
+            if node.tag.rsplit("}", 1)[-1].lower() not in {"item", "entry"}:
+                continue
+            yield node
+            if stack:
+                stack[-1].remove(node)
+            entries += 1
+            if entries >= max_entries:
+                return
+
+
 def parse_feed_items(
     body: str,
     *,
     source: str,
     source_label: str,
     now: datetime | None = None,
+    max_entries: int = MAX_FEED_ENTRIES,
+    max_bytes: int = MAX_FEED_BYTES,
+    max_elements: int = MAX_FEED_ELEMENTS,
 ) -> list[InterestItem]:
     current = now or _now()
-    try:
-        root = ET.fromstring(body)
-    except ET.ParseError:
-        return []
-    entries = [
-        node
-        for node in root.iter()
-        if node.tag.rsplit("}", 1)[-1].lower() in {"item", "entry"}
-    ]
+    entries = _iter_feed_entries(
+        body,
+        max_entries=max_entries,
+        max_bytes=max_bytes,
+        max_elements=max_elements,
+    )
     items: list[InterestItem] = []
-    for node in entries[:30]:
+    for node in entries:
         title = _clip_line(_child_text(node, ("title",)), 180)
         url = _clip_line(_entry_link(node), 300)
         summary = _clip_line(_child_text(node, ("summary", "description", "content")), 240)
@@ -476,25 +707,95 @@ def parse_feed_items(
     return items
 
 
-def _fetch_url_text(url: str, *, headers: dict[str, str] | None = None, timeout: int = 20) -> str:
+def _fetch_url_text(
+    url: str,
+    *,
+    headers: dict[str, str] | None = None,
+    timeout: int = 20,
+    max_bytes: int | None = None,
+) -> str:
     request = urllib.request.Request(
         url,
         headers={"User-Agent": USER_AGENT, **(headers or {})},
         method="GET",
     )
     with urllib.request.urlopen(request, timeout=timeout) as response:
-        return response.read().decode("utf-8", errors="replace")
+        raw = response.read(max_bytes) if max_bytes is not None else response.read()
+        return raw.decode("utf-8", errors="replace")
+
+
+FEED_ACCEPT = "application/rss+xml, application/atom+xml, text/xml"
 
 
 def fetch_text(url: str, timeout: int = 20) -> str:
     return _fetch_url_text(
         url,
-        headers={"Accept": "application/rss+xml, application/atom+xml, text/xml"},
+        headers={"Accept": FEED_ACCEPT},
         timeout=timeout,
+        max_bytes=MAX_FEED_BYTES,
     )
 
 
+@dataclass(frozen=True)
+class FeedResponse:
+    status: int
+    body: str = ""
+    etag: str = ""
+    last_modified: str = ""
+
+
+def _response_socket(response: Any) -> socket.socket | None:
+    """The connection socket under an http.client response; None once the body is drained."""
+    sock = getattr(getattr(getattr(response, "fp", None), "raw", None), "_sock", None)
+    return sock if isinstance(sock, socket.socket) else None
+
+
+def fetch_feed_conditional(url: str, validators: dict[str, str], deadline_sec: float = DEFAULT_FEED_DEADLINE_SEC) -> FeedResponse:
+    """GET a feed with If-None-Match / If-Modified-Since; 304 comes back as FeedResponse(status=304).
+
+    `deadline_sec` bounds the whole fetch (connect + body), not just each socket read: before
+    every read the socket timeout is set to what is left of the budget and `read1` returns
+    whatever has arrived, so a server that trickles or stalls cannot hold a worker past it.
+    The body is cut at MAX_FEED_BYTES; the parser would not look past that anyway.
+    """
+    headers = {"User-Agent": USER_AGENT, "Accept": FEED_ACCEPT}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("lastModified"):
+        headers["If-Modified-Since"] = validators["lastModified"]
+    deadline = time.monotonic() + deadline_sec
+    request = urllib.request.Request(url, headers=headers, method="GET")
+    try:
+        response = urllib.request.urlopen(request, timeout=deadline_sec)
+    except urllib.error.HTTPError as exc:
+        if exc.code == 304:
+            return FeedResponse(status=304, etag=validators.get("etag", ""), last_modified=validators.get("lastModified", ""))
+        raise
+    with response:
+        chunks: list[bytes] = []
+        received = 0
+        while received < MAX_FEED_BYTES:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("feed deadline exceeded")
+            sock = _response_socket(response)
+            if sock is not None:
+                sock.settimeout(remaining)
+            chunk = response.read1(min(FEED_PARSE_CHUNK, MAX_FEED_BYTES - received))
+            if not chunk:
+                break
+            chunks.append(chunk)
+            received += len(chunk)
+        return FeedResponse(
+            status=response.status,
+            body=b"".join(chunks).decode("utf-8", errors="replace"),
+            etag=str(response.headers.get("ETag", "") or ""),
+            last_modified=str(response.headers.get("Last-Modified", "") or ""),
+        )
+
+
 Fetcher = Callable[[str], str]
+ConditionalFetcher = Callable[[str, dict[str, str], float], FeedResponse]
 WebSearcher = Callable[[str, int], dict[str, Any]]
 
 
@@ -738,33 +1039,153 @@ def collect_web_search_items(
             errors.append(f"brave_web_search: {type(exc).__name__}")
             continue
         items.extend(parse_brave_search_items(payload, query=query, now=now))
+    # overlapping queries return the same story under different URLs
+    items, _duplicates = collapse_near_duplicates(items)
     return items, tuple(errors)
 
 
+def _read_feed_cache(storage_root: Path) -> dict[str, dict[str, str]]:
+    path = _feed_cache_path(storage_root)
+    if not path.is_file():
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return {}
+    feeds = data.get("feeds", {}) if isinstance(data, dict) else {}
+    if not isinstance(feeds, dict):
+        return {}
+    return {
+        str(url): {key: str(value) for key, value in entry.items() if key in {"etag", "lastModified"} and value}
+        for url, entry in feeds.items()
+        if isinstance(entry, dict)
+    }
+
+
+def _write_feed_cache(storage_root: Path, feeds: dict[str, dict[str, str]]) -> None:
+    ensure_interest_storage(storage_root)
+    path = _feed_cache_path(storage_root)
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=path.parent, delete=False) as handle:
+        tmp_path = Path(handle.name)
+        handle.write(json.dumps({"feeds": feeds}, ensure_ascii=False, indent=2, sort_keys=True) + "\n")
+    tmp_path.replace(path)
+
+
+def _submit_to_daemon_workers(fn: Callable[[str], FeedResponse], args: list[str], workers: int) -> list[Future]:
+    """Run `fn` over `args` on at most `workers` daemon threads; futures keep argument order.
+
+    Unlike ThreadPoolExecutor (whose workers the interpreter joins at exit), an abandoned
+    worker here never holds up process exit. Futures cancelled before they start are skipped.
+    """
+    futures: list[Future] = [Future() for _ in args]
+    pending: queue.SimpleQueue[tuple[Future, str]] = queue.SimpleQueue()
+    for future, arg in zip(futures, args):
+        pending.put((future, arg))
+
+    def work() -> None:
+        while True:
+            try:
+                future, arg = pending.get_nowait()
+            except queue.Empty:
+                return
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(arg))
+            except Exception as exc:
+                future.set_exception(exc)
+
+    for index in range(min(workers, len(args))):
+        threading.Thread(target=work, name=f"interest-feed-{index}", daemon=True).start()
+    return futures
+
+
 def collect_feed_items(
     *,
     fetcher: Fetcher = fetch_text,
     now: datetime | None = None,
     sources: tuple[dict[str, str], ...] = DEFAULT_FEED_SOURCES,
+    storage_root: Path | None = None,
+    conditional_fetcher: ConditionalFetcher | None = None,
+    max_workers: int | None = None,
+    deadline_sec: float | None = None,
 ) -> tuple[list[InterestItem], tuple[str, ...]]:
+    """Fetch all feeds in parallel (bounded), each within its own deadline.
+
+    With `conditional_fetcher` and `storage_root`, every feed is requested with the ETag /
+    Last-Modified saved from its previous 200; a 304 means nothing new, so the feed is skipped
+    (its items are already in the interest store). A feed still running when the collection
+    budget runs out is reported as `<source>: deadline` and abandoned; workers are daemon
+    threads, so one stuck where no socket timeout reaches (e.g. DNS) cannot delay exit.
+    Items keep source order.
+    """
     current = now or _now()
+    workers = max_workers or _env_int(
+        "LIFE_PILOT_INTEREST_FEED_CONCURRENCY",
+        default=DEFAULT_FEED_CONCURRENCY,
+        minimum=1,
+        maximum=16,
+    )
+    per_feed = deadline_sec or _env_int(
+        "LIFE_PILOT_INTEREST_FEED_DEADLINE_SEC",
+        default=DEFAULT_FEED_DEADLINE_SEC,
+        minimum=1,
+        maximum=120,
+    )
+    conditional = conditional_fetcher is not None and storage_root is not None
+    cache = _read_feed_cache(storage_root) if conditional and storage_root is not None else {}
+
+    def fetch_one(url: str) -> FeedResponse:
+        if conditional and conditional_fetcher is not None:
+            return conditional_fetcher(url, cache.get(url, {}), per_feed)
+        return FeedResponse(status=200, body=fetcher(url))
+
+    if not sources:
+        return [], ()
+    futures = _submit_to_daemon_workers(fetch_one, [source["url"] for source in sources], workers)
+    # queued feeds start late, so the budget covers every wave of `workers` feeds
+    waves = -(-len(sources) // min(workers, len(sources)))
+    wait(futures, timeout=per_feed * waves + 1.0)
+    for future in futures:
+        future.cancel()
+
     items: list[InterestItem] = []
     errors: list[str] = []
-    for source in sources:
-        url = source["url"]
+    updated = dict(cache)
+    for source, future in zip(sources, futures):
+        if not future.done():
+            errors.append(f"{source['source']}: deadline")
+            continue
         try:
-            body = fetcher(url)
+            response = future.result()
         except (OSError, ValueError, urllib.error.URLError) as exc:
             errors.append(f"{source['source']}: {type(exc).__name__}")
             continue
+        if response.status == 304:
+            continue
+        validators = {
+            key: value
+            for key, value in (("etag", response.etag), ("lastModified", response.last_modified))
+            if value
+        }
+        if validators:
+            updated[source["url"]] = validators
+        else:
+            updated.pop(source["url"], None)
         items.extend(
             parse_feed_items(
-                body,
+                response.body,
                 source=source["source"],
                 source_label=source["label"],
                 now=current,
             )
         )
+    if conditional and storage_root is not None:
+        configured = {source["url"] for source in sources}
+        updated = {url: entry for url, entry in updated.items() if url in configured}
+        if updated != cache:
+            with _InterestLock(storage_root):
+                _write_feed_cache(storage_root, updated)
     return items, tuple(errors)
 
 
@@ -800,25 +1221,9 @@ def collect_shared_x_items(storage_root: Path, *, now: datetime | None = None) -
 
 
 def merge_interest_items(storage_root: Path, items: list[InterestItem]) -> int:
-    ensure_interest_storage(storage_root)
-    with _InterestLock(storage_root):
-        rows = _read_jsonl(_items_path(storage_root))
-        seen_keys = {
-            str(row.get("url", "") or "").strip()
-            or str(row.get("itemId", "") or "").strip()
-            for row in rows
-        }
-        added = 0
-        for item in items:
-            key = item.url or item.item_id
-            if key in seen_keys:
-                continue
-            rows.append(_to_row(item))
-            seen_keys.add(key)
-            added += 1
-        rows = rows[-MAX_STORED_ITEMS:]
-        _write_jsonl(_items_path(storage_root), rows)
-        return added
+    """Upsert by URL (or itemId); an already stored item is kept as is. Returns how many were new."""
+    with open_interest_store(storage_root) as store:
+        return store.upsert_items([_to_row(item) for item in items])
 
 
 def read_interest_items(
@@ -827,20 +1232,32 @@ def read_interest_items(
     now: datetime | None = None,
     days: int = 30,
     limit: int = 200,
+    exclude_seen: bool = False,
 ) -> list[InterestItem]:
+    """Newest stored items within `days`; with `exclude_seen`, URLs already delivered are skipped in SQL."""
     current = now or _now()
-    cutoff = current - timedelta(days=days)
-    items: list[InterestItem] = []
-    for row in _read_jsonl(_items_path(storage_root)):
-        item = _from_row(row, now=current)
-        if item is None:
-            continue
-        when = item.published_at or item.captured_at or current
-        if when < cutoff:
-            continue
-        items.append(item)
-    items.sort(key=lambda item: item.published_at or item.captured_at or current, reverse=True)
-    return items[:limit]
+    with open_interest_store(storage_root) as store:
+        rows = store.recent_items(
+            since_ts=(current - timedelta(days=days)).timestamp(),
+            now_ts=current.timestamp(),
+            limit=limit,
+            unseen_since_ts=(current - timedelta(days=SEEN_WINDOW_DAYS)).timestamp() if exclude_seen else None,
+        )
+    return [item for item in (_from_row(row, now=current) for row in rows) if item is not None]
+
+
+def search_interest_items(
+    storage_root: Path,
+    query: str,
+    *,
+    now: datetime | None = None,
+    limit: int = MAX_STORED_SEARCH_MATCHES,
+) -> list[InterestItem]:
+    """Stored items whose title or summary matches `query` (SQLite FTS5), best match first."""
+    current = now or _now()
+    with open_interest_store(storage_root) as store:
+        rows = store.search_items(query, limit=limit)
+    return [item for item in (_from_row(row, now=current) for row in rows) if item is not None]
 
 
 def _default_profile() -> dict[str, Any]:
@@ -901,37 +1318,19 @@ def _score_keywords(profile: dict[str, Any]) -> tuple[list[str], list[str]]:
     return positive, negative
 
 
-def _seen_urls(storage_root: Path, *, now: datetime | None = None, days: int = 45) -> set[str]:
+def _seen_urls(storage_root: Path, *, now: datetime | None = None, days: int = SEEN_WINDOW_DAYS) -> set[str]:
     current = now or _now()
-    cutoff = current - timedelta(days=days)
-    urls: set[str] = set()
-    for row in _read_jsonl(_seen_path(storage_root)):
-        seen_at = _parse_datetime(row.get("seenAt"), current.tzinfo)
-        if seen_at is not None and seen_at < cutoff:
-            continue
-        url = str(row.get("url", "") or "").strip()
-        if url:
-            urls.add(url)
-    return urls
+    with open_interest_store(storage_root) as store:
+        return store.seen_urls(since_ts=(current - timedelta(days=days)).timestamp())
 
 
 def _mark_seen(storage_root: Path, items: tuple[InterestItem, ...], *, now: datetime | None = None) -> None:
     current = now or _now()
-    rows = _read_jsonl(_seen_path(storage_root))
-    existing = {str(row.get("url", "") or "").strip() for row in rows}
-    for item in items:
-        if item.url in existing:
-            continue
-        rows.append(
-            {
-                "itemId": item.item_id,
-                "url": item.url,
-                "source": item.source,
-                "seenAt": current.isoformat(timespec="seconds"),
-            }
+    with open_interest_store(storage_root) as store:
+        store.mark_seen(
+            [{"itemId": item.item_id, "url": item.url, "source": item.source} for item in items],
+            seen_at=current.isoformat(timespec="seconds"),
         )
-        existing.add(item.url)
-    _write_jsonl(_seen_path(storage_root), rows[-MAX_SEEN:])
 
 
 def rank_interest_items(
@@ -945,6 +1344,15 @@ def rank_interest_items(
     current = now or _now()
     seen = set() if include_seen else _seen_urls(storage_root, now=current)
     positive, negative = _score_keywords(profile)
+    # one compiled pass per item instead of a substring scan per keyword
+    matcher = _compiled_keyword_matcher(tuple(positive) + tuple(negative))
+    # profile lists may repeat a keyword; each listing counts, as it did with the per-keyword loop
+    positive_slots: dict[str, list[int]] = {}
+    for index, keyword in enumerate(positive):
+        positive_slots.setdefault(keyword, []).append(index)
+    negative_slots: dict[str, int] = {}
+    for keyword in negative:
+        negative_slots[keyword] = negative_slots.get(keyword, 0) + 1
     source_weights = profile.get("sourceWeights", {})
     if not isinstance(source_weights, dict):
         source_weights = {}
@@ -953,16 +1361,15 @@ def rank_interest_items(
         if item.url in seen:
             continue
         text = f"{item.title} {item.summary} {' '.join(item.tags)}".lower()
+        hits = matcher.hits(text)
         score = 1.0
         reasons: list[str] = []
-        for keyword in positive:
-            if keyword in text:
-                score += 1.5
-                if len(reasons) < 3:
-                    reasons.append(f"{keyword} に関係")
-        for keyword in negative:
-            if keyword in text:
-                score -= 2.0
+        for index in sorted(index for hit in hits for index in positive_slots.get(hit, ())):
+            score += 1.5
+            if len(reasons) < 3:
+                reasons.append(f"{positive[index]} に関係")
+        for _ in range(sum(negative_slots.get(hit, 0) for hit in hits)):
+            score -= 2.0
         source_weight = int(source_weights.get(item.source, 0) or 0)
         if source_weight:
             score += source_weight * 0.5
@@ -1101,21 +1508,34 @@ def build_interest_digest(
     mark_seen: bool = True,
     editorial_enabled: bool | None = None,
     editorial_client: EditorialLlmClient | None = None,
+    feed_fetcher: ConditionalFetcher | None = None,
 ) -> InterestDigestResult:
     current = now or _now()
     ensure_interest_storage(storage_root)
     fetched_items: list[InterestItem] = []
     errors: tuple[str, ...] = ()
     if fetch:
-        feed_items, feed_errors = collect_feed_items(fetcher=fetcher, now=current)
-        weather_items, weather_errors = collect_weather_items(fetcher=fetcher, now=current)
-        search_items, search_errors = collect_web_search_items(searcher=web_searcher, now=current)
+        # conditional GET only with the real network fetcher; injected fetchers stay plain
+        conditional = feed_fetcher or (fetch_feed_conditional if fetcher is fetch_text else None)
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="interest-source") as pool:
+            weather_future = pool.submit(collect_weather_items, fetcher=fetcher, now=current)
+            search_future = pool.submit(collect_web_search_items, searcher=web_searcher, now=current)
+            feed_items, feed_errors = collect_feed_items(
+                fetcher=fetcher,
+                now=current,
+                storage_root=storage_root,
+                conditional_fetcher=conditional,
+            )
+            weather_items, weather_errors = weather_future.result()
+            search_items, search_errors = search_future.result()
         fetched_items = feed_items + weather_items + search_items
         errors = feed_errors + weather_errors + search_errors
     local_items = collect_shared_x_items(storage_root, now=current)
     added = merge_interest_items(storage_root, fetched_items + local_items)
     profile = read_interest_profile(storage_root)
-    candidates = read_interest_items(storage_root, now=current)
+    candidates, duplicates = collapse_near_duplicates(
+        read_interest_items(storage_root, now=current, exclude_seen=not include_seen)
+    )
     ranked = rank_interest_items(
         candidates,
         profile,
@@ -1126,7 +1546,8 @@ def build_interest_digest(
     selected = tuple(ranked[:max_items])
     _save_last(storage_root, selected, current)
     if mark_seen:
-        _mark_seen(storage_root, selected, now=current)
+        folded = tuple(duplicate for item in selected for duplicate in duplicates.get(item.item_id, ()))
+        _mark_seen(storage_root, selected + folded, now=current)
     message = render_interest_digest(selected, fetched_count=added, errors=errors)
     render_mode = "deterministic"
     fallback_reason = ""
@@ -1139,6 +1560,7 @@ def build_interest_digest(
             config=_interest_editorial_config(editorial_enabled),
             client=editorial_client,
             debug_lines=_discord_debug_lines_enabled(),
+            cache_path=_editorial_cache_path(storage_root),
         )
         if editorial.ok:
             message = editorial.message
@@ -1208,9 +1630,16 @@ def build_interest_search_digest(
         require_enabled=True,
     )
     added = merge_interest_items(storage_root, items)
+    fresh_urls = {item.url for item in items}
+    stored = [
+        item
+        for item in search_interest_items(storage_root, query, now=current)
+        if item.url not in fresh_urls
+    ]
     profile = read_interest_profile(storage_root)
+    candidates, _duplicates = collapse_near_duplicates(items + stored)
     ranked = rank_interest_items(
-        items,
+        candidates,
         profile,
         storage_root=storage_root,
         now=current,
@@ -1437,14 +1866,14 @@ def record_interest_feedback(
         if candidate:
             profile["memoryCandidates"] = [candidate]
         _write_profile(storage_root, profile)
-        _append_jsonl(
-            _feedback_path(storage_root),
-            {
-                "createdAt": current.isoformat(timespec="seconds"),
-                "action": clean_action,
-                "topic": clean_topic,
-            },
-        )
+        with open_interest_store(storage_root) as store:
+            store.append_feedback(
+                {
+                    "createdAt": current.isoformat(timespec="seconds"),
+                    "action": clean_action,
+                    "topic": clean_topic,
+                }
+            )
         return f"""好みに反映しました: {clean_topic}
 
 -# debug: interest=feedback action={clean_action} boundary=local-only/no-tools""".strip()
@@ -1475,19 +1904,18 @@ def record_interest_feedback(
     if candidate:
         profile["memoryCandidates"] = [candidate]
     _write_profile(storage_root, profile)
-    rows = _read_jsonl(_feedback_path(storage_root))
-    rows.append(
-        {
-            "createdAt": current.isoformat(timespec="seconds"),
-            "action": clean_action,
-            "itemId": item.item_id,
-            "source": item.source,
-            "title": item.title,
-            "url": item.url,
-            "untrusted": True,
-        }
-    )
-    _write_jsonl(_feedback_path(storage_root), rows[-MAX_FEEDBACK:])
+    with open_interest_store(storage_root) as store:
+        store.append_feedback(
+            {
+                "createdAt": current.isoformat(timespec="seconds"),
+                "action": clean_action,
+                "itemId": item.item_id,
+                "source": item.source,
+                "title": item.title,
+                "url": item.url,
+                "untrusted": True,
+            }
+        )
     memory_line = f"\nMemory候補: {candidate}" if candidate else ""
     return f"""{ACTION_LABELS[clean_action]}として記録しました: {_clip_line(item.title, 90)}
 {memory_line}
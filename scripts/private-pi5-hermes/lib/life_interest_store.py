@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""SQLite store for the Daily Interest Digest.
+
+Holds what used to be interest/items.jsonl, seen.jsonl and feedback.jsonl in one
+indexed database (interest/interest.sqlite3) so merges are single upserts and digest
+candidates / search hits are selected by query instead of re-reading whole files.
+Rows use the same camelCase shape as the old JSONL lines; life_interest_digest.py
+keeps converting them to InterestItem. The JSONL files are imported once on first
+open and renamed to *.jsonl.migrated.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+import json
+from pathlib import Path
+import re
+import sqlite3
+from typing import Any
+
+
+DB_FILENAME = "interest.sqlite3"
+SCHEMA_VERSION = 1
+BUSY_TIMEOUT_SEC = 30.0
+# trigram handles Japanese titles without a word segmenter; needs SQLite >= 3.34
+FTS_TOKENIZERS = ("trigram", "unicode61")
+MIN_TRIGRAM_TERM = 3
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS items (
+        id INTEGER PRIMARY KEY,
+        key TEXT NOT NULL UNIQUE,
+        item_id TEXT NOT NULL,
+        source TEXT NOT NULL,
+        source_label TEXT NOT NULL,
+        title TEXT NOT NULL,
+        url TEXT NOT NULL,
+        summary TEXT NOT NULL DEFAULT '',
+        published_at TEXT NOT NULL DEFAULT '',
+        captured_at TEXT NOT NULL DEFAULT '',
+        sort_ts REAL,
+        tags TEXT NOT NULL DEFAULT '[]',
+        untrusted INTEGER NOT NULL DEFAULT 1
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS items_sort_ts ON items (sort_ts)",
+    "CREATE INDEX IF NOT EXISTS items_url ON items (url)",
+    """
+    CREATE TABLE IF NOT EXISTS seen (
+        url TEXT PRIMARY KEY,
+        item_id TEXT NOT NULL DEFAULT '',
+        source TEXT NOT NULL DEFAULT '',
+        seen_at TEXT NOT NULL DEFAULT '',
+        seen_ts REAL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS seen_seen_ts ON seen (seen_ts)",
+    """
+    CREATE TABLE IF NOT EXISTS feedback (
+        id INTEGER PRIMARY KEY,
+        created_at TEXT NOT NULL,
+        action TEXT NOT NULL,
+        payload TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS items_fts_insert AFTER INSERT ON items BEGIN
+        INSERT INTO items_fts (rowid, title, summary) VALUES (new.id, new.title, new.summary);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS items_fts_delete AFTER DELETE ON items BEGIN
+        INSERT INTO items_fts (items_fts, rowid, title, summary) VALUES ('delete', old.id, old.title, old.summary);
+    END
+    """,
+)
+
+_ITEM_FIELDS = (
+    "item_id",
+    "source",
+    "source_label",
+    "title",
+    "url",
+    "summary",
+    "published_at",
+    "captured_at",
+    "tags",
+    "untrusted",
+)
+_ITEM_COLUMNS = ", ".join(_ITEM_FIELDS)
+
+
+def _timestamp_of(value: Any) -> float | None:
+    raw = str(value or "").strip()
+    if not raw:
+        return None
+    try:
+        return datetime.fromisoformat(raw.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def _item_key(row: dict[str, Any]) -> str:
+    return str(row.get("url", "") or "").strip() or str(row.get("itemId", "") or "").strip()
+
+
+def _row_from_item_record(record: sqlite3.Row) -> dict[str, Any]:
+    try:
+        tags = json.loads(record["tags"])
+    except json.JSONDecodeError:
+        tags = []
+    return {
+        "itemId": record["item_id"],
+        "source": record["source"],
+        "sourceLabel": record["source_label"],
+        "title": record["title"],
+        "url": record["url"],
+        "summary": record["summary"],
+        "publishedAt": record["published_at"],
+        "capturedAt": record["captured_at"],
+        "tags": tags if isinstance(tags, list) else [],
+        "untrusted": bool(record["untrusted"]),
+    }
+
+
+def _read_jsonl_rows(path: Path) -> list[dict[str, Any]]:
+    if not path.is_file():
+        return []
+    rows: list[dict[str, Any]] = []
+    for line in path.read_text(encoding="utf-8", errors="replace").splitlines():
+        try:
+            row = json.loads(line) if line.strip() else None
+        except json.JSONDecodeError:
+            continue
+        if isinstance(row, dict):
+            rows.append(row)
+    return rows
+
+
+def fts_query(text: str, *, trigram: bool) -> str:
+    """Quote each term as an FTS5 phrase and OR them; terms the tokenizer cannot index are dropped."""
+    terms = [term for term in re.split(r"\s+", text.strip()) if term]
+    if trigram:
+        terms = [term for term in terms if len(term) >= MIN_TRIGRAM_TERM]
+    return " OR ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+class InterestStore:
+    """One connection to interest/interest.sqlite3; use as a context manager.
+
+    Several processes share the file (systemd timer, Discord bridge); WAL and a busy
+    timeout serialize writers, and each public method is one transaction.
+    """
+
+    def __init__(
+        self,
+        interest_dir: Path,
+        *,
+        max_items: int,
+        max_seen: int,
+        max_feedback: int,
+    ) -> None:
+        self.interest_dir = interest_dir
+        self.path = interest_dir / DB_FILENAME
+        self.max_items = max_items
+        self.max_seen = max_seen
+        self.max_feedback = max_feedback
+        interest_dir.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_SEC, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self.tokenizer = ""
+        self._ensure_schema()
+
+    def __enter__(self) -> "InterestStore":
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._db.close()
+
+    def _ensure_schema(self) -> None:
+        if self._db.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            self.tokenizer = self._fts_tokenizer()
+            return
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            # another process may have finished the setup while we waited for the write lock
+            if self._db.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                self._create_fts()
+                for statement in _SCHEMA:
+                    self._db.execute(statement)
+                migrated = self._import_jsonl()
+                self._db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+            else:
+                migrated = []
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        for path in migrated:
+            path.replace(path.with_name(path.name + ".migrated"))
+        self.tokenizer = self._fts_tokenizer()
+
+    def _create_fts(self) -> None:
+        for tokenizer in FTS_TOKENIZERS:
+            try:
+                self._db.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5("
+                    f"title, summary, content='items', content_rowid='id', tokenize='{tokenizer}')"
+                )
+                return
+            except sqlite3.OperationalError:
+                continue
+        raise sqlite3.OperationalError("SQLite FTS5 is not available")
+
+    def _fts_tokenizer(self) -> str:
+        row = self._db.execute("SELECT sql FROM sqlite_master WHERE name = 'items_fts'").fetchone()
+        sql = str(row["sql"] if row else "")
+        return next((tokenizer for tokenizer in FTS_TOKENIZERS if f"'{tokenizer}'" in sql), "")
+
+    def _import_jsonl(self) -> list[Path]:
+        migrated: list[Path] = []
+        items_path = self.interest_dir / "items.jsonl"
+        if items_path.is_file():
+            self._insert_items(_read_jsonl_rows(items_path))
+            migrated.append(items_path)
+        seen_path = self.interest_dir / "seen.jsonl"
+        if seen_path.is_file():
+            for row in _read_jsonl_rows(seen_path):
+                self._insert_seen(row, str(row.get("seenAt", "") or ""))
+            migrated.append(seen_path)
+        feedback_path = self.interest_dir / "feedback.jsonl"
+        if feedback_path.is_file():
+            for row in _read_jsonl_rows(feedback_path):
+                self._insert_feedback(row)
+            migrated.append(feedback_path)
+        self._prune()
+        return migrated
+
+    def _insert_items(self, rows: list[dict[str, Any]]) -> int:
+        added = 0
+        for row in rows:
+            key = _item_key(row)
+            if not key:
+                continue
+            cursor = self._db.execute(
+                f"INSERT INTO items (key, {_ITEM_COLUMNS}, sort_ts) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (key) DO NOTHING",
+                (
+                    key,
+                    str(row.get("itemId", "") or ""),
+                    str(row.get("source", "") or "unknown"),
+                    str(row.get("sourceLabel", "") or ""),
+                    str(row.get("title", "") or ""),
+                    str(row.get("url", "") or ""),
+                    str(row.get("summary", "") or ""),
+                    str(row.get("publishedAt", "") or ""),
+                    str(row.get("capturedAt", "") or ""),
+                    json.dumps(list(row.get("tags", []) or []), ensure_ascii=False),
+                    1 if row.get("untrusted", True) else 0,
+                    _timestamp_of(row.get("publishedAt")) or _timestamp_of(row.get("capturedAt")),
+                ),
+            )
+            added += cursor.rowcount
+        return added
+
+    def _insert_seen(self, row: dict[str, Any], seen_at: str) -> None:
+        url = str(row.get("url", "") or "").strip()
+        if not url:
+            return
+        self._db.execute(
+            "INSERT INTO seen (url, item_id, source, seen_at, seen_ts) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (url) DO NOTHING",
+            (url, str(row.get("itemId", "") or ""), str(row.get("source", "") or ""), seen_at, _timestamp_of(seen_at)),
+        )
+
+    def _insert_feedback(self, row: dict[str, Any]) -> None:
+        self._db.execute(
+            "INSERT INTO feedback (created_at, action, payload) VALUES (?, ?, ?)",
+            (
+                str(row.get("createdAt", "") or ""),
+                str(row.get("action", "") or ""),
+                json.dumps(row, ensure_ascii=False, sort_keys=True),
+            ),
+        )
+
+    def _prune(self) -> None:
+        """Keep the newest N rows per table (same caps the JSONL files had)."""
+        self._db.execute(
+            "DELETE FROM items WHERE id <= (SELECT id FROM items ORDER BY id DESC LIMIT 1 OFFSET ?)",
+            (self.max_items,),
+        )
+        self._db.execute(
+            "DELETE FROM seen WHERE rowid <= (SELECT rowid FROM seen ORDER BY rowid DESC LIMIT 1 OFFSET ?)",
+            (self.max_seen,),
+        )
+        self._db.execute(
+            "DELETE FROM feedback WHERE id <= (SELECT id FROM feedback ORDER BY id DESC LIMIT 1 OFFSET ?)",
+            (self.max_feedback,),
+        )
+
+    def _write(self, action: Any, *args: Any) -> Any:
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            result = action(*args)
+            self._prune()
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        return result
+
+    def upsert_items(self, rows: list[dict[str, Any]]) -> int:
+        """Insert rows whose URL (or itemId) is new; returns how many were added."""
+        if not rows:
+            return 0
+        return self._write(self._insert_items, rows)
+
+    def recent_items(
+        self,
+        *,
+        since_ts: float,
+        now_ts: float,
+        limit: int,
+        unseen_since_ts: float | None = None,
+    ) -> list[dict[str, Any]]:
+        """Newest first; items without a date count as `now_ts`. Optionally drop URLs seen since."""
+        seen_filter = ""
+        params: list[Any] = [since_ts]
+        if unseen_since_ts is not None:
+            seen_filter = "AND NOT EXISTS (SELECT 1 FROM seen WHERE seen.url = items.url AND (seen.seen_ts IS NULL OR seen.seen_ts >= ?))"
+            params.append(unseen_since_ts)
+        params.extend([now_ts, limit])
+        records = self._db.execute(
+            f"SELECT {_ITEM_COLUMNS} FROM items "
+            f"WHERE (sort_ts IS NULL OR sort_ts >= ?) {seen_filter} "
+            "ORDER BY COALESCE(sort_ts, ?) DESC, id ASC LIMIT ?",
+            params,
+        ).fetchall()
+        return [_row_from_item_record(record) for record in records]
+
+    def search_items(self, query: str, *, limit: int) -> list[dict[str, Any]]:
+        """Full-text match over stored titles and summaries, best match first."""
+        expression = fts_query(query, trigram=self.tokenizer == "trigram")
+        if expression:
+            records = self._db.execute(
+                f"SELECT {', '.join('items.' + field for field in _ITEM_FIELDS)} "
+                "FROM items_fts JOIN items ON items.id = items_fts.rowid "
+                "WHERE items_fts MATCH ? ORDER BY bm25(items_fts), items.id DESC LIMIT ?",
+                (expression, limit),
+            ).fetchall()
+        else:
+            # too short for the trigram index (e.g. "AI"): fall back to a LIKE scan
+            pattern = "%" + query.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            if pattern == "%%":
+                return []
+            records = self._db.execute(
+                f"SELECT {_ITEM_COLUMNS} FROM items WHERE title LIKE ? ESCAPE '\\' OR summary LIKE ? ESCAPE '\\' "
+                "ORDER BY id DESC LIMIT ?",
+                (pattern, pattern, limit),
+            ).fetchall()
+        return [_row_from_item_record(record) for record in records]
+
+    def seen_urls(self, *, since_ts: float) -> set[str]:
+        records = self._db.execute(
+            "SELECT url FROM seen WHERE seen_ts IS NULL OR seen_ts >= ?",
+            (since_ts,),
+        ).fetchall()
+        return {record["url"] for record in records}
+
+    def mark_seen(self, rows: list[dict[str, Any]], *, seen_at: str) -> None:
+        """Remember URLs as delivered; an already-seen URL keeps its first seenAt."""
+        if rows:
+            self._write(lambda: [self._insert_seen(row, seen_at) for row in rows])
+
+    def append_feedback(self, row: dict[str, Any]) -> None:
+        self._write(self._insert_feedback, row)
+
+    def feedback_rows(self, *, limit: int = 100) -> list[dict[str, Any]]:
+        records = self._db.execute(
+            "SELECT payload FROM feedback ORDER BY id DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+        return [json.loads(record["payload"]) for record in reversed(records)]
+
+    def counts(self) -> dict[str, int]:
+        return {
+            table: int(self._db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0])
+            for table in ("items", "seen", "feedback")
+        }
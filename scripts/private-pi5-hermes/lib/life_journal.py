@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""Append-only JSONL journal shared by the Life Pilot record files.
+
+Every line is one complete version of a record; the last version of a key
+wins and keeps the position where the key first appeared, so the file stays a
+plain JSONL list that old readers and hand edits understand. A status change
+is one appended line (atomic: a torn line is ignored), not a rewrite;
+`put(..., reorder=True)` is the exception that moves a key to the end.
+
+Lookups go through in-memory indexes (primary key plus optional dedupe fields)
+kept by a process-wide instance per file; each call only reads what other
+processes appended since the last call. The file is compacted (temp file,
+fsync, rename) while it is small, and afterwards once superseded lines
+outnumber live ones, so rewrites stay amortized O(1) per update.
+
+Writers must hold the caller's existing file lock (e.g. `.reminders.lock`).
+New records should carry their own key. Legacy records without one get a
+synthetic `line-<sha1>` key from their raw line, written into the record the
+first time it is updated; a derived key skips every key already seen, so an
+identical keyless line read after that update (e.g. in a fresh process after
+compaction) gets the next suffix instead of shadowing the updated record.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+import tempfile
+import threading
+from typing import Any, Iterable
+
+
+COMPACT_SMALL_LINES = 256
+_ANCHOR_BYTES = 64
+
+
+class JsonlJournal:
+    """Indexed view of one append-only JSONL file (see module docstring)."""
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        key_field: str,
+        index_fields: tuple[str, ...] = (),
+        small_lines: int = COMPACT_SMALL_LINES,
+    ) -> None:
+        self.path = path
+        self.key_field = key_field
+        self.index_fields = index_fields
+        self.small_lines = small_lines
+        self._lock = threading.RLock()
+        # monotonic across file replacements so `changes()` cursors stay valid
+        self._seq = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        # key -> record; unparseable lines are kept as raw strings so compaction preserves them
+        self._entries: dict[str, dict[str, Any] | str] = {}
+        self._raw: dict[str, str] = {}
+        self._indexes: dict[str, dict[str, str]] = {field: {} for field in self.index_fields}
+        self._line_keys: dict[str, int] = {}
+        # key -> sequence number of its latest version, oldest first
+        self._touched: dict[str, int] = {}
+        self._lines = 0
+        self._dead = 0
+        self._offset = 0
+        self._anchor = b""
+        self._identity: tuple[int, int] | None = None
+        self._tail_pending = False
+
+    # -- reading -----------------------------------------------------------------
+
+    def _refresh(self) -> None:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            if self._identity is not None:
+                self._reset()
+            return
+        identity = (stat.st_dev, stat.st_ino)
+        if identity != self._identity or stat.st_size < self._offset:
+            self._reset()
+            self._identity = identity
+        start = self._offset - len(self._anchor)
+        with self.path.open("rb") as handle:
+            handle.seek(start)
+            chunk = handle.read(stat.st_size - start)
+        if chunk[: len(self._anchor)] != self._anchor:
+            # same inode number, different file (replaced by a compaction elsewhere)
+            self._reset()
+            self._identity = identity
+            self._refresh()
+            return
+        chunk = chunk[len(self._anchor) :]
+        end = chunk.rfind(b"\n")
+        self._tail_pending = end != len(chunk) - 1
+        if end < 0:
+            return
+        for raw in chunk[: end + 1].split(b"\n")[:-1]:
+            self._apply_line(raw.decode("utf-8", errors="replace"))
+        self._advance(chunk[: end + 1])
+
+    def _advance(self, consumed: bytes) -> None:
+        self._offset += len(consumed)
+        self._anchor = (self._anchor + consumed)[-_ANCHOR_BYTES:]
+
+    def _apply_line(self, line: str) -> None:
+        if not line.strip():
+            return
+        self._lines += 1
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            record = None
+        if not isinstance(record, dict):
+            self._entries[f"raw-{self._lines}"] = line
+            return
+        key = self._key_for(record, line)
+        if key.startswith("line-") and key not in self._entries:
+            self._raw[key] = line
+        self._store(key, record)
+
+    def _key_for(self, record: dict[str, Any], line: str) -> str:
+        explicit = str(record.get(self.key_field, "") or "").strip()
+        if explicit:
+            return explicit
+        digest = hashlib.sha1(line.encode("utf-8")).hexdigest()[:16]
+        count = self._line_keys.get(digest, 0)
+        while True:
+            count += 1
+            key = f"line-{digest}" if count == 1 else f"line-{digest}-{count}"
+            if key not in self._entries:
+                break
+        self._line_keys[digest] = count
+        return key
+
+    def _store(self, key: str, record: dict[str, Any]) -> None:
+        previous = self._entries.get(key)
+        if isinstance(previous, dict):
+            self._dead += 1
+            self._raw.pop(key, None)
+            for field, index in self._indexes.items():
+                value = str(previous.get(field, "") or "").strip()
+                if value and index.get(value) == key:
+                    del index[value]
+        self._entries[key] = record
+        self._seq += 1
+        self._touched.pop(key, None)
+        self._touched[key] = self._seq
+        for field, index in self._indexes.items():
+            value = str(record.get(field, "") or "").strip()
+            if value:
+                index[value] = key
+
+    def records(self) -> list[dict[str, Any]]:
+        """Latest version of every record, in first-appearance order (copies)."""
+        return [record for _key, record in self.items()]
+
+    def items(self) -> list[tuple[str, dict[str, Any]]]:
+        with self._lock:
+            self._refresh()
+            return [(key, dict(entry)) for key, entry in self._entries.items() if isinstance(entry, dict)]
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        with self._lock:
+            self._refresh()
+            entry = self._entries.get(str(key or "").strip())
+            return dict(entry) if isinstance(entry, dict) else None
+
+    def find(self, field: str, value: str) -> tuple[str, dict[str, Any]] | None:
+        """Record whose indexed `field` equals `value` (last writer wins)."""
+        with self._lock:
+            self._refresh()
+            key = self._indexes[field].get(str(value or "").strip())
+            entry = self._entries.get(key) if key else None
+            return (key, dict(entry)) if key and isinstance(entry, dict) else None
+
+    def changes(self, since: int = 0) -> tuple[int, list[tuple[str, dict[str, Any]]]]:
+        """Records whose latest version is newer than cursor `since`, plus the next cursor.
+
+        Costs O(changed records). After the file was replaced elsewhere every record
+        is reported again; removed records are simply no longer returned by `get()`.
+        """
+        with self._lock:
+            self._refresh()
+            changed: list[tuple[str, dict[str, Any]]] = []
+            for key, seq in reversed(self._touched.items()):
+                if seq <= since:
+                    break
+                entry = self._entries.get(key)
+                if isinstance(entry, dict):
+                    changed.append((key, dict(entry)))
+            changed.reverse()
+            return self._seq, changed
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return sum(1 for entry in self._entries.values() if isinstance(entry, dict))
+
+    # -- writing -----------------------------------------------------------------
+
+    def put(self, record: dict[str, Any], *, reorder: bool = False) -> str:
+        """Append `record` as a new record, or as the new version of its key.
+
+        With `reorder`, an existing key moves to the end instead of keeping its first
+        position (a remove-and-append); the file is compacted at once so the new order
+        is what every reader of the file sees.
+        """
+        with self._lock:
+            self._refresh()
+            line = _dump(record)
+            key = self._key_for(record, line)
+            existed = isinstance(self._entries.get(key), dict)
+            self._write_line(line)
+            if key.startswith("line-") and key not in self._entries:
+                self._raw[key] = line
+            self._store(key, dict(record))
+            if reorder and existed:
+                self._entries[key] = self._entries.pop(key)
+                self.compact()
+            else:
+                self._maybe_compact()
+            return key
+
+    def update(self, key: str, changes: dict[str, Any]) -> dict[str, Any] | None:
+        """Append a version of `key` with `changes` merged in; None if the key is unknown."""
+        with self._lock:
+            self._refresh()
+            current = self._entries.get(key)
+            if not isinstance(current, dict):
+                return None
+            record = {**current, **changes}
+            if not str(record.get(self.key_field, "") or "").strip():
+                record[self.key_field] = key
+            self._write_line(_dump(record))
+            self._store(key, record)
+            self._maybe_compact()
+            return dict(record)
+
+    def rewrite(self, records: Iterable[dict[str, Any]]) -> None:
+        """Replace the whole file with `records` (pruning); same crash safety as compaction."""
+        with self._lock:
+            self._replace_file([_dump(record) for record in records])
+
+    def compact(self) -> None:
+        with self._lock:
+            self._refresh()
+            lines = [
+                entry if isinstance(entry, str) else self._raw.get(key) or _dump(entry)
+                for key, entry in self._entries.items()
+            ]
+            self._replace_file(lines)
+
+    def _write_line(self, line: str) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        prefix = b""
+        if self._tail_pending:
+            # a writer died mid-line: terminate the fragment so it stays one ignored line
+            with self.path.open("rb") as handle:
+                handle.seek(self._offset)
+                fragment = handle.read()
+            self._apply_line(fragment.decode("utf-8", errors="replace"))
+            self._advance(fragment)
+            prefix = b"\n"
+            self._tail_pending = False
+        payload = prefix + line.encode("utf-8") + b"\n"
+        with self.path.open("ab") as handle:
+            handle.write(payload)
+        if self._identity is None:
+            stat = self.path.stat()
+            self._identity = (stat.st_dev, stat.st_ino)
+        self._advance(payload)
+
+    def _maybe_compact(self) -> None:
+        live = len(self._entries)
+        if self._dead and (live + self._dead <= self.small_lines or self._dead >= live):
+            self.compact()
+
+    def _replace_file(self, lines: list[str]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile("wb", dir=self.path.parent, delete=False) as handle:
+            tmp_path = Path(handle.name)
+            handle.write(b"".join(line.encode("utf-8") + b"\n" for line in lines))
+            handle.flush()
+            os.fsync(handle.fileno())
+        tmp_path.replace(self.path)
+        _fsync_dir(self.path.parent)
+        self._reset()
+        self._refresh()
+
+
+def _dump(record: dict[str, Any]) -> str:
+    return json.dumps(record, ensure_ascii=False, sort_keys=True)
+
+
+def _fsync_dir(path: Path) -> None:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+_SHARED: dict[tuple[str, str], JsonlJournal] = {}
+_SHARED_LOCK = threading.Lock()
+
+
+def open_journal(path: Path, *, key_field: str, index_fields: tuple[str, ...] = ()) -> JsonlJournal:
+    """Process-wide journal for `path`, so its indexes survive between calls."""
+    cache_key = (os.path.abspath(path), key_field)
+    with _SHARED_LOCK:
+        journal = _SHARED.get(cache_key)
+        if journal is None or journal.index_fields != index_fields:
+            journal = _SHARED[cache_key] = JsonlJournal(path, key_field=key_field, index_fields=index_fields)
+        return journal
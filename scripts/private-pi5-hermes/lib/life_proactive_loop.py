@@ -10,7 +10,6 @@ from datetime import datetime, timedelta
 import json
 import os
 import re
-import tempfile
 from pathlib import Path
 from typing import Any, Callable, Iterator
 
@@ -26,6 +25,7 @@ try:
         _clip_line,
         _date_key,
         _ensure_storage,
+        _notify_due_scheduler,
         _parse_due_at_item,
         _read_note_entries,
         _read_pending_reminders,
@@ -35,6 +35,7 @@ try:
         load_life_pilot_policy,
         validate_life_prompt,
     )
+    from .life_journal import JsonlJournal, open_journal
     from .life_reminder_scheduler import (
         DiscordSendResult,
         send_discord_channel_message,
@@ -63,6 +64,7 @@ except ImportError:
         _clip_line,
         _date_key,
         _ensure_storage,
+        _notify_due_scheduler,
         _parse_due_at_item,
         _read_note_entries,
         _read_pending_reminders,
@@ -72,6 +74,7 @@ except ImportError:
         load_life_pilot_policy,
         validate_life_prompt,
     )
+    from life_journal import JsonlJournal, open_journal
     from life_reminder_scheduler import (
         DiscordSendResult,
         send_discord_channel_message,
@@ -161,34 +164,12 @@ def _proactive_file_lock(root: Path) -> Iterator[None]:
                 fcntl.flock(handle, fcntl.LOCK_UN)
 
 
-def _read_jsonl(path: Path) -> list[dict[str, Any]]:
-    if not path.is_file():
-        return []
-    rows: list[dict[str, Any]] = []
-    for line in path.read_text(encoding="utf-8", errors="replace").splitlines():
-        if not line.strip():
-            continue
-        try:
-            item = json.loads(line)
-        except json.JSONDecodeError:
-            continue
-        if isinstance(item, dict):
-            rows.append(item)
-    return rows
+def _checkins_journal(root: Path) -> JsonlJournal:
+    return open_journal(_checkins_path(root), key_field="id")
 
 
-def _write_jsonl(path: Path, rows: list[dict[str, Any]]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with tempfile.NamedTemporaryFile(
-        "w",
-        encoding="utf-8",
-        dir=path.parent,
-        delete=False,
-    ) as handle:
-        tmp_path = Path(handle.name)
-        for item in rows:
-            handle.write(json.dumps(item, ensure_ascii=False, sort_keys=True) + "\n")
-    tmp_path.replace(path)
+def _followups_journal(root: Path) -> JsonlJournal:
+    return open_journal(_followups_path(root), key_field="id")
 
 
 def _append_jsonl(path: Path, item: dict[str, Any]) -> None:
@@ -392,7 +373,7 @@ def _has_low_energy_signal(entries: list[tuple[str, str]], now: datetime) -> boo
 
 
 def _recent_carried_candidate(root: Path, now: datetime) -> str:
-    rows = _read_jsonl(_checkins_path(root))
+    rows = _checkins_journal(root).records()
     cutoff = now - timedelta(days=3)
     today_prefix = f"{_date_key(now)}-"
     for item in reversed(rows):
@@ -563,7 +544,7 @@ def _note_lines(entries: list[tuple[str, str]], empty: str, limit: int = 3) -> s
 
 def _latest_daily_candidate(root: Path, now: datetime) -> str:
     today_prefix = f"{_date_key(now)}-"
-    rows = _read_jsonl(_checkins_path(root))
+    rows = _checkins_journal(root).records()
     for item in reversed(rows):
         if str(item.get("mode", "") or "") not in {"morning", "followup"}:
             continue
@@ -797,15 +778,15 @@ def dispatch_proactive_checkin(
             checkin_id=checkin_id,
         )
     with _proactive_file_lock(storage_root):
-        rows = _read_jsonl(_checkins_path(storage_root))
-        for item in rows:
-            if item.get("id") == checkin_id and item.get("status") != "send_failed":
-                return ProactiveDispatchResult(
-                    ok=True,
-                    skipped_duplicate=1,
-                    mode=mode,
-                    checkin_id=checkin_id,
-                )
+        checkins = _checkins_journal(storage_root)
+        existing = checkins.get(checkin_id)
+        if existing is not None and existing.get("status") != "send_failed":
+            return ProactiveDispatchResult(
+                ok=True,
+                skipped_duplicate=1,
+                mode=mode,
+                checkin_id=checkin_id,
+            )
         result = send(context_channel, content)
         record = {
             "id": checkin_id,
@@ -845,9 +826,8 @@ def dispatch_proactive_checkin(
             record["lastSendError"] = result.error or f"HTTP {result.status_code}"
             sent = 0
             failed = 1
-        rows = [item for item in rows if item.get("id") != checkin_id]
-        rows.append(record)
-        _write_jsonl(_checkins_path(storage_root), rows)
+        # a resend of a send_failed check-in is the latest check-in again (readers walk newest-last)
+        checkins.put(record, reorder=True)
     if sent and candidate.get("source") == "discord_inbox" and candidate.get("inboxItemId"):
         try:
             mark_discord_inbox_suggested(
@@ -910,7 +890,8 @@ def _schedule_followup(
     candidate = str(checkin.get("candidateText", "") or "").strip()
     if not candidate:
         return None
-    rows = _read_jsonl(_followups_path(root))
+    journal = _followups_journal(root)
+    rows = journal.records()
     source_checkin_id = str(checkin.get("id", "") or "").strip()
     followup = {
         "id": _next_followup_id(rows, source_checkin_id),
@@ -923,11 +904,80 @@ def _schedule_followup(
         "reason": reason,
         "candidateText": candidate,
     }
-    rows.append(followup)
-    _write_jsonl(_followups_path(root), rows)
+    journal.put(followup)
+    _notify_due_scheduler(root)
     return followup
 
 
+def followup_due_at(followup: dict[str, Any], fallback_tz: Any) -> datetime | None:
+    """Due time of a follow-up that still has to be sent, else None."""
+    if followup.get("status") != "pending":
+        return None
+    return _parse_iso_datetime(str(followup.get("dueAt", "") or ""), fallback_tz)
+
+
+def send_followup(
+    storage_root: Path,
+    key: str,
+    followup: dict[str, Any],
+    *,
+    now: datetime,
+    sender: ProactiveSender | None = None,
+    channel_id: str = "",
+    user_id: str = "",
+) -> str:
+    """Send one due follow-up: "sent", "already-sent", "failed" or "missing-channel".
+
+    Callers hold `_proactive_file_lock` and have checked `followup_due_at(...) <= now`.
+    """
+    followups = _followups_journal(storage_root)
+    checkins = _checkins_journal(storage_root)
+    followup_channel = str(channel_id or followup.get("channelId", "") or "").strip()
+    followup_user = str(user_id or followup.get("userId", "") or "").strip()
+    if not followup_channel:
+        followups.update(
+            key,
+            {
+                "lastSendAttemptAt": now.isoformat(timespec="seconds"),
+                "lastSendError": "notify channel is empty",
+            },
+        )
+        return "missing-channel"
+    checkin_id = str(followup.get("id", "") or "").strip()
+    existing = checkins.get(checkin_id)
+    if existing is not None and existing.get("status") != "send_failed":
+        followups.update(key, {"status": "sent", "sentAt": now.isoformat(timespec="seconds")})
+        return "already-sent"
+    candidate = str(followup.get("candidateText", "") or "").strip()
+    send = sender or _env_sender(checkin_id=checkin_id, mode="followup")
+    result = send(followup_channel, build_followup_checkin_message(candidate, now=now))
+    changes: dict[str, Any] = {"lastSendAttemptAt": now.isoformat(timespec="seconds")}
+    if result.ok:
+        changes["status"] = "sent"
+        changes["sentAt"] = now.isoformat(timespec="seconds")
+        checkins.put(
+            {
+                "id": checkin_id,
+                "createdAt": now.isoformat(timespec="seconds"),
+                "sentAt": now.isoformat(timespec="seconds"),
+                "mode": "followup",
+                "sourceCheckinId": followup.get("sourceCheckinId", ""),
+                "followupReason": followup.get("reason", ""),
+                "candidateText": candidate,
+                "candidateSource": "followup",
+                "channelId": followup_channel,
+                "userId": followup_user,
+                "options": _option_rows("followup"),
+                "status": "pending_reply",
+            },
+            reorder=True,
+        )
+    else:
+        changes["lastSendError"] = result.error or f"HTTP {result.status_code}"
+    followups.update(key, changes)
+    return "sent" if result.ok else "failed"
+
+
 def dispatch_due_followups(
     storage_root: Path,
     *,
@@ -942,64 +992,26 @@ def dispatch_due_followups(
     skipped_missing = 0
     last_checkin_id = ""
     with _proactive_file_lock(storage_root):
-        followups = _read_jsonl(_followups_path(storage_root))
-        checkins = _read_jsonl(_checkins_path(storage_root))
-        changed = False
-        for followup in followups:
-            if followup.get("status") != "pending":
-                continue
-            due_at = _parse_iso_datetime(str(followup.get("dueAt", "") or ""), current.tzinfo)
+        for key, followup in _followups_journal(storage_root).items():
+            due_at = followup_due_at(followup, current.tzinfo)
             if due_at is None or due_at > current:
                 continue
-            followup_channel = str(channel_id or followup.get("channelId", "") or "").strip()
-            followup_user = str(user_id or followup.get("userId", "") or "").strip()
-            if not followup_channel:
-                followup["lastSendAttemptAt"] = current.isoformat(timespec="seconds")
-                followup["lastSendError"] = "notify channel is empty"
-                skipped_missing += 1
-                changed = True
-                continue
-            checkin_id = str(followup.get("id", "") or "").strip()
-            if any(
-                item.get("id") == checkin_id and item.get("status") != "send_failed"
-                for item in checkins
-            ):
-                followup["status"] = "sent"
-                followup["sentAt"] = current.isoformat(timespec="seconds")
-                changed = True
-                continue
-            candidate = str(followup.get("candidateText", "") or "").strip()
-            send = sender or _env_sender(checkin_id=checkin_id, mode="followup")
-            result = send(followup_channel, build_followup_checkin_message(candidate, now=current))
-            followup["lastSendAttemptAt"] = current.isoformat(timespec="seconds")
-            if result.ok:
-                followup["status"] = "sent"
-                followup["sentAt"] = current.isoformat(timespec="seconds")
-                checkins.append(
-                    {
-                        "id": checkin_id,
-                        "createdAt": current.isoformat(timespec="seconds"),
-                        "sentAt": current.isoformat(timespec="seconds"),
-                        "mode": "followup",
-                        "sourceCheckinId": followup.get("sourceCheckinId", ""),
-                        "followupReason": followup.get("reason", ""),
-                        "candidateText": candidate,
-                        "candidateSource": "followup",
-                        "channelId": followup_channel,
-                        "userId": followup_user,
-                        "options": _option_rows("followup"),
-                        "status": "pending_reply",
-                    }
-                )
+            outcome = send_followup(
+                storage_root,
+                key,
+                followup,
+                now=current,
+                sender=sender,
+                channel_id=channel_id,
+                user_id=user_id,
+            )
+            if outcome == "sent":
                 sent += 1
-                last_checkin_id = checkin_id
-            else:
-                followup["lastSendError"] = result.error or f"HTTP {result.status_code}"
+                last_checkin_id = str(followup.get("id", "") or "").strip()
+            elif outcome == "failed":
                 failed += 1
-            changed = True
-        if changed:
-            _write_jsonl(_followups_path(storage_root), followups)
-            _write_jsonl(_checkins_path(storage_root), checkins)
+            elif outcome == "missing-channel":
+                skipped_missing += 1
     return ProactiveDispatchResult(
         ok=failed == 0,
         sent=sent,
@@ -1078,7 +1090,8 @@ def resolve_proactive_reply(
     root = _storage_root(loaded_policy, storage_root)
     current = now or _now()
     with _proactive_file_lock(root):
-        rows = _read_jsonl(_checkins_path(root))
+        checkins = _checkins_journal(root)
+        rows = checkins.records()
         checkin = _match_pending_checkin(
             rows,
             user_id=user_id,
@@ -1110,19 +1123,18 @@ def resolve_proactive_reply(
             reply["followupId"] = scheduled_followup.get("id", "")
             reply["followupDueAt"] = scheduled_followup.get("dueAt", "")
         _append_jsonl(_replies_path(root), reply)
-        for item in rows:
-            if item.get("id") == checkin.get("id"):
-                item["status"] = "answered"
-                item["answeredAt"] = current.isoformat(timespec="seconds")
-                item["answerMethod"] = method
-                item["answerText"] = response
-                if selected:
-                    item["selectedOption"] = selected
-                if scheduled_followup is not None:
-                    item["followupId"] = scheduled_followup.get("id", "")
-                    item["followupDueAt"] = scheduled_followup.get("dueAt", "")
-                break
-        _write_jsonl(_checkins_path(root), rows)
+        answer: dict[str, Any] = {
+            "status": "answered",
+            "answeredAt": current.isoformat(timespec="seconds"),
+            "answerMethod": method,
+            "answerText": response,
+        }
+        if selected:
+            answer["selectedOption"] = selected
+        if scheduled_followup is not None:
+            answer["followupId"] = scheduled_followup.get("id", "")
+            answer["followupDueAt"] = scheduled_followup.get("dueAt", "")
+        checkins.update(str(checkin.get("id", "") or ""), answer)
         mode = str(checkin.get("mode", "") or "")
         if mode == "followup":
             memo_label = "Hermes再確認への返信"
@@ -6,7 +6,6 @@ from __future__ import annotations
 import argparse
 import json
 import os
-import tempfile
 import urllib.error
 import urllib.request
 from dataclasses import dataclass
@@ -19,17 +18,21 @@ try:
         _clip_line,
         _parse_due_at_item,
         _reminder_file_lock,
+        _reminders_journal,
         _render_debug_line,
         _timestamp,
     )
+    from .life_journal import JsonlJournal
 except ImportError:
     from discord_life_pilot_bridge import (
         _clip_line,
         _parse_due_at_item,
         _reminder_file_lock,
+        _reminders_journal,
         _render_debug_line,
         _timestamp,
     )
+    from life_journal import JsonlJournal
 
 DISCORD_API_BASE = "https://discord.com/api/v10"
 DISCORD_USER_AGENT = (
@@ -65,46 +68,6 @@ def _discord_debug_lines_enabled() -> bool:
     }
 
 
-def _reminders_path(storage_root: Path) -> Path:
-    return storage_root / "reminders" / "reminders.jsonl"
-
-
-def _read_jsonl(path: Path) -> list[tuple[dict[str, Any] | None, str]]:
-    if not path.is_file():
-        return []
-    rows: list[tuple[dict[str, Any] | None, str]] = []
-    for line in path.read_text(encoding="utf-8", errors="replace").splitlines():
-        if not line.strip():
-            continue
-        try:
-            item = json.loads(line)
-        except json.JSONDecodeError:
-            rows.append((None, line))
-            continue
-        if isinstance(item, dict):
-            rows.append((item, ""))
-        else:
-            rows.append((None, line))
-    return rows
-
-
-def _write_jsonl(path: Path, rows: list[tuple[dict[str, Any] | None, str]]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with tempfile.NamedTemporaryFile(
-        "w",
-        encoding="utf-8",
-        dir=path.parent,
-        delete=False,
-    ) as handle:
-        tmp_path = Path(handle.name)
-        for item, raw in rows:
-            if item is None:
-                handle.write(raw.rstrip("\n") + "\n")
-            else:
-                handle.write(json.dumps(item, ensure_ascii=False, sort_keys=True) + "\n")
-    tmp_path.replace(path)
-
-
 def format_reminder_notification(item: dict[str, Any]) -> str:
     text = _clip_line(str(item.get("text", "") or ""), 700)
     due_at = _parse_due_at_item(item)
@@ -168,6 +131,49 @@ def _env_sender() -> ReminderSender:
     return _send
 
 
+def reminder_due_at(item: dict[str, Any]) -> datetime | None:
+    """Due time of a reminder that still needs a notification, else None."""
+    if item.get("status") != "pending" or item.get("notifiedAt"):
+        return None
+    return _parse_due_at_item(item)
+
+
+def notify_reminder(
+    journal: JsonlJournal,
+    key: str,
+    item: dict[str, Any],
+    *,
+    now: datetime,
+    send: ReminderSender,
+) -> str:
+    """Send one due reminder and record the outcome: "sent", "failed" or "missing-channel".
+
+    Callers hold `_reminder_file_lock` and have checked `reminder_due_at(item) <= now`.
+    """
+    channel_id = str(item.get("notifyChannelId", "") or "").strip()
+    if not channel_id:
+        return "missing-channel"
+    result = send(channel_id, format_reminder_notification(item))
+    if result.ok:
+        journal.update(
+            key,
+            {
+                "status": "notified",
+                "notifiedAt": now.isoformat(timespec="seconds"),
+                "notification": "sent",
+            },
+        )
+        return "sent"
+    journal.update(
+        key,
+        {
+            "lastNotifyAttemptAt": now.isoformat(timespec="seconds"),
+            "lastNotifyError": result.error or f"HTTP {result.status_code}",
+        },
+    )
+    return "failed"
+
+
 def dispatch_due_reminders(
     storage_root: Path,
     *,
@@ -175,41 +181,26 @@ def dispatch_due_reminders(
     sender: ReminderSender | None = None,
 ) -> ReminderDispatchResult:
     current = now or datetime.now().astimezone()
-    reminders_path = _reminders_path(storage_root)
     send = sender or _env_sender()
     sent = 0
     failed = 0
     skipped = 0
     scanned = 0
-    changed = False
 
     with _reminder_file_lock(storage_root):
-        rows = _read_jsonl(reminders_path)
-        for item, _raw in rows:
-            if item is None or item.get("status") != "pending" or item.get("notifiedAt"):
-                continue
-            due_at = _parse_due_at_item(item)
+        journal = _reminders_journal(storage_root)
+        for key, item in journal.items():
+            due_at = reminder_due_at(item)
             if due_at is None or due_at > current:
                 continue
             scanned += 1
-            channel_id = str(item.get("notifyChannelId", "") or "").strip()
-            if not channel_id:
-                skipped += 1
-                continue
-            result = send(channel_id, format_reminder_notification(item))
-            if result.ok:
-                item["status"] = "notified"
-                item["notifiedAt"] = current.isoformat(timespec="seconds")
-                item["notification"] = "sent"
+            outcome = notify_reminder(journal, key, item, now=current, send=send)
+            if outcome == "sent":
                 sent += 1
-                changed = True
-            else:
-                item["lastNotifyAttemptAt"] = current.isoformat(timespec="seconds")
-                item["lastNotifyError"] = result.error or f"HTTP {result.status_code}"
+            elif outcome == "failed":
                 failed += 1
-                changed = True
-        if changed:
-            _write_jsonl(reminders_path, rows)
+            else:
+                skipped += 1
 
     return ReminderDispatchResult(
         ok=failed == 0,
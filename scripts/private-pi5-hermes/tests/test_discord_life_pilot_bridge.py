@@ -150,6 +150,20 @@ class DiscordLifePilotBridgeTests(unittest.TestCase):
             self.assertIn("notification=needs-time", result)
             self.assertNotIn("dueAt", item)
 
+    def test_identical_reminders_get_distinct_ids(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            run_life_remind_bridge("キレイキレイの詰め替えを買う", _policy(), root)
+            run_life_remind_bridge("キレイキレイの詰め替えを買う", _policy(), root)
+            items = [
+                json.loads(line)
+                for line in (root / "reminders" / "reminders.jsonl").read_text(encoding="utf-8").splitlines()
+            ]
+
+        self.assertEqual(len(items), 2)
+        self.assertTrue(all(item["id"].startswith("reminder-") for item in items))
+        self.assertNotEqual(items[0]["id"], items[1]["id"])
+
     def test_parse_reminder_japanese_relative_and_weekday(self) -> None:
         now = datetime(2026, 6, 6, 14, 0, tzinfo=timezone(timedelta(hours=9)))
 
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""Life Pilot deadline scheduler tests."""
+
+import json
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from lib.discord_life_pilot_bridge import _append_reminder, _notify_due_scheduler  # noqa: E402
+from lib.life_due_scheduler import DueScheduler, WakeSocket  # noqa: E402
+from lib.life_reminder_scheduler import DiscordSendResult, dispatch_due_reminders  # noqa: E402
+
+
+JST = timezone(timedelta(hours=9))
+START = datetime(2026, 6, 6, 10, 0, tzinfo=JST)
+
+
+class FakeClock:
+    def __init__(self, now: datetime) -> None:
+        self.now = now
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+class FakeSender:
+    def __init__(self, clock: FakeClock, *, fail: int = 0) -> None:
+        self.clock = clock
+        self.fail = fail
+        self.calls: list[tuple[datetime, str, str]] = []
+
+    def __call__(self, channel_id: str, content: str) -> DiscordSendResult:
+        self.calls.append((self.clock(), channel_id, content))
+        if self.fail:
+            self.fail -= 1
+            return DiscordSendResult(ok=False, status_code=503, error="unavailable")
+        return DiscordSendResult(ok=True, status_code=200)
+
+
+class FakeWaker:
+    """Advances the fake clock by each requested sleep; stops after `steps` sleeps."""
+
+    def __init__(self, clock: FakeClock, stop: threading.Event, steps: int) -> None:
+        self.clock = clock
+        self.stop = stop
+        self.steps = steps
+        self.timeouts: list[float] = []
+
+    def wait(self, timeout: float) -> bool:
+        self.timeouts.append(timeout)
+        self.clock.now += timedelta(seconds=timeout)
+        if len(self.timeouts) >= self.steps:
+            self.stop.set()
+        return False
+
+
+def remind(root: Path, text: str, *, channel: str = "channel-1") -> None:
+    _append_reminder(root, text, START, notify_channel_id=channel, notify_user_id="user-1")
+
+
+def write_followup(root: Path, due_at: datetime) -> None:
+    path = root / "proactive" / "followups.jsonl"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    row = {
+        "id": "2026-06-06-morning-followup-1",
+        "sourceCheckinId": "2026-06-06-morning",
+        "createdAt": START.isoformat(timespec="seconds"),
+        "dueAt": due_at.isoformat(timespec="seconds"),
+        "status": "pending",
+        "channelId": "channel-1",
+        "userId": "user-1",
+        "reason": "snooze",
+        "candidateText": "風呂洗い",
+    }
+    path.write_text(json.dumps(row, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+class DueSchedulerTests(unittest.TestCase):
+    def test_sleeps_until_each_deadline_and_sends_exactly_then(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            clock = FakeClock(START)
+            remind(root, "今日10:05 洗濯物")
+            remind(root, "今日10:20 歯医者の電話")
+            write_followup(root, START + timedelta(minutes=10))
+            reminders = FakeSender(clock)
+            followups = FakeSender(clock)
+            scheduler = DueScheduler(root, clock=clock, reminder_sender=reminders, followup_sender=followups)
+            stop = threading.Event()
+            waker = FakeWaker(clock, stop, steps=5)
+
+            scheduler.serve(waker, stop=stop, max_sleep=300)
+            lines = (root / "reminders" / "reminders.jsonl").read_text(encoding="utf-8").splitlines()
+            statuses = [json.loads(line)["status"] for line in lines]
+
+        self.assertEqual(waker.timeouts, [300, 300, 300, 300, 300])
+        self.assertEqual(
+            [(when.strftime("%H:%M"), text) for when, _channel, text in reminders.calls],
+            [("10:05", "洗濯物"), ("10:20", "歯医者の電話")],
+        )
+        self.assertEqual([when.strftime("%H:%M") for when, _channel, _text in followups.calls], ["10:10"])
+        self.assertEqual(statuses, ["notified", "notified"])
+        self.assertIsNone(scheduler.next_due_at())
+
+    def test_new_deadline_is_picked_up_without_rescanning(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            clock = FakeClock(START)
+            remind(root, "今日12:00 昼の薬")
+            sender = FakeSender(clock)
+            scheduler = DueScheduler(root, clock=clock, reminder_sender=sender, followups=False)
+            first = scheduler.run_due()
+            remind(root, "今日10:30 ゴミ出し")
+            second = scheduler.run_due()
+            clock.now = START + timedelta(minutes=30)
+            third = scheduler.run_due()
+
+        self.assertEqual(first.next_due_at, START.replace(hour=12))
+        self.assertEqual(second.next_due_at, START + timedelta(minutes=30))
+        self.assertEqual((third.sent, third.next_due_at), (1, START.replace(hour=12)))
+        self.assertEqual([text for _when, _channel, text in sender.calls], ["ゴミ出し"])
+
+    def test_failed_send_is_retried_after_the_retry_delay(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            clock = FakeClock(START + timedelta(minutes=5))
+            remind(root, "今日10:05 洗濯物")
+            sender = FakeSender(clock, fail=1)
+            scheduler = DueScheduler(root, clock=clock, reminder_sender=sender, followups=False, retry_sec=60)
+            failed = scheduler.run_due()
+            clock.now += timedelta(seconds=30)
+            early = scheduler.run_due()
+            clock.now += timedelta(seconds=30)
+            retried = scheduler.run_due()
+
+        self.assertEqual((failed.failed, failed.next_due_at), (1, START + timedelta(minutes=6)))
+        self.assertEqual(early.sent, 0)
+        self.assertEqual(retried.sent, 1)
+        self.assertEqual(len(sender.calls), 2)
+
+    def test_record_sent_elsewhere_is_not_sent_again(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            clock = FakeClock(START)
+            remind(root, "今日10:05 洗濯物")
+            scheduler_sender = FakeSender(clock)
+            timer_sender = FakeSender(clock)
+            scheduler = DueScheduler(root, clock=clock, reminder_sender=scheduler_sender, followups=False)
+            scheduler.run_due()
+            clock.now = START + timedelta(minutes=5)
+            dispatch_due_reminders(root, now=clock.now, sender=timer_sender)
+            tick = scheduler.run_due()
+
+        self.assertEqual(len(timer_sender.calls), 1)
+        self.assertEqual((tick.sent, scheduler_sender.calls), (0, []))
+
+    def test_wake_socket_returns_early_on_notification(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            self.assertFalse(_notify_due_scheduler(root))
+            waker = WakeSocket(root)
+            try:
+                idle = waker.wait(0.01)
+                notified = _notify_due_scheduler(root)
+                started = time.monotonic()
+                woken = waker.wait(5)
+                elapsed = time.monotonic() - started
+            finally:
+                waker.close()
+
+        self.assertFalse(idle)
+        self.assertTrue(notified)
+        self.assertTrue(woken)
+        self.assertLess(elapsed, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,9 +3,13 @@
 
 import json
 import os
+import random
 import sys
 import tempfile
+import threading
+import time
 import unittest
+import xml.etree.ElementTree as ET
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from unittest.mock import patch
@@ -16,11 +20,20 @@ sys.path.insert(0, str(ROOT))
 
 from lib.life_discord_inbox import capture_discord_inbox_message  # noqa: E402
 from lib.life_reminder_scheduler import DiscordSendResult  # noqa: E402
+from fake_feed_server import feed_sources, render_feed, start_fake_feed_server  # noqa: E402
 from lib.life_interest_digest import (  # noqa: E402
+    InterestItem,
+    KeywordMatcher,
     build_interest_digest,
+    collapse_near_duplicates,
+    collect_feed_items,
     dispatch_daily_interest_digest,
+    fetch_feed_conditional,
     handle_interest_command,
+    merge_interest_items,
+    open_interest_store,
     parse_feed_items,
+    rank_interest_items,
     read_interest_profile,
     record_interest_feedback,
     render_interest_profile,
@@ -159,12 +172,8 @@ class LifeInterestDigestTests(unittest.TestCase):
                 return RSS_BODY if "nvidia" in url else ATOM_BODY
 
             digest = build_interest_digest(root, now=now, fetch=True, fetcher=fetcher)
-            rows = [
-                json.loads(line)
-                for line in (root / "interest" / "items.jsonl")
-                .read_text(encoding="utf-8")
-                .splitlines()
-            ]
+            with open_interest_store(root) as store:
+                rows = store.recent_items(since_ts=0, now_ts=now.timestamp(), limit=100)
 
         self.assertGreaterEqual(len(rows), 2)
         self.assertIn("vLLM", digest.message)
@@ -192,12 +201,8 @@ class LifeInterestDigestTests(unittest.TestCase):
                 clear=False,
             ):
                 digest = build_interest_digest(root, now=now, fetch=True, fetcher=fetcher)
-            rows = [
-                json.loads(line)
-                for line in (root / "interest" / "items.jsonl")
-                .read_text(encoding="utf-8")
-                .splitlines()
-            ]
+            with open_interest_store(root) as store:
+                rows = store.recent_items(since_ts=0, now_ts=now.timestamp(), limit=100)
 
         self.assertIn("東京 今日の天気", digest.message)
         weather_rows = [row for row in rows if row["source"] == "open_meteo_weather"]
@@ -313,12 +318,8 @@ class LifeInterestDigestTests(unittest.TestCase):
                 sender=sender,
                 fetcher=lambda _url: RSS_BODY,
             )
-            seen_rows = [
-                json.loads(line)
-                for line in (root / "interest" / "seen.jsonl")
-                .read_text(encoding="utf-8")
-                .splitlines()
-            ]
+            with open_interest_store(root) as store:
+                seen_urls = store.seen_urls(since_ts=0)
 
         self.assertTrue(first.ok)
         self.assertEqual(first.sent, 1)
@@ -326,7 +327,7 @@ class LifeInterestDigestTests(unittest.TestCase):
         self.assertEqual(len(sent), 1)
         self.assertEqual(sent[0][0], "channel-1")
         self.assertIn("今日見るなら", sent[0][1])
-        self.assertGreaterEqual(len(seen_rows), 1)
+        self.assertGreaterEqual(len(seen_urls), 1)
 
     def test_daily_dispatch_empty_digest_skips_without_sending(self) -> None:
         with tempfile.TemporaryDirectory() as tmp:
@@ -362,11 +363,12 @@ class LifeInterestDigestTests(unittest.TestCase):
                 sender=lambda _channel_id, _content: DiscordSendResult(ok=True),
                 fetcher=lambda _url: RSS_BODY,
             )
-            seen_exists = (root / "interest" / "seen.jsonl").exists()
+            with open_interest_store(root) as store:
+                seen_urls = store.seen_urls(since_ts=0)
 
         self.assertTrue(result.ok)
         self.assertEqual(result.skipped_missing_channel, 1)
-        self.assertFalse(seen_exists)
+        self.assertEqual(seen_urls, set())
 
     def test_daily_dispatch_failed_send_does_not_mark_seen(self) -> None:
         with tempfile.TemporaryDirectory() as tmp:
@@ -387,7 +389,274 @@ class LifeInterestDigestTests(unittest.TestCase):
 
             self.assertFalse(result.ok)
             self.assertEqual(result.failed, 1)
-            self.assertFalse((root / "interest" / "seen.jsonl").exists())
+            with open_interest_store(root) as store:
+                self.assertEqual(store.seen_urls(since_ts=0), set())
+
+
+class KeywordMatcherTests(unittest.TestCase):
+    VOCAB = ("dgx", "dgx spark", "spark", "park", "llm", "vllm", "local llm", "c++", "x_search", "a.b", "(gb10)", "天気", "天気予報", "予報")
+
+    def random_text(self, rng: random.Random) -> str:
+        pieces = list(self.VOCAB) + ["vl", "sp", "ab", "a+b", "gb10", "noise", "予"]
+        return "".join(rng.choice(pieces) + rng.choice(["", " ", "-"]) for _ in range(rng.randint(0, 12)))
+
+    def test_compiled_hits_equal_substring_checks(self) -> None:
+        rng = random.Random(3)
+        for _ in range(200):
+            keywords = tuple(rng.sample(self.VOCAB, rng.randint(1, len(self.VOCAB))))
+            matcher = KeywordMatcher(keywords, threshold=1)
+            self.assertTrue(matcher.compiled)
+            for _ in range(10):
+                text = self.random_text(rng)
+                self.assertEqual(matcher.hits(text), {keyword for keyword in keywords if keyword in text}, (keywords, text))
+
+    def test_large_profile_ranking_is_unchanged(self) -> None:
+        rng = random.Random(5)
+        words = [word for phrase in self.VOCAB for word in phrase.split()] + ["hermes", "agent", "cron", "音声"]
+        positive = [" ".join(rng.sample(words, rng.randint(1, 2))) + rng.choice(["", str(rng.randint(0, 300))]) for _ in range(600)]
+        positive += positive[:5]
+        profile = {"positiveKeywords": positive, "negativeKeywords": ["cron", "noise 天気"], "sourceWeights": {"forum": 1}}
+        now = datetime(2026, 6, 7, 10, 0, tzinfo=timezone(timedelta(hours=9)))
+        items = [
+            InterestItem(
+                item_id=f"item-{index}",
+                source=rng.choice(["forum", "github"]),
+                source_label="Bench",
+                title=" ".join(rng.choice(words) for _ in range(8)),
+                url=f"https://bench.example/{index}",
+                summary=" ".join(rng.choice(words) for _ in range(20)),
+                published_at=now - timedelta(hours=rng.randint(0, 100)),
+            )
+            for index in range(150)
+        ]
+        expected: dict[str, tuple[float, tuple[str, ...]]] = {}
+        clean_positive = [keyword.strip().lower() for keyword in positive]
+        for item in items:
+            text = f"{item.title} {item.summary} {' '.join(item.tags)}".lower()
+            score, reasons = 1.0, []
+            for keyword in clean_positive:
+                if keyword in text:
+                    score += 1.5
+                    if len(reasons) < 3:
+                        reasons.append(f"{keyword} に関係")
+            for keyword in ("cron", "noise 天気"):
+                if keyword in text:
+                    score -= 2.0
+            expected[item.item_id] = (score, tuple(reasons))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            ranked = rank_interest_items(items, profile, storage_root=Path(tmp), now=now, include_seen=True)
+
+        self.assertEqual(len(ranked), len(items))
+        for item in ranked:
+            score, reasons = expected[item.item_id]
+            source_bonus = 0.5 if item.source == "forum" else 0.0
+            recent_bonus = 1.0 if item.published_at and now - item.published_at < timedelta(hours=48) else 0.0
+            self.assertEqual(item.score, score + source_bonus + recent_bonus, item.item_id)
+            self.assertEqual(item.reasons[: len(reasons)], reasons, item.item_id)
+
+
+class NearDuplicateCollapseTests(unittest.TestCase):
+    NOW = datetime(2026, 6, 7, 10, 0, tzinfo=timezone(timedelta(hours=9)))
+
+    def item(self, item_id: str, source: str, title: str, summary: str = "", hours_ago: int = 1) -> InterestItem:
+        return InterestItem(
+            item_id=item_id,
+            source=source,
+            source_label=source,
+            title=title,
+            url=f"https://example.test/{item_id}",
+            summary=summary,
+            published_at=self.NOW - timedelta(hours=hours_ago),
+        )
+
+    def test_same_story_collapses_to_feed_representative(self) -> None:
+        summary = "The new vLLM release adds NVFP4 quantized checkpoints for Blackwell GPUs including DGX Spark."
+        items = [
+            self.item("brave", "brave_web_search_vllm", "NVIDIA releases vLLM 0.9 with NVFP4 support - Phoronix", summary + " More"),
+            self.item("forum", "nvidia_dgx_spark_forum", "NVIDIA releases vLLM 0.9 with NVFP4 support", summary),
+            self.item("ja-1", "zenn", "ラズパイ5で音声認識を常駐させる", "faster-whisperを使ってラズパイ5で音声認識を常駐させる方法"),
+            self.item("ja-2", "qiita", "ラズパイ5で音声認識を常駐させる方法", "faster-whisper を使ってラズパイ5で音声認識を常駐させる"),
+        ]
+
+        kept, duplicates = collapse_near_duplicates(items)
+
+        self.assertEqual([entry.item_id for entry in kept], ["forum", "ja-1"])
+        self.assertEqual({key: [entry.item_id for entry in group] for key, group in duplicates.items()}, {"forum": ["brave"], "ja-1": ["ja-2"]})
+
+    def test_distinct_stories_and_shared_links_are_kept(self) -> None:
+        boilerplate = "A concise public web result about vLLM and local LLM operations."
+        items = [
+            self.item("a", "brave_web_search_dgx", "DGX Spark field report", boilerplate),
+            self.item("b", "brave_web_search_llm", "local LLM operations field report", boilerplate),
+            self.item("c", "github", "Hermes Agent v0.4 released", "Hermes Agent adds cron skills"),
+            self.item("d", "github", "Hermes Agent v0.5 released", "Hermes Agent adds cron skills"),
+            self.item("e", "x_shared_inbox", "vLLM cold start", "あなたがDiscordへ共有したXリンクです。"),
+            self.item("f", "x_shared_inbox", "vLLM cold start", "あなたがDiscordへ共有したXリンクです。"),
+        ]
+
+        kept, duplicates = collapse_near_duplicates(items)
+
+        self.assertEqual([entry.item_id for entry in kept], ["a", "b", "c", "d", "e", "f"])
+        self.assertEqual(duplicates, {})
+
+    def test_digest_ranks_once_per_story_and_marks_folded_copies_seen(self) -> None:
+        summary = "Discussion about NVFP4, vLLM, and startup time on the DGX Spark."
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            merge_interest_items(
+                root,
+                [
+                    self.item("forum", "nvidia_dgx_spark_forum", "DGX Spark vLLM cold start workaround", summary, hours_ago=3),
+                    self.item("mirror", "reddit_localllama", "DGX Spark vLLM cold start workaround (mirror)", summary, hours_ago=2),
+                    self.item("other", "github", "Hermes Agent cron and skills update", "Skills and cron improvements."),
+                ],
+            )
+            digest = build_interest_digest(root, now=self.NOW, fetch=False, editorial_enabled=False)
+            with open_interest_store(root) as store:
+                seen = store.seen_urls(since_ts=0)
+
+        self.assertEqual(sorted(entry.item_id for entry in digest.items), ["mirror", "other"])
+        self.assertEqual(digest.message.count("DGX Spark vLLM cold start workaround"), 1)
+        self.assertEqual(seen, {f"https://example.test/{name}" for name in ("forum", "mirror", "other")})
+
+
+class FeedParsingLimitTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.now = datetime(2026, 6, 7, 10, 0, tzinfo=timezone(timedelta(hours=9)))
+
+    def parse(self, body: str, **kwargs: object) -> list[object]:
+        return parse_feed_items(body, source="bench", source_label="Bench", now=self.now, **kwargs)
+
+    def test_streaming_parse_matches_whole_tree_parse(self) -> None:
+        for name in ("rss-big", "atom-big"):
+            body = render_feed(name, 80)
+            root = ET.fromstring(body)
+            expected = [
+                node.findtext("title") or node.findtext("{http://www.w3.org/2005/Atom}title")
+                for node in root.iter()
+                if node.tag.rsplit("}", 1)[-1] in {"item", "entry"}
+            ][:30]
+            items = self.parse(body)
+            self.assertEqual([item.title for item in items], expected)
+            self.assertTrue(all(item.url.startswith("https://feeds.example.test/") for item in items))
+            self.assertTrue(all(item.published_at is not None for item in items))
+
+    def test_parser_stops_after_entry_cap(self) -> None:
+        # a broken tail past the cap is never fed to the parser, so the entries survive
+        body = render_feed("rss-cap", 5).replace("</channel>", "<item><title>x</title><bad attr></channel>")
+        self.assertEqual(len(self.parse(body, max_entries=5)), 5)
+        self.assertEqual(len(self.parse(body, max_entries=10)), 5)
+
+    def test_byte_limit_keeps_only_complete_entries(self) -> None:
+        body = render_feed("rss-bytes", 50)
+        cut = body.index("</item>", len(body) // 2) + len("</item>") + 20
+        items = self.parse(body, max_bytes=cut, max_entries=100)
+        self.assertEqual(len(items), body[:cut].count("</item>"))
+        self.assertLess(len(items), 50)
+
+    def test_element_limit_rejects_element_floods(self) -> None:
+        flood = "<rss><channel>" + "<x/>" * 50_000 + render_feed("rss-flood", 3).split("<channel>", 1)[1].split("</rss>")[0] + "</rss>"
+        self.assertEqual(self.parse(flood), [])
+        self.assertEqual(len(self.parse(flood, max_elements=100_000)), 3)
+
+
+class InterestFeedCollectionTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server, self.feeds = start_fake_feed_server(feeds=4, items=3, latency_ms=300)
+        self.sources = feed_sources(self.server, [f"feed-{index}" for index in range(4)])
+        self.now = datetime(2026, 6, 7, 10, 0, tzinfo=timezone(timedelta(hours=9)))
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def collect(self, root: Path, **kwargs: object) -> tuple[list[object], tuple[str, ...]]:
+        options: dict[str, object] = {"max_workers": 4, "deadline_sec": 5}
+        options.update(kwargs)
+        return collect_feed_items(
+            sources=self.sources,
+            now=self.now,
+            storage_root=root,
+            conditional_fetcher=fetch_feed_conditional,
+            **options,
+        )
+
+    def test_feeds_are_fetched_in_parallel_in_source_order(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            started = time.monotonic()
+            items, errors = self.collect(Path(tmp))
+            elapsed = time.monotonic() - started
+
+        self.assertEqual(errors, ())
+        self.assertEqual([item.source for item in items], [f"feed-{i}" for i in range(4) for _ in range(3)])
+        self.assertEqual(self.feeds.max_inflight, 4)
+        # four 300ms feeds one after another would take 1.2s
+        self.assertLess(elapsed, 0.9)
+
+    def test_unchanged_feeds_are_skipped_with_304(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            first, _ = self.collect(root)
+            cache = json.loads((root / "interest" / "feed_cache.json").read_text(encoding="utf-8"))
+            self.feeds.publish("feed-2", revision=1)
+            second, errors = self.collect(root)
+
+        self.assertEqual(len(first), 12)
+        self.assertEqual(set(cache["feeds"]), {source["url"] for source in self.sources})
+        self.assertTrue(all(entry["etag"] for entry in cache["feeds"].values()))
+        self.assertEqual(errors, ())
+        self.assertEqual({item.source for item in second}, {"feed-2"})
+        self.assertEqual(self.feeds.stats()["notModified"], 3)
+
+    def test_slow_feed_hits_deadline_without_blocking_the_rest(self) -> None:
+        self.feeds.set_latency("feed-1", 3000)
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            started = time.monotonic()
+            items, errors = self.collect(root, deadline_sec=1)
+            elapsed = time.monotonic() - started
+            cache = json.loads((root / "interest" / "feed_cache.json").read_text(encoding="utf-8"))
+
+        self.assertEqual(len(errors), 1)
+        self.assertTrue(errors[0].startswith("feed-1: "))
+        self.assertEqual({item.source for item in items}, {"feed-0", "feed-2", "feed-3"})
+        self.assertNotIn(self.sources[1]["url"], cache["feeds"])
+        self.assertLess(elapsed, 2.5)
+
+    def test_trickling_feed_is_cut_at_the_deadline(self) -> None:
+        # ~1.5 KB body in 64-byte pieces every 0.2s: no single read ever times out
+        self.feeds.set_trickle("feed-1", 64, 200)
+        started = time.monotonic()
+        with self.assertRaises(TimeoutError):
+            fetch_feed_conditional(self.sources[1]["url"], {}, 1.0)
+        direct = time.monotonic() - started
+        with tempfile.TemporaryDirectory() as tmp:
+            started = time.monotonic()
+            items, errors = self.collect(Path(tmp), deadline_sec=1)
+            collected = time.monotonic() - started
+        feed_threads = [thread for thread in threading.enumerate() if thread.name.startswith("interest-feed")]
+
+        self.assertLess(direct, 1.5)
+        self.assertEqual(errors, ("feed-1: TimeoutError",))
+        self.assertEqual({item.source for item in items}, {"feed-0", "feed-2", "feed-3"})
+        self.assertLess(collected, 1.5)
+        self.assertTrue(all(thread.daemon for thread in feed_threads))
+
+    def test_injected_plain_fetcher_skips_validator_cache(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            items, errors = collect_feed_items(
+                fetcher=lambda _url: RSS_BODY,
+                sources=self.sources[:2],
+                now=self.now,
+                storage_root=root,
+            )
+            cache_exists = (root / "interest" / "feed_cache.json").exists()
+
+        self.assertEqual(errors, ())
+        self.assertEqual(len(items), 2)
+        self.assertFalse(cache_exists)
 
 
 if __name__ == "__main__":
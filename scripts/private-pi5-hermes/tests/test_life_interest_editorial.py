@@ -6,7 +6,10 @@ import os
 import subprocess
 import sys
 import tempfile
+import threading
 import unittest
+from dataclasses import replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from unittest.mock import patch
@@ -20,6 +23,7 @@ from lib.life_interest_digest import (  # noqa: E402
     build_interest_digest,
 )
 from lib.life_interest_editorial import (  # noqa: E402
+    DgxEditorialLlmClient,
     EditorialDigestConfig,
     parse_editorial_draft,
     render_editorial_interest_digest,
@@ -57,7 +61,7 @@ def _raw_editorial(**updates: object) -> str:
     payload: dict[str, object] = {
         "main_story": "DGX Spark運用は、vLLMの起動安定化とローカルLLM活用の話がかなり実務寄りに進んでいます。",
         "latest": "直近では cold start と NVFP4 の扱いが話題で、運用で詰まりそうな場所を先回りで見られます。",
-        "item_notes": ["起動待ちで時間を溶かしたくないなら、先に見ておく価値があります。"],
+        "item_notes": {"1": "起動待ちで時間を溶かしたくないなら、先に見ておく価値があります。"},
     }
     payload.update(updates)
     return json.dumps(payload, ensure_ascii=False)
@@ -79,6 +83,33 @@ def _item() -> InterestItem:
     )
 
 
+def _chat_server(*, drop_after_response: bool = False) -> tuple[ThreadingHTTPServer, list[int]]:
+    """Local OpenAI-compatible stand-in; records the client port of every request."""
+    ports: list[int] = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self) -> None:  # noqa: N802
+            self.rfile.read(int(self.headers.get("Content-Length", "0")))
+            ports.append(self.client_address[1])
+            body = json.dumps({"choices": [{"message": {"content": _raw_editorial()}}]}).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            if drop_after_response:
+                self.close_connection = True
+
+        def log_message(self, fmt: str, *args: object) -> None:
+            return
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, ports
+
+
 class LifeInterestEditorialTests(unittest.TestCase):
     def setUp(self) -> None:
         self.env_patcher = patch.dict(
@@ -292,12 +323,134 @@ class LifeInterestEditorialTests(unittest.TestCase):
         self.assertIn("理由:", completed.stdout)
         self.assertNotIn("主筋", completed.stdout)
 
+    def test_rerun_digest_reuses_cached_editorial_without_llm_call(self) -> None:
+        client = FakeEditorialClient(_raw_editorial())
+        with tempfile.TemporaryDirectory() as tmp:
+            runs = [
+                build_interest_digest(
+                    Path(tmp),
+                    now=datetime(2026, 6, 7, 10, 0, tzinfo=timezone(timedelta(hours=9))),
+                    fetch=True,
+                    fetcher=lambda _url: RSS_BODY,
+                    include_seen=True,
+                    editorial_enabled=True,
+                    editorial_client=client,
+                )
+                for _ in range(2)
+            ]
+
+        self.assertEqual([digest.render_mode for digest in runs], ["editorial", "editorial"])
+        self.assertEqual(runs[0].message, runs[1].message)
+        self.assertEqual(len(client.calls), 1)
+
+    def test_changed_items_reuse_cached_notes_and_only_request_new_ones(self) -> None:
+        first, second = _item(), replace(_item(), item_id="item-2", title="Hermes Agent cron update", url="https://example.test/2")
+        third = replace(_item(), item_id="item-3", title="ラズパイ5 の音声認識", url="https://example.test/3")
+        config = EditorialDigestConfig(enabled=True, max_chars=3000)
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_path = Path(tmp) / "editorial_cache.json"
+            seed = render_editorial_interest_digest(
+                (first, second),
+                config=config,
+                client=FakeEditorialClient(_raw_editorial(item_notes={"1": "一本目の見どころです。", "2": "二本目の見どころです。"})),
+                cache_path=cache_path,
+            )
+            client = FakeEditorialClient(_raw_editorial(item_notes={"1": "三本目の見どころです。"}))
+            partial = render_editorial_interest_digest((third, first), config=config, client=client, cache_path=cache_path)
+            reordered = render_editorial_interest_digest(
+                (first, third),
+                config=config,
+                client=FakeEditorialClient(AssertionError("must not be called")),
+                cache_path=cache_path,
+            )
+            other_model = FakeEditorialClient(_raw_editorial(item_notes={"1": "別モデル", "2": "別モデル"}))
+            missed = render_editorial_interest_digest(
+                (first, third),
+                config=replace(config, model="other-model"),
+                client=other_model,
+                cache_path=cache_path,
+            )
+
+        self.assertEqual((seed.cache, partial.cache, reordered.cache, missed.cache), ("miss", "partial", "hit", "miss"))
+        sent = client.calls[0]["items"]
+        self.assertNotIn("existing_note", sent[0])
+        self.assertEqual(sent[1]["existing_note"], "一本目の見どころです。")
+        self.assertEqual(partial.draft.item_notes, ("三本目の見どころです。", "一本目の見どころです。"))
+        self.assertEqual(reordered.draft.item_notes, ("一本目の見どころです。", "三本目の見どころです。"))
+        self.assertNotIn("existing_note", other_model.calls[0]["items"][0])
+
+    def test_partial_reuse_maps_notes_by_item_number_even_when_all_are_returned(self) -> None:
+        first = _item()
+        third = replace(_item(), item_id="item-3", title="ラズパイ5 の音声認識", url="https://example.test/3")
+        config = EditorialDigestConfig(enabled=True, max_chars=3000)
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_path = Path(tmp) / "editorial_cache.json"
+            render_editorial_interest_digest(
+                (first,),
+                config=config,
+                client=FakeEditorialClient(_raw_editorial(item_notes={"1": "一本目の見どころです。"})),
+                cache_path=cache_path,
+            )
+            # only item 2 was asked for, but the model answered for every item
+            chatty = FakeEditorialClient(
+                _raw_editorial(item_notes={"1": "一本目を言い直したもの。", "2": "三本目の見どころです。"})
+            )
+            partial = render_editorial_interest_digest((first, third), config=config, client=chatty, cache_path=cache_path)
+
+        self.assertEqual(partial.cache, "partial")
+        self.assertEqual(partial.draft.item_notes, ("一本目の見どころです。", "三本目の見どころです。"))
+        contract_text = " ".join(str(value) for value in chatty.calls[0]["contract"])
+        self.assertIn("keyed by their item number", contract_text)
+
+    def test_dgx_client_keeps_one_connection_alive_across_calls(self) -> None:
+        server, ports = _chat_server()
+        client = DgxEditorialLlmClient(
+            EditorialDigestConfig(base_url=f"http://127.0.0.1:{server.server_port}", api_key="test", ensure_runtime=False)
+        )
+        try:
+            outputs = [client.generate({"items": []}) for _ in range(3)]
+        finally:
+            client.close()
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(outputs, [_raw_editorial()] * 3)
+        self.assertEqual(len(ports), 3)
+        self.assertEqual(len(set(ports)), 1)
+
+    def test_dgx_client_retries_once_when_kept_connection_was_closed(self) -> None:
+        server, ports = _chat_server(drop_after_response=True)
+        client = DgxEditorialLlmClient(
+            EditorialDigestConfig(base_url=f"http://127.0.0.1:{server.server_port}", api_key="test", ensure_runtime=False)
+        )
+        try:
+            outputs = [client.generate({"items": []}) for _ in range(2)]
+        finally:
+            client.close()
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(outputs, [_raw_editorial()] * 2)
+        self.assertEqual(len(set(ports)), 2)
+
     def test_parse_editorial_draft_accepts_json_fence(self) -> None:
         draft = parse_editorial_draft(f"```json\n{_raw_editorial()}\n```", item_count=1)
 
         self.assertIn("DGX Spark", draft.main_story)
         self.assertEqual(len(draft.item_notes), 1)
 
+    def test_parse_editorial_draft_places_notes_by_item_number(self) -> None:
+        keyed = parse_editorial_draft(
+            _raw_editorial(item_notes={"3": "三つ目。", "#1": "一つ目。", "9": "範囲外。"}),
+            item_count=3,
+        )
+        listed = parse_editorial_draft(_raw_editorial(item_notes=["一つ目。", "二つ目。"]), item_count=3)
+
+        self.assertEqual(keyed.item_notes, ("一つ目。", "", "三つ目。"))
+        self.assertEqual(listed.item_notes, ("一つ目。", "二つ目。", ""))
+        with self.assertRaises(ValueError):
+            parse_editorial_draft(_raw_editorial(item_notes={"1": "一つ目。"}), item_count=3, required=[1, 2])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""Daily Interest Digest SQLite store tests."""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from lib.life_interest_digest import (  # noqa: E402
+    InterestItem,
+    handle_interest_command,
+    merge_interest_items,
+    open_interest_store,
+    read_interest_items,
+    search_interest_items,
+)
+from lib.life_interest_store import InterestStore  # noqa: E402
+
+
+NOW = datetime(2026, 6, 7, 10, 0, tzinfo=timezone(timedelta(hours=9)))
+
+
+def item(index: int, *, title: str = "", summary: str = "", hours_ago: int = 0) -> InterestItem:
+    return InterestItem(
+        item_id=f"item-{index}",
+        source="nvidia_dgx_spark_forum",
+        source_label="NVIDIA DGX Spark Forum",
+        title=title or f"DGX Spark note {index}",
+        url=f"https://forums.example.test/t/{index}",
+        summary=summary,
+        published_at=NOW - timedelta(hours=hours_ago),
+        captured_at=NOW,
+    )
+
+
+def jsonl(path: Path, rows: list[object]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        "".join((row if isinstance(row, str) else json.dumps(row, ensure_ascii=False)) + "\n" for row in rows),
+        encoding="utf-8",
+    )
+
+
+class LifeInterestStoreTests(unittest.TestCase):
+    def test_jsonl_files_are_migrated_once(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            interest = root / "interest"
+            row = {
+                "itemId": "item-1",
+                "source": "nvidia_dgx_spark_forum",
+                "sourceLabel": "NVIDIA DGX Spark Forum",
+                "title": "DGX Spark vLLM cold start workaround",
+                "url": "https://forums.developer.nvidia.com/t/dgx-spark-vllm/123",
+                "summary": "Discussion about NVFP4.",
+                "publishedAt": NOW.isoformat(timespec="seconds"),
+                "capturedAt": NOW.isoformat(timespec="seconds"),
+                "tags": ["dgx", "vllm"],
+                "untrusted": True,
+            }
+            jsonl(interest / "items.jsonl", [row, dict(row, title="duplicate url"), "{broken"])
+            jsonl(
+                interest / "seen.jsonl",
+                [{"itemId": "item-1", "url": row["url"], "seenAt": NOW.isoformat(timespec="seconds")}],
+            )
+            jsonl(interest / "feedback.jsonl", [{"createdAt": NOW.isoformat(), "action": "like", "itemId": "item-1"}])
+
+            with open_interest_store(root) as store:
+                counts = store.counts()
+                feedback = store.feedback_rows()
+            items = read_interest_items(root, now=NOW)
+            unseen = read_interest_items(root, now=NOW, exclude_seen=True)
+            (interest / "items.jsonl").write_text(json.dumps(dict(row, url="https://late.example/1")) + "\n", encoding="utf-8")
+            with open_interest_store(root) as store:
+                counts_after_reopen = store.counts()
+            migrated = sorted(path.name for path in interest.glob("*.migrated"))
+
+        self.assertEqual(counts, {"items": 1, "seen": 1, "feedback": 1})
+        self.assertEqual(feedback[0]["action"], "like")
+        self.assertEqual([entry.title for entry in items], ["DGX Spark vLLM cold start workaround"])
+        self.assertEqual(items[0].tags, ("dgx", "vllm"))
+        self.assertEqual(unseen, [])
+        self.assertEqual(counts_after_reopen["items"], 1)
+        self.assertEqual(migrated, ["feedback.jsonl.migrated", "items.jsonl.migrated", "seen.jsonl.migrated"])
+
+    def test_merge_upserts_by_url_and_keeps_the_newest_rows(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            first = merge_interest_items(root, [item(1), item(2)])
+            again = merge_interest_items(root, [item(2, title="retitled"), item(3)])
+            stored = {entry.url: entry.title for entry in read_interest_items(root, now=NOW)}
+            with InterestStore(root / "interest", max_items=2, max_seen=10, max_feedback=10) as store:
+                store.upsert_items([{"itemId": "item-4", "title": "x", "url": "https://forums.example.test/t/4"}])
+                remaining = store.counts()["items"]
+                search_after_prune = store.search_items("DGX Spark note", limit=10)
+
+        self.assertEqual((first, again), (2, 1))
+        self.assertEqual(stored["https://forums.example.test/t/2"], "DGX Spark note 2")
+        self.assertEqual(remaining, 2)
+        self.assertEqual([row["url"] for row in search_after_prune], ["https://forums.example.test/t/3"])
+
+    def test_recent_items_are_newest_first_without_seen_urls(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            undated = InterestItem(item_id="undated", source="x", source_label="X", title="undated", url="https://x.example/u")
+            merge_interest_items(root, [item(1, hours_ago=5), item(2, hours_ago=1), undated, item(3, hours_ago=24 * 40)])
+            with open_interest_store(root) as store:
+                store.mark_seen([{"url": "https://forums.example.test/t/2"}], seen_at=NOW.isoformat())
+            everything = [entry.item_id for entry in read_interest_items(root, now=NOW)]
+            unseen = [entry.item_id for entry in read_interest_items(root, now=NOW, exclude_seen=True)]
+
+        self.assertEqual(everything, ["undated", "item-2", "item-1"])
+        self.assertEqual(unseen, ["undated", "item-1"])
+
+    def test_full_text_search_matches_titles_and_summaries(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            merge_interest_items(
+                root,
+                [
+                    item(1, title="vLLM cold start workaround", summary="NVFP4 checkpoints"),
+                    item(2, title="ラズパイ5 の音声認識", summary="faster-whisper を常駐させる"),
+                    item(3, title="Hermes Agent skills", summary="AI cron update"),
+                ],
+            )
+            english = [entry.item_id for entry in search_interest_items(root, "nvfp4", now=NOW)]
+            japanese = [entry.item_id for entry in search_interest_items(root, "音声認識", now=NOW)]
+            short = [entry.item_id for entry in search_interest_items(root, "AI", now=NOW)]
+            missing = search_interest_items(root, "kubernetes", now=NOW)
+
+        self.assertEqual(english, ["item-1"])
+        self.assertEqual(japanese, ["item-2"])
+        self.assertEqual(short, ["item-3"])
+        self.assertEqual(missing, [])
+
+    def test_interest_search_includes_stored_matches(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            merge_interest_items(root, [item(1, title="vLLM cold start workaround")])
+            with patch.dict(os.environ, {"LIFE_PILOT_INTEREST_WEB_SEARCH_ENABLED": "true"}, clear=False):
+                message = handle_interest_command(
+                    root,
+                    "search cold start",
+                    now=NOW,
+                    web_searcher=lambda _query, _count: {"web": {"results": []}},
+                )
+
+        self.assertIn("Web検索: cold start", message)
+        self.assertIn("vLLM cold start workaround", message)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Life Pilot append-only JSONL journal tests."""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from lib.life_journal import JsonlJournal  # noqa: E402
+
+
+def lines(path: Path) -> list[str]:
+    return path.read_text(encoding="utf-8").splitlines()
+
+
+class JsonlJournalTests(unittest.TestCase):
+    def test_last_version_wins_in_first_appearance_order(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "rows.jsonl"
+            journal = JsonlJournal(path, key_field="id", small_lines=0)
+            journal.put({"id": "a", "status": "pending"})
+            journal.put({"id": "b", "status": "pending"})
+            merged = journal.update("a", {"status": "notified"})
+            missing = journal.update("zzz", {"status": "notified"})
+            reread = JsonlJournal(path, key_field="id", small_lines=0).records()
+            raw = lines(path)
+
+        self.assertEqual(merged, {"id": "a", "status": "notified"})
+        self.assertIsNone(missing)
+        self.assertEqual(reread, [{"id": "a", "status": "notified"}, {"id": "b", "status": "pending"}])
+        self.assertEqual(len(raw), 3)
+
+    def test_reorder_put_moves_an_existing_key_to_the_end(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "rows.jsonl"
+            journal = JsonlJournal(path, key_field="id", small_lines=0)
+            journal.put({"id": "a", "status": "send_failed"})
+            journal.put({"id": "b", "status": "pending"})
+            journal.put({"id": "a", "status": "pending"}, reorder=True)
+            journal.put({"id": "c", "status": "pending"}, reorder=True)
+            in_memory = [record["id"] for record in journal.records()]
+            reread = JsonlJournal(path, key_field="id", small_lines=0).records()
+
+        self.assertEqual(in_memory, ["b", "a", "c"])
+        self.assertEqual(
+            reread,
+            [{"id": "b", "status": "pending"}, {"id": "a", "status": "pending"}, {"id": "c", "status": "pending"}],
+        )
+
+    def test_small_files_are_compacted_and_large_ones_once_half_dead(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            small = Path(tmp) / "small.jsonl"
+            journal = JsonlJournal(small, key_field="id")
+            journal.put({"id": "a", "n": 0})
+            journal.update("a", {"n": 1})
+            small_lines = lines(small)
+
+            large = Path(tmp) / "large.jsonl"
+            journal = JsonlJournal(large, key_field="id", small_lines=0)
+            for index in range(4):
+                journal.put({"id": str(index), "n": 0})
+            for index in range(3):
+                journal.update(str(index), {"n": 1})
+            before = len(lines(large))
+            journal.update("3", {"n": 1})
+            after = lines(large)
+
+        self.assertEqual(small_lines, ['{"id": "a", "n": 1}'])
+        self.assertEqual(before, 7)
+        self.assertEqual([json.loads(line)["n"] for line in after], [1, 1, 1, 1])
+
+    def test_keyless_and_broken_lines_survive_updates_and_compaction(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "legacy.jsonl"
+            path.write_text('{"text": "old"}\n{broken\n{"text": "old"}\n', encoding="utf-8")
+            journal = JsonlJournal(path, key_field="id")
+            keys = [key for key, _record in journal.items()]
+            journal.update(keys[0], {"status": "done"})
+            raw = lines(path)
+
+        self.assertEqual(len(keys), 2)
+        self.assertNotEqual(keys[0], keys[1])
+        self.assertEqual(json.loads(raw[0]), {"id": keys[0], "status": "done", "text": "old"})
+        self.assertEqual(raw[1:], ["{broken", '{"text": "old"}'])
+
+    def test_derived_key_never_shadows_an_updated_identical_line(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "reminders.jsonl"
+            line = '{"dueAt": "2026-06-06T10:05:00+09:00", "status": "pending", "text": "洗濯物"}\n'
+            path.write_text(line * 2, encoding="utf-8")
+            journal = JsonlJournal(path, key_field="id")
+            first, second = [key for key, _record in journal.items()]
+            journal.update(first, {"status": "notified"})
+            compacted = lines(path)
+            fresh = JsonlJournal(path, key_field="id")
+            fresh_keys = [key for key, _record in fresh.items()]
+            fresh.put(json.loads(line))
+            fresh_statuses = [record["status"] for _key, record in fresh.items()]
+            reread = JsonlJournal(path, key_field="id").items()
+
+        self.assertEqual(json.loads(compacted[0])["id"], first)
+        self.assertNotIn('"id"', compacted[1])
+        self.assertEqual(fresh_keys, [first, second])
+        self.assertEqual(fresh_statuses, ["notified", "pending", "pending"])
+        self.assertEqual(len({key for key, _record in reread}), 3)
+        self.assertEqual([record["status"] for _key, record in reread], ["notified", "pending", "pending"])
+
+    def test_torn_tail_is_ignored_and_terminated_before_the_next_append(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "rows.jsonl"
+            path.write_text('{"id": "a"}\n{"id": "b", "sta', encoding="utf-8")
+            journal = JsonlJournal(path, key_field="id", small_lines=0)
+            before = [record["id"] for record in journal.records()]
+            journal.put({"id": "c"})
+            after = [record["id"] for record in JsonlJournal(path, key_field="id").records()]
+            raw = lines(path)
+
+        self.assertEqual(before, ["a"])
+        self.assertEqual(after, ["a", "c"])
+        self.assertEqual(raw[1], '{"id": "b", "sta')
+
+    def test_other_writers_appends_and_replacements_are_picked_up(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "rows.jsonl"
+            reader = JsonlJournal(path, key_field="id", index_fields=("messageId",), small_lines=0)
+            writer = JsonlJournal(path, key_field="id", index_fields=("messageId",), small_lines=0)
+            self.assertIsNone(reader.find("messageId", "m1"))
+            writer.put({"id": "a", "messageId": "m1"})
+            appended = reader.find("messageId", "m1")
+            writer.rewrite([{"id": "z", "messageId": "m9"}])
+            replaced = [record["id"] for record in reader.records()]
+            stale = reader.find("messageId", "m1")
+            os.remove(path)
+            removed = len(reader)
+
+        self.assertEqual(appended, ("a", {"id": "a", "messageId": "m1"}))
+        self.assertEqual(replaced, ["z"])
+        self.assertIsNone(stale)
+        self.assertEqual(removed, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
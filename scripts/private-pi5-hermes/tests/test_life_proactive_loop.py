@@ -485,6 +485,62 @@ class LifeProactiveLoopTests(unittest.TestCase):
             self.assertEqual(checkins[0]["status"], "pending_reply")
             self.assertEqual(checkins[0]["channelId"], "channel-1")
 
+    def test_resend_after_failure_becomes_the_latest_checkin(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            now = datetime(2026, 6, 6, 7, 30, tzinfo=timezone(timedelta(hours=9)))
+            _write_basic_reminder(root, now, "風呂洗い")
+
+            failed = dispatch_proactive_checkin(
+                root,
+                "morning",
+                now=now,
+                sender=lambda _channel, _content: DiscordSendResult(ok=False, status_code=500),
+                channel_id="channel-1",
+                user_id="user-1",
+            )
+            _write_checkin(
+                root,
+                {
+                    "id": "2026-06-05-evening",
+                    "createdAt": (now - timedelta(hours=10)).isoformat(timespec="seconds"),
+                    "sentAt": (now - timedelta(hours=10)).isoformat(timespec="seconds"),
+                    "mode": "evening",
+                    "channelId": "channel-1",
+                    "userId": "user-1",
+                    "status": "pending_reply",
+                },
+            )
+            resent = dispatch_proactive_checkin(
+                root,
+                "morning",
+                now=now + timedelta(minutes=5),
+                sender=FakeSender(),
+                channel_id="channel-1",
+                user_id="user-1",
+            )
+            response = resolve_proactive_reply(
+                "2",
+                _policy(),
+                root,
+                user_id="user-1",
+                channel_id="channel-1",
+                now=now + timedelta(minutes=10),
+            )
+            checkins = [
+                json.loads(line)
+                for line in (root / "proactive" / "checkins.jsonl")
+                .read_text(encoding="utf-8")
+                .splitlines()
+            ]
+
+        self.assertEqual((failed.failed, resent.sent), (1, 1))
+        self.assertIsNotNone(response)
+        self.assertEqual([item["id"] for item in checkins], ["2026-06-05-evening", "2026-06-06-morning"])
+        statuses = {item["id"]: item["status"] for item in checkins}
+        self.assertEqual(statuses["2026-06-06-morning"], "answered")
+        self.assertEqual(statuses["2026-06-05-evening"], "pending_reply")
+
     def test_remembered_context_can_be_used_for_dispatch(self) -> None:
         with tempfile.TemporaryDirectory() as tmp:
             root = Path(tmp)
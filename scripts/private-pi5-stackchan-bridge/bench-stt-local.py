@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Benchmark local faster-whisper STT on recorded audio fixtures.
+
+Measures, per strategy, on a fresh client:
+- startup load: model load (in-memory also runs its warm() inference); the legacy bridge paid
+  this on the first utterance, the shipped one pays it at startup
+- first-request latency: the first transcription right after that load, timed the same way for
+  both strategies (add startupLoadSec to get the legacy bridge's cold first utterance)
+- warm latency and real-time factor (transcription sec / audio sec) over every fixture
+
+strategy:
+  in-memory  SttRuntimeClient as shipped: warm() preload, WAV decoded to an array, one VAD pass
+             whose speech regions are reused as clip_timestamps
+  legacy     the previous path: temp WAV file per utterance, VAD pass then a full re-run when empty
+
+Fixtures are local recordings (not committed): pass WAV files or directories of them.
+Requires the bridge venv with the `local-stt` extra.
+
+examples:
+  python3 ./bench-stt-local.py ~/stt-fixtures --model small --repeat 3
+  python3 ./bench-stt-local.py a.wav b.wav --strategy legacy --strategy in-memory --compute-type int8
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from stt_runtime_client import SttRuntimeClient, SttRuntimeConfig, read_wav_pcm16
+
+
+def _fixtures(paths: list[str]) -> list[Path]:
+    found: list[Path] = []
+    for raw in paths:
+        path = Path(raw).expanduser()
+        if path.is_dir():
+            found.extend(sorted(p for p in path.rglob("*.wav") if p.is_file()))
+        elif path.is_file():
+            found.append(path)
+    return found
+
+
+def _audio_sec(audio_bytes: bytes) -> float:
+    pcm = read_wav_pcm16(audio_bytes)
+    if pcm is not None:
+        frames, rate, channels = pcm
+        return len(frames) / (2 * channels * rate)
+    from faster_whisper import decode_audio
+
+    return len(decode_audio(io.BytesIO(audio_bytes))) / 16000.0
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct * len(ordered)))]
+
+
+class LegacyTranscriber:
+    """Previous behaviour: temp file per request, VAD pass, full re-run without VAD when empty."""
+
+    def __init__(self, config: SttRuntimeConfig) -> None:
+        self._c = config
+        self._client = SttRuntimeClient(config)
+
+    def load(self) -> None:
+        self._client._ensure_whisper_model()
+
+    def transcribe(self, audio_bytes: bytes) -> str:
+        model = self._client._ensure_whisper_model()
+        with tempfile.NamedTemporaryFile(prefix="stackchan-stt-", suffix=".wav") as fp:
+            fp.write(audio_bytes)
+            fp.flush()
+            language = self._c.local_language_default or None
+            segments, _info = model.transcribe(fp.name, language=language, vad_filter=self._c.local_vad_filter)
+            text = "".join(seg.text for seg in segments).strip()
+            if text == "" and self._c.local_retry_without_vad:
+                segments, _info = model.transcribe(fp.name, language=None, vad_filter=False)
+                text = "".join(seg.text for seg in segments).strip()
+            return text
+
+
+class InMemoryTranscriber:
+    def __init__(self, config: SttRuntimeConfig) -> None:
+        self._client = SttRuntimeClient(config)
+
+    def load(self) -> None:
+        self._client.warm()
+
+    def transcribe(self, audio_bytes: bytes) -> str:
+        text, _details = self._client.transcribe(audio_bytes, "audio/wav", None, None)
+        return text
+
+
+def run_strategy(name: str, config: SttRuntimeConfig, clips: list[tuple[Path, bytes, float]], repeat: int) -> dict[str, Any]:
+    transcriber = LegacyTranscriber(config) if name == "legacy" else InMemoryTranscriber(config)
+    first_path, first_audio, _ = clips[0]
+    started = time.perf_counter()
+    transcriber.load()
+    load_sec = time.perf_counter() - started
+    first_started = time.perf_counter()
+    transcriber.transcribe(first_audio)
+    first_request_sec = time.perf_counter() - first_started
+
+    latencies: list[float] = []
+    rtfs: list[float] = []
+    per_clip: list[dict[str, Any]] = []
+    for path, audio, audio_sec in clips:
+        clip_latencies = []
+        text = ""
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            text = transcriber.transcribe(audio)
+            clip_latencies.append(time.perf_counter() - t0)
+        latencies.extend(clip_latencies)
+        rtfs.extend(lat / audio_sec for lat in clip_latencies if audio_sec > 0)
+        per_clip.append(
+            {
+                "file": str(path),
+                "audioSec": round(audio_sec, 3),
+                "medianSec": round(statistics.median(clip_latencies), 3),
+                "text": text[:80],
+            }
+        )
+    return {
+        "strategy": name,
+        "startupLoadSec": round(load_sec, 3),
+        "firstRequestSec": round(first_request_sec, 3),
+        "firstRequestFile": str(first_path),
+        "warmLatencySec": {
+            "p50": round(_percentile(latencies, 0.5), 3),
+            "p95": round(_percentile(latencies, 0.95), 3),
+        },
+        "realTimeFactor": {
+            "mean": round(statistics.fmean(rtfs), 3) if rtfs else None,
+            "p50": round(_percentile(rtfs, 0.5), 3) if rtfs else None,
+            "p95": round(_percentile(rtfs, 0.95), 3) if rtfs else None,
+        },
+        "clips": per_clip,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("fixtures", nargs="+", help="WAV files or directories of WAV files")
+    parser.add_argument("--strategy", action="append", choices=("in-memory", "legacy"))
+    parser.add_argument("--model", default="small")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--compute-type", default="int8")
+    parser.add_argument("--language", default="ja")
+    parser.add_argument("--no-vad", action="store_true")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    try:
+        import faster_whisper  # noqa: F401
+    except ImportError:
+        print("faster-whisper is not installed (uv sync --extra local-stt)", file=sys.stderr)
+        return 2
+    paths = _fixtures(args.fixtures)
+    if not paths:
+        print("no WAV fixtures found", file=sys.stderr)
+        return 2
+    clips = []
+    for path in paths:
+        audio = path.read_bytes()
+        clips.append((path, audio, _audio_sec(audio)))
+
+    config = SttRuntimeConfig(
+        provider="faster-whisper-local",
+        local_model=args.model,
+        local_device=args.device,
+        local_compute_type=args.compute_type,
+        local_language_default=args.language,
+        local_vad_filter=not args.no_vad,
+    )
+    results = [run_strategy(name, config, clips, max(1, args.repeat)) for name in (args.strategy or ["legacy", "in-memory"])]
+    print(
+        json.dumps(
+            {
+                "model": args.model,
+                "device": args.device,
+                "computeType": args.compute_type,
+                "fixtures": len(clips),
+                "audioSecTotal": round(sum(c[2] for c in clips), 3),
+                "results": results,
+            },
+            ensure_ascii=False,
+            indent=2,
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Request admission for the threaded stackchan bridge.
+
+Responsibility: ordering and concurrency limits around STT / chat / utterance work.
+- Per-device FIFO: requests from one device run one at a time in arrival order, so a
+  StackChan never sees its second utterance answered before the first. Other devices proceed.
+- Global upstream limit: at most `max_upstream_concurrency` workflows call DGX / STT at once
+  (the Pi5 and the DGX gateway admission lane are both small).
+- Metrics: queue wait (device queue + upstream slot) and processing time per route, as rolling
+  percentiles, for `GET /metrics`.
+Does not depend on BaseHTTPRequestHandler; bridge_server.py maps rejections to HTTP responses.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Iterator
+
+
+@dataclass(frozen=True)
+class AdmissionConfig:
+    max_upstream_concurrency: int = 2
+    device_queue_max: int = 4
+    queue_timeout_sec: float = 60.0
+    metrics_window: int = 512
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted (device queue full or wait timed out)."""
+
+    def __init__(self, http_status: int, code: str, message: str, details: dict | None = None) -> None:
+        super().__init__(message)
+        self.http_status = http_status
+        self.code = code
+        self.message = message
+        self.details = details or {}
+
+
+@dataclass
+class AdmissionTicket:
+    device_id: str
+    route: str
+    enqueued_at: float
+    admitted_at: float = 0.0
+
+    @property
+    def queue_wait_sec(self) -> float:
+        return max(0.0, self.admitted_at - self.enqueued_at)
+
+
+class _RollingTimings:
+    def __init__(self, window: int) -> None:
+        self._samples: deque[float] = deque(maxlen=max(1, window))
+        self.count = 0
+        self.max_ms = 0.0
+
+    def observe(self, sec: float) -> None:
+        ms = sec * 1000.0
+        self._samples.append(ms)
+        self.count += 1
+        self.max_ms = max(self.max_ms, ms)
+
+    def snapshot(self) -> dict[str, float | int | None]:
+        ordered = sorted(self._samples)
+
+        def pct(q: float) -> float | None:
+            if not ordered:
+                return None
+            return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 1)
+
+        return {"count": self.count, "p50": pct(0.5), "p95": pct(0.95), "max": round(self.max_ms, 1)}
+
+
+class _RouteMetrics:
+    def __init__(self, window: int) -> None:
+        self.completed = 0
+        self.rejected = 0
+        self.queue_wait = _RollingTimings(window)
+        self.processing = _RollingTimings(window)
+
+    def snapshot(self) -> dict[str, object]:
+        return {
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "queueWaitMs": self.queue_wait.snapshot(),
+            "processingMs": self.processing.snapshot(),
+        }
+
+
+class BridgeAdmission:
+    def __init__(self, config: AdmissionConfig = AdmissionConfig(), clock: Callable[[], float] = time.monotonic) -> None:
+        self._c = config
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._device_queues: dict[str, deque[AdmissionTicket]] = {}
+        self._upstream_inflight = 0
+        self._upstream_peak = 0
+        self._routes: dict[str, _RouteMetrics] = {}
+
+    @contextmanager
+    def admit(self, device_id: str, route: str) -> Iterator[AdmissionTicket]:
+        """Wait for this device's turn and an upstream slot; raise AdmissionRejected otherwise."""
+        ticket = AdmissionTicket(device_id=device_id, route=route, enqueued_at=self._clock())
+        self._acquire(ticket)
+        try:
+            yield ticket
+        finally:
+            self._release(ticket)
+
+    def _acquire(self, ticket: AdmissionTicket) -> None:
+        deadline = ticket.enqueued_at + self._c.queue_timeout_sec
+        with self._cond:
+            queue = self._device_queues.setdefault(ticket.device_id, deque())
+            if len(queue) > self._c.device_queue_max:
+                self._route_locked(ticket.route).rejected += 1
+                raise AdmissionRejected(
+                    429,
+                    "DEVICE_QUEUE_FULL",
+                    "too many pending requests for this device",
+                    {"deviceId": ticket.device_id, "pending": len(queue)},
+                )
+            queue.append(ticket)
+            while queue[0] is not ticket or self._upstream_inflight >= self._c.max_upstream_concurrency:
+                remaining = deadline - self._clock()
+                if remaining <= 0:
+                    queue.remove(ticket)
+                    if not queue:
+                        del self._device_queues[ticket.device_id]
+                    self._route_locked(ticket.route).rejected += 1
+                    self._cond.notify_all()
+                    raise AdmissionRejected(
+                        503,
+                        "BRIDGE_BUSY",
+                        "timed out waiting for a processing slot",
+                        {"deviceId": ticket.device_id, "queueTimeoutSec": self._c.queue_timeout_sec},
+                    )
+                self._cond.wait(remaining)
+            self._upstream_inflight += 1
+            self._upstream_peak = max(self._upstream_peak, self._upstream_inflight)
+            ticket.admitted_at = self._clock()
+
+    def _release(self, ticket: AdmissionTicket) -> None:
+        finished = self._clock()
+        with self._cond:
+            self._upstream_inflight -= 1
+            queue = self._device_queues.get(ticket.device_id)
+            if queue and queue[0] is ticket:
+                queue.popleft()
+                if not queue:
+                    del self._device_queues[ticket.device_id]
+            metrics = self._route_locked(ticket.route)
+            metrics.completed += 1
+            metrics.queue_wait.observe(ticket.queue_wait_sec)
+            metrics.processing.observe(max(0.0, finished - ticket.admitted_at))
+            self._cond.notify_all()
+
+    def _route_locked(self, route: str) -> _RouteMetrics:
+        metrics = self._routes.get(route)
+        if metrics is None:
+            metrics = self._routes[route] = _RouteMetrics(self._c.metrics_window)
+        return metrics
+
+    def snapshot(self) -> dict[str, object]:
+        with self._cond:
+            return {
+                "maxUpstreamConcurrency": self._c.max_upstream_concurrency,
+                "upstreamInflight": self._upstream_inflight,
+                "upstreamPeak": self._upstream_peak,
+                "waiting": sum(len(q) for q in self._device_queues.values()) - self._upstream_inflight,
+                "activeDevices": len(self._device_queues),
+                "routes": {route: metrics.snapshot() for route, metrics in sorted(self._routes.items())},
+            }
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return max(0.0, float(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+def config_from_env() -> AdmissionConfig:
+    return AdmissionConfig(
+        max_upstream_concurrency=_env_int("STACKCHAN_MAX_UPSTREAM_CONCURRENCY", 2),
+        device_queue_max=_env_int("STACKCHAN_DEVICE_QUEUE_MAX", 4),
+        queue_timeout_sec=_env_float("STACKCHAN_QUEUE_TIMEOUT_SEC", 60.0),
+    )
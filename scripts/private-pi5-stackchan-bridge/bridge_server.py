@@ -1,15 +1,18 @@
 #!/usr/bin/env python3
 import base64
+import itertools
 import json
 import os
 import socket
 import sys
-from http.server import BaseHTTPRequestHandler, HTTPServer
-from typing import Any, ClassVar
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, ClassVar, TypeVar
 from urllib.parse import urlsplit
 
+from bridge_admission import AdmissionRejected, BridgeAdmission, config_from_env as admission_config_from_env
 from dgx_runtime_client import DgxUpstreamClient, config_from_env
-from home_assistant_client import HomeAssistantClient, config_from_env as ha_config_from_env
+from home_assistant_client import HomeAssistantClient, HomeAssistantStateCache, config_from_env as ha_config_from_env
 from stt_bridge_core import SttFailure, SttSuccess, SttWorkflow, ValidatedSttRequest, validate_stt_json_payload
 from stt_runtime_client import SttRuntimeClient, config_from_env as stt_config_from_env
 from stackchan_chat_core import (
@@ -17,6 +20,8 @@ from stackchan_chat_core import (
     ChatFailure,
     ChatSuccess,
     ChatValidationConfig,
+    PromptCacheStats,
+    ValidatedChatRequest,
     format_simple_success,
     validate_openai_compatible_chat_payload,
     validate_chat_payload,
@@ -25,6 +30,7 @@ from stackchan_utterance_core import (
     UtteranceFailure,
     UtteranceSuccess,
     UtteranceWorkflow,
+    ValidatedUtteranceRequest,
     format_utterance_success,
     validate_utterance_json_payload,
 )
@@ -39,6 +45,9 @@ except ValueError:
 
 STACKCHAN_TOKEN = os.getenv("STACKCHAN_TOKEN", "")
 OPENAI_COMPATIBLE_CHAT_PATHS = {"/v1/chat/completions", "/v1/chat/completions/"}
+DEVICE_ID_HEADER = "X-Stackchan-Device-Id"
+
+T = TypeVar("T")
 
 
 def _env_bool(name: str, default: bool = False) -> bool:
@@ -63,6 +72,7 @@ CHAT_VALIDATION_CONFIG = ChatValidationConfig(
     max_tokens_cap=_env_int("STACKCHAN_CHAT_MAX_TOKENS_CAP", 192),
     max_messages=_env_int("STACKCHAN_CHAT_MAX_MESSAGES", 8),
     allow_thinking=_env_bool("STACKCHAN_CHAT_ALLOW_THINKING", False),
+    history_trim_step=_env_int("STACKCHAN_CHAT_HISTORY_TRIM_STEP", 4),
 )
 
 
@@ -150,13 +160,162 @@ def _is_authorized(handler: BaseHTTPRequestHandler) -> bool:
     return authorization.startswith(prefix) and authorization[len(prefix) :] == STACKCHAN_TOKEN
 
 
+def _device_id(handler: BaseHTTPRequestHandler) -> str:
+    """Serialization key: explicit device header, else the client address."""
+    device_id = (handler.headers.get(DEVICE_ID_HEADER) or "").strip()
+    if device_id:
+        return device_id[:128]
+    client_address = getattr(handler, "client_address", None)
+    return str(client_address[0]) if client_address else "unknown"
+
+
+def _run_admitted(
+    handler: BaseHTTPRequestHandler,
+    route: str,
+    error_response: Callable[..., None],
+    run: Callable[[], T],
+) -> T | None:
+    """Run upstream work in this device's FIFO slot; respond and return None when not admitted."""
+    try:
+        with handler.admission.admit(_device_id(handler), route) as ticket:
+            outcome = run()
+    except AdmissionRejected as e:
+        handler.log_message("admission rejected route=%s code=%s", route, e.code)
+        error_response(handler, e.http_status, e.code, e.message, True, e.details)
+        return None
+    if ticket.queue_wait_sec >= 1.0:
+        handler.log_message("route=%s waited %.1fs for its slot", route, ticket.queue_wait_sec)
+    return outcome
+
+
+def _read_utterance_request(handler: BaseHTTPRequestHandler) -> ValidatedUtteranceRequest | None:
+    """Parse JSON (`audioBase64`) or raw-audio utterance bodies; sends 400 and returns None when invalid."""
+    content_type = handler.headers.get("Content-Type", "")
+    if "application/json" in content_type:
+        payload, err = _read_json(handler)
+        if err:
+            _error_response(handler, 400, "BAD_REQUEST", err)
+            return None
+        validated_utt, verr = validate_utterance_json_payload(
+            payload if isinstance(payload, dict) else None,
+            CHAT_VALIDATION_CONFIG,
+        )
+    else:
+        try:
+            content_length = int(handler.headers.get("Content-Length", "0"))
+        except ValueError:
+            _error_response(handler, 400, "BAD_REQUEST", "invalid content-length")
+            return None
+        raw = handler.rfile.read(content_length) if content_length > 0 else b""
+        if not raw:
+            _error_response(handler, 400, "BAD_REQUEST", "empty body")
+            return None
+        raw_headers: dict[str, Any] = {
+            "audioBase64": base64.b64encode(raw).decode("ascii"),
+            "contentType": content_type or "audio/wav",
+        }
+        if lang := handler.headers.get("X-Stt-Language"):
+            raw_headers["language"] = lang
+        if stt_model := handler.headers.get("X-Stt-Model"):
+            raw_headers["sttModel"] = stt_model
+        if max_tok := handler.headers.get("X-Chat-Max-Tokens"):
+            raw_headers["maxTokens"] = max_tok
+        if temp := handler.headers.get("X-Chat-Temperature"):
+            raw_headers["temperature"] = temp
+        validated_utt, verr = validate_utterance_json_payload(raw_headers, CHAT_VALIDATION_CONFIG)
+    if verr or validated_utt is None:
+        _error_response(handler, 400, "BAD_REQUEST", verr or "bad request")
+        return None
+    return validated_utt
+
+
+class NdjsonStream:
+    """Newline-delimited JSON response, started on the first event.
+
+    Failures before any event still get a normal HTTP error response; after that they are
+    sent as a final `{"type": "error"}` line. The connection closes when the stream ends.
+    """
+
+    def __init__(self, handler: BaseHTTPRequestHandler) -> None:
+        self._handler = handler
+        self.started = False
+
+    def send(self, event: dict[str, Any]) -> None:
+        if not self.started:
+            self._handler.send_response(200)
+            self._handler.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+            self._handler.send_header("Cache-Control", "no-cache")
+            self._handler.send_header("Connection", "close")
+            self._handler.end_headers()
+            self._handler.close_connection = True
+            self.started = True
+        self._handler.wfile.write(json.dumps(event, ensure_ascii=False).encode("utf-8") + b"\n")
+        self._handler.wfile.flush()
+
+    def fail(self, status_code: int, code: str, message: str, retryable: bool, details: dict | None = None) -> None:
+        if not self.started:
+            _error_response(self._handler, status_code, code, message, retryable, details)
+            return
+        error: dict[str, Any] = {"code": code, "message": message, "retryable": retryable}
+        if details:
+            error["details"] = details
+        self.send({"type": "error", "ok": False, "error": error})
+
+
+def _stream_utterance(
+    handler: BaseHTTPRequestHandler,
+    workflow: UtteranceWorkflow,
+    req: ValidatedUtteranceRequest,
+) -> None:
+    """`stt` event, then one `sentence` event per completed sentence, then `done` (or `error`)."""
+    stream = NdjsonStream(handler)
+    stt = workflow.transcribe(req)
+    if isinstance(stt, UtteranceFailure):
+        stream.fail(stt.http_status, stt.code, stt.message, stt.retryable, {**(stt.details or {}), "stage": stt.stage})
+        return
+    stream.send({"type": "stt", "sttText": stt.text, "stt": stt.details})
+    sentences = itertools.count()
+
+    def on_sentence(text: str) -> None:
+        stream.send({"type": "sentence", "index": next(sentences), "text": text})
+
+    outcome = workflow.stream_reply(req, stt, on_sentence, log=handler.log_message)
+    if isinstance(outcome, UtteranceSuccess):
+        stream.send({"type": "done", **format_utterance_success(outcome)})
+        return
+    stream.fail(
+        outcome.http_status,
+        outcome.code,
+        outcome.message,
+        outcome.retryable,
+        {**(outcome.details or {}), "stage": outcome.stage},
+    )
+
+
+def _stream_chat(handler: BaseHTTPRequestHandler, workflow: ChatCompletionWorkflow, req: ValidatedChatRequest) -> None:
+    """One `sentence` event per completed sentence, then `done` with the simple-chat body (or `error`)."""
+    stream = NdjsonStream(handler)
+    sentences = itertools.count()
+
+    def on_sentence(text: str) -> None:
+        stream.send({"type": "sentence", "index": next(sentences), "text": text})
+
+    outcome = workflow.stream(req, on_sentence, log=handler.log_message)
+    if isinstance(outcome, ChatSuccess):
+        stream.send({"type": "done", **format_simple_success(outcome.parsed)})
+        return
+    stream.fail(outcome.http_status, outcome.code, outcome.message, outcome.retryable, outcome.details)
+
+
 class Handler(BaseHTTPRequestHandler):
     """HTTP adapter; DGX behaviour is in ChatCompletionWorkflow + DgxUpstreamClient."""
 
     dgx_client: ClassVar[DgxUpstreamClient] = DgxUpstreamClient(config_from_env())
     stt_client: ClassVar[SttRuntimeClient] = SttRuntimeClient(stt_config_from_env())
-    home_assistant_client: ClassVar[HomeAssistantClient] = HomeAssistantClient(ha_config_from_env())
+    home_assistant_client: ClassVar[HomeAssistantStateCache] = HomeAssistantStateCache(HomeAssistantClient(ha_config_from_env()))
     dgx_model: ClassVar[str] = _default_dgx_model()
+    admission: ClassVar[BridgeAdmission] = BridgeAdmission(admission_config_from_env())
+    prompt_cache: ClassVar[PromptCacheStats] = PromptCacheStats()
 
     @classmethod
     def install_upstream(cls, client: DgxUpstreamClient, model: str | None = None) -> None:
@@ -173,6 +332,12 @@ class Handler(BaseHTTPRequestHandler):
         if route_path == "/healthz":
             _json_response(self, 200, {"ok": True, "service": "stackchan-private-bridge"})
             return
+        if route_path == "/metrics":
+            payload = {"ok": True, "admission": self.admission.snapshot(), "promptCache": self.prompt_cache.snapshot()}
+            if self.home_assistant_client is not None and self.home_assistant_client.enabled:
+                payload["homeAssistant"] = self.home_assistant_client.stats()
+            _json_response(self, 200, payload)
+            return
         _error_response(self, 404, "NOT_FOUND", "endpoint not found")
 
     def do_POST(self):
@@ -196,6 +361,9 @@ class Handler(BaseHTTPRequestHandler):
                 error_response(self, 408, "REQUEST_TIMEOUT", "request read timed out")
             except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError):
                 pass
+        except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError):
+            # streaming routes: the device hung up mid-reply; upstream iteration already stopped
+            self.log_message("client disconnected during %s", urlsplit(self.path).path)
         finally:
             if REQUEST_READ_TIMEOUT_SEC > 0:
                 try:
@@ -209,12 +377,16 @@ class Handler(BaseHTTPRequestHandler):
         simple_paths = {"/api/stackchan/chat/simple", "/api/stackchan/chat/simple/"}
         stt_paths = {"/api/stackchan/stt", "/api/stackchan/stt/"}
         utterance_paths = {"/api/stackchan/utterance", "/api/stackchan/utterance/"}
+        utterance_stream_paths = {"/api/stackchan/utterance/stream", "/api/stackchan/utterance/stream/"}
+        chat_stream_paths = {"/api/stackchan/chat/stream", "/api/stackchan/chat/stream/"}
         if (
             route_path not in raw_paths
             and route_path not in simple_paths
             and route_path not in OPENAI_COMPATIBLE_CHAT_PATHS
             and route_path not in stt_paths
             and route_path not in utterance_paths
+            and route_path not in utterance_stream_paths
+            and route_path not in chat_stream_paths
         ):
             _error_response(self, 404, "NOT_FOUND", "endpoint not found")
             return
@@ -222,55 +394,34 @@ class Handler(BaseHTTPRequestHandler):
         openai_compatible_mode = route_path in OPENAI_COMPATIBLE_CHAT_PATHS
         stt_mode = route_path in stt_paths
         utterance_mode = route_path in utterance_paths
+        utterance_stream_mode = route_path in utterance_stream_paths
+        chat_stream_mode = route_path in chat_stream_paths
         error_response = _openai_error_response if openai_compatible_mode else _error_response
 
         if not _is_authorized(self):
             error_response(self, 401, "UNAUTHORIZED", "invalid stackchan token")
             return
 
-        if utterance_mode:
-            content_type = self.headers.get("Content-Type", "")
-            if "application/json" in content_type:
-                payload, err = _read_json(self)
-                if err:
-                    _error_response(self, 400, "BAD_REQUEST", err)
-                    return
-                validated_utt, verr = validate_utterance_json_payload(
-                    payload if isinstance(payload, dict) else None,
-                    CHAT_VALIDATION_CONFIG,
-                )
-            else:
-                try:
-                    content_length = int(self.headers.get("Content-Length", "0"))
-                except ValueError:
-                    _error_response(self, 400, "BAD_REQUEST", "invalid content-length")
-                    return
-                raw = self.rfile.read(content_length) if content_length > 0 else b""
-                if not raw:
-                    _error_response(self, 400, "BAD_REQUEST", "empty body")
-                    return
-                raw_headers: dict[str, Any] = {
-                    "audioBase64": base64.b64encode(raw).decode("ascii"),
-                    "contentType": content_type or "audio/wav",
-                }
-                if lang := self.headers.get("X-Stt-Language"):
-                    raw_headers["language"] = lang
-                if stt_model := self.headers.get("X-Stt-Model"):
-                    raw_headers["sttModel"] = stt_model
-                if max_tok := self.headers.get("X-Chat-Max-Tokens"):
-                    raw_headers["maxTokens"] = max_tok
-                if temp := self.headers.get("X-Chat-Temperature"):
-                    raw_headers["temperature"] = temp
-                validated_utt, verr = validate_utterance_json_payload(raw_headers, CHAT_VALIDATION_CONFIG)
-            if verr or validated_utt is None:
-                _error_response(self, 400, "BAD_REQUEST", verr or "bad request")
+        if utterance_mode or utterance_stream_mode:
+            validated_utt = _read_utterance_request(self)
+            if validated_utt is None:
                 return
 
             utterance_workflow = UtteranceWorkflow(
                 SttWorkflow(self.stt_client),
-                ChatCompletionWorkflow(self.dgx_client, self.dgx_model, self.home_assistant_client),
+                ChatCompletionWorkflow(self.dgx_client, self.dgx_model, self.home_assistant_client, self.prompt_cache),
+            )
+            if utterance_stream_mode:
+                _run_admitted(
+                    self,
+                    "utterance-stream",
+                    _error_response,
+                    lambda: _stream_utterance(self, utterance_workflow, validated_utt),
+                )
+                return
+            utt_outcome = _run_admitted(
+                self, "utterance", _error_response, lambda: utterance_workflow.run(validated_utt, log=self.log_message)
             )
-            utt_outcome = utterance_workflow.run(validated_utt, log=self.log_message)
             if isinstance(utt_outcome, UtteranceSuccess):
                 _json_response(self, utt_outcome.status_code, format_utterance_success(utt_outcome))
                 return
@@ -316,7 +467,7 @@ class Handler(BaseHTTPRequestHandler):
                 return
 
             stt_workflow = SttWorkflow(self.stt_client)
-            stt_outcome = stt_workflow.run(validated_stt)
+            stt_outcome = _run_admitted(self, "stt", _error_response, lambda: stt_workflow.run(validated_stt))
             if isinstance(stt_outcome, SttSuccess):
                 _json_response(
                     self,
@@ -350,8 +501,12 @@ class Handler(BaseHTTPRequestHandler):
             error_response(self, 400, "BAD_REQUEST", verr or "bad request")
             return
 
-        workflow = ChatCompletionWorkflow(self.dgx_client, self.dgx_model, self.home_assistant_client)
-        outcome = workflow.run(validated, log=self.log_message)
+        workflow = ChatCompletionWorkflow(self.dgx_client, self.dgx_model, self.home_assistant_client, self.prompt_cache)
+        if chat_stream_mode:
+            _run_admitted(self, "chat-stream", error_response, lambda: _stream_chat(self, workflow, validated))
+            return
+        route = "openai-chat" if openai_compatible_mode else "simple-chat" if simple_mode else "chat"
+        outcome = _run_admitted(self, route, error_response, lambda: workflow.run(validated, log=self.log_message))
 
         if isinstance(outcome, ChatSuccess):
             if simple_mode:
@@ -372,11 +527,29 @@ class Handler(BaseHTTPRequestHandler):
             return
 
 
+def _warm_stt(client: SttRuntimeClient) -> None:
+    try:
+        result = client.warm()
+    except Exception as e:  # first utterance will load (and report) it instead
+        print(f"stt warm-up failed: {e}", file=sys.stderr, flush=True)
+        return
+    print(f"stt warm-up: {json.dumps(result)}", flush=True)
+
+
 def main():
     Handler.install_upstream(DgxUpstreamClient(config_from_env()), _default_dgx_model())
-    Handler.stt_client = SttRuntimeClient(stt_config_from_env())
-    Handler.home_assistant_client = HomeAssistantClient(ha_config_from_env())
-    server = HTTPServer((LISTEN_HOST, LISTEN_PORT), Handler)
+    stt_config = stt_config_from_env()
+    Handler.stt_client = SttRuntimeClient(stt_config)
+    if stt_config.local_preload and stt_config.provider.lower() == "faster-whisper-local":
+        # load in the background so /healthz answers immediately; STT requests wait on the load lock
+        threading.Thread(target=_warm_stt, args=(Handler.stt_client,), name="stt-warm", daemon=True).start()
+    # chat requests read the cached lines; entity GETs happen on the cache's refresh thread
+    Handler.home_assistant_client = HomeAssistantStateCache(HomeAssistantClient(ha_config_from_env()))
+    Handler.home_assistant_client.start()
+    Handler.admission = BridgeAdmission(admission_config_from_env())
+    # One thread per connection; ordering and upstream limits live in BridgeAdmission.
+    server = ThreadingHTTPServer((LISTEN_HOST, LISTEN_PORT), Handler)
+    server.daemon_threads = True
     print(f"stackchan bridge listening on {LISTEN_HOST}:{LISTEN_PORT}", flush=True)
     server.serve_forever()
 
@@ -2,18 +2,32 @@
 """
 DGX gateway upstream client for stackchan-bridge.
 
-Responsibility: HTTP calls to DGX (`/v1/chat/completions`, optional `/start`, ready probe).
+Responsibility: HTTP calls to DGX (`/v1/chat/completions` plain or SSE-streamed, optional `/start`, ready probe).
+After `/start`, readiness is awaited with the gateway long-poll (`GET /system/ready?timeoutSec=N`),
+which shares one upstream probe across all waiters; older gateways without it (404) fall back to
+polling `runtime_ready_path` every `ready_poll_sec`.
+
+Transport: one keep-alive connection pool per client (HTTP/1.1 to the gateway's nginx), so chat
+calls and probes do not pay a TCP handshake each. Readiness is single-flight: concurrent callers
+that find the runtime cold share one `/start` + wait, and a confirmed-ready result (including any
+successful chat call) is trusted for `ready_cache_ttl_sec`, so warm-path checks skip the round trip.
 Does not depend on BaseHTTPRequestHandler; keep bridge_server.py as routing/IO only.
 """
 
 from __future__ import annotations
 
+import http.client
 import json
+import threading
 import time
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Callable, Iterator
 from urllib.error import HTTPError, URLError
-from urllib.request import Request, urlopen
+from urllib.parse import urlencode
+from urllib.request import HTTPHandler, HTTPSHandler, OpenerDirector, Request, build_opener
+
+# Idle pooled connections older than this are closed rather than reused (nginx keepalive_timeout is 75s).
+POOL_IDLE_SEC = 30.0
 
 
 @dataclass(frozen=True)
@@ -27,18 +41,219 @@ class DgxUpstreamConfig:
     upstream_timeout_sec: float = 45.0
     ready_timeout_sec: float = 600.0
     ready_poll_sec: float = 1.0
+    runtime_ready_wait_path: str = "/system/ready"
+    ready_long_poll_sec: float = 25.0
     auto_start: bool = False
     model_profile_id: str = ""
+    ready_cache_ttl_sec: float = 15.0
+    pool_max_idle: int = 4
+
+
+class _PooledResponse(http.client.HTTPResponse):
+    """HTTPResponse that hands its connection back to the pool when closed after a full read."""
+
+    _release: Callable[[bool], None] | None = None
+
+    def close(self) -> None:
+        # fp is dropped by http.client once the whole body has been read
+        reusable = self.fp is None and not self.will_close
+        super().close()
+        release, self._release = self._release, None
+        if release is not None:
+            release(reusable)
+
+
+def _http_error_body(e: HTTPError) -> str:
+    """Read an error body and close it, so its pooled connection goes back to the pool (or is dropped)."""
+    try:
+        return e.read().decode("utf-8", errors="ignore")[:1000]
+    finally:
+        e.close()
+
+
+class _ConnectionPool:
+    def __init__(self, max_idle: int, clock: Callable[[], float] = time.monotonic) -> None:
+        self._max_idle = max_idle
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._idle: dict[tuple[str, str], list[tuple[float, http.client.HTTPConnection]]] = {}
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, key: tuple[str, str]) -> http.client.HTTPConnection | None:
+        now = self._clock()
+        with self._lock:
+            idle = self._idle.get(key, [])
+            while idle:
+                released_at, conn = idle.pop()
+                if now - released_at <= POOL_IDLE_SEC and conn.sock is not None:
+                    self.reused += 1
+                    return conn
+                conn.close()
+            return None
+
+    def release(self, key: tuple[str, str], conn: http.client.HTTPConnection, reusable: bool) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if reusable and conn.sock is not None and len(idle) < self._max_idle:
+                idle.append((self._clock(), conn))
+                return
+        conn.close()
+
+    def open(self, req: Request, make_conn: Callable[[str, float | None], http.client.HTTPConnection]) -> http.client.HTTPResponse:
+        """urllib `do_open` with a pooled HTTP/1.1 connection instead of `Connection: close`.
+
+        A reused connection the server already closed (idle timeout) fails on send or on the status
+        line before any response; that request is retried once on a fresh connection.
+        """
+        key = (req.type, req.host)
+        headers = dict(req.unredirected_hdrs)
+        headers.update({k: v for k, v in req.headers.items() if k not in headers})
+        headers["Connection"] = "keep-alive"
+        headers = {name.title(): val for name, val in headers.items()}
+        while True:
+            conn = self.acquire(key)
+            reused = conn is not None
+            if conn is None:
+                conn = make_conn(req.host, req.timeout)
+                conn.response_class = _PooledResponse
+                with self._lock:
+                    self.created += 1
+            else:
+                conn.timeout = req.timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(req.timeout)
+            try:
+                try:
+                    conn.request(req.get_method(), req.selector, req.data, headers)
+                except OSError as err:
+                    if reused and isinstance(err, ConnectionError):
+                        conn.close()
+                        continue
+                    raise URLError(err)
+                resp = conn.getresponse()
+            except (ConnectionError, http.client.BadStatusLine):
+                conn.close()
+                if reused:
+                    continue
+                raise
+            except BaseException:
+                conn.close()
+                raise
+            resp._release = lambda reusable, conn=conn: self.release(key, conn, reusable)
+            resp.url = req.get_full_url()
+            resp.msg = resp.reason
+            return resp
+
+    def close(self) -> None:
+        with self._lock:
+            conns = [conn for idle in self._idle.values() for _, conn in idle]
+            self._idle.clear()
+        for conn in conns:
+            conn.close()
+
+
+class _PooledHTTPHandler(HTTPHandler):
+    def __init__(self, pool: _ConnectionPool) -> None:
+        super().__init__()
+        self._pool = pool
+
+    def http_open(self, req: Request) -> http.client.HTTPResponse:
+        if req._tunnel_host:  # proxy CONNECT: keep urllib's one-shot path
+            return super().http_open(req)
+        return self._pool.open(req, lambda host, timeout: http.client.HTTPConnection(host, timeout=timeout))
+
+
+class _PooledHTTPSHandler(HTTPSHandler):
+    def __init__(self, pool: _ConnectionPool) -> None:
+        super().__init__()
+        self._pool = pool
+
+    def https_open(self, req: Request) -> http.client.HTTPResponse:
+        if req._tunnel_host:
+            return super().https_open(req)
+        return self._pool.open(
+            req, lambda host, timeout: http.client.HTTPSConnection(host, timeout=timeout, context=self._context)
+        )
+
+
+class _ReadinessFlight:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: tuple[bool, dict[str, Any]] = (False, {"message": "runtime readiness check failed"})
+
+
+class ReadinessGate:
+    """Single-flight runtime readiness with a short TTL on confirmed-ready results."""
+
+    def __init__(self, ttl_sec: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self._ttl_sec = ttl_sec
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._ready_at: float | None = None
+        self._flight: _ReadinessFlight | None = None
+
+    def fresh_age(self) -> float | None:
+        """Seconds since readiness was last confirmed, or None when unknown / older than the TTL."""
+        with self._lock:
+            if self._ready_at is None:
+                return None
+            age = self._clock() - self._ready_at
+            return age if age <= self._ttl_sec else None
+
+    def mark_ready(self) -> None:
+        with self._lock:
+            self._ready_at = self._clock()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._ready_at = None
+
+    def run(self, check: Callable[[], tuple[bool, dict[str, Any]]]) -> tuple[bool, dict[str, Any]]:
+        """Run `check` unless another caller already is; followers wait for and share its result."""
+        with self._lock:
+            flight = self._flight
+            leader = flight is None
+            if leader:
+                flight = self._flight = _ReadinessFlight()
+        assert flight is not None
+        if not leader:
+            flight.done.wait()
+            ok, details = flight.result
+            return ok, {**details, "sharedFlight": True}
+        try:
+            flight.result = check()
+            if flight.result[0]:
+                self.mark_ready()
+            return flight.result
+        finally:
+            with self._lock:
+                self._flight = None
+            flight.done.set()
 
 
 class DgxUpstreamClient:
     def __init__(self, config: DgxUpstreamConfig) -> None:
         self._c = config
+        self._pool = _ConnectionPool(max(0, config.pool_max_idle))
+        self._opener: OpenerDirector = build_opener(_PooledHTTPHandler(self._pool), _PooledHTTPSHandler(self._pool))
+        self._readiness = ReadinessGate(config.ready_cache_ttl_sec)
 
     @property
     def auto_start(self) -> bool:
         return self._c.auto_start
 
+    def _open(self, req: Request, timeout: float) -> http.client.HTTPResponse:
+        return self._opener.open(req, timeout=timeout)
+
+    def close(self) -> None:
+        self._pool.close()
+
+    def _observe_upstream_error(self, exc: BaseException) -> None:
+        # 502/503 / unreachable mean the runtime may be gone; the next readiness check must hit the wire
+        if isinstance(exc, URLError) and (not isinstance(exc, HTTPError) or exc.code in (502, 503, 504)):
+            self._readiness.invalidate()
+
     def _llm_headers(self) -> dict[str, str]:
         headers = {"Content-Type": "application/json"}
         if self._c.llm_shared_token:
@@ -60,14 +275,18 @@ class DgxUpstreamClient:
             headers=self._llm_headers(),
         )
         try:
-            with urlopen(ready_req, timeout=probe_timeout) as resp:
+            with self._open(ready_req, timeout=probe_timeout) as resp:
                 body = resp.read().decode("utf-8", errors="ignore")[:1000]
+                self._readiness.mark_ready()
                 return True, {"status": resp.getcode(), "body": body}
         except HTTPError as e:
-            return False, {"status": e.code, "body": e.read().decode("utf-8", errors="ignore")[:1000]}
+            self._readiness.invalidate()
+            return False, {"status": e.code, "body": _http_error_body(e)}
         except URLError as e:
+            self._readiness.invalidate()
             return False, {"message": str(e)}
         except TimeoutError:
+            self._readiness.invalidate()
             return False, {"message": "runtime ready probe timed out"}
 
     def fetch_active_model_profile(self) -> tuple[bool, dict[str, Any]]:
@@ -79,11 +298,11 @@ class DgxUpstreamClient:
             headers=self._llm_headers(),
         )
         try:
-            with urlopen(req, timeout=probe_timeout) as resp:
+            with self._open(req, timeout=probe_timeout) as resp:
                 body = resp.read().decode("utf-8", errors="ignore")
                 return True, json.loads(body)
         except HTTPError as e:
-            return False, {"status": e.code, "body": e.read().decode("utf-8", errors="ignore")[:1000]}
+            return False, {"status": e.code, "body": _http_error_body(e)}
         except URLError as e:
             return False, {"message": str(e)}
         except TimeoutError:
@@ -93,6 +312,9 @@ class DgxUpstreamClient:
 
     def warm_runtime_if_needed(self) -> tuple[bool, dict[str, Any]]:
         """GET ready path; POST /start + poll only when not already warm."""
+        age = self._readiness.fresh_age()
+        if age is not None:
+            return True, {"phase": "already_warm", "cachedReadyAgeSec": round(age, 1)}
         ready, probe = self.probe_runtime_ready()
         if ready:
             return True, {"phase": "already_warm", "probe": probe}
@@ -121,13 +343,21 @@ class DgxUpstreamClient:
         return self.warm_runtime_if_needed()
 
     def ensure_runtime_ready(self) -> tuple[bool, dict[str, Any]]:
-        """POST /start then poll GET ready path until 200 or timeout."""
-        details: dict[str, Any] = {}
+        """POST /start then wait (gateway long-poll, or GET ready path polling) until ready or timeout.
+
+        Single-flight: concurrent callers share one start + wait. Readiness confirmed within
+        `ready_cache_ttl_sec` (and not invalidated by a later upstream failure) returns at once.
+        """
         if not self._c.auto_start:
             return False, {"message": "runtime auto start disabled"}
         if not self._c.runtime_control_token:
             return False, {"message": "runtime control token missing"}
+        age = self._readiness.fresh_age()
+        if age is not None:
+            return True, {"phase": "cached", "cachedReadyAgeSec": round(age, 1)}
+        return self._readiness.run(self._start_and_wait)
 
+    def _start_and_wait(self) -> tuple[bool, dict[str, Any]]:
         profile_id = (self._c.model_profile_id or "").strip()
         if profile_id:
             start_body = json.dumps({"modelProfileId": profile_id}).encode("utf-8")
@@ -142,12 +372,12 @@ class DgxUpstreamClient:
         )
         start_result: dict[str, Any] = {"attempted": True}
         try:
-            with urlopen(start_req, timeout=self._c.upstream_timeout_sec) as resp:
+            with self._open(start_req, timeout=self._c.upstream_timeout_sec) as resp:
                 start_result["status"] = resp.getcode()
                 start_result["body"] = resp.read().decode("utf-8", errors="ignore")[:1000]
         except HTTPError as e:
             start_result["status"] = e.code
-            start_result["body"] = e.read().decode("utf-8", errors="ignore")[:1000]
+            start_result["body"] = _http_error_body(e)
             return False, {"start": start_result}
         except URLError as e:
             start_result["message"] = str(e)
@@ -157,33 +387,57 @@ class DgxUpstreamClient:
             return False, {"start": start_result}
 
         deadline = time.monotonic() + self._c.ready_timeout_sec
-        last_probe: dict[str, Any] = {}
-        probe_timeout = min(self._c.upstream_timeout_sec, 10.0)
-
-        while time.monotonic() < deadline:
-            ready_req = Request(
-                url=f"{self._c.base_url}{self._c.runtime_ready_path}",
-                method="GET",
-                headers=self._llm_headers(),
-            )
-            try:
-                with urlopen(ready_req, timeout=probe_timeout) as resp:
-                    body = resp.read().decode("utf-8", errors="ignore")[:1000]
-                    return True, {"start": start_result, "ready": {"status": resp.getcode(), "body": body}}
-            except HTTPError as e:
-                last_probe = {"status": e.code, "body": e.read().decode("utf-8", errors="ignore")[:1000]}
-            except URLError as e:
-                last_probe = {"message": str(e)}
-            except TimeoutError:
-                last_probe = {"message": "runtime ready probe timed out"}
-            time.sleep(self._c.ready_poll_sec)
-
+        ready, probe = self._wait_until_ready(deadline)
+        if ready:
+            return True, {"start": start_result, "ready": probe}
         return False, {
             "start": start_result,
-            "ready": last_probe,
+            "ready": probe,
             "message": "runtime did not become ready in time",
         }
 
+    def _long_poll_ready(self, timeout_sec: float) -> tuple[bool | None, dict[str, Any]]:
+        """One gateway long-poll. Returns (None, ...) when the gateway has no wait endpoint."""
+        query = urlencode({"timeoutSec": f"{timeout_sec:.1f}"})
+        req = Request(
+            url=f"{self._c.base_url}{self._c.runtime_ready_wait_path}?{query}",
+            method="GET",
+            headers=self._llm_headers(),
+        )
+        try:
+            with self._open(req, timeout=timeout_sec + 10.0) as resp:
+                body = resp.read().decode("utf-8", errors="ignore")[:1000]
+                return True, {"status": resp.getcode(), "body": body}
+        except HTTPError as e:
+            detail = {"status": e.code, "body": _http_error_body(e)}
+            return (None if e.code == 404 else False), detail
+        except URLError as e:
+            return False, {"message": str(e)}
+        except TimeoutError:
+            return False, {"message": "runtime ready long-poll timed out"}
+
+    def _wait_until_ready(self, deadline: float) -> tuple[bool, dict[str, Any]]:
+        last_probe: dict[str, Any] = {}
+        long_poll = bool(self._c.runtime_ready_wait_path)
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False, last_probe
+            if long_poll:
+                ready, last_probe = self._long_poll_ready(min(remaining, self._c.ready_long_poll_sec))
+                if ready:
+                    return True, last_probe
+                if ready is None:
+                    long_poll = False
+                elif "RUNTIME_NOT_READY" in str(last_probe.get("body") or ""):
+                    # the gateway already waited timeoutSec; start the next long-poll right away
+                    continue
+            else:
+                ready, last_probe = self.probe_runtime_ready()
+                if ready:
+                    return True, last_probe
+            time.sleep(self._c.ready_poll_sec)
+
     def post_chat_completions(self, body: bytes) -> tuple[int, dict[str, Any]]:
         """POST chat completions; returns (http_status, parsed_json). Raises on non-JSON 2xx edge cases."""
         req = Request(
@@ -192,11 +446,51 @@ class DgxUpstreamClient:
             headers=self._llm_headers(),
             data=body,
         )
-        with urlopen(req, timeout=self._c.upstream_timeout_sec) as resp:
-            raw = resp.read()
-            status = resp.getcode()
-            parsed = json.loads(raw.decode("utf-8"))
-            return status, parsed
+        try:
+            with self._open(req, timeout=self._c.upstream_timeout_sec) as resp:
+                raw = resp.read()
+                status = resp.getcode()
+        except URLError as e:
+            self._observe_upstream_error(e)
+            raise
+        self._readiness.mark_ready()
+        return status, json.loads(raw.decode("utf-8"))
+
+    def stream_chat_completions(self, body: bytes) -> Iterator[dict[str, Any]]:
+        """POST a `stream: true` chat completion and yield each SSE `data:` chunk as it arrives.
+
+        Upstreams that ignore `stream` (plain JSON reply) yield that single completion instead.
+        HTTPError / URLError are raised on the first `next()`, like post_chat_completions.
+        """
+        req = Request(
+            url=f"{self._c.base_url}{self._c.chat_path}",
+            method="POST",
+            headers={**self._llm_headers(), "Accept": "text/event-stream"},
+            data=body,
+        )
+        try:
+            resp = self._open(req, timeout=self._c.upstream_timeout_sec)
+        except URLError as e:
+            self._observe_upstream_error(e)
+            raise
+        self._readiness.mark_ready()
+        with resp:
+            if "text/event-stream" not in resp.headers.get("Content-Type", ""):
+                yield json.loads(resp.read().decode("utf-8"))
+                return
+            for raw_line in resp:
+                line = raw_line.strip()
+                if not line.startswith(b"data:"):
+                    continue
+                data = line[len(b"data:") :].strip()
+                if data == b"[DONE]":
+                    return
+                try:
+                    chunk = json.loads(data.decode("utf-8"))
+                except (UnicodeDecodeError, json.JSONDecodeError):
+                    continue
+                if isinstance(chunk, dict):
+                    yield chunk
 
 
 def config_from_env() -> DgxUpstreamConfig:
@@ -214,6 +508,10 @@ def config_from_env() -> DgxUpstreamConfig:
         upstream_timeout_sec=float(os.getenv("UPSTREAM_TIMEOUT_SEC", "45")),
         ready_timeout_sec=float(os.getenv("DGX_RUNTIME_READY_TIMEOUT_SEC", "600")),
         ready_poll_sec=float(os.getenv("DGX_RUNTIME_READY_POLL_SEC", "1")),
+        runtime_ready_wait_path=os.getenv("DGX_RUNTIME_READY_WAIT_PATH", "/system/ready").strip(),
+        ready_long_poll_sec=float(os.getenv("DGX_RUNTIME_READY_LONG_POLL_SEC", "25")),
         auto_start=auto,
         model_profile_id=os.getenv("DGX_MODEL_PROFILE_ID", "").strip(),
+        ready_cache_ttl_sec=float(os.getenv("DGX_RUNTIME_READY_CACHE_TTL_SEC", "15")),
+        pool_max_idle=int(os.getenv("DGX_HTTP_POOL_MAX_IDLE", "4")),
     )
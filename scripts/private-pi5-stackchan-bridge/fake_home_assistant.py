@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Local Home Assistant stand-in for the stackchan-bridge state cache tests and manual checks.
+
+Implements only what home_assistant_client.py uses:
+- GET /api/states/<entity_id>  Bearer token required; 404 for unknown entities
+- GET /stats                   per-entity request counts and peak concurrent requests
+
+Latency and failures are configurable so cache refresh concurrency, TTL expiry and stale
+fallback can be exercised without a real Home Assistant.
+
+usage:
+  python3 ./fake_home_assistant.py --port 38123 --token dev --latency-ms 200 \
+    --state sensor.living_temperature=22.5 --state weather.home=sunny
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import unquote
+
+
+class FakeHomeAssistantState:
+    def __init__(self, token: str = "token", latency_ms: float = 0.0) -> None:
+        self.token = token
+        self.latency_ms = latency_ms
+        self._lock = threading.Lock()
+        self._states: dict[str, dict[str, Any]] = {}
+        self._failing: set[str] = set()
+        self._inflight = 0
+        self.max_inflight = 0
+        self.requests: dict[str, int] = {}
+
+    def set_state(self, entity_id: str, state: str, attributes: dict[str, Any] | None = None) -> None:
+        with self._lock:
+            self._states[entity_id] = {"entity_id": entity_id, "state": state, "attributes": attributes or {}}
+
+    def set_failing(self, entity_id: str, failing: bool = True) -> None:
+        """While failing, the entity answers 500 (Home Assistant restarting, integration down, ...)."""
+        with self._lock:
+            if failing:
+                self._failing.add(entity_id)
+            else:
+                self._failing.discard(entity_id)
+
+    def request_count(self, entity_id: str) -> int:
+        with self._lock:
+            return self.requests.get(entity_id, 0)
+
+    def begin(self, entity_id: str) -> tuple[int, dict[str, Any] | None]:
+        with self._lock:
+            self.requests[entity_id] = self.requests.get(entity_id, 0) + 1
+            self._inflight += 1
+            self.max_inflight = max(self.max_inflight, self._inflight)
+            if entity_id in self._failing:
+                return 500, None
+            payload = self._states.get(entity_id)
+            return (200, dict(payload)) if payload is not None else (404, None)
+
+    def end(self) -> None:
+        with self._lock:
+            self._inflight -= 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"requests": dict(self.requests), "maxInflight": self.max_inflight}
+
+
+def make_handler(state: FakeHomeAssistantState) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send_json(self, status: int, payload: dict[str, Any]) -> None:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:  # noqa: N802
+            path = self.path.split("?", 1)[0]
+            if path == "/stats":
+                self._send_json(200, state.stats())
+                return
+            if not path.startswith("/api/states/"):
+                self._send_json(404, {"message": "not found"})
+                return
+            if self.headers.get("Authorization") != f"Bearer {state.token}":
+                self._send_json(401, {"message": "unauthorized"})
+                return
+            entity_id = unquote(path[len("/api/states/") :])
+            status, payload = state.begin(entity_id)
+            try:
+                if state.latency_ms > 0:
+                    time.sleep(state.latency_ms / 1000.0)
+            finally:
+                state.end()
+            if status == 200 and payload is not None:
+                self._send_json(200, payload)
+            elif status == 404:
+                self._send_json(404, {"message": f"Entity not found: {entity_id}"})
+            else:
+                self._send_json(status, {"message": "injected failure"})
+
+        def log_message(self, fmt: str, *args: object) -> None:
+            return
+
+    return Handler
+
+
+def start_fake_home_assistant(
+    token: str = "token",
+    latency_ms: float = 0.0,
+    host: str = "127.0.0.1",
+    port: int = 0,
+) -> tuple[ThreadingHTTPServer, FakeHomeAssistantState]:
+    """Serve in a background thread; returns (server, state). Stop with server.shutdown()."""
+    state = FakeHomeAssistantState(token=token, latency_ms=latency_ms)
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fake-home-assistant", daemon=True).start()
+    return server, state
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=38123)
+    parser.add_argument("--token", default="token")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--state", action="append", default=[], help="entity_id=state (repeatable)")
+    args = parser.parse_args()
+    state = FakeHomeAssistantState(token=args.token, latency_ms=args.latency_ms)
+    for item in args.state:
+        entity_id, _, value = item.partition("=")
+        state.set_state(entity_id.strip(), value.strip())
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(state))
+    server.daemon_threads = True
+    print(f"[fake-home-assistant] listening on http://{args.host}:{args.port}", file=sys.stderr)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,30 @@
 #!/usr/bin/env python3
 """
 Read-only Home Assistant context client for stackchan-bridge.
+
+`HomeAssistantClient` fetches one allowlisted entity per GET. Chat requests use
+`HomeAssistantStateCache`: a background thread re-fetches each entity when its TTL expires
+(due entities in parallel), and `snapshot_lines()` only returns the last rendered lines, so
+chat latency no longer grows with the allowlist.
 """
 
 from __future__ import annotations
 
 import json
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Callable
+from urllib.parse import quote
 from urllib.request import Request, urlopen
 
+# A failed refresh keeps serving the previous state until it is this many TTLs old.
+STALE_TTL_FACTOR = 3.0
+# Retry a failed entity sooner than its TTL, but never hammer Home Assistant.
+FAILED_RETRY_SEC = 10.0
+
 
 @dataclass(frozen=True)
 class HomeAssistantConfig:
@@ -19,6 +33,9 @@ class HomeAssistantConfig:
     token: str = ""
     entity_ids: tuple[str, ...] = ()
     timeout_sec: float = 5.0
+    ttl_sec: float = 30.0
+    entity_ttls: tuple[tuple[str, float], ...] = ()
+    fetch_concurrency: int = 4
 
 
 def _env_bool(value: str | None, default: bool = False) -> bool:
@@ -36,10 +53,28 @@ def _env_entity_ids(value: str | None) -> tuple[str, ...]:
     return tuple(part.strip() for part in value.split(",") if part.strip())
 
 
+def _env_entity_ttls(value: str | None) -> tuple[tuple[str, float], ...]:
+    """`sensor.a=10,weather.home=600` -> ((entity, sec), ...); malformed items are skipped."""
+    ttls: list[tuple[str, float]] = []
+    for part in _env_entity_ids(value):
+        entity_id, sep, raw = part.partition("=")
+        if not sep:
+            continue
+        try:
+            ttls.append((entity_id.strip(), max(1.0, float(raw))))
+        except ValueError:
+            continue
+    return tuple(ttls)
+
+
 class HomeAssistantClient:
     def __init__(self, config: HomeAssistantConfig) -> None:
         self._c = config
 
+    @property
+    def config(self) -> HomeAssistantConfig:
+        return self._c
+
     @property
     def enabled(self) -> bool:
         return self._c.enabled and self._c.base_url != "" and self._c.token != "" and len(self._c.entity_ids) > 0
@@ -49,14 +84,14 @@ class HomeAssistantClient:
             return []
         lines: list[str] = []
         for entity_id in self._c.entity_ids:
-            state = self._get_state(entity_id)
+            state = self.get_state_line(entity_id)
             if state:
                 lines.append(state)
         return lines
 
-    def _get_state(self, entity_id: str) -> str | None:
+    def get_state_line(self, entity_id: str) -> str | None:
         req = Request(
-            url=f"{self._c.base_url.rstrip('/')}/api/states/{entity_id}",
+            url=f"{self._c.base_url.rstrip('/')}/api/states/{quote(entity_id)}",
             method="GET",
             headers={"Authorization": f"Bearer {self._c.token}", "Accept": "application/json"},
         )
@@ -65,6 +100,133 @@ class HomeAssistantClient:
         return format_home_assistant_state(parsed)
 
 
+@dataclass
+class _CachedEntity:
+    line: str | None = None
+    fetched_at: float | None = None
+    next_due: float = 0.0
+    failures: int = 0
+    last_error: str | None = None
+
+
+class HomeAssistantStateCache:
+    """Per-entity TTL cache in front of HomeAssistantClient; `snapshot_lines()` never does I/O.
+
+    Until the first refresh has finished, `snapshot_lines()` waits for it (at most `timeout_sec`)
+    so the first chat after startup still gets context.
+    """
+
+    def __init__(self, client: HomeAssistantClient, clock: Callable[[], float] = time.monotonic) -> None:
+        self._client = client
+        self._c = client.config
+        self._clock = clock
+        self._ttls = dict(self._c.entity_ttls)
+        self._lock = threading.Lock()
+        self._entries: dict[str, _CachedEntity] = {entity_id: _CachedEntity() for entity_id in self._c.entity_ids}
+        self._lines: tuple[str, ...] = ()
+        self._refreshes = 0
+        self._fetches = 0
+        self._first_refresh = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._pool: ThreadPoolExecutor | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._client.enabled
+
+    def ttl_for(self, entity_id: str) -> float:
+        return self._ttls.get(entity_id, self._c.ttl_sec)
+
+    def start(self) -> None:
+        with self._lock:
+            if not self.enabled or self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="ha-state-cache", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self._c.timeout_sec + 1.0)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+
+    def snapshot_lines(self) -> list[str]:
+        if not self.enabled:
+            return []
+        if not self._first_refresh.is_set():
+            self.start()
+            self._first_refresh.wait(self._c.timeout_sec)
+        return list(self._lines)
+
+    def refresh_due(self) -> int:
+        """Fetch every entity whose TTL has expired (in parallel); returns how many were fetched."""
+        now = self._clock()
+        with self._lock:
+            due = [entity_id for entity_id, entry in self._entries.items() if entry.next_due <= now]
+        if not due:
+            return 0
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=max(1, self._c.fetch_concurrency), thread_name_prefix="ha-fetch")
+        results = list(self._pool.map(self._fetch, due))
+        finished = self._clock()
+        with self._lock:
+            for entity_id, line, error in results:
+                entry = self._entries[entity_id]
+                ttl = self.ttl_for(entity_id)
+                if error is None:
+                    entry.line, entry.fetched_at, entry.failures, entry.last_error = line, finished, 0, None
+                    entry.next_due = finished + ttl
+                    continue
+                entry.failures += 1
+                entry.last_error = error
+                entry.next_due = finished + min(ttl, FAILED_RETRY_SEC)
+                if entry.fetched_at is None or finished - entry.fetched_at > ttl * STALE_TTL_FACTOR:
+                    entry.line = None
+            # keep allowlist order; built once per refresh so readers just take the tuple
+            self._lines = tuple(e.line for e in self._entries.values() if e.line)
+            self._refreshes += 1
+            self._fetches += len(due)
+        self._first_refresh.set()
+        return len(due)
+
+    def stats(self) -> dict[str, Any]:
+        now = self._clock()
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "refreshes": self._refreshes,
+                "fetches": self._fetches,
+                "lines": len(self._lines),
+                "entities": {
+                    entity_id: {
+                        "ttlSec": self.ttl_for(entity_id),
+                        "ageSec": round(now - e.fetched_at, 1) if e.fetched_at is not None else None,
+                        "failures": e.failures,
+                        "lastError": e.last_error,
+                    }
+                    for entity_id, e in self._entries.items()
+                },
+            }
+
+    def _fetch(self, entity_id: str) -> tuple[str, str | None, str | None]:
+        try:
+            return entity_id, self._client.get_state_line(entity_id), None
+        except Exception as e:  # HTTPError / URLError / timeout / bad JSON: keep the previous line for now
+            return entity_id, None, str(e) or e.__class__.__name__
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.refresh_due()
+            except Exception:
+                self._first_refresh.set()
+            with self._lock:
+                next_due = min((e.next_due for e in self._entries.values()), default=self._clock() + self._c.ttl_sec)
+            self._stop.wait(min(max(0.2, next_due - self._clock()), 5.0))
+
+
 def format_home_assistant_state(payload: dict[str, Any]) -> str | None:
     entity_id = payload.get("entity_id")
     state = payload.get("state")
@@ -84,10 +246,17 @@ def format_home_assistant_state(payload: dict[str, Any]) -> str | None:
 
 
 def config_from_env() -> HomeAssistantConfig:
+    try:
+        fetch_concurrency = max(1, int(os.getenv("HOME_ASSISTANT_FETCH_CONCURRENCY", "4")))
+    except ValueError:
+        fetch_concurrency = 4
     return HomeAssistantConfig(
         enabled=_env_bool(os.getenv("HOME_ASSISTANT_CONTEXT_ENABLED"), False),
         base_url=os.getenv("HOME_ASSISTANT_BASE_URL", ""),
         token=os.getenv("HOME_ASSISTANT_TOKEN", ""),
         entity_ids=_env_entity_ids(os.getenv("HOME_ASSISTANT_CONTEXT_ENTITIES")),
         timeout_sec=float(os.getenv("HOME_ASSISTANT_TIMEOUT_SEC", "5")),
+        ttl_sec=max(1.0, float(os.getenv("HOME_ASSISTANT_CONTEXT_TTL_SEC", "30"))),
+        entity_ttls=_env_entity_ttls(os.getenv("HOME_ASSISTANT_CONTEXT_ENTITY_TTLS")),
+        fetch_concurrency=fetch_concurrency,
     )
@@ -3,13 +3,21 @@
 StackChan ↔ DGX chat bridge: validation + upstream completion workflow.
 
 Keeps HTTP framing in bridge_server.py; this module is testable without BaseHTTPRequestHandler.
+
+Prompt layout is prefix-cache friendly (vLLM automatic prefix caching): the client's system
+prompt and earlier turns come first and are sent byte-for-byte as received, history is trimmed
+in blocks rather than one message per turn, and volatile context (Home Assistant state) is
+attached to the latest user turn only. Turn N+1 therefore reuses turn N's prompt up to its last
+user message; PromptCacheStats reports how much of each prompt upstream actually served from cache.
 """
 
 from __future__ import annotations
 
 import json
+import re
+import threading
 from dataclasses import dataclass
-from typing import Any, Protocol
+from typing import Any, Callable, Protocol
 from urllib.error import HTTPError, URLError
 
 from dgx_runtime_client import DgxUpstreamClient
@@ -37,6 +45,8 @@ class ChatValidationConfig:
     max_tokens_cap: int = 192
     max_messages: int = 8
     allow_thinking: bool = False
+    # drop old history this many messages at a time so the prompt prefix survives several turns
+    history_trim_step: int = 4
 
 
 def _normalize_message(message: Any) -> dict[str, Any] | None:
@@ -51,14 +61,27 @@ def _normalize_message(message: Any) -> dict[str, Any] | None:
     return {"role": role, "content": content}
 
 
-def _trim_messages(messages: list[dict[str, Any]], max_messages: int) -> list[dict[str, Any]]:
+def _trim_messages(messages: list[dict[str, Any]], max_messages: int, trim_step: int = 1) -> list[dict[str, Any]]:
+    """Keep the first system message and the newest turns, within `max_messages`.
+
+    Old turns are dropped `trim_step` messages at a time (capped at half the history slots), so
+    the kept history starts at the same message for several consecutive turns instead of
+    shifting by one every turn, which would invalidate the upstream prefix cache each time.
+    """
     if max_messages <= 0 or len(messages) <= max_messages:
         return messages
     system_messages = [m for m in messages if m.get("role") == "system"]
     keep_system = system_messages[:1]
     remaining_slots = max(max_messages - len(keep_system), 0)
     non_system = [m for m in messages if m.get("role") != "system"]
-    return keep_system + non_system[-remaining_slots:] if remaining_slots > 0 else keep_system
+    if remaining_slots <= 0:
+        return keep_system
+    overflow = len(non_system) - remaining_slots
+    if overflow <= 0:
+        return keep_system + non_system
+    step = max(1, min(trim_step, (remaining_slots + 1) // 2))
+    start = -(-overflow // step) * step
+    return keep_system + non_system[start:]
 
 
 def validate_chat_payload(
@@ -88,7 +111,7 @@ def validate_chat_payload(
     max_tokens = min(max_tokens, cfg.max_tokens_cap) if cfg.max_tokens_cap > 0 else max_tokens
     enable_thinking = bool(payload.get("enableThinking", False)) and cfg.allow_thinking
     return ValidatedChatRequest(
-        messages=_trim_messages(normalized_messages, cfg.max_messages),
+        messages=_trim_messages(normalized_messages, cfg.max_messages, cfg.history_trim_step),
         max_tokens=max_tokens,
         temperature=temperature,
         enable_thinking=enable_thinking,
@@ -124,6 +147,10 @@ def build_upstream_dict(req: ValidatedChatRequest, model: str) -> dict[str, Any]
     }
 
 
+def build_streaming_upstream_dict(req: ValidatedChatRequest, model: str) -> dict[str, Any]:
+    return {**build_upstream_dict(req, model), "stream": True, "stream_options": {"include_usage": True}}
+
+
 def encode_upstream_body(upstream_dict: dict[str, Any]) -> bytes:
     return json.dumps(upstream_dict, ensure_ascii=False).encode("utf-8")
 
@@ -144,6 +171,66 @@ def extract_reply_text(upstream: dict[str, Any]) -> str:
     return ""
 
 
+def extract_delta_text(chunk: dict[str, Any]) -> str:
+    """Content of one streamed chunk (`delta.content`), or the whole `message.content` of a non-stream reply."""
+    choices = chunk.get("choices")
+    if not isinstance(choices, list) or not choices or not isinstance(choices[0], dict):
+        return ""
+    for key in ("delta", "message"):
+        part = choices[0].get(key)
+        if isinstance(part, dict) and isinstance(part.get("content"), str):
+            return part["content"]
+    return ""
+
+
+# Sentence end: Japanese / ASCII terminators (plus closing quotes), an ASCII period before
+# whitespace, or a newline. The period rule keeps "3.5" and "e.g." mid-token from splitting.
+_SENTENCE_END = re.compile(r"(?:[。．！？!?…]+|\.(?=\s))[」』）)\]\"']*|\n+")
+_SOFT_BREAK = re.compile(r"[、，,；;：:]")
+
+
+class SentenceChunker:
+    """Cut a token stream into speakable sentences as soon as each one is complete.
+
+    Sentences longer than `max_chars` are cut at the last soft break (、 , ;) so a long
+    first sentence does not hold back speech.
+    """
+
+    def __init__(self, max_chars: int = 80) -> None:
+        self._max_chars = max_chars
+        self._buffer = ""
+
+    def feed(self, delta: str) -> list[str]:
+        self._buffer += delta
+        sentences: list[str] = []
+        while True:
+            match = _SENTENCE_END.search(self._buffer)
+            if match is None:
+                break
+            if match.end() == len(self._buffer) and not match.group().startswith("\n"):
+                # a closing quote or more "！" may still follow; decide on the next delta (or flush)
+                break
+            self._emit(self._buffer[: match.end()], sentences)
+            self._buffer = self._buffer[match.end() :]
+        while len(self._buffer) > self._max_chars:
+            cut = max((m.end() for m in _SOFT_BREAK.finditer(self._buffer, 0, self._max_chars)), default=self._max_chars)
+            self._emit(self._buffer[:cut], sentences)
+            self._buffer = self._buffer[cut:]
+        return sentences
+
+    def flush(self) -> list[str]:
+        sentences: list[str] = []
+        self._emit(self._buffer, sentences)
+        self._buffer = ""
+        return sentences
+
+    @staticmethod
+    def _emit(text: str, sentences: list[str]) -> None:
+        text = text.strip()
+        if text:
+            sentences.append(text)
+
+
 @dataclass(frozen=True)
 class ChatSuccess:
     status_code: int
@@ -162,73 +249,165 @@ class ChatFailure:
 class ChatCompletionWorkflow:
     """Runs chat completion against DGX with optional auto-start recovery (delegated to client)."""
 
-    def __init__(self, dgx: DgxUpstreamClient, model: str, home_assistant: HomeAssistantContextProvider | None = None) -> None:
+    def __init__(
+        self,
+        dgx: DgxUpstreamClient,
+        model: str,
+        home_assistant: HomeAssistantContextProvider | None = None,
+        prompt_cache: PromptCacheStats | None = None,
+    ) -> None:
         self._dgx = dgx
         self._model = model
         self._home_assistant = home_assistant
+        self._prompt_cache = prompt_cache
 
     def run(self, req: ValidatedChatRequest, log: LogFn | None = None) -> ChatSuccess | ChatFailure:
         request = with_home_assistant_context(req, self._home_assistant, log)
         body = encode_upstream_body(build_upstream_dict(request, self._model))
-        auto_start = self._dgx.auto_start
 
         for attempt in range(2):
             try:
                 status, parsed = self._dgx.post_chat_completions(body)
+                self._record_usage(parsed, log)
                 return ChatSuccess(status_code=status, parsed=parsed)
-            except HTTPError as e:
-                err_body = e.read().decode("utf-8", errors="ignore")
-                if attempt == 0 and e.code in (502, 503) and auto_start:
-                    ready, runtime_details = self._dgx.ensure_runtime_ready()
-                    if ready:
-                        if log:
-                            log("upstream %s recovered after runtime start", e.code)
+            except Exception as e:
+                failure = self._failure_or_recover(e, attempt == 0, log)
+                if failure is not None:
+                    return failure
+        raise AssertionError("unreachable")
+
+    def stream(
+        self,
+        req: ValidatedChatRequest,
+        on_sentence: Callable[[str], None],
+        log: LogFn | None = None,
+    ) -> ChatSuccess | ChatFailure:
+        """Stream the completion and call `on_sentence` for each complete sentence as it arrives.
+
+        Returns the same ChatSuccess shape as `run` (content = all sentences joined), so callers
+        can reuse format_simple_success. Runtime recovery is only attempted before the first
+        sentence was handed out; after that a failure is reported as-is.
+        """
+        request = with_home_assistant_context(req, self._home_assistant, log)
+        body = encode_upstream_body(build_streaming_upstream_dict(request, self._model))
+
+        for attempt in range(2):
+            chunker = SentenceChunker()
+            parts: list[str] = []
+            emitted = 0
+            model: Any = None
+            usage: Any = None
+            finish_reason: Any = None
+            try:
+                for chunk in self._dgx.stream_chat_completions(body):
+                    model = chunk.get("model") or model
+                    usage = chunk.get("usage") or usage
+                    choices = chunk.get("choices")
+                    if isinstance(choices, list) and choices and isinstance(choices[0], dict):
+                        finish_reason = choices[0].get("finish_reason") or finish_reason
+                    delta = extract_delta_text(chunk)
+                    if not delta:
                         continue
-                    return ChatFailure(
-                        e.code,
-                        "UPSTREAM_HTTP_ERROR",
-                        "upstream returned non-2xx after runtime recovery attempt",
-                        True,
-                        {"status": e.code, "body": err_body[:2000], "runtimeRecovery": runtime_details},
+                    parts.append(delta)
+                    for sentence in chunker.feed(delta):
+                        emitted += 1
+                        on_sentence(sentence)
+                for sentence in chunker.flush():
+                    emitted += 1
+                    on_sentence(sentence)
+            except Exception as e:
+                failure = self._failure_or_recover(e, attempt == 0 and emitted == 0, log)
+                if failure is None:
+                    continue
+                if emitted:
+                    failure = ChatFailure(
+                        failure.http_status,
+                        failure.code,
+                        failure.message,
+                        False,
+                        {**(failure.details or {}), "emittedSentences": emitted},
                     )
+                return failure
+            parsed = {
+                "model": model or self._model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": "".join(parts).strip()},
+                        "finish_reason": finish_reason,
+                    }
+                ],
+                "usage": usage,
+            }
+            self._record_usage(parsed, log)
+            return ChatSuccess(status_code=200, parsed=parsed)
+        raise AssertionError("unreachable")
+
+    def _record_usage(self, parsed: Any, log: LogFn | None) -> None:
+        if self._prompt_cache is None or not isinstance(parsed, dict):
+            return
+        ratio = self._prompt_cache.record(parsed.get("usage"))
+        if ratio is not None and log:
+            log("prompt cache: %.0f%% of prompt tokens cached", ratio * 100)
+
+    def _failure_or_recover(self, exc: Exception, can_recover: bool, log: LogFn | None) -> ChatFailure | None:
+        """Map an upstream exception to ChatFailure; None means the runtime was started and the call should be retried."""
+        auto_start = can_recover and self._dgx.auto_start
+        if isinstance(exc, HTTPError):
+            try:
+                err_body = exc.read().decode("utf-8", errors="ignore")
+            finally:
+                exc.close()
+            if auto_start and exc.code in (502, 503):
+                ready, runtime_details = self._dgx.ensure_runtime_ready()
+                if ready:
+                    if log:
+                        log("upstream %s recovered after runtime start", exc.code)
+                    return None
                 return ChatFailure(
-                    e.code,
+                    exc.code,
                     "UPSTREAM_HTTP_ERROR",
-                    "upstream returned non-2xx",
-                    e.code in (429, 500, 502, 503, 504),
-                    {"status": e.code, "body": err_body[:2000]},
+                    "upstream returned non-2xx after runtime recovery attempt",
+                    True,
+                    {"status": exc.code, "body": err_body[:2000], "runtimeRecovery": runtime_details},
                 )
-            except URLError as e:
-                if attempt == 0 and auto_start:
-                    ready, runtime_details = self._dgx.ensure_runtime_ready()
-                    if ready:
-                        if log:
-                            log("upstream unreachable; recovered after runtime start (%s)", str(e))
-                        continue
-                    return ChatFailure(
-                        502,
-                        "UPSTREAM_UNREACHABLE",
-                        "failed to reach upstream after runtime recovery attempt",
-                        True,
-                        {"message": str(e), "runtimeRecovery": runtime_details},
-                    )
+            return ChatFailure(
+                exc.code,
+                "UPSTREAM_HTTP_ERROR",
+                "upstream returned non-2xx",
+                exc.code in (429, 500, 502, 503, 504),
+                {"status": exc.code, "body": err_body[:2000]},
+            )
+        if isinstance(exc, URLError):
+            if auto_start:
+                ready, runtime_details = self._dgx.ensure_runtime_ready()
+                if ready:
+                    if log:
+                        log("upstream unreachable; recovered after runtime start (%s)", str(exc))
+                    return None
                 return ChatFailure(
                     502,
                     "UPSTREAM_UNREACHABLE",
-                    "failed to reach upstream",
+                    "failed to reach upstream after runtime recovery attempt",
                     True,
-                    {"message": str(e)},
-                )
-            except TimeoutError:
-                return ChatFailure(504, "UPSTREAM_TIMEOUT", "upstream request timed out", True, None)
-            except Exception as e:
-                return ChatFailure(
-                    500,
-                    "BRIDGE_INTERNAL_ERROR",
-                    "unexpected bridge error",
-                    False,
-                    {"message": str(e)},
+                    {"message": str(exc), "runtimeRecovery": runtime_details},
                 )
+            return ChatFailure(
+                502,
+                "UPSTREAM_UNREACHABLE",
+                "failed to reach upstream",
+                True,
+                {"message": str(exc)},
+            )
+        if isinstance(exc, TimeoutError):
+            return ChatFailure(504, "UPSTREAM_TIMEOUT", "upstream request timed out", True, None)
+        return ChatFailure(
+            500,
+            "BRIDGE_INTERNAL_ERROR",
+            "unexpected bridge error",
+            False,
+            {"message": str(exc)},
+        )
 
 
 def with_home_assistant_context(
@@ -247,7 +426,14 @@ def with_home_assistant_context(
     if not lines:
         return req
     context = "Home Assistant current state (read-only):\n" + "\n".join(f"- {line}" for line in lines)
-    messages = [{"role": "system", "content": context}] + req.messages
+    # Volatile state goes into the newest user turn, never ahead of the stable system prompt / history.
+    messages = list(req.messages)
+    for i in range(len(messages) - 1, -1, -1):
+        if messages[i].get("role") == "user":
+            messages[i] = {**messages[i], "content": f"{context}\n\n{messages[i]['content']}"}
+            break
+    else:
+        messages.append({"role": "system", "content": context})
     return ValidatedChatRequest(
         messages=messages,
         max_tokens=req.max_tokens,
@@ -256,6 +442,58 @@ def with_home_assistant_context(
     )
 
 
+def cached_prompt_tokens(usage: Any) -> tuple[int, int] | None:
+    """(prompt_tokens, cached_tokens) from an OpenAI-style usage block, or None when not reported.
+
+    vLLM fills `prompt_tokens_details.cached_tokens` only with `--enable-prompt-tokens-details`.
+    """
+    if not isinstance(usage, dict):
+        return None
+    prompt_tokens = usage.get("prompt_tokens")
+    details = usage.get("prompt_tokens_details")
+    cached = details.get("cached_tokens") if isinstance(details, dict) else None
+    if not isinstance(prompt_tokens, int) or not isinstance(cached, int) or prompt_tokens <= 0:
+        return None
+    return prompt_tokens, cached
+
+
+class PromptCacheStats:
+    """Running totals of upstream prefix-cache hits for GET /metrics (thread-safe)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.reported = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.last_ratio: float | None = None
+
+    def record(self, usage: Any) -> float | None:
+        """Count one completion; returns its cached-token ratio (None if upstream did not report it)."""
+        tokens = cached_prompt_tokens(usage)
+        with self._lock:
+            self.requests += 1
+            if tokens is None:
+                return None
+            prompt_tokens, cached = tokens
+            self.reported += 1
+            self.prompt_tokens += prompt_tokens
+            self.cached_tokens += cached
+            self.last_ratio = round(cached / prompt_tokens, 3)
+            return self.last_ratio
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "reported": self.reported,
+                "promptTokens": self.prompt_tokens,
+                "cachedTokens": self.cached_tokens,
+                "cachedRatio": round(self.cached_tokens / self.prompt_tokens, 3) if self.prompt_tokens else None,
+                "lastCachedRatio": self.last_ratio,
+            }
+
+
 def format_simple_success(parsed: dict[str, Any]) -> dict[str, Any]:
     reply_text = extract_reply_text(parsed)
     return {
@@ -2,6 +2,8 @@
 """
 StackChan utterance workflow: STT (Spark or local) -> DGX chat -> replyText.
 
+`run` returns the whole reply; `transcribe` + `stream_reply` hand out each sentence as soon as
+the upstream has generated it, so the device can start speaking after the first sentence.
 Keeps HTTP framing in bridge_server.py; testable without BaseHTTPRequestHandler.
 """
 
@@ -9,7 +11,7 @@ from __future__ import annotations
 
 import base64
 from dataclasses import dataclass
-from typing import Any, Protocol
+from typing import Any, Callable, Protocol
 
 from stackchan_chat_core import (
     ChatCompletionWorkflow,
@@ -141,7 +143,8 @@ class UtteranceWorkflow:
         self._stt = stt_workflow
         self._chat = chat_workflow
 
-    def run(self, req: ValidatedUtteranceRequest, log: LogFn | None = None) -> UtteranceSuccess | UtteranceFailure:
+    def transcribe(self, req: ValidatedUtteranceRequest) -> SttSuccess | UtteranceFailure:
+        """STT stage only; an empty transcript is a (retryable) failure."""
         stt_outcome = self._stt.run(
             ValidatedSttRequest(
                 audio_bytes=req.audio_bytes,
@@ -169,9 +172,28 @@ class UtteranceWorkflow:
                 stt_outcome.details,
                 stage="stt",
             )
+        return SttSuccess(text=stt_text, details=stt_outcome.details)
+
+    def run(self, req: ValidatedUtteranceRequest, log: LogFn | None = None) -> UtteranceSuccess | UtteranceFailure:
+        stt = self.transcribe(req)
+        if isinstance(stt, UtteranceFailure):
+            return stt
+        chat_req = build_chat_request_after_stt(req.prior_messages, stt.text, req.chat)
+        return self._finish(stt, self._chat.run(chat_req, log=log))
 
-        chat_req = build_chat_request_after_stt(req.prior_messages, stt_text, req.chat)
-        chat_outcome = self._chat.run(chat_req, log=log)
+    def stream_reply(
+        self,
+        req: ValidatedUtteranceRequest,
+        stt: SttSuccess,
+        on_sentence: Callable[[str], None],
+        log: LogFn | None = None,
+    ) -> UtteranceSuccess | UtteranceFailure:
+        """Chat stage for an already transcribed utterance, calling `on_sentence` per sentence."""
+        chat_req = build_chat_request_after_stt(req.prior_messages, stt.text, req.chat)
+        return self._finish(stt, self._chat.stream(chat_req, on_sentence, log=log))
+
+    @staticmethod
+    def _finish(stt: SttSuccess, chat_outcome: ChatSuccess | ChatFailure) -> UtteranceSuccess | UtteranceFailure:
         if isinstance(chat_outcome, ChatFailure):
             return UtteranceFailure(
                 chat_outcome.http_status,
@@ -189,14 +211,14 @@ class UtteranceWorkflow:
                 "UPSTREAM_EMPTY_REPLY",
                 "upstream chat returned empty replyText",
                 True,
-                {"sttText": stt_text},
+                {"sttText": stt.text},
                 stage="chat",
             )
 
         return UtteranceSuccess(
             status_code=chat_outcome.status_code,
-            stt_text=stt_text,
-            stt_details=stt_outcome.details,
+            stt_text=stt.text,
+            stt_details=stt.details,
             chat_parsed=chat_outcome.parsed,
         )
 
@@ -5,18 +5,30 @@ STT runtime client for stackchan-bridge.
 Supports:
 - upstream OpenAI-compatible transcription endpoint
 - optional local faster-whisper execution
+
+Local execution keeps everything in memory: the model is loaded once (`warm()` at bridge startup),
+16 kHz PCM16 WAV is handed to faster-whisper as a float32 array (other formats as a BytesIO,
+decoded by faster-whisper itself), and no temp file is written. Silero VAD runs once on the
+decoded array: its speech regions are handed to faster-whisper as `clip_timestamps` with
+`vad_filter=False`, so VAD is not run a second time inside `transcribe`. When it finds no speech
+at all, the utterance is transcribed once without VAD instead of a wasted VAD pass followed by a
+full re-run.
 """
 
 from __future__ import annotations
 
+import io
 import json
 import os
-import tempfile
+import threading
+import time
+import wave
 from dataclasses import dataclass
-from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 from urllib.request import Request, urlopen
 
+WHISPER_SAMPLE_RATE = 16000
+
 
 @dataclass(frozen=True)
 class SttRuntimeConfig:
@@ -34,6 +46,7 @@ class SttRuntimeConfig:
     local_vad_filter: bool = True
     local_retry_without_vad: bool = True
     local_fallback_to_upstream_on_empty: bool = False
+    local_preload: bool = True
 
 
 def _env_bool(value: str | None, default: bool) -> bool:
@@ -67,6 +80,56 @@ def _encode_multipart_form(fields: list[tuple[str, str]], files: list[tuple[str,
     return boundary, b"".join(chunks)
 
 
+def read_wav_pcm16(audio_bytes: bytes) -> tuple[bytes, int, int] | None:
+    """(frames, sample_rate, channels) for PCM16 WAV; None for anything else."""
+    try:
+        with wave.open(io.BytesIO(audio_bytes), "rb") as wav:
+            if wav.getsampwidth() != 2 or wav.getcomptype() != "NONE":
+                return None
+            return wav.readframes(wav.getnframes()), wav.getframerate(), wav.getnchannels()
+    except (wave.Error, EOFError):
+        return None
+
+
+def decode_audio_in_memory(audio_bytes: bytes) -> Any:
+    """faster-whisper input without touching disk.
+
+    16 kHz PCM16 WAV (what StackChan sends) becomes a mono float32 ndarray; other input is
+    passed as BytesIO and decoded / resampled by faster-whisper (PyAV) in memory.
+    """
+    pcm = read_wav_pcm16(audio_bytes)
+    if pcm is not None and pcm[1] == WHISPER_SAMPLE_RATE:
+        try:
+            import numpy as np
+        except ImportError:
+            return io.BytesIO(audio_bytes)
+        frames, _rate, channels = pcm
+        samples = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+        if channels > 1:
+            samples = samples[: len(samples) - len(samples) % channels].reshape(-1, channels).mean(axis=1)
+        return samples
+    return io.BytesIO(audio_bytes)
+
+
+def speech_clip_timestamps(audio: Any) -> list[float] | None:
+    """Silero VAD (bundled with faster-whisper) speech regions of a decoded array.
+
+    Returns flat `[start, end, ...]` seconds for `transcribe(clip_timestamps=...)`; `[]` when there
+    is no speech and None when it cannot tell (not an array). Uses the same default `VadOptions`
+    as `transcribe(vad_filter=True)`.
+    """
+    if not hasattr(audio, "dtype"):
+        return None
+    try:
+        from faster_whisper.vad import get_speech_timestamps
+    except ImportError:
+        return None
+    clips: list[float] = []
+    for chunk in get_speech_timestamps(audio):
+        clips.extend((chunk["start"] / WHISPER_SAMPLE_RATE, chunk["end"] / WHISPER_SAMPLE_RATE))
+    return clips
+
+
 def _extract_text_from_response(raw: bytes) -> str:
     body = raw.decode("utf-8", errors="ignore").strip()
     if body == "":
@@ -86,6 +149,30 @@ class SttRuntimeClient:
     def __init__(self, config: SttRuntimeConfig) -> None:
         self._c = config
         self._whisper_model = None
+        # bridge handlers run on threads; load the local model only once
+        self._whisper_lock = threading.Lock()
+        self._speech_clips: Callable[[Any], list[float] | None] = speech_clip_timestamps
+
+    def warm(self) -> dict[str, Any]:
+        """Load the local model and run one tiny transcription so the first utterance is not cold."""
+        if self._c.provider.lower() != "faster-whisper-local":
+            return {"warmed": False, "reason": "provider is not local"}
+        started = time.monotonic()
+        model = self._ensure_whisper_model()
+        loaded = time.monotonic()
+        try:
+            import numpy as np
+        except ImportError:
+            return {"warmed": True, "loadSec": round(loaded - started, 3)}
+        silence = np.zeros(WHISPER_SAMPLE_RATE // 2, dtype=np.float32)
+        self._speech_clips(silence)
+        segments, _info = model.transcribe(silence, language=self._c.local_language_default or None, vad_filter=False)
+        list(segments)
+        return {
+            "warmed": True,
+            "loadSec": round(loaded - started, 3),
+            "warmupSec": round(time.monotonic() - loaded, 3),
+        }
 
     def transcribe(self, audio_bytes: bytes, content_type: str, language: str | None, model: str | None) -> tuple[str, dict[str, Any]]:
         provider = self._c.provider.lower()
@@ -133,50 +220,71 @@ class SttRuntimeClient:
     def _ensure_whisper_model(self):
         if self._whisper_model is not None:
             return self._whisper_model
-        try:
-            from faster_whisper import WhisperModel
-        except ImportError as e:
-            raise RuntimeError(
-                "faster-whisper is not installed. Use provider=upstream-openai "
-                "or install faster-whisper in the bridge venv."
-            ) from e
-        self._whisper_model = WhisperModel(
-            self._c.local_model,
-            device=self._c.local_device,
-            compute_type=self._c.local_compute_type,
-        )
-        return self._whisper_model
+        with self._whisper_lock:
+            if self._whisper_model is not None:
+                return self._whisper_model
+            try:
+                from faster_whisper import WhisperModel
+            except ImportError as e:
+                raise RuntimeError(
+                    "faster-whisper is not installed. Use provider=upstream-openai "
+                    "or install faster-whisper in the bridge venv."
+                ) from e
+            self._whisper_model = WhisperModel(
+                self._c.local_model,
+                device=self._c.local_device,
+                compute_type=self._c.local_compute_type,
+            )
+            return self._whisper_model
 
-    def _transcribe_once(self, temp_path: Path, language: str | None, vad_filter: bool) -> str:
+    def _transcribe_once(
+        self,
+        audio: Any,
+        language: str | None,
+        vad_filter: bool,
+        clip_timestamps: list[float] | None = None,
+    ) -> str:
         model = self._ensure_whisper_model()
+        if isinstance(audio, io.BytesIO):
+            audio.seek(0)
+        options: dict[str, Any] = {"clip_timestamps": clip_timestamps} if clip_timestamps else {}
         segments, _info = model.transcribe(
-            str(temp_path),
+            audio,
             language=language,
             vad_filter=vad_filter,
+            **options,
         )
         return "".join(seg.text for seg in segments).strip()
 
     def _transcribe_local(self, audio_bytes: bytes, language: str | None) -> tuple[str, dict[str, Any]]:
-        with tempfile.NamedTemporaryFile(prefix="stackchan-stt-", suffix=".wav", delete=False) as fp:
-            fp.write(audio_bytes)
-            temp_path = Path(fp.name)
-        try:
-            first_language = language or self._c.local_language_default or None
-            text = self._transcribe_once(temp_path, first_language, self._c.local_vad_filter)
-            retried = False
-            if text == "" and self._c.local_retry_without_vad and (first_language is not None or self._c.local_vad_filter):
-                retried = True
-                text = self._transcribe_once(temp_path, None, False)
+        audio = decode_audio_in_memory(audio_bytes)
+        first_language = language or self._c.local_language_default or None
+        vad_filter = self._c.local_vad_filter
+        can_retry = self._c.local_retry_without_vad and (first_language is not None or vad_filter)
+        clips = self._speech_clips(audio) if vad_filter else None
+        if clips == []:
+            # VAD would drop everything (short speech); go straight to the no-VAD pass
+            text = self._transcribe_once(audio, None, False) if can_retry else ""
             return text, {
                 "language": first_language,
-                "vadFilter": self._c.local_vad_filter,
-                "retryWithoutVad": retried,
+                "vadFilter": vad_filter,
+                "retryWithoutVad": False,
+                "vadNoSpeech": True,
             }
-        finally:
-            try:
-                temp_path.unlink(missing_ok=True)
-            except OSError:
-                pass
+        if clips:
+            # reuse the pre-check's speech regions instead of running VAD again inside transcribe
+            text = self._transcribe_once(audio, first_language, False, clip_timestamps=clips)
+        else:
+            text = self._transcribe_once(audio, first_language, vad_filter)
+        retried = False
+        if text == "" and can_retry:
+            retried = True
+            text = self._transcribe_once(audio, None, False)
+        return text, {
+            "language": first_language,
+            "vadFilter": vad_filter,
+            "retryWithoutVad": retried,
+        }
 
 
 def config_from_env() -> SttRuntimeConfig:
@@ -195,4 +303,5 @@ def config_from_env() -> SttRuntimeConfig:
         local_vad_filter=_env_bool(os.getenv("STT_LOCAL_VAD_FILTER"), True),
         local_retry_without_vad=_env_bool(os.getenv("STT_LOCAL_RETRY_WITHOUT_VAD"), True),
         local_fallback_to_upstream_on_empty=_env_bool(os.getenv("STT_LOCAL_FALLBACK_TO_UPSTREAM_ON_EMPTY"), False),
+        local_preload=_env_bool(os.getenv("STT_LOCAL_PRELOAD"), True),
     )
@@ -0,0 +1,129 @@
+import importlib.util
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+
+MODULE_DIR = Path(__file__).resolve().parents[1]
+MODULE_PATH = MODULE_DIR / "bridge_admission.py"
+
+
+def load_module():
+    if str(MODULE_DIR) not in sys.path:
+        sys.path.insert(0, str(MODULE_DIR))
+    spec = importlib.util.spec_from_file_location("bridge_admission", MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+admission_module = load_module()
+
+
+def wait_for(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+class BridgeAdmissionTests(unittest.TestCase):
+    def test_same_device_runs_in_arrival_order(self):
+        admission = admission_module.BridgeAdmission(admission_module.AdmissionConfig(max_upstream_concurrency=4))
+        order = []
+        gate = threading.Event()
+
+        def work(label: str):
+            with admission.admit("stackchan-a", "chat"):
+                if label == "first":
+                    gate.wait(5)
+                order.append(label)
+
+        threads = []
+        for label in ("first", "second", "third"):
+            thread = threading.Thread(target=work, args=(label,))
+            thread.start()
+            threads.append(thread)
+            self.assertTrue(wait_for(lambda: sum(1 for t in threads if t.is_alive()) == len(threads)))
+            time.sleep(0.02)
+        gate.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(order, ["first", "second", "third"])
+
+    def test_other_device_proceeds_while_one_device_is_busy(self):
+        admission = admission_module.BridgeAdmission(admission_module.AdmissionConfig(max_upstream_concurrency=2))
+        gate = threading.Event()
+        busy = threading.Thread(target=lambda: self._hold(admission, "stackchan-a", gate))
+        busy.start()
+        self.assertTrue(wait_for(lambda: admission.snapshot()["upstreamInflight"] == 1))
+
+        with admission.admit("stackchan-b", "chat") as ticket:
+            self.assertLess(ticket.queue_wait_sec, 1.0)
+        gate.set()
+        busy.join(5)
+
+    def test_global_limit_bounds_upstream_concurrency(self):
+        admission = admission_module.BridgeAdmission(admission_module.AdmissionConfig(max_upstream_concurrency=2))
+        gate = threading.Event()
+        threads = [threading.Thread(target=self._hold, args=(admission, f"dev-{i}", gate)) for i in range(5)]
+        for thread in threads:
+            thread.start()
+        self.assertTrue(wait_for(lambda: admission.snapshot()["waiting"] == 3))
+        self.assertEqual(admission.snapshot()["upstreamInflight"], 2)
+        gate.set()
+        for thread in threads:
+            thread.join(5)
+
+        snapshot = admission.snapshot()
+        self.assertEqual(snapshot["upstreamPeak"], 2)
+        self.assertEqual(snapshot["routes"]["chat"]["completed"], 5)
+        self.assertEqual(snapshot["activeDevices"], 0)
+
+    def test_wait_timeout_raises_busy_and_frees_queue_position(self):
+        admission = admission_module.BridgeAdmission(
+            admission_module.AdmissionConfig(max_upstream_concurrency=1, queue_timeout_sec=0.05)
+        )
+        gate = threading.Event()
+        busy = threading.Thread(target=lambda: self._hold(admission, "stackchan-a", gate))
+        busy.start()
+        self.assertTrue(wait_for(lambda: admission.snapshot()["upstreamInflight"] == 1))
+
+        with self.assertRaises(admission_module.AdmissionRejected) as ctx:
+            with admission.admit("stackchan-b", "stt"):
+                pass
+        gate.set()
+        busy.join(5)
+
+        self.assertEqual(ctx.exception.http_status, 503)
+        self.assertEqual(ctx.exception.code, "BRIDGE_BUSY")
+        snapshot = admission.snapshot()
+        self.assertEqual(snapshot["routes"]["stt"]["rejected"], 1)
+        self.assertEqual(snapshot["waiting"], 0)
+
+    def test_metrics_split_queue_wait_from_processing(self):
+        now = [10.0]
+        admission = admission_module.BridgeAdmission(clock=lambda: now[0])
+
+        with admission.admit("stackchan-a", "utterance"):
+            now[0] += 2.0
+
+        route = admission.snapshot()["routes"]["utterance"]
+        self.assertEqual(route["queueWaitMs"]["max"], 0.0)
+        self.assertEqual(route["processingMs"]["p50"], 2000.0)
+
+    @staticmethod
+    def _hold(admission, device_id: str, gate: threading.Event) -> None:
+        with admission.admit(device_id, "chat"):
+            gate.wait(5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,8 +2,11 @@ import importlib.util
 import io
 import json
 import sys
+import threading
 import unittest
+from http.server import ThreadingHTTPServer
 from pathlib import Path
+from urllib.request import Request, urlopen
 
 
 MODULE_DIR = Path(__file__).resolve().parents[1]
@@ -35,6 +38,20 @@ class FakeDgxClient:
         return 200, self.response
 
 
+class FakeStreamingDgxClient(FakeDgxClient):
+    def __init__(self, pieces):
+        super().__init__({})
+        self.pieces = pieces
+
+    def stream_chat_completions(self, body: bytes):
+        self.calls += 1
+        self.last_body = body
+        for piece in self.pieces:
+            if isinstance(piece, Exception):
+                raise piece
+            yield {"model": "system-prod-primary", "choices": [{"delta": {"content": piece}}]}
+
+
 class FakeHandler:
     def __init__(self, path, payload):
         body = json.dumps(payload).encode("utf-8")
@@ -61,6 +78,9 @@ class FakeHandler:
     def json_body(self):
         return json.loads(self.wfile.getvalue().decode("utf-8"))
 
+    def ndjson_events(self):
+        return [json.loads(line) for line in self.wfile.getvalue().decode("utf-8").splitlines()]
+
 
 class BridgeServerRouteTests(unittest.TestCase):
     def setUp(self):
@@ -84,6 +104,8 @@ class BridgeServerRouteTests(unittest.TestCase):
         handler.stt_client = None
         handler.home_assistant_client = None
         handler.dgx_model = "system-prod-primary"
+        handler.admission = self.module.BridgeAdmission()
+        handler.prompt_cache = self.module.PromptCacheStats()
         return handler
 
     def test_openai_compatible_chat_completions_returns_upstream_payload(self):
@@ -171,5 +193,158 @@ class BridgeServerRouteTests(unittest.TestCase):
         self.assertEqual(self.fake_dgx.calls, 1)
 
 
+    def test_device_queue_full_returns_retryable_429_without_calling_upstream(self):
+        handler = self.make_handler(
+            "/api/stackchan/chat",
+            {"messages": [{"role": "user", "content": "こんにちは"}]},
+        )
+        admission_config = sys.modules["bridge_admission"].AdmissionConfig(device_queue_max=1)
+        handler.admission = self.module.BridgeAdmission(admission_config)
+        handler.client_address = ("192.168.10.20", 50000)
+        blocker = threading.Event()
+        started = threading.Event()
+
+        def hold_slot(route):
+            with handler.admission.admit("192.168.10.20", route):
+                started.set()
+                blocker.wait(5)
+
+        holders = [threading.Thread(target=hold_slot, args=(route,)) for route in ("chat", "chat")]
+        for holder in holders:
+            holder.start()
+        self.assertTrue(started.wait(5))
+        for _ in range(100):
+            if handler.admission.snapshot()["waiting"] == 1:
+                break
+            threading.Event().wait(0.01)
+
+        self.module.Handler._handle_post(handler)
+        blocker.set()
+        for holder in holders:
+            holder.join(5)
+
+        self.assertEqual(handler.status_code, 429)
+        self.assertEqual(handler.json_body()["error"]["code"], "DEVICE_QUEUE_FULL")
+        self.assertTrue(handler.json_body()["error"]["retryable"])
+        self.assertEqual(self.fake_dgx.calls, 0)
+
+    def test_chat_stream_returns_one_event_per_sentence_then_done(self):
+        handler = self.make_handler(
+            "/api/stackchan/chat/stream",
+            {"messages": [{"role": "user", "content": "こんにちは"}]},
+        )
+        handler.dgx_client = FakeStreamingDgxClient(["やあ。", "元気", "だよ！", "またね"])
+
+        self.module.Handler._handle_post(handler)
+
+        self.assertEqual(handler.status_code, 200)
+        self.assertIn(("Content-Type", "application/x-ndjson; charset=utf-8"), handler.response_headers)
+        events = handler.ndjson_events()
+        self.assertEqual(
+            [(e["type"], e.get("text")) for e in events[:-1]],
+            [("sentence", "やあ。"), ("sentence", "元気だよ！"), ("sentence", "またね")],
+        )
+        self.assertEqual([e["index"] for e in events[:-1]], [0, 1, 2])
+        self.assertEqual(events[-1]["type"], "done")
+        self.assertEqual(events[-1]["replyText"], "やあ。元気だよ！またね")
+
+    def test_chat_stream_failure_before_first_sentence_keeps_http_status(self):
+        handler = self.make_handler(
+            "/api/stackchan/chat/stream",
+            {"messages": [{"role": "user", "content": "こんにちは"}]},
+        )
+        handler.dgx_client = FakeStreamingDgxClient([TimeoutError("timed out")])
+
+        self.module.Handler._handle_post(handler)
+
+        self.assertEqual(handler.status_code, 504)
+        self.assertEqual(handler.json_body()["error"]["code"], "UPSTREAM_TIMEOUT")
+
+    def test_utterance_stream_sends_stt_then_sentences(self):
+        class FakeStt:
+            def transcribe(self, audio_bytes, content_type, language, model):
+                return "今日の天気は", {"provider": "fake"}
+
+        handler = self.make_handler("/api/stackchan/utterance/stream", {"audioBase64": "aGVsbG8="})
+        handler.stt_client = FakeStt()
+        handler.dgx_client = FakeStreamingDgxClient(["晴れです。", "傘はいりません。"])
+
+        self.module.Handler._handle_post(handler)
+
+        events = handler.ndjson_events()
+        self.assertEqual([e["type"] for e in events], ["stt", "sentence", "sentence", "done"])
+        self.assertEqual(events[0]["sttText"], "今日の天気は")
+        self.assertEqual(events[-1]["replyText"], "晴れです。傘はいりません。")
+        sent = json.loads(handler.dgx_client.last_body.decode("utf-8"))
+        self.assertEqual(sent["messages"][-1], {"role": "user", "content": "今日の天気は"})
+
+
+class SlowDgxClient(FakeDgxClient):
+    def __init__(self, response):
+        super().__init__(response)
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def post_chat_completions(self, body: bytes):
+        self.entered.set()
+        self.release.wait(5)
+        return super().post_chat_completions(body)
+
+
+class BridgeServerThreadingTests(unittest.TestCase):
+    def setUp(self):
+        self.module = load_module()
+        self.original = (self.module.STACKCHAN_TOKEN, self.module.Handler.dgx_client, self.module.Handler.admission)
+        self.module.STACKCHAN_TOKEN = ""
+        self.slow = SlowDgxClient({"choices": [{"message": {"content": "おそい返答"}}]})
+        self.module.Handler.dgx_client = self.slow
+        self.module.Handler.home_assistant_client = None
+        self.module.Handler.admission = self.module.BridgeAdmission()
+        self.module.Handler.log_message = lambda *args: None
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self.module.Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.slow.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+        self.module.STACKCHAN_TOKEN, self.module.Handler.dgx_client, self.module.Handler.admission = self.original
+        del self.module.Handler.log_message
+
+    def test_health_and_metrics_answer_while_a_chat_is_in_flight(self):
+        results = {}
+
+        def chat():
+            req = Request(
+                f"{self.base_url}/api/stackchan/chat",
+                data=json.dumps({"messages": [{"role": "user", "content": "こんにちは"}]}).encode("utf-8"),
+                headers={"Content-Type": "application/json", "X-Stackchan-Device-Id": "stackchan-a"},
+                method="POST",
+            )
+            with urlopen(req, timeout=10) as resp:
+                results["chat"] = json.loads(resp.read())
+
+        worker = threading.Thread(target=chat)
+        worker.start()
+        self.assertTrue(self.slow.entered.wait(5))
+
+        with urlopen(f"{self.base_url}/healthz", timeout=2) as resp:
+            self.assertEqual(json.loads(resp.read())["ok"], True)
+        with urlopen(f"{self.base_url}/metrics", timeout=2) as resp:
+            admission = json.loads(resp.read())["admission"]
+        self.assertEqual(admission["upstreamInflight"], 1)
+        self.assertEqual(admission["activeDevices"], 1)
+
+        self.slow.release.set()
+        worker.join(10)
+        self.assertEqual(results["chat"]["choices"][0]["message"]["content"], "おそい返答")
+        with urlopen(f"{self.base_url}/metrics", timeout=2) as resp:
+            routes = json.loads(resp.read())["admission"]["routes"]
+        self.assertEqual(routes["chat"]["completed"], 1)
+        self.assertEqual(routes["chat"]["processingMs"]["count"], 1)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -4,8 +4,13 @@
 from __future__ import annotations
 
 import io
+import json
+import threading
+import time
 import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import patch
+from urllib.error import HTTPError
 
 from dgx_runtime_client import DgxUpstreamClient, DgxUpstreamConfig
 
@@ -38,7 +43,7 @@ class TestDgxRuntimeClient(unittest.TestCase):
             def read(self) -> bytes:
                 return b'{"data":[]}'
 
-        with patch("dgx_runtime_client.urlopen", return_value=FakeResp()):
+        with patch.object(DgxUpstreamClient, "_open", return_value=FakeResp()):
             ok, details = client.probe_runtime_ready()
 
         self.assertTrue(ok)
@@ -173,12 +178,252 @@ class TestDgxRuntimeClient(unittest.TestCase):
                 captured["body"] = getattr(request, "data", b"")
             return FakeResp()
 
-        with patch("dgx_runtime_client.urlopen", side_effect=fake_urlopen):
+        with patch.object(DgxUpstreamClient, "_open", side_effect=fake_urlopen):
             ok, _details = client.ensure_runtime_ready()
 
         self.assertTrue(ok)
         self.assertIn(b"qwen36_35b_uncensored", captured.get("body", b""))
 
 
+    def test_ensure_runtime_ready_long_polls_gateway_until_ready(self):
+        client = DgxUpstreamClient(_config(ready_long_poll_sec=5.0))
+        urls: list[str] = []
+        not_ready = b'{"ok":false,"ready":false,"code":"RUNTIME_NOT_READY"}'
+
+        class FakeResp:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *args: object) -> None:
+                return None
+
+            def getcode(self) -> int:
+                return 200
+
+            def read(self) -> bytes:
+                return b'{"ok":true,"ready":true}'
+
+        def fake_urlopen(req: object, timeout: float = 0) -> FakeResp:
+            url = getattr(req, "full_url", "")
+            urls.append(url)
+            if "/system/ready" in url and len(urls) < 4:
+                self.assertEqual(timeout, 15.0)
+                raise HTTPError(url, 503, "not ready", {}, io.BytesIO(not_ready))  # type: ignore[arg-type]
+            return FakeResp()
+
+        with patch.object(DgxUpstreamClient, "_open", side_effect=fake_urlopen):
+            with patch("dgx_runtime_client.time.sleep") as sleep:
+                ok, details = client.ensure_runtime_ready()
+
+        self.assertTrue(ok)
+        self.assertEqual(details["ready"]["status"], 200)
+        self.assertTrue(urls[0].endswith("/start"))
+        self.assertEqual(urls[1:], ["http://dgx.example:38081/system/ready?timeoutSec=5.0"] * 3)
+        sleep.assert_not_called()
+
+    def test_ensure_runtime_ready_falls_back_to_polling_without_wait_endpoint(self):
+        client = DgxUpstreamClient(_config())
+        urls: list[str] = []
+
+        class FakeResp:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *args: object) -> None:
+                return None
+
+            def getcode(self) -> int:
+                return 200
+
+            def read(self) -> bytes:
+                return b'{"data":[]}'
+
+        def fake_urlopen(req: object, timeout: float = 0) -> FakeResp:
+            del timeout
+            url = getattr(req, "full_url", "")
+            urls.append(url)
+            if "/system/ready" in url:
+                raise HTTPError(url, 404, "not found", {}, io.BytesIO(b"not found"))  # type: ignore[arg-type]
+            return FakeResp()
+
+        with patch.object(DgxUpstreamClient, "_open", side_effect=fake_urlopen):
+            ok, details = client.ensure_runtime_ready()
+
+        self.assertTrue(ok)
+        self.assertEqual(urls[-1], "http://dgx.example:38081/v1/models")
+        self.assertEqual(details["ready"]["body"], '{"data":[]}')
+
+    def test_stream_chat_completions_yields_sse_chunks_until_done(self):
+        client = DgxUpstreamClient(_config())
+        sse = (
+            b'data: {"choices":[{"delta":{"content":"\xe3\x81\x93"}}]}\n\n'
+            b": keep-alive\n\n"
+            b"data: not-json\n\n"
+            b'data: {"choices":[],"usage":{"completion_tokens":1}}\n\n'
+            b"data: [DONE]\n\n"
+            b'data: {"after":"done"}\n\n'
+        )
+
+        class FakeResp(io.BytesIO):
+            headers = {"Content-Type": "text/event-stream"}
+
+        with patch.object(DgxUpstreamClient, "_open", return_value=FakeResp(sse)) as opened:
+            chunks = list(client.stream_chat_completions(b'{"stream":true}'))
+
+        self.assertEqual(chunks[0]["choices"][0]["delta"]["content"], "こ")
+        self.assertEqual(chunks[1]["usage"], {"completion_tokens": 1})
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(opened.call_args.args[0].get_header("Accept"), "text/event-stream")
+
+    def test_stream_chat_completions_passes_through_non_stream_reply(self):
+        client = DgxUpstreamClient(_config())
+
+        class FakeResp(io.BytesIO):
+            headers = {"Content-Type": "application/json"}
+
+        body = b'{"choices":[{"message":{"content":"full"}}]}'
+        with patch.object(DgxUpstreamClient, "_open", return_value=FakeResp(body)):
+            chunks = list(client.stream_chat_completions(b"{}"))
+
+        self.assertEqual(chunks, [{"choices": [{"message": {"content": "full"}}]}])
+
+
+class FakeGateway:
+    """HTTP/1.1 gateway stand-in: counts TCP connections, /start calls and requests per path."""
+
+    def __init__(self, start_delay_sec: float = 0.0, drop_after_response: bool = False) -> None:
+        self.connections: set[tuple[str, int]] = set()
+        self.paths: list[str] = []
+        self.starts = 0
+        self.chat_status = 200
+        self.get_status = 200
+        self._lock = threading.Lock()
+        gateway = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _reply(self, status: int, payload: dict) -> None:
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                # simulate the server's idle timeout closing a connection the client still pools
+                self.close_connection = drop_after_response
+
+            def _record(self) -> None:
+                with gateway._lock:
+                    gateway.connections.add(self.client_address)
+                    gateway.paths.append(self.path.split("?", 1)[0])
+
+            def do_GET(self) -> None:  # noqa: N802
+                self._record()
+                status = gateway.get_status
+                self._reply(status, {"ok": True, "ready": True} if status == 200 else {"ok": False, "code": "RUNTIME_NOT_READY"})
+
+            def do_POST(self) -> None:  # noqa: N802
+                self._record()
+                self.rfile.read(int(self.headers.get("Content-Length", "0")))
+                if self.path == "/start":
+                    with gateway._lock:
+                        gateway.starts += 1
+                    time.sleep(start_delay_sec)
+                    self._reply(200, {"ok": True})
+                    return
+                status = gateway.chat_status
+                self._reply(status, {"choices": [{"message": {"content": "ok"}}]} if status == 200 else {"error": "down"})
+
+            def log_message(self, fmt: str, *args: object) -> None:
+                return
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestDgxClientTransport(unittest.TestCase):
+    def make(self, **kwargs: object) -> tuple[FakeGateway, DgxUpstreamClient]:
+        gateway = FakeGateway(**kwargs)  # type: ignore[arg-type]
+        self.addCleanup(gateway.close)
+        client = DgxUpstreamClient(_config(base_url=gateway.base_url))
+        self.addCleanup(client.close)
+        return gateway, client
+
+    def test_calls_reuse_one_keep_alive_connection(self):
+        gateway, client = self.make()
+
+        for _ in range(5):
+            status, parsed = client.post_chat_completions(b"{}")
+            self.assertEqual((status, parsed["choices"][0]["message"]["content"]), (200, "ok"))
+        ok, _details = client.probe_runtime_ready()
+
+        self.assertTrue(ok)
+        self.assertEqual(len(gateway.paths), 6)
+        self.assertEqual(len(gateway.connections), 1)
+
+    def test_connection_closed_by_server_is_retried_on_a_fresh_one(self):
+        gateway, client = self.make(drop_after_response=True)
+
+        for _ in range(3):
+            status, _parsed = client.post_chat_completions(b"{}")
+            self.assertEqual(status, 200)
+
+        self.assertEqual(gateway.paths, ["/v1/chat/completions"] * 3)
+        self.assertEqual(len(gateway.connections), 3)
+
+    def test_error_responses_hand_their_connection_back_to_the_pool(self):
+        gateway, client = self.make()
+        gateway.get_status = 503
+
+        results = [client.probe_runtime_ready() for _ in range(3)]
+
+        self.assertEqual([details["status"] for _ok, details in results], [503] * 3)
+        self.assertIn("RUNTIME_NOT_READY", results[0][1]["body"])
+        self.assertEqual(len(gateway.connections), 1)
+
+    def test_concurrent_cold_callers_share_one_start(self):
+        gateway, client = self.make(start_delay_sec=0.2)
+        results: list[tuple[bool, dict]] = []
+
+        threads = [threading.Thread(target=lambda: results.append(client.ensure_runtime_ready())) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(gateway.starts, 1)
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(ok for ok, _ in results))
+        self.assertEqual(sum(1 for _, details in results if details.get("sharedFlight")), 4)
+
+    def test_confirmed_readiness_skips_round_trips_until_an_upstream_failure(self):
+        gateway, client = self.make()
+        client.post_chat_completions(b"{}")
+        requests_after_chat = len(gateway.paths)
+
+        warm_ok, warm = client.warm_runtime_if_needed()
+        ensure_ok, ensure = client.ensure_runtime_ready()
+
+        self.assertTrue(warm_ok and ensure_ok)
+        self.assertEqual((warm["phase"], ensure["phase"]), ("already_warm", "cached"))
+        self.assertEqual(len(gateway.paths), requests_after_chat)
+
+        gateway.chat_status = 503
+        with self.assertRaises(HTTPError):
+            client.post_chat_completions(b"{}")
+        ok, details = client.ensure_runtime_ready()
+
+        self.assertTrue(ok)
+        self.assertEqual(gateway.starts, 1)
+        self.assertIn("start", details)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,17 +1,19 @@
 import importlib.util
 import sys
+import time
 import unittest
 from pathlib import Path
 
 
 MODULE_DIR = Path(__file__).resolve().parents[1]
 MODULE_PATH = MODULE_DIR / "home_assistant_client.py"
+FAKE_HA_PATH = MODULE_DIR / "fake_home_assistant.py"
 
 
-def load_module():
+def load_module(name="home_assistant_client", path=MODULE_PATH):
     if str(MODULE_DIR) not in sys.path:
         sys.path.insert(0, str(MODULE_DIR))
-    spec = importlib.util.spec_from_file_location("home_assistant_client", MODULE_PATH)
+    spec = importlib.util.spec_from_file_location(name, path)
     module = importlib.util.module_from_spec(spec)
     assert spec.loader is not None
     sys.modules[spec.name] = module
@@ -19,6 +21,14 @@ def load_module():
     return module
 
 
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
 class HomeAssistantClientTests(unittest.TestCase):
     def test_format_home_assistant_state_uses_friendly_name_and_unit(self):
         module = load_module()
@@ -44,5 +54,121 @@ class HomeAssistantClientTests(unittest.TestCase):
         self.assertEqual(client.snapshot_lines(), [])
 
 
+    def test_entity_ttls_env_format(self):
+        module = load_module()
+
+        self.assertEqual(
+            module._env_entity_ttls("sensor.a=10, weather.home=600,broken,bad=x"),
+            (("sensor.a", 10.0), ("weather.home", 600.0)),
+        )
+
+
+class HomeAssistantStateCacheTests(unittest.TestCase):
+    ENTITIES = ("sensor.living_temperature", "sensor.living_humidity", "weather.home", "binary_sensor.door")
+
+    def setUp(self):
+        self.module = load_module()
+        fake = load_module("fake_home_assistant", FAKE_HA_PATH)
+        self.server, self.ha = fake.start_fake_home_assistant(token="secret")
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.ha.set_state("sensor.living_temperature", "22.3", {"friendly_name": "Living temperature", "unit_of_measurement": "°C"})
+        self.ha.set_state("sensor.living_humidity", "48", {"unit_of_measurement": "%"})
+        self.ha.set_state("weather.home", "sunny")
+        self.ha.set_state("binary_sensor.door", "off")
+
+    def make_cache(self, clock=None, **overrides):
+        host, port = self.server.server_address[:2]
+        config = self.module.HomeAssistantConfig(
+            enabled=True,
+            base_url=f"http://{host}:{port}",
+            token="secret",
+            entity_ids=self.ENTITIES,
+            timeout_sec=2.0,
+            **overrides,
+        )
+        cache = self.module.HomeAssistantStateCache(self.module.HomeAssistantClient(config), clock=clock or time.monotonic)
+        self.addCleanup(cache.stop)
+        return cache
+
+    def test_refresh_fetches_entities_concurrently_in_allowlist_order(self):
+        self.ha.latency_ms = 150
+        cache = self.make_cache(clock=FakeClock(), fetch_concurrency=4)
+
+        started = time.monotonic()
+        self.assertEqual(cache.refresh_due(), 4)
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(self.ha.max_inflight, 4)
+        self.assertLess(elapsed, 0.45)
+        self.assertEqual(
+            cache.snapshot_lines(),
+            [
+                "Living temperature (sensor.living_temperature): 22.3°C",
+                "sensor.living_humidity (sensor.living_humidity): 48%",
+                "weather.home (weather.home): sunny",
+                "binary_sensor.door (binary_sensor.door): off",
+            ],
+        )
+
+    def test_snapshot_does_not_hit_home_assistant_after_refresh(self):
+        cache = self.make_cache(clock=FakeClock())
+        cache.refresh_due()
+
+        for _ in range(20):
+            cache.snapshot_lines()
+
+        self.assertEqual(self.ha.stats()["requests"], {entity_id: 1 for entity_id in self.ENTITIES})
+
+    def test_per_entity_ttl_controls_refetch(self):
+        clock = FakeClock()
+        cache = self.make_cache(clock=clock, ttl_sec=30.0, entity_ttls=(("weather.home", 600.0),))
+        cache.refresh_due()
+        self.ha.set_state("sensor.living_humidity", "55", {"unit_of_measurement": "%"})
+        self.ha.set_state("weather.home", "rainy")
+
+        clock.now += 10
+        self.assertEqual(cache.refresh_due(), 0)
+        clock.now += 25
+        self.assertEqual(cache.refresh_due(), 3)
+
+        lines = cache.snapshot_lines()
+        self.assertIn("sensor.living_humidity (sensor.living_humidity): 55%", lines)
+        self.assertIn("weather.home (weather.home): sunny", lines)
+        self.assertEqual(self.ha.request_count("weather.home"), 1)
+
+    def test_failed_refresh_keeps_stale_line_until_limit(self):
+        clock = FakeClock()
+        cache = self.make_cache(clock=clock, ttl_sec=30.0)
+        cache.refresh_due()
+        self.ha.set_failing("binary_sensor.door")
+
+        clock.now += 31
+        cache.refresh_due()
+        self.assertIn("binary_sensor.door (binary_sensor.door): off", cache.snapshot_lines())
+        self.assertEqual(cache.stats()["entities"]["binary_sensor.door"]["failures"], 1)
+
+        clock.now += 30 * self.module.STALE_TTL_FACTOR
+        cache.refresh_due()
+        lines = cache.snapshot_lines()
+        self.assertNotIn("binary_sensor.door (binary_sensor.door): off", lines)
+        self.assertEqual(len(lines), 3)
+
+    def test_background_refresh_serves_first_snapshot(self):
+        cache = self.make_cache()
+
+        lines = cache.snapshot_lines()
+
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(cache.stats()["refreshes"], 1)
+
+    def test_disabled_cache_never_starts(self):
+        cache = self.module.HomeAssistantStateCache(self.module.HomeAssistantClient(self.module.HomeAssistantConfig()))
+
+        self.assertEqual(cache.snapshot_lines(), [])
+        cache.start()
+        self.assertEqual(self.ha.stats()["requests"], {})
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,5 +1,6 @@
 import importlib.util
 import io
+import json
 import sys
 import unittest
 from pathlib import Path
@@ -42,6 +43,35 @@ class FakeDgxClient:
         return self._ready_result
 
 
+class FakeStreamingDgxClient:
+    """stream_results: each item is a list of chunks (an Exception inside is raised mid-stream) or an Exception."""
+
+    def __init__(self, stream_results, auto_start=False, ready_result=(True, {"phase": "started"})):
+        self.auto_start = auto_start
+        self._stream_results = list(stream_results)
+        self._ready_result = ready_result
+        self.ensure_calls = 0
+        self.bodies = []
+
+    def stream_chat_completions(self, body: bytes):
+        self.bodies.append(body)
+        result = self._stream_results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        for chunk in result:
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+
+    def ensure_runtime_ready(self):
+        self.ensure_calls += 1
+        return self._ready_result
+
+
+def delta_chunk(text):
+    return {"model": "system-prod-primary", "choices": [{"index": 0, "delta": {"content": text}}]}
+
+
 class FakeHomeAssistantContext:
     def __init__(self, lines):
         self._lines = lines
@@ -215,9 +245,11 @@ class StackchanChatCoreTests(unittest.TestCase):
 
         self.assertIsInstance(outcome, module.ChatSuccess)
         sent_body = module.json.loads(client.last_body.decode("utf-8"))
-        self.assertEqual(sent_body["messages"][0]["role"], "system")
-        self.assertIn("Home Assistant current state", sent_body["messages"][0]["content"])
-        self.assertEqual(sent_body["messages"][1]["content"], "リビングはどう？")
+        self.assertEqual(len(sent_body["messages"]), 1)
+        self.assertEqual(sent_body["messages"][0]["role"], "user")
+        self.assertTrue(sent_body["messages"][0]["content"].startswith("Home Assistant current state"))
+        self.assertTrue(sent_body["messages"][0]["content"].endswith("\n\nリビングはどう？"))
+        self.assertEqual(request.messages[0]["content"], "リビングはどう？")
 
     def test_workflow_returns_failure_when_runtime_recovery_fails(self):
         module = load_module()
@@ -266,5 +298,153 @@ class StackchanChatCoreTests(unittest.TestCase):
         self.assertEqual(payload["usage"]["total_tokens"], 18)
 
 
+    def test_sentence_chunker_emits_each_sentence_as_soon_as_it_is_closed(self):
+        module = load_module()
+        chunker = module.SentenceChunker()
+
+        self.assertEqual(chunker.feed("こんにちは"), [])
+        self.assertEqual(chunker.feed("。今日は"), ["こんにちは。"])
+        self.assertEqual(chunker.feed("晴れです！"), [])
+        self.assertEqual(chunker.feed("」と彼は"), ["今日は晴れです！」"])
+        self.assertEqual(chunker.feed("言った"), [])
+        self.assertEqual(chunker.flush(), ["と彼は言った"])
+        self.assertEqual(chunker.flush(), [])
+
+    def test_sentence_chunker_handles_ascii_periods_newlines_and_long_runs(self):
+        module = load_module()
+        chunker = module.SentenceChunker(max_chars=20)
+
+        self.assertEqual(chunker.feed("Version 3.5 is out. Next"), ["Version 3.5 is out."])
+        self.assertEqual(chunker.feed(" line\n次"), ["Next line"])
+        long_run = chunker.feed("の文はとても長くて、句点がなかなか来ないので途中で切る")
+        self.assertEqual(long_run, ["次の文はとても長くて、"])
+        self.assertEqual(chunker.flush(), ["句点がなかなか来ないので途中で切る"])
+
+    def test_chat_stream_hands_out_sentences_and_returns_full_reply(self):
+        module = load_module()
+        request, _ = module.validate_chat_payload({"messages": [{"role": "user", "content": "天気は？"}]})
+        usage_chunk = {"choices": [], "usage": {"completion_tokens": 9}}
+        client = FakeStreamingDgxClient(
+            [[delta_chunk("晴れ"), delta_chunk("です。"), delta_chunk("傘は"), delta_chunk("不要です。"), usage_chunk]]
+        )
+        sentences = []
+
+        outcome = module.ChatCompletionWorkflow(client, "system-prod-primary").stream(request, sentences.append)
+
+        self.assertIsInstance(outcome, module.ChatSuccess)
+        self.assertEqual(sentences, ["晴れです。", "傘は不要です。"])
+        self.assertEqual(module.extract_reply_text(outcome.parsed), "晴れです。傘は不要です。")
+        self.assertEqual(outcome.parsed["usage"], {"completion_tokens": 9})
+        sent = json.loads(client.bodies[0].decode("utf-8"))
+        self.assertTrue(sent["stream"])
+        self.assertEqual(sent["stream_options"], {"include_usage": True})
+
+    def test_chat_stream_recovers_runtime_before_first_sentence(self):
+        module = load_module()
+        request, _ = module.validate_chat_payload({"messages": [{"role": "user", "content": "hi"}]})
+        client = FakeStreamingDgxClient(
+            [
+                HTTPError("http://dgx", 503, "unavailable", {}, io.BytesIO(b"loading")),
+                [delta_chunk("起きました。")],
+            ],
+            auto_start=True,
+        )
+        sentences = []
+
+        outcome = module.ChatCompletionWorkflow(client, "system-prod-primary").stream(request, sentences.append)
+
+        self.assertIsInstance(outcome, module.ChatSuccess)
+        self.assertEqual(client.ensure_calls, 1)
+        self.assertEqual(sentences, ["起きました。"])
+
+    def test_chat_stream_failure_after_first_sentence_is_not_retried(self):
+        module = load_module()
+        request, _ = module.validate_chat_payload({"messages": [{"role": "user", "content": "hi"}]})
+        client = FakeStreamingDgxClient(
+            [[delta_chunk("前半です。"), delta_chunk("後"), TimeoutError("read timed out")]],
+            auto_start=True,
+        )
+        sentences = []
+
+        outcome = module.ChatCompletionWorkflow(client, "system-prod-primary").stream(request, sentences.append)
+
+        self.assertIsInstance(outcome, module.ChatFailure)
+        self.assertEqual(outcome.code, "UPSTREAM_TIMEOUT")
+        self.assertFalse(outcome.retryable)
+        self.assertEqual(outcome.details["emittedSentences"], 1)
+        self.assertEqual(sentences, ["前半です。"])
+        self.assertEqual(client.ensure_calls, 0)
+
+    def test_trim_drops_history_in_blocks(self):
+        module = load_module()
+        system = {"role": "system", "content": "sys"}
+        history = [{"role": "user" if i % 2 == 0 else "assistant", "content": str(i)} for i in range(12)]
+
+        starts = []
+        for n in range(8, 13):
+            trimmed = module._trim_messages([system] + history[:n], 8, trim_step=4)
+            self.assertEqual(trimmed[0], system)
+            self.assertLessEqual(len(trimmed), 8)
+            self.assertEqual(trimmed[-1], history[n - 1])
+            starts.append(trimmed[1]["content"])
+
+        # the first kept message changes every 4 messages (2 turns), not every message
+        self.assertEqual(starts, ["4", "4", "4", "4", "8"])
+
+    def test_prompt_prefix_is_stable_across_a_simulated_conversation(self):
+        module = load_module()
+        system_prompt = "あなたはスタックチャンです。" * 200
+        replies = [{"choices": [{"message": {"content": f"返答{i}"}}], "usage": {"prompt_tokens": 100}} for i in range(12)]
+        client = FakeDgxClient(post_results=[(200, reply) for reply in replies])
+        home_assistant = FakeHomeAssistantContext([])
+        workflow = module.ChatCompletionWorkflow(client, "system-prod-primary", home_assistant)
+        config = module.ChatValidationConfig(max_messages=8)
+
+        conversation = [{"role": "system", "content": system_prompt}]
+        prompts = []
+        for turn in range(12):
+            home_assistant._lines = [f"Living temperature (sensor.living_temperature): {20 + turn * 0.1:.1f}°C"]
+            conversation.append({"role": "user", "content": f"質問{turn}"})
+            validated, err = module.validate_chat_payload({"messages": conversation}, config)
+            self.assertIsNone(err)
+            self.assertIsInstance(workflow.run(validated), module.ChatSuccess)
+            sent = json.loads(client.last_body.decode("utf-8"))["messages"]
+            prompts.append([json.dumps(m, ensure_ascii=False) for m in sent])
+            conversation.append({"role": "assistant", "content": f"返答{turn}"})
+
+        reused = 0
+        for previous, current in zip(prompts, prompts[1:]):
+            # the stable system prompt is always the byte-identical first message
+            self.assertEqual(current[0], prompts[0][0])
+            # volatile state only ever appears in the newest message
+            self.assertTrue(all("Home Assistant" not in m for m in current[:-1]))
+            self.assertIn("Home Assistant", current[-1])
+            if current[: len(previous) - 1] == previous[:-1]:
+                reused += 1
+        # everything but the previous user turn is reused, except on the turns where history is trimmed
+        self.assertGreaterEqual(reused, 7)
+
+    def test_prompt_cache_stats_reads_cached_tokens_from_usage(self):
+        module = load_module()
+        usage = {"prompt_tokens": 1000, "completion_tokens": 20, "prompt_tokens_details": {"cached_tokens": 900}}
+        client = FakeDgxClient(post_results=[(200, {"choices": [{"message": {"content": "はい"}}], "usage": usage})])
+        stats = module.PromptCacheStats()
+        logs = []
+        request = module.ValidatedChatRequest(
+            messages=[{"role": "user", "content": "hello"}], max_tokens=32, temperature=0.2, enable_thinking=False
+        )
+
+        module.ChatCompletionWorkflow(client, "system-prod-primary", prompt_cache=stats).run(
+            request, log=lambda fmt, *args: logs.append(fmt % args)
+        )
+        stats.record({"prompt_tokens": 10})
+
+        snapshot = stats.snapshot()
+        self.assertEqual(snapshot["requests"], 2)
+        self.assertEqual(snapshot["reported"], 1)
+        self.assertEqual(snapshot["cachedRatio"], 0.9)
+        self.assertEqual(logs, ["prompt cache: 90% of prompt tokens cached"])
+
+
 if __name__ == "__main__":
     unittest.main()
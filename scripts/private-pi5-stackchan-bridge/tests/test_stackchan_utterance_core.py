@@ -51,6 +51,11 @@ class FakeDgxClient:
             },
         )
 
+    def stream_chat_completions(self, body: bytes):
+        self.last_body = body
+        for piece in ("こんにちは、", "調子は", "どう？", "私は元気。"):
+            yield {"model": "system-prod-primary", "choices": [{"delta": {"content": piece}}]}
+
     def ensure_runtime_ready(self):
         return False, {}
 
@@ -92,5 +97,24 @@ class UtteranceCoreTests(unittest.TestCase):
         self.assertEqual(outcome.stage, "stt")
 
 
+    def test_utterance_stream_reply_emits_sentences_after_transcribe(self):
+        stt_wf = stt_core.SttWorkflow(FakeSttClient())
+        chat_wf = chat_core.ChatCompletionWorkflow(FakeDgxClient(), "system-prod-primary")
+        wf = utterance.UtteranceWorkflow(stt_wf, chat_wf)
+        validated, _ = utterance.validate_utterance_json_payload({"audioBase64": "aGVsbG8="})
+        assert validated is not None
+
+        stt = wf.transcribe(validated)
+        self.assertNotIsInstance(stt, utterance.UtteranceFailure)
+        sentences = []
+        outcome = wf.stream_reply(validated, stt, sentences.append)
+
+        self.assertEqual(sentences, ["こんにちは、調子はどう？", "私は元気。"])
+        self.assertIsInstance(outcome, utterance.UtteranceSuccess)
+        payload = utterance.format_utterance_success(outcome)
+        self.assertEqual(payload["sttText"], "こんにちは")
+        self.assertEqual(payload["replyText"], "こんにちは、調子はどう？私は元気。")
+
+
 if __name__ == "__main__":
     unittest.main()
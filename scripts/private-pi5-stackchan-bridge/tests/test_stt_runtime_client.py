@@ -1,6 +1,9 @@
 import importlib.util
+import io
+import struct
 import sys
 import unittest
+import wave
 from pathlib import Path
 from unittest.mock import patch
 
@@ -20,6 +23,24 @@ def load_module():
     return module
 
 
+def make_wav(sample_rate=16000, channels=1, samples=(0, 1000, -1000, 32767)):
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(struct.pack(f"<{len(samples)}h", *samples))
+    return buf.getvalue()
+
+
+try:
+    import numpy  # noqa: F401
+
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+
 class FakeSegment:
     def __init__(self, text):
         self.text = text
@@ -30,8 +51,10 @@ class FakeWhisperModel:
         self.responses = list(responses)
         self.calls = []
 
-    def transcribe(self, path, language=None, vad_filter=True):
-        self.calls.append({"path": path, "language": language, "vad_filter": vad_filter})
+    def transcribe(self, path, language=None, vad_filter=True, clip_timestamps="0"):
+        self.calls.append(
+            {"path": path, "language": language, "vad_filter": vad_filter, "clip_timestamps": clip_timestamps}
+        )
         text = self.responses.pop(0)
         return [FakeSegment(text)] if text else [], object()
 
@@ -124,5 +147,87 @@ class SttRuntimeClientTests(unittest.TestCase):
         upstream.assert_called_once()
 
 
+    def test_local_transcribe_skips_vad_pass_when_vad_finds_no_speech(self):
+        module = load_module()
+        client = module.SttRuntimeClient(
+            module.SttRuntimeConfig(provider="faster-whisper-local", local_language_default="ja")
+        )
+        fake_model = FakeWhisperModel([" はい "])
+        client._whisper_model = fake_model
+        client._speech_clips = lambda audio: []
+
+        text, details = client.transcribe(make_wav(), "audio/wav", None, None)
+
+        self.assertEqual(text, "はい")
+        self.assertEqual(len(fake_model.calls), 1)
+        self.assertEqual(fake_model.calls[0]["vad_filter"], False)
+        self.assertIsNone(fake_model.calls[0]["language"])
+        self.assertTrue(details["vadNoSpeech"])
+        self.assertFalse(details["retryWithoutVad"])
+
+    def test_local_transcribe_reuses_vad_regions_instead_of_a_second_vad_pass(self):
+        module = load_module()
+        client = module.SttRuntimeClient(
+            module.SttRuntimeConfig(provider="faster-whisper-local", local_language_default="ja")
+        )
+        fake_model = FakeWhisperModel([" 電気をつけて "])
+        client._whisper_model = fake_model
+        vad_calls = []
+        client._speech_clips = lambda audio: vad_calls.append(audio) or [0.25, 1.5, 2.0, 2.75]
+
+        text, details = client.transcribe(make_wav(), "audio/wav", None, None)
+
+        self.assertEqual(text, "電気をつけて")
+        self.assertEqual(len(vad_calls), 1)
+        self.assertEqual(len(fake_model.calls), 1)
+        self.assertEqual(fake_model.calls[0]["vad_filter"], False)
+        self.assertEqual(fake_model.calls[0]["clip_timestamps"], [0.25, 1.5, 2.0, 2.75])
+        self.assertEqual(fake_model.calls[0]["language"], "ja")
+        self.assertFalse(details["retryWithoutVad"])
+
+    def test_local_transcribe_keeps_audio_in_memory(self):
+        module = load_module()
+        client = module.SttRuntimeClient(module.SttRuntimeConfig(provider="faster-whisper-local"))
+        fake_model = FakeWhisperModel(["テスト"])
+        client._whisper_model = fake_model
+        client._speech_clips = lambda audio: None
+
+        client.transcribe(make_wav(sample_rate=8000), "audio/wav", "ja", None)
+
+        self.assertIsInstance(fake_model.calls[0]["path"], io.BytesIO)
+
+    def test_read_wav_pcm16_accepts_pcm16_only(self):
+        module = load_module()
+
+        frames, rate, channels = module.read_wav_pcm16(make_wav(sample_rate=16000, channels=2))
+
+        self.assertEqual((rate, channels, len(frames)), (16000, 2, 8))
+        self.assertIsNone(module.read_wav_pcm16(b"RIFF....WAVE"))
+        self.assertIsInstance(module.decode_audio_in_memory(b"not audio"), io.BytesIO)
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy is installed with faster-whisper only")
+    def test_decode_audio_in_memory_downmixes_16k_wav_to_float32(self):
+        module = load_module()
+
+        audio = module.decode_audio_in_memory(make_wav(channels=2, samples=(16384, 0, -32768, 0)))
+
+        self.assertEqual(str(audio.dtype), "float32")
+        self.assertEqual(audio.tolist(), [0.25, -0.5])
+
+    def test_warm_loads_local_model_only(self):
+        module = load_module()
+        upstream = module.SttRuntimeClient(module.SttRuntimeConfig(provider="upstream-openai"))
+        self.assertFalse(upstream.warm()["warmed"])
+
+        local = module.SttRuntimeClient(module.SttRuntimeConfig(provider="faster-whisper-local"))
+        local._whisper_model = FakeWhisperModel([""])
+        local._speech_clips = lambda audio: None
+
+        result = local.warm()
+
+        self.assertTrue(result["warmed"])
+        self.assertIn("loadSec", result)
+
+
 if __name__ == "__main__":
     unittest.main()